@@ -47,6 +47,9 @@ namespace ClassicUO.Assets
         [ThreadStatic]
         private static uint[] _data = null;
 
+        [ThreadStatic]
+        private static DataReader _reader;
+
         public const int MAX_LAND_DATA_INDEX_COUNT = 0x4000;
         public const int MAX_STATIC_DATA_INDEX_COUNT = 0x14000;
 
@@ -104,8 +107,10 @@ namespace ClassicUO.Assets
                 return false;
             }
 
-            _file.SetData(entry.Address, entry.FileSize);
-            _file.Seek(entry.Offset);
+            // A reader per thread instead of moving _file, so art can be decoded off the game thread
+            DataReader file = _reader ??= new DataReader();
+            file.SetData(entry.Address, entry.FileSize);
+            file.Seek(entry.Offset);
             //var flags = _file.ReadUInt();
 
             //if (flags > 0xFFFF || flags == 0)
@@ -134,7 +139,7 @@ namespace ClassicUO.Assets
 
                     for (int j = start; j < end; ++j)
                     {
-                        data[pos++] = HuesHelper.Color16To32(_file.ReadUShort()) | 0xFF_00_00_00;
+                        data[pos++] = HuesHelper.Color16To32(file.ReadUShort()) | 0xFF_00_00_00;
                     }
                 }
 
@@ -145,15 +150,15 @@ namespace ClassicUO.Assets
 
                     for (int j = i; j < end; ++j)
                     {
-                        data[pos++] = HuesHelper.Color16To32(_file.ReadUShort()) | 0xFF_00_00_00;
+                        data[pos++] = HuesHelper.Color16To32(file.ReadUShort()) | 0xFF_00_00_00;
                     }
                 }
             }
             else
             {
-                var flags = _file.ReadUInt();
-                width = _file.ReadShort();
-                height = _file.ReadShort();
+                var flags = file.ReadUInt();
+                width = file.ReadShort();
+                height = file.ReadShort();
 
                 if (width <= 0 || height <= 0 || data.Length < (width * height))
                 {
@@ -169,7 +174,7 @@ namespace ClassicUO.Assets
 
                 ushort fixedGraphic = (ushort)(g - 0x4000);
 
-                if (ReadData(data, width, height, _file))
+                if (ReadData(data, width, height, file))
                 {
                     // keep the cursor graphic check to cleanup edges
                     //if ((fixedGraphic >= 0x2053 && fixedGraphic <= 0x2062) || (fixedGraphic >= 0x206A && fixedGraphic <= 0x2079))
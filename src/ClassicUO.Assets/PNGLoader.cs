@@ -84,6 +84,11 @@ namespace ClassicUO.Assets
             };
         }
 
+        /// <summary>
+        /// True if an external png replaces the art, safe to call from any thread.
+        /// </summary>
+        public bool HasArtTexture(uint graphic) => art_availableIDs != null && Array.IndexOf(art_availableIDs, graphic) != -1;
+
         public ArtInfo LoadArtTexture(uint graphic)
         {
             Texture2D texture;
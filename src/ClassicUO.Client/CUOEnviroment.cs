@@ -50,6 +50,15 @@ namespace ClassicUO
         public static bool SkipLoginScreen;
         public static bool IsOutlands;
         public static bool NoServerPing;
+        /// <summary>
+        /// Where to capture packets to, empty for the default file, null when not capturing.
+        /// </summary>
+        public static string PacketCaptureFile;
+        /// <summary>
+        /// Capture to replay without a window or server instead of starting the game.
+        /// </summary>
+        public static string ReplayFile;
+        public static double ReplaySpeed;
         public static Assembly Assembly => Assembly.GetEntryAssembly();
 
         public static readonly bool IsUnix = Environment.OSVersion.Platform != PlatformID.Win32NT && Environment.OSVersion.Platform != PlatformID.Win32Windows && Environment.OSVersion.Platform != PlatformID.Win32S && Environment.OSVersion.Platform != PlatformID.WinCE;
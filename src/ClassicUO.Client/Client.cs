@@ -61,6 +61,11 @@ namespace ClassicUO
 
             Load();
 
+            if (CUOEnviroment.PacketCaptureFile != null)
+            {
+                PacketCapture.Start(CUOEnviroment.PacketCaptureFile);
+            }
+
             Log.Trace("Running game...");
 
             using (Game = new GameController())
@@ -87,9 +92,34 @@ namespace ClassicUO
                 Game.Run();
             }
 
+            PacketCapture.Stop();
+
             Log.Trace("Exiting game...");
         }
 
+        /// <summary>
+        /// Load the client files and play a packet capture into the world, without a window or a server.
+        /// Handlers that need the game window (sounds, scenes, gumps that draw) fail and are counted as errors.
+        /// </summary>
+        public static void Replay(string path, double speed)
+        {
+            Load();
+
+            Log.Trace($"Replaying {path}...");
+
+            try
+            {
+                PacketReplayResult result = PacketReplay.Run(path, speed);
+
+                Log.Trace(result.ToString());
+                Console.WriteLine(result);
+            }
+            catch (Exception e)
+            {
+                Log.Error($"Replay failed: {e}");
+            }
+        }
+
         public static void ShowErrorMessage(string msg)
         {
             SDL.SDL_ShowSimpleMessageBox(SDL.SDL_MessageBoxFlags.SDL_MESSAGEBOX_ERROR, "ERROR", msg, IntPtr.Zero);
@@ -114,6 +114,12 @@ namespace ClassicUO.Configuration
 
         [JsonPropertyName("encryption")] public byte Encryption { get; set; }
 
+        [JsonPropertyName("send_coalesce_ms")] public int SendCoalesceMs { get; set; }
+
+        [JsonPropertyName("packet_stats_dump_interval")] public int PacketStatsDumpInterval { get; set; }
+
+        [JsonPropertyName("texture_memory_budget_mb")] public int TextureMemoryBudgetMB { get; set; } = 1024; // 0 = no limit
+
         [JsonPropertyName("plugins")] public string[] Plugins { get; set; } = { @"./Assistant/Razor.dll" };
 
         public bool EnhancedPacketsEnabled = PacketsEnabled();
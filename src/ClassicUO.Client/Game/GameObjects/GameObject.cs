@@ -112,6 +112,10 @@ namespace ClassicUO.Game.GameObjects
                     originalGraphic = value;
                 GraphicsReplacement.Replace(originalGraphic, ref value, ref hue);
                 Hue = hue; //Workaround for making sure hues are replaced as-well
+
+                if (graphic != value && this is Item { IsIndexed: true } item)
+                    World.ItemIndex.OnGraphicChanged(item, graphic, value);
+
                 graphic = value;
             }
         }
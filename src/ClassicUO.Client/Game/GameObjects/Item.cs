@@ -53,6 +53,8 @@ namespace ClassicUO.Game.GameObjects
             Constants.PREDICTABLE_CHUNKS * 3,
             i =>
             {
+                // Index entries belong to the previous serial, they were dropped in Destroy
+                i.IsIndexed = false;
                 i.IsDestroyed = false;
                 i.Graphic = 0;
                 i.Amount = 0;
@@ -106,6 +108,7 @@ namespace ClassicUO.Game.GameObjects
 
         private ushort? _displayedGraphic;
         private bool _isMulti;
+        private uint _container = 0xFFFF_FFFF;
 
         public Item() : base(0) { }
 
@@ -236,7 +239,26 @@ namespace ClassicUO.Game.GameObjects
             && Graphic != 0;
 
         public ushort Amount;
-        public uint Container = 0xFFFF_FFFF;
+
+        public uint Container
+        {
+            get => _container;
+            set
+            {
+                if (_container == value)
+                    return;
+
+                if (IsIndexed)
+                    World.ItemIndex.OnContainerChanged(this, _container, value);
+
+                _container = value;
+            }
+        }
+
+        /// <summary>
+        /// True while this item is tracked by <see cref="World.ItemIndex"/>.
+        /// </summary>
+        internal bool IsIndexed;
 
         public bool IsDamageable;
         public Layer Layer;
@@ -286,6 +308,7 @@ namespace ClassicUO.Game.GameObjects
 
             base.Destroy();
 
+            World.ItemIndex.Remove(this);
             _pool.ReturnOne(this);
         }
 
@@ -0,0 +1,233 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Threading.Tasks;
+using ClassicUO.Utility.Logging;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// Long range walking. A route is found on the facet's <see cref="RegionGraph"/> in the background,
+    /// then walked a few tiles at a time with the regular <see cref="Pathfinder"/>, which takes care of mobiles, doors and other things the graph doesn't know about.
+    /// Graphs are cached in Data/Client/Regions and rebuilt when the map data changes.
+    /// </summary>
+    public static class HierarchicalPathfinder
+    {
+        /// <summary>
+        /// How far ahead on the route each tile pathfinder segment goes, kept inside of the loaded chunks.
+        /// </summary>
+        private const int SEGMENT_LENGTH = 16;
+        private const int PROGRESS_WINDOW = 48;
+        private const int RETRY_DELAY_MS = 250;
+        private const int MAX_FAILURES = 8;
+
+        private static readonly Dictionary<int, Task<RegionGraph>> _graphs = new Dictionary<int, Task<RegionGraph>>();
+        private static List<(int X, int Y, int Z)> _route;
+        private static int _routeMap, _progress, _distance, _failures;
+        private static long _nextAttempt;
+
+        public static string CachePath => Path.Combine(CUOEnviroment.ExecutablePath, "Data", "Client", "Regions");
+
+        /// <summary>
+        /// True while a route is being walked.
+        /// </summary>
+        public static bool IsWalkingRoute => _route != null;
+
+        /// <summary>
+        /// Tiles left on the route being walked.
+        /// </summary>
+        public static int RemainingSteps => _route == null ? 0 : _route.Count - 1 - _progress;
+
+        /// <summary>
+        /// The region graph of a facet, loaded from the cache or built in the background the first time it's asked for.
+        /// </summary>
+        public static Task<RegionGraph> GetGraph(int map)
+        {
+            lock (_graphs)
+            {
+                if (!_graphs.TryGetValue(map, out Task<RegionGraph> task) || task.IsFaulted)
+                    _graphs[map] = task = Task.Run(() => LoadOrBuild(map));
+
+                return task;
+            }
+        }
+
+        /// <summary>
+        /// Find a route from the player to a location on the current facet. Must be called from the game thread.
+        /// </summary>
+        /// <returns>The route including the player's tile, null if there is none</returns>
+        public static Task<List<(int X, int Y, int Z)>> FindRoute(int x, int y)
+        {
+            if (!World.InGame || World.Player == null)
+                return Task.FromResult<List<(int X, int Y, int Z)>>(null);
+
+            int startX = World.Player.X, startY = World.Player.Y;
+            Task<RegionGraph> graphTask = GetGraph(World.MapIndex);
+
+            return Task.Run
+            (async () =>
+                {
+                    RegionGraph graph = await graphTask.ConfigureAwait(false);
+                    List<(int X, int Y, int Z)> route = graph.FindRoute(startX, startY, x, y);
+
+                    if (graph.NeedsSave)
+                        Save(graph);
+
+                    return route;
+                }
+            );
+        }
+
+        /// <summary>
+        /// Start walking a route from <see cref="FindRoute"/>. Must be called from the game thread.
+        /// </summary>
+        /// <param name="distance">Stop when this close to the end of the route</param>
+        public static bool WalkRoute(List<(int X, int Y, int Z)> route, int distance = 0)
+        {
+            if (route == null || route.Count == 0 || World.Player == null)
+                return false;
+
+            Pathfinder.StopAutoWalk();
+            _route = route;
+            _routeMap = World.MapIndex;
+            _distance = Math.Max(0, distance);
+            _progress = 0;
+            _failures = 0;
+            _nextAttempt = 0;
+
+            return true;
+        }
+
+        public static void StopRoute()
+        {
+            if (_route == null)
+                return;
+
+            _route = null;
+            Pathfinder.StopAutoWalk();
+        }
+
+        /// <summary>
+        /// Keep the tile pathfinder walking towards the next part of the route.
+        /// </summary>
+        public static void Update()
+        {
+            if (_route == null)
+                return;
+
+            if (!World.InGame || World.Player == null || World.MapIndex != _routeMap)
+            {
+                StopRoute();
+
+                return;
+            }
+
+            if (Pathfinder.AutoWalking || Time.Ticks < _nextAttempt)
+                return;
+
+            int playerX = World.Player.X, playerY = World.Player.Y;
+            int end = Math.Min(_route.Count, _progress + PROGRESS_WINDOW);
+
+            for (int i = _progress; i < end; i++)
+            {
+                if (_route[i].X == playerX && _route[i].Y == playerY)
+                    _progress = i;
+            }
+
+            (int X, int Y, int Z) goal = _route[_route.Count - 1];
+
+            if (Math.Max(Math.Abs(goal.X - playerX), Math.Abs(goal.Y - playerY)) <= _distance)
+            {
+                StopRoute();
+
+                return;
+            }
+
+            // Farthest point of the route within reach, closer ones if the tile pathfinder can't get there
+            for (int i = Math.Min(_route.Count - 1, _progress + SEGMENT_LENGTH); i > _progress; i -= 4)
+            {
+                (int X, int Y, int Z) target = _route[i];
+
+                if (Math.Max(Math.Abs(target.X - playerX), Math.Abs(target.Y - playerY)) > SEGMENT_LENGTH)
+                    continue;
+
+                if (Pathfinder.WalkTo(target.X, target.Y, target.Z, 0))
+                {
+                    _failures = 0;
+
+                    return;
+                }
+            }
+
+            _nextAttempt = Time.Ticks + RETRY_DELAY_MS;
+
+            if (++_failures >= MAX_FAILURES)
+            {
+                StopRoute();
+                GameActions.Print("Long range path is blocked, stopped walking.");
+            }
+        }
+
+        /// <summary>
+        /// Map data in a block was patched (UltimaLive), the clusters around it get rebuilt before the next search.
+        /// </summary>
+        public static void OnBlockChanged(int map, int block)
+        {
+            Task<RegionGraph> task;
+
+            lock (_graphs)
+            {
+                if (!_graphs.TryGetValue(map, out task))
+                    return;
+            }
+
+            if (task.Status == TaskStatus.RanToCompletion)
+                task.Result.MarkBlockChanged(block);
+            else
+                task.ContinueWith(t => t.Result.MarkBlockChanged(block), TaskContinuationOptions.OnlyOnRanToCompletion);
+        }
+
+        /// <summary>
+        /// Forget the loaded graphs, for when the map files themselves change.
+        /// </summary>
+        public static void Clear()
+        {
+            StopRoute();
+
+            lock (_graphs)
+                _graphs.Clear();
+        }
+
+        private static RegionGraph LoadOrBuild(int map)
+        {
+            var graph = new RegionGraph(map);
+
+            if (graph.TryLoad(GetFilePath(graph)))
+                return graph;
+
+            graph.Build();
+            Save(graph);
+
+            return graph;
+        }
+
+        private static string GetFilePath(RegionGraph graph) => Path.Combine(CachePath, $"map{graph.MapIndex}_{graph.Hash:x16}.rgn");
+
+        private static void Save(RegionGraph graph)
+        {
+            try
+            {
+                Directory.CreateDirectory(CachePath);
+
+                foreach (string old in Directory.GetFiles(CachePath, $"map{graph.MapIndex}_*.rgn"))
+                    File.Delete(old);
+
+                graph.Save(GetFilePath(graph));
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"[RegionGraph] Could not save map {graph.MapIndex}: {e.Message}");
+            }
+        }
+    }
+}
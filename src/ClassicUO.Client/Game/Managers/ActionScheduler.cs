@@ -0,0 +1,566 @@
+using System;
+using System.Collections.Generic;
+using ClassicUO.Configuration;
+using ClassicUO.Utility;
+using ClassicUO.Utility.Collections;
+
+namespace ClassicUO.Game.Managers
+{
+    internal enum ActionKind
+    {
+        /// <summary>
+        /// Pick up and drop an item, acknowledged by the server.
+        /// </summary>
+        Move,
+        /// <summary>
+        /// Double click, not acknowledged so always spaced by the configured move delay.
+        /// </summary>
+        Use,
+        /// <summary>
+        /// Delayed single click, only waits for its own time.
+        /// </summary>
+        Click
+    }
+
+    internal enum SchedulePriority
+    {
+        High,
+        Normal,
+        Low
+    }
+
+    internal enum SendResult
+    {
+        Sent,
+        /// <summary>
+        /// Can't be sent right now, like while the player holds an item. The action stays queued.
+        /// </summary>
+        Wait,
+        /// <summary>
+        /// Can't be sent at all, the action is dropped.
+        /// </summary>
+        Failed
+    }
+
+    internal sealed class ScheduledAction(ActionKind kind, uint serial, SchedulePriority priority = SchedulePriority.Normal)
+    {
+        public ActionKind Kind { get; } = kind;
+        public uint Serial { get; } = serial;
+        public SchedulePriority Priority { get; } = priority;
+
+        /// <summary>
+        /// Don't send before this time.
+        /// </summary>
+        public long NotBefore { get; set; }
+
+        /// <summary>
+        /// Checked right before sending, the action is dropped when it returns false.
+        /// </summary>
+        public Func<bool> Condition { get; set; }
+
+        public uint Destination { get; set; }
+        public ushort Amount { get; set; }
+        public int X { get; set; } = 0xFFFF;
+        public int Y { get; set; } = 0xFFFF;
+        public int Z { get; set; }
+
+        internal long SentAt;
+        internal int Attempts;
+        internal bool Moved;
+    }
+
+    /// <summary>
+    /// Paces the moves, uses and delayed clicks the client sends on its own.
+    /// Only one move waits on the server at a time, the cursor holds a single item and the server's answer (0x29 when the drop
+    /// was accepted, 0x27 when the move was denied) is about that item. Answers for items the scheduler didn't move,
+    /// like the player's own drags, are ignored.
+    /// Moves are spaced by <see cref="Delay"/>, which starts at the configured move delay, shrinks with every accepted move
+    /// and doubles when one is denied for going too fast or times out.
+    /// Uses aren't acknowledged, so they keep the configured move delay. Clicks only wait for their own time.
+    /// </summary>
+    internal sealed class ActionScheduler
+    {
+        public const int MIN_DELAY = 50;
+        public const int MAX_DELAY = 2000;
+
+        private const int INITIAL_TIMEOUT = 3000;
+        private const int MIN_TIMEOUT = 1000;
+        private const int MAX_TIMEOUT = 5000;
+        private const int MAX_ATTEMPTS = 3;
+        private const int RATE_SAMPLES = 16;
+        private const int RATE_IDLE = 5000;
+
+        // 0x27 codes worth retrying, the player was still holding something or the server wants us to wait
+        private const byte DENY_HOLDING = 4;
+        private const byte DENY_OTHER = 5;
+
+        private readonly List<ScheduledAction>[] _queues;
+        private readonly HashSet<long> _queued = new HashSet<long>();
+        private readonly Deque<ScheduledAction> _inFlight = new Deque<ScheduledAction>();
+        private readonly Func<ScheduledAction, SendResult> _send;
+        private readonly Func<long> _clock;
+        private readonly Func<long> _configuredDelay;
+        private readonly long[] _completions = new long[RATE_SAMPLES];
+        private int _completionCount;
+        private long _lastMove = -MAX_DELAY;
+        private long _lastUse = -MAX_DELAY;
+        private long _configured = -1;
+        private double _rttVar;
+
+        public ActionScheduler() : this(Dispatch, () => Time.Ticks, () => ProfileManager.CurrentProfile?.MoveMultiObjectDelay ?? 1000, Client.Version >= ClientVersion.CV_6017)
+        {
+            Instance = this;
+        }
+
+        /// <param name="send">Sends an action to the server</param>
+        /// <param name="clock">Current time in ms</param>
+        /// <param name="configuredDelay">The configured move delay. Moves start from it and go back to it when it changes, uses always wait for it</param>
+        /// <param name="dropAcks">The server answers drops with 0x29, older clients only see the item show up in its container</param>
+        internal ActionScheduler(Func<ScheduledAction, SendResult> send, Func<long> clock, Func<long> configuredDelay, bool dropAcks)
+        {
+            _send = send;
+            _clock = clock;
+            _configuredDelay = configuredDelay;
+            DropAcks = dropAcks;
+            ReadConfiguredDelay();
+
+            _queues = new List<ScheduledAction>[Enum.GetValues(typeof(SchedulePriority)).Length];
+
+            for (int i = 0; i < _queues.Length; i++)
+                _queues[i] = new List<ScheduledAction>();
+        }
+
+        public static ActionScheduler Instance { get; private set; }
+
+        public bool DropAcks { get; }
+
+        /// <summary>
+        /// Current ms between moves.
+        /// </summary>
+        public double Delay { get; private set; }
+
+        /// <summary>
+        /// Smoothed round trip of moves in ms, 0 until one was answered.
+        /// </summary>
+        public double RoundTrip { get; private set; }
+
+        public int Queued { get; private set; }
+        public int InFlight => _inFlight.Count;
+        public long Sent { get; private set; }
+        public long Accepted { get; private set; }
+        public long Denied { get; private set; }
+        public long TimedOut { get; private set; }
+
+        /// <summary>
+        /// Actions dropped because their condition failed or they couldn't be sent.
+        /// </summary>
+        public long Dropped { get; private set; }
+
+        /// <summary>
+        /// Moves answered per second over the last few, 0 when idle.
+        /// </summary>
+        public double PerSecond
+        {
+            get
+            {
+                if (_completionCount < 2)
+                    return 0;
+
+                long last = _completions[(_completionCount - 1) % RATE_SAMPLES];
+
+                if (_clock() - last > RATE_IDLE)
+                    return 0;
+
+                int samples = Math.Min(_completionCount, RATE_SAMPLES);
+                long first = _completions[(_completionCount - samples) % RATE_SAMPLES];
+
+                return last > first ? (samples - 1) * 1000.0 / (last - first) : 0;
+            }
+        }
+
+        private long Timeout => RoundTrip == 0 ? INITIAL_TIMEOUT : Math.Max(MIN_TIMEOUT, Math.Min(MAX_TIMEOUT, (long)(RoundTrip + 4 * _rttVar)));
+
+        /// <returns>False when the same kind of action for the serial is already queued</returns>
+        public bool Enqueue(ScheduledAction action)
+        {
+            if (!_queued.Add(GetKey(action.Kind, action.Serial)))
+                return false;
+
+            _queues[(int)action.Priority].Add(action);
+            Queued++;
+
+            return true;
+        }
+
+        public bool IsQueued(ActionKind kind, uint serial) => _queued.Contains(GetKey(kind, serial));
+
+        public int Count(ActionKind kind) => Count(a => a.Kind == kind);
+
+        public int Count(ActionKind kind, SchedulePriority priority)
+        {
+            int count = 0;
+
+            foreach (ScheduledAction action in _queues[(int)priority])
+            {
+                if (action.Kind == kind)
+                    count++;
+            }
+
+            return count;
+        }
+
+        public int Count(Predicate<ScheduledAction> match)
+        {
+            int count = 0;
+
+            foreach (List<ScheduledAction> queue in _queues)
+            {
+                foreach (ScheduledAction action in queue)
+                {
+                    if (match(action))
+                        count++;
+                }
+            }
+
+            return count;
+        }
+
+        public int InFlightCount(ActionKind kind)
+        {
+            int count = 0;
+
+            for (int i = 0; i < _inFlight.Count; i++)
+            {
+                if (_inFlight[i].Kind == kind)
+                    count++;
+            }
+
+            return count;
+        }
+
+        public int Cancel(ActionKind kind, uint serial) => Cancel(a => a.Kind == kind && a.Serial == serial);
+
+        public int Cancel(ActionKind kind) => Cancel(a => a.Kind == kind);
+
+        /// <summary>
+        /// Remove queued actions, actions already sent can't be taken back.
+        /// </summary>
+        public int Cancel(Predicate<ScheduledAction> match)
+        {
+            int removed = 0;
+
+            foreach (List<ScheduledAction> queue in _queues)
+            {
+                for (int i = 0; i < queue.Count; i++)
+                {
+                    if (match(queue[i]))
+                    {
+                        RemoveAt(queue, i--);
+                        removed++;
+                    }
+                }
+            }
+
+            return removed;
+        }
+
+        public void Clear()
+        {
+            foreach (List<ScheduledAction> queue in _queues)
+                queue.Clear();
+
+            _queued.Clear();
+            _inFlight.Clear();
+            Queued = 0;
+        }
+
+        public void ResetStats()
+        {
+            Sent = 0;
+            Accepted = 0;
+            Denied = 0;
+            TimedOut = 0;
+            Dropped = 0;
+            _completionCount = 0;
+        }
+
+        public void Update()
+        {
+            long now = _clock();
+
+            ReadConfiguredDelay();
+            ExpireInFlight(now);
+
+            for (int p = 0; p < _queues.Length; p++)
+            {
+                List<ScheduledAction> queue = _queues[p];
+
+                for (int i = 0; i < queue.Count; i++)
+                {
+                    ScheduledAction action = queue[i];
+
+                    if (action.NotBefore > now)
+                        continue;
+
+                    if (!CanSend(action.Kind, now))
+                        continue;
+
+                    if (action.Condition != null && !action.Condition())
+                    {
+                        RemoveAt(queue, i--);
+                        Dropped++;
+
+                        continue;
+                    }
+
+                    // Taken off the queue first, sending may cancel actions
+                    RemoveAt(queue, i);
+
+                    SendResult result = _send(action);
+
+                    if (result == SendResult.Wait)
+                    {
+                        Insert(queue, i, action);
+
+                        continue;
+                    }
+
+                    i--;
+
+                    if (result == SendResult.Failed)
+                    {
+                        Dropped++;
+
+                        continue;
+                    }
+
+                    Sent++;
+
+                    if (action.Kind == ActionKind.Use)
+                    {
+                        _lastUse = now;
+                    }
+                    else if (action.Kind == ActionKind.Move)
+                    {
+                        _lastMove = now;
+                        action.SentAt = now;
+                        action.Moved = false;
+                        action.Attempts++;
+                        _inFlight.AddToBack(action);
+                    }
+                }
+            }
+        }
+
+        private bool CanSend(ActionKind kind, long now)
+        {
+            switch (kind)
+            {
+                case ActionKind.Move: return _inFlight.Count == 0 && now - _lastMove >= Delay;
+                case ActionKind.Use: return now - _lastUse >= _configured;
+                default: return true;
+            }
+        }
+
+        /// <summary>
+        /// The server accepted the drop of the held item (0x29).
+        /// </summary>
+        public void OnDropAccepted(uint serial)
+        {
+            ScheduledAction action = TakeInFlight(serial);
+
+            if (action == null)
+                return;
+
+            long now = _clock();
+
+            if (!action.Moved)
+                SampleRoundTrip(now - action.SentAt);
+
+            Accept(now);
+        }
+
+        /// <summary>
+        /// The server denied the move of the held item (0x27).
+        /// Moves denied because the player was busy are queued again and slow the scheduler down, others are dropped.
+        /// </summary>
+        public void OnMoveDenied(uint serial, byte code)
+        {
+            ScheduledAction action = TakeInFlight(serial);
+
+            if (action == null)
+                return;
+
+            long now = _clock();
+
+            SampleRoundTrip(now - action.SentAt);
+            AddCompletion(now);
+            Denied++;
+
+            if (code != DENY_HOLDING && code != DENY_OTHER)
+                return;
+
+            Backoff();
+
+            if (action.Attempts < MAX_ATTEMPTS && !IsQueued(action.Kind, action.Serial))
+                Insert(_queues[(int)action.Priority], 0, action);
+        }
+
+        /// <summary>
+        /// An item showed up in a container (0x25). Gives an early round trip sample for a move of it,
+        /// and completes the move when the server doesn't send drop acknowledgements.
+        /// </summary>
+        public void OnItemMoved(uint serial)
+        {
+            for (int i = 0; i < _inFlight.Count; i++)
+            {
+                ScheduledAction action = _inFlight[i];
+
+                if (action.Serial != serial || action.Moved)
+                    continue;
+
+                long now = _clock();
+                action.Moved = true;
+                SampleRoundTrip(now - action.SentAt);
+
+                if (!DropAcks)
+                {
+                    _inFlight.RemoveAt(i);
+                    Accept(now);
+                }
+
+                return;
+            }
+        }
+
+        /// <summary>
+        /// Removes the move of this item from the ones waiting on the server, null when the answer is for something else.
+        /// </summary>
+        private ScheduledAction TakeInFlight(uint serial)
+        {
+            for (int i = 0; i < _inFlight.Count; i++)
+            {
+                ScheduledAction action = _inFlight[i];
+
+                if (action.Serial == serial)
+                {
+                    _inFlight.RemoveAt(i);
+
+                    return action;
+                }
+            }
+
+            return null;
+        }
+
+        private void Accept(long now)
+        {
+            AddCompletion(now);
+            Accepted++;
+            Delay = Math.Max(MIN_DELAY, Delay - Delay / 4);
+        }
+
+        private void Backoff()
+        {
+            Delay = Math.Min(MAX_DELAY, Delay * 2);
+        }
+
+        private void ReadConfiguredDelay()
+        {
+            long configured = Math.Max(0, _configuredDelay());
+
+            if (configured == _configured)
+                return;
+
+            // Moves start over from the new setting
+            _configured = configured;
+            Delay = Math.Max(MIN_DELAY, Math.Min(MAX_DELAY, configured));
+        }
+
+        /// <summary>
+        /// Moves nobody answered, the server dropped them or the answer came while the player held another item.
+        /// </summary>
+        private void ExpireInFlight(long now)
+        {
+            long timeout = Timeout;
+            bool expired = false;
+
+            while (_inFlight.Count != 0 && now - _inFlight[0].SentAt > timeout)
+            {
+                ScheduledAction action = _inFlight.RemoveFromFront();
+
+                // Without drop acknowledgements a stacked item never shows up in the container, that's not worth slowing down for
+                if (!DropAcks && action.Moved)
+                    continue;
+
+                TimedOut++;
+                expired = true;
+            }
+
+            if (expired && DropAcks)
+                Backoff();
+        }
+
+        private void SampleRoundTrip(long rtt)
+        {
+            if (RoundTrip == 0)
+            {
+                RoundTrip = Math.Max(1, rtt);
+                _rttVar = rtt / 2.0;
+
+                return;
+            }
+
+            _rttVar += (Math.Abs(rtt - RoundTrip) - _rttVar) / 4;
+            RoundTrip += (rtt - RoundTrip) / 8;
+        }
+
+        private void AddCompletion(long now)
+        {
+            _completions[_completionCount % RATE_SAMPLES] = now;
+            _completionCount++;
+        }
+
+        private void RemoveAt(List<ScheduledAction> queue, int index)
+        {
+            ScheduledAction action = queue[index];
+            queue.RemoveAt(index);
+            _queued.Remove(GetKey(action.Kind, action.Serial));
+            Queued--;
+        }
+
+        private void Insert(List<ScheduledAction> queue, int index, ScheduledAction action)
+        {
+            queue.Insert(index, action);
+            _queued.Add(GetKey(action.Kind, action.Serial));
+            Queued++;
+        }
+
+        private static long GetKey(ActionKind kind, uint serial) => (long)kind << 32 | serial;
+
+        private static SendResult Dispatch(ScheduledAction action)
+        {
+            switch (action.Kind)
+            {
+                case ActionKind.Move:
+                    if (Client.Game.GameCursor.ItemHold.Enabled)
+                        return SendResult.Wait;
+
+                    if (!GameActions.PickUp(action.Serial, 0, 0, action.Amount))
+                        return SendResult.Failed;
+
+                    GameActions.DropItem(action.Serial, action.X, action.Y, action.Z, action.Destination);
+
+                    return SendResult.Sent;
+                case ActionKind.Use:
+                    GameActions.DoubleClick(action.Serial);
+
+                    return SendResult.Sent;
+                default:
+                    DelayedObjectClickManager.Perform(action.Serial);
+
+                    return SendResult.Sent;
+            }
+        }
+    }
+}
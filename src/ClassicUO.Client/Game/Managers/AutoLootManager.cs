@@ -19,12 +19,9 @@ namespace ClassicUO.Game.Managers
         public bool IsLoaded { get { return loaded; } }
         public List<AutoLootConfigEntry> AutoLootList { get => autoLootItems; set => autoLootItems = value; }
 
-        private HashSet<uint> quickContainsLookup = new ();
-        private static Queue<uint> lootItems = new ();
         private List<AutoLootConfigEntry> autoLootItems = new ();
         private bool loaded = false;
         private readonly string savePath = Path.Combine(CUOEnviroment.ExecutablePath, "Data", "Profiles", "AutoLoot.json");
-        private long nextLootTime = Time.Ticks;
         private ProgressBarGump progressBarGump;
         private int currentLootTotalCount = 0;
         private bool IsEnabled { get { return ProfileManager.CurrentProfile.EnableAutoLoot; } }
@@ -32,7 +29,7 @@ namespace ClassicUO.Game.Managers
         private AutoLootManager() { }
 
 
-        public bool IsBeingLooted(uint serial) => quickContainsLookup.Contains(serial);
+        public bool IsBeingLooted(uint serial) => MoveItemQueue.Instance?.IsQueued(serial) == true;
 
         public void LootItem(uint serial)
         {
@@ -45,10 +42,14 @@ namespace ClassicUO.Game.Managers
 
         public void LootItem(Item item)
         {
-            if (item == null || !quickContainsLookup.Add(item.Serial)) return;
+            if (item == null || MoveItemQueue.Instance == null) return;
 
-            lootItems.Enqueue(item);
-            currentLootTotalCount++;
+            uint serial = item.Serial;
+
+            // Loot goes behind moves the player asked for, and is skipped if it's gone or out of range by the time its turn comes.
+            // Items are pooled, so look it up again instead of keeping the object.
+            if (MoveItemQueue.Instance.EnqueueQuick(item, SchedulePriority.Low, () => IsEnabled && World.Items.Get(serial) is Item m && IsInLootRange(m)))
+                currentLootTotalCount++;
         }
 
         public void ForceLootContainer(uint serial)
@@ -71,7 +72,7 @@ namespace ClassicUO.Game.Managers
         /// </summary>
         private void CheckAndLoot(Item i)
         {
-            if (!loaded || i == null || quickContainsLookup.Contains(i.Serial)) return;
+            if (!loaded || i == null || IsBeingLooted(i.Serial)) return;
             
             if(i.IsCorpse)
             {
@@ -245,49 +246,33 @@ namespace ClassicUO.Game.Managers
         {
             if (!loaded || !IsEnabled || !World.InGame) return;
 
-            if (lootItems.Count == 0)
+            int remaining = ActionScheduler.Instance?.Count(ActionKind.Move, SchedulePriority.Low) ?? 0;
+
+            if (remaining == 0)
             {
+                currentLootTotalCount = 0;
                 progressBarGump?.Dispose();
                 return;
             }
 
-            if (nextLootTime > Time.Ticks) return;
-
-            if (Client.Game.GameCursor.ItemHold.Enabled)
-                return; //Prevent moving stuff while holding an item.
+            CreateProgressBar();
 
-            var moveItem = lootItems.Dequeue();
-            if (moveItem != 0)
+            if (progressBarGump != null && !progressBarGump.IsDisposed)
             {
-                if (lootItems.Count == 0) //Que emptied out                
-                    currentLootTotalCount = 0;
-
-                quickContainsLookup.Remove(moveItem);
-
-                CreateProgressBar();
-
-                if (progressBarGump != null && !progressBarGump.IsDisposed)
-                {
-                    progressBarGump.CurrentPercentage = 1 - ((double)lootItems.Count / (double)currentLootTotalCount);
-                }
-
-                Item m = World.Items.Get(moveItem);
+                progressBarGump.CurrentPercentage = 1 - ((double)remaining / Math.Max(remaining, currentLootTotalCount));
+            }
+        }
 
-                if (m != null)
-                {
-                    if (m.Distance > ProfileManager.CurrentProfile.AutoOpenCorpseRange)
-                    {
-                        Item rc = World.Items.Get(m.RootContainer);
-                        if (rc != null && rc.Distance > ProfileManager.CurrentProfile.AutoOpenCorpseRange)
-                            return;
-                    }
-                    
-                    MoveItemQueue.Instance?.EnqueueQuick(m);
-                    
-                    //GameActions.GrabItem(m, m.Amount);
-                    nextLootTime = Time.Ticks + ProfileManager.CurrentProfile.MoveMultiObjectDelay;
-                }
+        private static bool IsInLootRange(Item m)
+        {
+            if (m.Distance > ProfileManager.CurrentProfile.AutoOpenCorpseRange)
+            {
+                Item rc = World.Items.Get(m.RootContainer);
+                if (rc != null && rc.Distance > ProfileManager.CurrentProfile.AutoOpenCorpseRange)
+                    return false;
             }
+
+            return true;
         }
 
         private void CreateProgressBar()
@@ -299,6 +299,40 @@ namespace ClassicUO.Game.Managers
             Register("artbrowser", (s) => { UIManager.Add(new ArtBrowserGump()); });
             
             Register("animbrowser", (s) => { UIManager.Add(new AnimBrowser()); });
+
+            Register("packetstats", (s) =>
+            {
+                ///-packetstats [reset|dump]
+                var stats = Network.PacketHandlers.Handler.Statistics;
+
+                if (s.Length > 1 && s[1] == "reset")
+                {
+                    stats.Reset();
+                    GameActions.Print("Packet stats cleared.");
+
+                    return;
+                }
+
+                if (s.Length > 1 && s[1] == "dump")
+                {
+                    string folder = Utility.FileSystemHelper.CreateFolderIfNotExists(CUOEnviroment.ExecutablePath, "Logs", "Network");
+                    Network.PacketStatistics.Dump(stats.GetAll(), folder);
+                    GameActions.Print($"Packet stats saved to {folder}");
+
+                    return;
+                }
+
+                foreach (var packet in stats.GetAll().Take(10))
+                    GameActions.Print(packet.ToString());
+            });
+
+            Register("atlasstats", (s) =>
+            {
+                long budget = Renderer.TextureAtlas.MemoryBudget >> 20;
+
+                GameActions.Print($"Texture atlases: {Renderer.TextureAtlas.PageCount} pages, {Renderer.TextureAtlas.TotalBytes >> 20} MB of {(budget > 0 ? $"{budget} MB" : "no limit")}, {Renderer.TextureAtlas.FillRatio:P0} filled");
+                GameActions.Print($"Evicted {Renderer.TextureAtlas.Evictions} pages, {Renderer.TextureAtlas.EvictedSprites} sprites");
+            });
         }
 
 
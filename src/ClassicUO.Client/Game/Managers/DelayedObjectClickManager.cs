@@ -46,9 +46,12 @@ namespace ClassicUO.Game.Managers
         public static int LastMouseY { get; set; }
 
 
-        public static void Update()
+        /// <summary>
+        /// Send the click once the <see cref="ActionScheduler"/> says it's time.
+        /// </summary>
+        internal static void Perform(uint serial)
         {
-            if (!IsEnabled || Timer > Time.Ticks)
+            if (!IsEnabled || Serial != serial)
             {
                 return;
             }
@@ -80,10 +83,14 @@ namespace ClassicUO.Game.Managers
             Y = y;
             Timer = timer;
             IsEnabled = true;
+
+            ActionScheduler.Instance?.Cancel(ActionKind.Click);
+            ActionScheduler.Instance?.Enqueue(new ScheduledAction(ActionKind.Click, serial, SchedulePriority.High) { NotBefore = timer });
         }
 
         public static void Clear()
         {
+            ActionScheduler.Instance?.Cancel(ActionKind.Click);
             IsEnabled = false;
             Serial = 0xFFFF_FFFF;
             Timer = 0;
@@ -93,6 +100,7 @@ namespace ClassicUO.Game.Managers
         {
             if (Serial == serial)
             {
+                ActionScheduler.Instance?.Cancel(ActionKind.Click, serial);
                 Timer = 0;
                 Serial = 0;
                 IsEnabled = false;
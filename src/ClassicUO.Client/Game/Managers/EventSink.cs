@@ -116,6 +116,24 @@ namespace ClassicUO.Game.Managers
         public static event EventHandler<Vector4> OnPathFinding;
         public static void InvokeOnPathFinding(object sender, Vector4 e) => OnPathFinding?.Invoke(sender, e);
 
+        /// <summary>
+        /// Invoked when auto walking from path finding stops, either because the goal was reached or it was cancelled
+        /// </summary>
+        public static event EventHandler<EventArgs> OnPathFindingStopped;
+        public static void InvokeOnPathFindingStopped(object sender) => OnPathFindingStopped?.Invoke(sender, EventArgs.Empty);
+
+        /// <summary>
+        /// Invoked when the target cursor is shown or hidden, the bool is true while targeting
+        /// </summary>
+        public static event EventHandler<bool> OnTargetingChanged;
+        public static void InvokeOnTargetingChanged(object sender, bool isTargeting) => OnTargetingChanged?.Invoke(sender, isTargeting);
+
+        /// <summary>
+        /// Invoked when a gump is received from the server, uint is the gump id
+        /// </summary>
+        public static event EventHandler<uint> OnServerGumpOpened;
+        public static void InvokeOnServerGumpOpened(object sender, uint gumpID) => OnServerGumpOpened?.Invoke(sender, gumpID);
+
         /// <summary>
         /// Invoked when the server asks the client to generate some weather
         /// </summary>
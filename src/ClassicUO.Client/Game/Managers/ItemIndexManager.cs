@@ -0,0 +1,118 @@
+using System.Collections.Generic;
+using ClassicUO.Game.GameObjects;
+
+namespace ClassicUO.Game.Managers
+{
+    /// <summary>
+    /// Secondary indexes over <see cref="World.Items"/> by graphic and by parent container.
+    /// Kept current by <see cref="World"/> as items are added/removed and by <see cref="Item"/> when its graphic or container changes.
+    /// Only used from the game thread.
+    /// </summary>
+    public class ItemIndexManager
+    {
+        private static readonly HashSet<uint> _empty = new HashSet<uint>();
+
+        private readonly Dictionary<ushort, HashSet<uint>> _byGraphic = new Dictionary<ushort, HashSet<uint>>();
+        private readonly Dictionary<uint, HashSet<uint>> _byContainer = new Dictionary<uint, HashSet<uint>>();
+        private readonly Stack<uint> _containerStack = new Stack<uint>();
+
+        public void Add(Item item)
+        {
+            if (item.IsIndexed)
+                return;
+
+            item.IsIndexed = true;
+            AddTo(_byGraphic, item.Graphic, item.Serial);
+            AddTo(_byContainer, item.Container, item.Serial);
+        }
+
+        public void Remove(Item item)
+        {
+            if (!item.IsIndexed)
+                return;
+
+            item.IsIndexed = false;
+            RemoveFrom(_byGraphic, item.Graphic, item.Serial);
+            RemoveFrom(_byContainer, item.Container, item.Serial);
+        }
+
+        public void OnGraphicChanged(Item item, ushort oldGraphic, ushort newGraphic)
+        {
+            RemoveFrom(_byGraphic, oldGraphic, item.Serial);
+            AddTo(_byGraphic, newGraphic, item.Serial);
+        }
+
+        public void OnContainerChanged(Item item, uint oldContainer, uint newContainer)
+        {
+            RemoveFrom(_byContainer, oldContainer, item.Serial);
+            AddTo(_byContainer, newContainer, item.Serial);
+        }
+
+        public void Clear()
+        {
+            foreach (Item item in World.Items.Values)
+                item.IsIndexed = false;
+
+            _byGraphic.Clear();
+            _byContainer.Clear();
+        }
+
+        /// <summary>
+        /// Serials of all items with this graphic.
+        /// </summary>
+        public IReadOnlyCollection<uint> WithGraphic(ushort graphic)
+        {
+            return _byGraphic.TryGetValue(graphic, out var set) ? set : _empty;
+        }
+
+        /// <summary>
+        /// Serials of the items directly inside this container.
+        /// </summary>
+        public IReadOnlyCollection<uint> InContainer(uint container)
+        {
+            return _byContainer.TryGetValue(container, out var set) ? set : _empty;
+        }
+
+        /// <summary>
+        /// Adds every item below this container, at any depth, to the list.
+        /// </summary>
+        public void CollectNested(uint container, List<uint> results)
+        {
+            _containerStack.Clear();
+            _containerStack.Push(container);
+
+            while (_containerStack.Count > 0)
+            {
+                uint current = _containerStack.Pop();
+
+                if (!_byContainer.TryGetValue(current, out var set))
+                    continue;
+
+                foreach (uint serial in set)
+                {
+                    results.Add(serial);
+
+                    if (_byContainer.ContainsKey(serial))
+                        _containerStack.Push(serial);
+                }
+            }
+        }
+
+        private static void AddTo<TKey>(Dictionary<TKey, HashSet<uint>> index, TKey key, uint serial)
+        {
+            if (!index.TryGetValue(key, out var set))
+            {
+                set = new HashSet<uint>();
+                index[key] = set;
+            }
+
+            set.Add(serial);
+        }
+
+        private static void RemoveFrom<TKey>(Dictionary<TKey, HashSet<uint>> index, TKey key, uint serial)
+        {
+            if (index.TryGetValue(key, out var set) && set.Remove(serial) && set.Count == 0)
+                index.Remove(key);
+        }
+    }
+}
@@ -1,44 +1,68 @@
-using System.Collections.Concurrent;
+using System;
 using ClassicUO.Configuration;
 using ClassicUO.Game.Data;
 using ClassicUO.Game.GameObjects;
-using ClassicUO.Game.Scenes;
 
 namespace ClassicUO.Game.Managers
 {
+    /// <summary>
+    /// Item moves queued by the player, scripts and agents. They are sent by the <see cref="ActionScheduler"/>.
+    /// </summary>
     public class MoveItemQueue
     {
         public static MoveItemQueue Instance { get; private set; }
-        
-        public bool IsEmpty => _queue.IsEmpty;
-        
-        private static long delay = 1000;
-        private readonly ConcurrentQueue<MoveRequest> _queue = new();
-        private long nextMove;
 
-        public MoveItemQueue()
+        /// <summary>
+        /// No moves are queued or waiting on the server.
+        /// </summary>
+        public bool IsEmpty => _scheduler.Count(ActionKind.Move) == 0 && _scheduler.InFlightCount(ActionKind.Move) == 0;
+
+        private readonly ActionScheduler _scheduler;
+
+        internal MoveItemQueue(ActionScheduler scheduler)
         {
-            delay = ProfileManager.CurrentProfile.MoveMultiObjectDelay;
+            _scheduler = scheduler;
             Instance = this;
         }
 
         public void Enqueue(uint serial, uint destination, ushort amt = 0, int x = 0xFFFF, int y = 0xFFFF, int z = 0)
         {
-            _queue.Enqueue(new MoveRequest(serial, destination, amt, x, y, z));
+            Enqueue(serial, destination, amt, x, y, z, SchedulePriority.Normal, null);
+        }
+
+        internal bool Enqueue(uint serial, uint destination, ushort amt, int x, int y, int z, SchedulePriority priority, Func<bool> condition)
+        {
+            return _scheduler.Enqueue
+            (
+                new ScheduledAction(ActionKind.Move, serial, priority)
+                {
+                    Destination = destination,
+                    Amount = amt,
+                    X = x,
+                    Y = y,
+                    Z = z,
+                    Condition = condition
+                }
+            );
         }
 
         public void EnqueueQuick(Item item)
+        {
+            EnqueueQuick(item, SchedulePriority.Normal, null);
+        }
+
+        internal bool EnqueueQuick(Item item, SchedulePriority priority, Func<bool> condition)
         {
             Item backpack = World.Player.FindItemByLayer(Layer.Backpack);
 
             if (backpack == null)
             {
-                return;
+                return false;
             }
 
             uint bag = ProfileManager.CurrentProfile.GrabBagSerial == 0 ? backpack.Serial : ProfileManager.CurrentProfile.GrabBagSerial;
                 
-            Enqueue(item.Serial, bag, 0, 0xFFFF, 0xFFFF);
+            return Enqueue(item.Serial, bag, 0, 0xFFFF, 0xFFFF, 0, priority, condition);
         }
         
         public void EnqueueQuick(uint serial)
@@ -48,38 +72,10 @@ namespace ClassicUO.Game.Managers
                 EnqueueQuick(i);
         }
 
-        public void ProcessQueue()
-        {
-            if (Time.Ticks < nextMove)
-                return;
-            
-            if (Client.Game.GameCursor.ItemHold.Enabled)
-                return;
-
-            if (!_queue.TryDequeue(out var request))
-                return;
+        public bool IsQueued(uint serial) => _scheduler.IsQueued(ActionKind.Move, serial);
 
-            GameActions.PickUp(request.Serial, 0, 0, request.Amount);
-            GameActions.DropItem(request.Serial, request.X, request.Y, request.Z, request.Destination);
-            
-            nextMove = Time.Ticks + delay;
-        }
-
-        public void Clear()
-        {
-            while (_queue.TryDequeue(out var _))
-            {
-            }
-        }
+        public void Cancel(uint serial) => _scheduler.Cancel(ActionKind.Move, serial);
 
-        private readonly struct MoveRequest(uint serial, uint destination, ushort amount, int x, int y, int z)
-        {
-            public uint Serial { get; } = serial;
-            public uint Destination { get; } = destination;
-            public ushort Amount { get; } = amount;
-            public int X { get; } = x;
-            public int Y { get; } = y;
-            public int Z { get; } = z;
-        }
+        public void Clear() => _scheduler.Cancel(ActionKind.Move);
     }
-}
\ No newline at end of file
+}
@@ -509,6 +509,14 @@ namespace ClassicUO.Game.Managers
                     {
                         if (i.CastTime > 0)
                         {
+                            ref readonly var gi = ref Client.Game.Gumps.GetGump(0x0805);
+                            background = gi.Texture;
+                            barBounds = gi.UV;
+
+                            gi = ref Client.Game.Gumps.GetGump(0x0806);
+                            foreground = gi.Texture;
+                            barBoundsF = gi.UV;
+
                             if (background != null && foreground != null)
                             {
                                 Mobile m = World.Player;
@@ -207,7 +207,20 @@ namespace ClassicUO.Game.Managers
 
         public static CursorTarget TargetingState { get; private set; } = CursorTarget.Invalid;
 
-        public static bool IsTargeting { get; private set; }
+        public static bool IsTargeting
+        {
+            get => _isTargeting;
+            private set
+            {
+                if (_isTargeting == value)
+                    return;
+
+                _isTargeting = value;
+                EventSink.InvokeOnTargetingChanged(null, value);
+            }
+        }
+
+        private static bool _isTargeting;
 
         public static TargetType TargetingType { get; private set; }
 
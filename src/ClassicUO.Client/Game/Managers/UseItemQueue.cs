@@ -31,73 +31,34 @@
 #endregion
 
 using ClassicUO.Game.GameObjects;
-using ClassicUO.Configuration;
-using ClassicUO.Utility.Collections;
 
 namespace ClassicUO.Game.Managers
 {
+    /// <summary>
+    /// Delayed double clicks, like opening corpses. They are sent by the <see cref="ActionScheduler"/>.
+    /// </summary>
     internal class UseItemQueue
     {
-        private readonly Deque<uint> _actions = new Deque<uint>();
-        private long _timer;
-        private static long _delay = 1000;
+        private readonly ActionScheduler _scheduler;
 
-        public UseItemQueue()
+        public UseItemQueue(ActionScheduler scheduler)
         {
-            _delay = ProfileManager.CurrentProfile.MoveMultiObjectDelay;
-            _timer = Time.Ticks + _delay;
-        }
-
-        public void Update()
-        {
-            if (_timer < Time.Ticks)
-            {
-                _timer = Time.Ticks + _delay;
-
-                if (_actions.Count == 0)
-                {
-                    return;
-                }
-
-                uint serial = _actions.RemoveFromFront();
-                GameActions.DoubleClick(serial);
-            }
+            _scheduler = scheduler;
         }
 
         public void Add(uint serial)
         {
-            foreach (uint s in _actions)
-            {
-                if (serial == s)
-                {
-                    return;
-                }
-            }
-
-            _actions.AddToBack(serial);
+            _scheduler.Enqueue(new ScheduledAction(ActionKind.Use, serial));
         }
 
         public void Clear()
         {
-            _actions.Clear();
+            _scheduler.Cancel(ActionKind.Use);
         }
 
         public void ClearCorpses()
         {
-            for (int i = 0; i < _actions.Count; i++)
-            {
-                Entity entity = World.Get(_actions[i]);
-
-                if (entity == null)
-                {
-                    continue;
-                }
-
-                if (entity is Item it && it.IsCorpse)
-                {
-                    _actions.RemoveAt(i--);
-                }
-            }
+            _scheduler.Cancel(a => a.Kind == ActionKind.Use && World.Get(a.Serial) is Item it && it.IsCorpse);
         }
     }
 }
\ No newline at end of file
@@ -71,12 +71,34 @@ namespace ClassicUO.Game
 
         private static int _endPointZ;
         private static readonly List<PathObject> _reusableList = new();
+        private static readonly WalkData _tileData = new();
+        private static readonly NewZCalculator _calculateNewZ = CalculateNewZ;
+
+        /// <summary>
+        /// CalculateNewZ treats the top of the world as a blocker.
+        /// </summary>
+        private static readonly WalkabilityGrid.Entry _ceiling = new WalkabilityGrid.Entry((uint)PATH_OBJECT_FLAGS.POF_IMPASSABLE_OR_SURFACE, 128, 128, 128, -1);
 
         public static Point StartPoint => _startPoint;
         public static Point EndPoint => _endPoint;
         public static int PathSize => _path.Count;
 
-        public static bool AutoWalking { get; set; }
+        public static bool AutoWalking
+        {
+            get => _autoWalking;
+            set
+            {
+                if (_autoWalking == value)
+                    return;
+
+                _autoWalking = value;
+
+                if (!value)
+                    EventSink.InvokeOnPathFindingStopped(null);
+            }
+        }
+
+        private static bool _autoWalking;
 
         public static bool PathFindingCanBeCancelled { get; set; }
 
@@ -391,7 +413,7 @@ namespace ClassicUO.Game
             return list.Count != 0;
         }
 
-        private static int CalculateMinMaxZ
+        private static void CalculateMinMaxZ
         (
             ref int minZ,
             ref int maxZ,
@@ -409,25 +431,39 @@ namespace ClassicUO.Game
             newX += _offsetX[direction];
             newY += _offsetY[direction];
 
-            foreach (PathObject o in _reusableList)
-            {
-                o.Return();
-            }
-            _reusableList.Clear();
+            _tileData.Clear();
+            CollectWalkData(newX, newY, stepState, _tileData, false);
 
-            if (!CreateItemList(_reusableList, newX, newY, stepState) || _reusableList.Count == 0)
+            if (_tileData.EntryCount == 0)
             {
-                return 0;
+                return;
             }
 
-            foreach (PathObject obj in _reusableList)
+            ApplyMinMaxZ(_tileData.Entries, _tileData.StretchedZ, currentZ, newDirection, ref minZ, ref maxZ);
+        }
+
+        /// <summary>
+        /// Narrow the Z range a step can end in using the walk data of the tile it comes from.
+        /// Shared by this pathfinder and <see cref="PathSearch"/>, <paramref name="entries"/> must not be empty.
+        /// </summary>
+        /// <param name="entries">Walk data of the tile in the order CreateItemList adds it, surfaces raise minZ and bridges lower it again so sorting changes the result</param>
+        internal static void ApplyMinMaxZ
+        (
+            ReadOnlySpan<WalkabilityGrid.Entry> entries,
+            ReadOnlySpan<sbyte> stretchedZ,
+            int currentZ,
+            int newDirection,
+            ref int minZ,
+            ref int maxZ
+        )
+        {
+            foreach (WalkabilityGrid.Entry obj in entries)
             {
-                GameObject o = obj.Object;
                 int averageZ = obj.AverageZ;
 
-                if (averageZ <= currentZ && o is Land tile && tile.IsStretched)
+                if (averageZ <= currentZ && obj.IsStretchedLand)
                 {
-                    int avgZ = tile.CalculateCurrentAverageZ(newDirection);
+                    int avgZ = stretchedZ[obj.StretchedIndex + newDirection];
 
                     if (minZ < avgZ)
                     {
@@ -465,11 +501,9 @@ namespace ClassicUO.Game
             }
 
             maxZ += 2;
-
-            return maxZ;
         }
 
-        public static bool CalculateNewZ(int x, int y, ref sbyte z, int direction)
+        internal static int GetStepState()
         {
             int stepState = (int)PATH_STEP_STATE.PSS_NORMAL;
 
@@ -494,6 +528,44 @@ namespace ClassicUO.Game
                 }
             }
 
+            return stepState;
+        }
+
+        /// <summary>
+        /// Add the walk data of a tile, sorted by Z then height for <see cref="FindSurfaceZ"/> or in item order for <see cref="ApplyMinMaxZ"/>.
+        /// </summary>
+        internal static void CollectWalkData(int x, int y, int stepState, WalkData data, bool sort)
+        {
+            foreach (PathObject o in _reusableList)
+            {
+                o.Return();
+            }
+            _reusableList.Clear();
+
+            if (CreateItemList(_reusableList, x, y, stepState))
+            {
+                if (sort)
+                {
+                    _reusableList.Sort();
+                }
+
+                foreach (PathObject o in _reusableList)
+                {
+                    data.Add(o.Flags, o.Z, o.AverageZ, o.Height, o.Object as Land);
+                }
+            }
+
+            foreach (PathObject o in _reusableList)
+            {
+                o.Return();
+            }
+            _reusableList.Clear();
+        }
+
+        public static bool CalculateNewZ(int x, int y, ref sbyte z, int direction)
+        {
+            int stepState = GetStepState();
+
             int minZ = -128;
             int maxZ = z;
 
@@ -508,12 +580,6 @@ namespace ClassicUO.Game
                 stepState
             );
 
-            foreach (PathObject o in _reusableList)
-            {
-                o.Return();
-            }
-            _reusableList.Clear();
-
             if (World.CustomHouseManager != null)
             {
                 Rectangle rect = new Rectangle(World.CustomHouseManager.StartPos.X, World.CustomHouseManager.StartPos.Y, World.CustomHouseManager.EndPos.X, World.CustomHouseManager.EndPos.Y);
@@ -524,40 +590,63 @@ namespace ClassicUO.Game
                 }
             }
 
-            if (!CreateItemList(_reusableList, x, y, stepState) || _reusableList.Count == 0)
+            _tileData.Clear();
+            CollectWalkData(x, y, stepState, _tileData, true);
+
+            if (_tileData.EntryCount == 0)
             {
                 return false;
             }
 
-            _reusableList.Sort();
+            int resultZ = FindSurfaceZ(_tileData.Entries, z, minZ, maxZ, stepState == (int)PATH_STEP_STATE.PSS_FLYING);
 
-            _reusableList.Add
-            (
-                PathObject.Get
-                (
-                    (uint)PATH_OBJECT_FLAGS.POF_IMPASSABLE_OR_SURFACE,
-                    128,
-                    128,
-                    128,
-                    null
-                )
-            );
+            z = (sbyte)resultZ;
+
+            return resultZ != -128;
+        }
+
+        /// <summary>
+        /// Sort walk data by Z then height like PathObject.CompareTo. Insertion sort, which is what List.Sort does for the handful of objects on a tile.
+        /// </summary>
+        internal static void SortEntries(Span<WalkabilityGrid.Entry> entries)
+        {
+            for (int i = 1; i < entries.Length; i++)
+            {
+                WalkabilityGrid.Entry entry = entries[i];
+                int j = i - 1;
+
+                while (j >= 0 && (entries[j].Z > entry.Z || entries[j].Z == entry.Z && entries[j].Height > entry.Height))
+                {
+                    entries[j + 1] = entries[j];
+                    j--;
+                }
+
+                entries[j + 1] = entry;
+            }
+        }
 
+        /// <summary>
+        /// Z to stand at on a tile after a step, or -128 if the step is blocked. Shared by this pathfinder and <see cref="PathSearch"/>.
+        /// </summary>
+        /// <param name="list">Walk data of the tile, sorted by Z then height, not empty</param>
+        internal static int FindSurfaceZ(ReadOnlySpan<WalkabilityGrid.Entry> list, int z, int minZ, int maxZ, bool flying)
+        {
             int resultZ = -128;
 
             if (z < minZ)
             {
-                z = (sbyte)minZ;
+                z = minZ;
             }
 
             int currentTempObjZ = 1000000;
             int currentZ = -128;
 
-            for (int i = 0; i < _reusableList.Count; i++)
+            // One past the end is the top of the world, which blocks like an impassable object
+            for (int i = 0; i <= list.Length; i++)
             {
-                PathObject obj = _reusableList[i];
+                WalkabilityGrid.Entry obj = i < list.Length ? list[i] : _ceiling;
 
-                if ((obj.Flags & (uint)PATH_OBJECT_FLAGS.POF_NO_DIAGONAL) != 0 && stepState == (int)PATH_STEP_STATE.PSS_FLYING)
+                if ((obj.Flags & (uint)PATH_OBJECT_FLAGS.POF_NO_DIAGONAL) != 0 && flying)
                 {
                     int objAverageZ = obj.AverageZ;
                     int delta = Math.Abs(objAverageZ - z);
@@ -578,7 +667,7 @@ namespace ClassicUO.Game
                     {
                         for (int j = i - 1; j >= 0; j--)
                         {
-                            PathObject tempObj = _reusableList[j];
+                            WalkabilityGrid.Entry tempObj = list[j];
 
                             if ((tempObj.Flags & (uint)(PATH_OBJECT_FLAGS.POF_SURFACE | PATH_OBJECT_FLAGS.POF_BRIDGE)) != 0)
                             {
@@ -612,9 +701,7 @@ namespace ClassicUO.Game
                 }
             }
 
-            z = (sbyte)resultZ;
-
-            return resultZ != -128;
+            return resultZ;
         }
 
         public static void GetNewXY(byte direction, ref int x, ref int y)
@@ -692,13 +779,24 @@ namespace ClassicUO.Game
         }
 
         public static bool CanWalk(ref Direction direction, ref int x, ref int y, ref sbyte z)
+        {
+            return TryStep(_calculateNewZ, ref direction, ref x, ref y, ref z);
+        }
+
+        internal delegate bool NewZCalculator(int x, int y, ref sbyte z, int direction);
+
+        /// <summary>
+        /// Check a step, diagonal steps also need both sides free and fall back to one of them when blocked.
+        /// Shared by this pathfinder and <see cref="PathSearch"/>, which pass their own Z check.
+        /// </summary>
+        internal static bool TryStep(NewZCalculator calculateNewZ, ref Direction direction, ref int x, ref int y, ref sbyte z)
         {
             int newX = x;
             int newY = y;
             sbyte newZ = z;
             byte newDirection = (byte)direction;
             GetNewXY((byte)direction, ref newX, ref newY);
-            bool passed = CalculateNewZ(newX, newY, ref newZ, (byte)direction);
+            bool passed = calculateNewZ(newX, newY, ref newZ, (byte)direction);
 
             if ((sbyte)direction % 2 != 0)
             {
@@ -711,7 +809,7 @@ namespace ClassicUO.Game
                         sbyte testZ = z;
                         byte testDir = (byte)(((byte)direction + _dirOffset[i]) % 8);
                         GetNewXY(testDir, ref testX, ref testY);
-                        passed = CalculateNewZ(testX, testY, ref testZ, testDir);
+                        passed = calculateNewZ(testX, testY, ref testZ, testDir);
                     }
                 }
 
@@ -724,7 +822,7 @@ namespace ClassicUO.Game
                         newZ = z;
                         newDirection = (byte)(((byte)direction + _dirOffset[i]) % 8);
                         GetNewXY(newDirection, ref newX, ref newY);
-                        passed = CalculateNewZ(newX, newY, ref newZ, newDirection);
+                        passed = calculateNewZ(newX, newY, ref newZ, newDirection);
                     }
                 }
             }
@@ -1078,6 +1176,66 @@ namespace ClassicUO.Game
             return _path.Count != 0;
         }
 
+        /// <summary>
+        /// Start auto walking along a path found by <see cref="PathfindingService"/>.
+        /// The player may have moved while the path was searched, walking starts from where they are on it.
+        /// </summary>
+        /// <returns>False if the player can't walk or isn't on the path anymore</returns>
+        internal static bool WalkPath(PathRequest request)
+        {
+            IReadOnlyList<PathStep> steps = request.Path;
+
+            if (World.Player == null || World.Player.IsParalyzed || steps == null || steps.Count == 0)
+            {
+                return false;
+            }
+
+            int first = -1;
+
+            for (int i = steps.Count - 1; i >= 0; i--)
+            {
+                if (steps[i].X == World.Player.X && steps[i].Y == World.Player.Y)
+                {
+                    first = i;
+
+                    break;
+                }
+            }
+
+            if (first < 0)
+            {
+                return false;
+            }
+
+            EventSink.InvokeOnPathFinding(null, new Vector4(request.X, request.Y, request.Z, request.Distance));
+
+            CleanupPathfinding();
+            _startPoint.X = steps[first].X;
+            _startPoint.Y = steps[first].Y;
+            _endPoint.X = request.X;
+            _endPoint.Y = request.Y;
+            _endPointZ = request.Z;
+            _pathfindDistance = request.Distance;
+            _run = Math.Max(Math.Abs(_endPoint.X - _startPoint.X), Math.Abs(_endPoint.Y - _startPoint.Y)) > 14;
+
+            for (int i = first; i < steps.Count; i++)
+            {
+                PathStep step = steps[i];
+                PathNode node = PathNode.Get();
+                node.X = step.X;
+                node.Y = step.Y;
+                node.Z = step.Z;
+                node.Direction = step.Direction;
+                _path.Add(node);
+            }
+
+            AutoWalking = true;
+            _pointIndex = 1;
+            ProcessAutoWalk();
+
+            return true;
+        }
+
         public static void ProcessAutoWalk()
         {
             if (AutoWalking && World.InGame && World.Player.Walker.StepsCount < Constants.MAX_STEP_COUNT && World.Player.Walker.LastStepRequestTime <= Time.Ticks)
@@ -1135,7 +1293,7 @@ namespace ClassicUO.Game
             _goalNode = null;
         }
 
-        private enum PATH_STEP_STATE
+        internal enum PATH_STEP_STATE
         {
             PSS_NORMAL = 0,
             PSS_DEAD_OR_GM,
@@ -1144,7 +1302,7 @@ namespace ClassicUO.Game
         }
 
         [Flags]
-        private enum PATH_OBJECT_FLAGS : uint
+        internal enum PATH_OBJECT_FLAGS : uint
         {
             POF_IMPASSABLE_OR_SURFACE = 0x00000001,
             POF_SURFACE = 0x00000002,
@@ -0,0 +1,541 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+using System.Threading.Tasks;
+using ClassicUO.Assets;
+using ClassicUO.Game.Data;
+using ClassicUO.Utility.Logging;
+using Microsoft.Xna.Framework;
+using MathHelper = ClassicUO.Utility.MathHelper;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// Finds paths on worker threads so long searches don't freeze the game.
+    /// <see cref="Request"/> starts copying the walkable area into a <see cref="WalkabilityGrid"/> (or reuses a recent one) and returns right away.
+    /// The copy is made a few rows per frame on the game thread by <see cref="Update"/>, the search then runs in the background against it.
+    /// </summary>
+    public static class PathfindingService
+    {
+        public const int MAX_NODES = 150000;
+
+        private const int MAX_CONCURRENT_SEARCHES = 2;
+        private const int GRID_MAX_AGE_MS = 500;
+        private const int GRID_MARGIN = 24;
+        private const int GRID_MAX_RADIUS = 160;
+
+        /// <summary>
+        /// Ms per frame spent copying tiles into grids being built.
+        /// </summary>
+        private const double BUILD_BUDGET_MS = 2;
+
+        private static readonly SemaphoreSlim _searchSlots = new SemaphoreSlim(MAX_CONCURRENT_SEARCHES);
+        private static readonly List<WalkabilityGrid.Builder> _builds = new List<WalkabilityGrid.Builder>();
+        private static readonly Stopwatch _buildTimer = new Stopwatch();
+        private static WalkabilityGrid _lastGrid;
+
+        /// <summary>
+        /// Searches queued or running.
+        /// </summary>
+        public static int Pending => _pending;
+
+        private static int _pending;
+
+        /// <summary>
+        /// Start looking for a path from the player to a location. Must be called from the game thread.
+        /// </summary>
+        public static PathRequest Request(int x, int y, int z, int distance, int maxNodes = MAX_NODES)
+        {
+            var request = new PathRequest(x, y, z, distance);
+
+            if (!World.InGame || World.Player == null)
+            {
+                request.Complete(null, 0, 0);
+
+                return request;
+            }
+
+            if (World.CustomHouseManager != null)
+            {
+                // House customization changes what can be walked on, use the regular pathfinder for it
+                request.Complete(FromPoints(Pathfinder.GetPathTo(x, y, z, distance)), 0, 0);
+
+                return request;
+            }
+
+            Task<WalkabilityGrid> gridTask = GetGrid(World.Player.X, World.Player.Y, x, y);
+            int startX = World.Player.X, startY = World.Player.Y, startZ = World.Player.Z;
+
+            Interlocked.Increment(ref _pending);
+
+            Task.Run
+            (async () =>
+                {
+                    WalkabilityGrid grid = await gridTask.ConfigureAwait(false);
+
+                    if (grid == null)
+                    {
+                        request.Complete(null, 0, 0);
+                        Interlocked.Decrement(ref _pending);
+
+                        return;
+                    }
+
+                    var search = new PathSearch(grid, x, y, z, distance, request.Token);
+
+                    await _searchSlots.WaitAsync().ConfigureAwait(false);
+
+                    try
+                    {
+                        Stopwatch sw = Stopwatch.StartNew();
+                        List<PathStep> path = search.Run(startX, startY, startZ, maxNodes);
+                        request.Complete(path, search.NodesSearched, sw.Elapsed.TotalMilliseconds);
+                    }
+                    catch (Exception e)
+                    {
+                        Log.Error($"[Pathfinder] Background search failed: {e}");
+                        request.Complete(null, search.NodesSearched, 0);
+                    }
+                    finally
+                    {
+                        _searchSlots.Release();
+                        Interlocked.Decrement(ref _pending);
+                    }
+                }
+            );
+
+            return request;
+        }
+
+        /// <summary>
+        /// Continue building the grids requested searches wait for. Called every frame from the game thread.
+        /// </summary>
+        internal static void Update()
+        {
+            if (_builds.Count == 0)
+                return;
+
+            _buildTimer.Restart();
+
+            while (_builds.Count > 0)
+            {
+                WalkabilityGrid.Builder builder = _builds[0];
+
+                if (!World.InGame || builder.MapIndex != World.MapIndex)
+                {
+                    builder.Cancel();
+                    _builds.RemoveAt(0);
+
+                    continue;
+                }
+
+                if (!builder.Step(_buildTimer, BUILD_BUDGET_MS))
+                    break;
+
+                _lastGrid = builder.Completion.Result;
+                _builds.RemoveAt(0);
+
+                if (_buildTimer.Elapsed.TotalMilliseconds >= BUILD_BUDGET_MS)
+                    break;
+            }
+        }
+
+        internal static void Clear()
+        {
+            foreach (WalkabilityGrid.Builder builder in _builds)
+                builder.Cancel();
+
+            _builds.Clear();
+            _lastGrid = null;
+        }
+
+        private static Task<WalkabilityGrid> GetGrid(int startX, int startY, int endX, int endY)
+        {
+            int mapWidth = MapLoader.Instance.MapBlocksSize[World.MapIndex, 0] << 3;
+            int mapHeight = MapLoader.Instance.MapBlocksSize[World.MapIndex, 1] << 3;
+
+            int left = Math.Max(Math.Max(0, startX - GRID_MAX_RADIUS), Math.Min(startX, endX) - GRID_MARGIN);
+            int top = Math.Max(Math.Max(0, startY - GRID_MAX_RADIUS), Math.Min(startY, endY) - GRID_MARGIN);
+            int right = Math.Min(Math.Min(mapWidth, startX + GRID_MAX_RADIUS), Math.Max(startX, endX) + GRID_MARGIN);
+            int bottom = Math.Min(Math.Min(mapHeight, startY + GRID_MAX_RADIUS), Math.Max(startY, endY) + GRID_MARGIN);
+            var area = new Rectangle(left, top, Math.Max(1, right - left), Math.Max(1, bottom - top));
+
+            WalkabilityGrid grid = _lastGrid;
+            int stepState = Pathfinder.GetStepState();
+
+            if (grid != null && grid.MapIndex == World.MapIndex && grid.StepState == stepState &&
+                unchecked(Environment.TickCount - grid.CreatedAt) < GRID_MAX_AGE_MS && grid.Area.Contains(area))
+            {
+                return Task.FromResult(grid);
+            }
+
+            foreach (WalkabilityGrid.Builder pending in _builds)
+            {
+                if (pending.MapIndex == World.MapIndex && pending.StepState == stepState && pending.Area.Contains(area))
+                    return pending.Completion;
+            }
+
+            var builder = new WalkabilityGrid.Builder(area);
+
+            // Small areas are done right away, larger ones continue in Update over the next frames
+            _buildTimer.Restart();
+
+            if (builder.Step(_buildTimer, BUILD_BUDGET_MS))
+                _lastGrid = builder.Completion.Result;
+            else
+                _builds.Add(builder);
+
+            return builder.Completion;
+        }
+
+        private static List<PathStep> FromPoints(List<(int X, int Y, int Z)> points)
+        {
+            if (points == null)
+                return null;
+
+            var path = new List<PathStep>(points.Count);
+
+            for (int i = 0; i < points.Count; i++)
+            {
+                int direction = i > 0 ? (int)DirectionHelper.CalculateDirection(points[i - 1].X, points[i - 1].Y, points[i].X, points[i].Y) : 0;
+                path.Add(new PathStep(points[i].X, points[i].Y, points[i].Z, direction));
+            }
+
+            return path;
+        }
+    }
+
+    public readonly struct PathStep(int x, int y, int z, int direction)
+    {
+        public int X { get; } = x;
+        public int Y { get; } = y;
+        public int Z { get; } = z;
+
+        /// <summary>
+        /// Direction walked to reach this step from the previous one.
+        /// </summary>
+        public int Direction { get; } = direction;
+
+        public override string ToString() => $"({X}, {Y}, {Z})";
+    }
+
+    /// <summary>
+    /// Handle to a path being searched in the background.
+    /// </summary>
+    public sealed class PathRequest
+    {
+        private readonly CancellationTokenSource _cancel = new CancellationTokenSource();
+        private readonly ManualResetEventSlim _done = new ManualResetEventSlim(false);
+        private List<PathStep> _path;
+
+        internal PathRequest(int x, int y, int z, int distance)
+        {
+            X = x;
+            Y = y;
+            Z = z;
+            Distance = distance;
+        }
+
+        public int X { get; }
+        public int Y { get; }
+        public int Z { get; }
+        public int Distance { get; }
+
+        public bool IsCompleted => _done.IsSet;
+
+        public bool IsCancelled => _cancel.IsCancellationRequested;
+
+        /// <summary>
+        /// True if the search finished and found a path.
+        /// </summary>
+        public bool Succeeded => IsCompleted && _path != null;
+
+        /// <summary>
+        /// The path starting at the player's position when requested, null until the search completes or if none was found.
+        /// </summary>
+        public IReadOnlyList<PathStep> Path => IsCompleted ? _path : null;
+
+        public int NodesSearched { get; private set; }
+
+        public double SearchMs { get; private set; }
+
+        internal CancellationToken Token => _cancel.Token;
+
+        /// <summary>
+        /// Stop searching, the request completes without a path.
+        /// </summary>
+        public void Cancel()
+        {
+            _cancel.Cancel();
+        }
+
+        /// <summary>
+        /// Block until the search completes.
+        /// </summary>
+        /// <returns>True if completed, false if timed out</returns>
+        public bool Wait(double timeoutSeconds)
+        {
+            return _done.Wait(TimeSpan.FromSeconds(Math.Max(0, timeoutSeconds)));
+        }
+
+        internal void Complete(List<PathStep> path, int nodesSearched, double searchMs)
+        {
+            _path = _cancel.IsCancellationRequested ? null : path;
+            NodesSearched = nodesSearched;
+            SearchMs = searchMs;
+            _done.Set();
+        }
+    }
+
+    /// <summary>
+    /// A* search over a <see cref="WalkabilityGrid"/>. Uses the movement and Z rules of <see cref="Pathfinder"/>,
+    /// but every search has its own state so several can run at once on different threads.
+    /// </summary>
+    internal sealed class PathSearch
+    {
+        private static readonly int[] _offsetX = { 0, 1, 1, 1, 0, -1, -1, -1, 0, 1 };
+        private static readonly int[] _offsetY = { -1, -1, 0, 1, 1, 1, 0, -1, -1, -1 };
+
+        private readonly WalkabilityGrid _grid;
+        private readonly Pathfinder.NewZCalculator _calculateNewZ;
+        private readonly int _endX, _endY, _endZ, _distance;
+        private readonly bool _flying;
+        private readonly CancellationToken _token;
+        private readonly List<Node> _heap = new List<Node>();
+        private readonly Dictionary<(int, int, int), Node> _open = new Dictionary<(int, int, int), Node>();
+        private readonly HashSet<(int, int, int)> _closed = new HashSet<(int, int, int)>();
+        private WalkabilityGrid.Entry[] _sorted = new WalkabilityGrid.Entry[16];
+        private Node _goalNode;
+
+        public PathSearch(WalkabilityGrid grid, int endX, int endY, int endZ, int distance, CancellationToken token)
+        {
+            _grid = grid;
+            _endX = endX;
+            _endY = endY;
+            _endZ = endZ;
+            _distance = distance;
+            _flying = grid.StepState == (int)Pathfinder.PATH_STEP_STATE.PSS_FLYING;
+            _token = token;
+            _calculateNewZ = CalculateNewZ;
+        }
+
+        public int NodesSearched { get; private set; }
+
+        /// <returns>The path including the start position, or null if none was found</returns>
+        public List<PathStep> Run(int startX, int startY, int startZ, int maxNodes)
+        {
+            var start = new Node(startX, startY, startZ, 0, null)
+            {
+                DistFromGoalCost = GetGoalDistCost(startX, startY)
+            };
+            start.Cost = start.DistFromGoalCost;
+            Enqueue(start);
+
+            while (!_token.IsCancellationRequested)
+            {
+                Node current = FindCheapestNode();
+
+                if (current == null)
+                    return null;
+
+                if (++NodesSearched >= maxNodes)
+                    break;
+
+                if (_goalNode != null)
+                    return ReconstructPath(_goalNode);
+
+                OpenNodes(current);
+            }
+
+            return null;
+        }
+
+        private static List<PathStep> ReconstructPath(Node goal)
+        {
+            var path = new List<PathStep>();
+
+            for (Node n = goal; n != null; n = n.Parent)
+                path.Add(new PathStep(n.X, n.Y, n.Z, n.Direction));
+
+            path.Reverse();
+
+            return path;
+        }
+
+        private int GetGoalDistCost(int x, int y) => Math.Max(Math.Abs(_endX - x), Math.Abs(_endY - y));
+
+        private void OpenNodes(Node node)
+        {
+            for (int i = 0; i < 8; i++)
+            {
+                Direction direction = (Direction)i;
+                int x = node.X;
+                int y = node.Y;
+                sbyte z = (sbyte)node.Z;
+                Direction oldDirection = direction;
+
+                if (!Pathfinder.TryStep(_calculateNewZ, ref direction, ref x, ref y, ref z) || direction != oldDirection)
+                    continue;
+
+                int diagonal = i % 2;
+
+                if (diagonal != 0)
+                {
+                    int wantX = node.X;
+                    int wantY = node.Y;
+                    Pathfinder.GetNewXY((byte)i, ref wantX, ref wantY);
+
+                    if (x != wantX || y != wantY)
+                        diagonal = -1;
+                }
+
+                if (diagonal >= 0)
+                    AddNode((int)direction, x, y, z, node, diagonal == 0 ? 1 : 2);
+            }
+        }
+
+        private void AddNode(int direction, int x, int y, int z, Node parent, int cost)
+        {
+            var key = (x, y, z);
+
+            if (_closed.Contains(key))
+                return;
+
+            int turnPenalty = parent.Parent != null && parent.Direction != direction ? 1 : 0;
+
+            var node = new Node(x, y, z, direction, parent)
+            {
+                DistFromStartCost = parent.DistFromStartCost + cost + Math.Abs(z - parent.Z) + turnPenalty,
+                DistFromGoalCost = GetGoalDistCost(x, y)
+            };
+            node.Cost = node.DistFromStartCost + node.DistFromGoalCost;
+
+            bool known = _open.TryGetValue(key, out Node existing) && existing.IsValid;
+
+            Enqueue(node);
+
+            if (!known && MathHelper.GetDistance(new Point(_endX, _endY), new Point(x, y)) <= _distance && Math.Abs(_endZ - z) < Constants.ALLOWED_Z_DIFFERENCE)
+                _goalNode = node;
+        }
+
+        private Node FindCheapestNode()
+        {
+            while (_heap.Count > 0)
+            {
+                Node node = Pop();
+
+                if (!node.IsValid)
+                    continue;
+
+                var key = (node.X, node.Y, node.Z);
+                _open.Remove(key);
+
+                if (_closed.Add(key))
+                    return node;
+            }
+
+            return null;
+        }
+
+        private bool CalculateNewZ(int x, int y, ref sbyte z, int direction)
+        {
+            int minZ = -128;
+            int maxZ = z;
+            int newDirection = direction & 7;
+            int fromDirection = newDirection ^ 4;
+
+            ReadOnlySpan<WalkabilityGrid.Entry> from = _grid.GetEntries(x + _offsetX[fromDirection], y + _offsetY[fromDirection]);
+
+            if (from.Length != 0)
+                Pathfinder.ApplyMinMaxZ(from, _grid.StretchedZ, z, newDirection, ref minZ, ref maxZ);
+
+            ReadOnlySpan<WalkabilityGrid.Entry> entries = _grid.GetEntries(x, y);
+
+            if (entries.Length == 0)
+                return false;
+
+            if (_sorted.Length < entries.Length)
+                _sorted = new WalkabilityGrid.Entry[Math.Max(entries.Length, _sorted.Length * 2)];
+
+            Span<WalkabilityGrid.Entry> list = new Span<WalkabilityGrid.Entry>(_sorted, 0, entries.Length);
+            entries.CopyTo(list);
+            Pathfinder.SortEntries(list);
+
+            int resultZ = Pathfinder.FindSurfaceZ(list, z, minZ, maxZ, _flying);
+            z = (sbyte)resultZ;
+
+            return resultZ != -128;
+        }
+
+        private void Enqueue(Node node)
+        {
+            var key = (node.X, node.Y, node.Z);
+
+            if (_open.TryGetValue(key, out Node existing) && existing.IsValid)
+            {
+                if (existing.Cost <= node.Cost)
+                    return;
+
+                // Lazily removed from the heap when it comes up
+                existing.IsValid = false;
+            }
+
+            node.IsValid = true;
+            _open[key] = node;
+            _heap.Add(node);
+
+            int index = _heap.Count - 1;
+
+            while (index > 0)
+            {
+                int parent = (index - 1) / 2;
+
+                if (_heap[index].Cost >= _heap[parent].Cost)
+                    break;
+
+                (_heap[index], _heap[parent]) = (_heap[parent], _heap[index]);
+                index = parent;
+            }
+        }
+
+        private Node Pop()
+        {
+            Node top = _heap[0];
+            int last = _heap.Count - 1;
+            _heap[0] = _heap[last];
+            _heap.RemoveAt(last);
+
+            int index = 0;
+
+            while (true)
+            {
+                int left = index * 2 + 1;
+                int right = left + 1;
+                int smallest = index;
+
+                if (left < _heap.Count && _heap[left].Cost < _heap[smallest].Cost)
+                    smallest = left;
+
+                if (right < _heap.Count && _heap[right].Cost < _heap[smallest].Cost)
+                    smallest = right;
+
+                if (smallest == index)
+                    break;
+
+                (_heap[index], _heap[smallest]) = (_heap[smallest], _heap[index]);
+                index = smallest;
+            }
+
+            return top;
+        }
+
+        private sealed class Node(int x, int y, int z, int direction, Node parent)
+        {
+            public readonly int X = x, Y = y, Z = z, Direction = direction;
+            public readonly Node Parent = parent;
+            public int Cost, DistFromStartCost, DistFromGoalCost;
+            public bool IsValid;
+        }
+    }
+}
@@ -0,0 +1,1014 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Threading.Tasks;
+using ClassicUO.Assets;
+using ClassicUO.Utility.Logging;
+using Microsoft.Xna.Framework;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// Cluster and portal graph of a facet for long range pathfinding (HPA*).
+    /// The map is cut into <see cref="CLUSTER_SIZE"/> tile clusters, every walkable opening between two clusters gets a portal node
+    /// and the portals of a cluster are linked with their walking distance.
+    /// Built from the map and statics data only, mobiles, doors and other items are left to the tile <see cref="Pathfinder"/> that walks each segment.
+    /// Every tile keeps a single walk level, the lowest one with head room, so upper floors of buildings are not part of the graph.
+    /// </summary>
+    public sealed class RegionGraph
+    {
+        public const int CLUSTER_SIZE = 32;
+
+        private const int FILE_MAGIC = 0x314E4752; // RGN1
+        private const int FILE_VERSION = 1;
+        private const int MAX_STEP_Z = 10;
+        private const int MAX_LAND_STEP_Z = 20;
+        private const int PORTAL_SPLIT_LENGTH = 6;
+        private const int SNAP_RANGE = 3;
+        private const byte TILE_WALKABLE = 0x01;
+        private const byte TILE_LAND = 0x02;
+
+        private static readonly int[] _stepX = { 0, 1, 1, 1, 0, -1, -1, -1 };
+        private static readonly int[] _stepY = { -1, -1, 0, 1, 1, 1, 0, -1 };
+
+        private readonly object _lock = new object();
+        private readonly object _dirtyLock = new object();
+        private readonly int _dataMap;
+        private readonly int _blocksHeight;
+        private readonly ulong[] _blockHashes;
+        private readonly HashSet<int> _dirtyBlocks = new HashSet<int>();
+        private readonly Dictionary<int, Node> _nodes = new Dictionary<int, Node>();
+        private Node[][] _clusters;
+
+        /// <summary>
+        /// Hashes the map and statics data of a facet, must be created after the facet was loaded.
+        /// </summary>
+        public RegionGraph(int mapIndex)
+        {
+            MapIndex = mapIndex;
+            _dataMap = mapIndex;
+            MapLoader.Instance.SanitizeMapIndex(ref _dataMap);
+            _blocksHeight = MapLoader.Instance.MapBlocksSize[mapIndex, 1];
+            Width = MapLoader.Instance.MapBlocksSize[mapIndex, 0] << 3;
+            Height = _blocksHeight << 3;
+            ClustersX = (Width + CLUSTER_SIZE - 1) / CLUSTER_SIZE;
+            ClustersY = (Height + CLUSTER_SIZE - 1) / CLUSTER_SIZE;
+
+            _blockHashes = new ulong[(Width >> 3) * _blocksHeight];
+
+            for (int block = 0; block < _blockHashes.Length; block++)
+            {
+                _blockHashes[block] = HashBlock(block);
+                Hash += MixBlockHash(block, _blockHashes[block]);
+            }
+        }
+
+        public int MapIndex { get; }
+
+        public int Width { get; }
+
+        public int Height { get; }
+
+        public int ClustersX { get; }
+
+        public int ClustersY { get; }
+
+        /// <summary>
+        /// Hash of the map and statics data the graph was built from.
+        /// </summary>
+        public ulong Hash { get; private set; }
+
+        public int NodeCount
+        {
+            get
+            {
+                lock (_lock)
+                    return _nodes.Count;
+            }
+        }
+
+        public bool IsBuilt => _clusters != null;
+
+        /// <summary>
+        /// Set when clusters were rebuilt after a map patch and the cached file is out of date.
+        /// </summary>
+        public bool NeedsSave { get; private set; }
+
+        /// <summary>
+        /// Build every cluster, spread over all cores.
+        /// </summary>
+        public void Build()
+        {
+            Stopwatch sw = Stopwatch.StartNew();
+            var clusters = new Node[ClustersX * ClustersY][];
+
+            Parallel.For(0, clusters.Length, i => clusters[i] = BuildCluster(i));
+
+            lock (_lock)
+            {
+                _clusters = clusters;
+                _nodes.Clear();
+
+                foreach (Node[] nodes in clusters)
+                {
+                    foreach (Node node in nodes)
+                        _nodes[node.Key] = node;
+                }
+            }
+
+            Log.Trace($"[RegionGraph] Built map {MapIndex}: {_nodes.Count} portals in {sw.ElapsedMilliseconds}ms");
+        }
+
+        /// <summary>
+        /// Map data in this block changed, the clusters around it are rebuilt before the next search.
+        /// </summary>
+        public void MarkBlockChanged(int block)
+        {
+            if (block < 0 || block >= _blockHashes.Length)
+                return;
+
+            lock (_dirtyLock)
+                _dirtyBlocks.Add(block);
+        }
+
+        /// <summary>
+        /// Find a route between two tiles, every step of the result is one tile away from the previous one.
+        /// Tiles that aren't walkable in the graph are moved to the nearest walkable tile within a few tiles.
+        /// </summary>
+        /// <returns>The route including the start tile, or null if there is none</returns>
+        public List<(int X, int Y, int Z)> FindRoute(int startX, int startY, int goalX, int goalY)
+        {
+            if (!IsBuilt || !Contains(startX, startY) || !Contains(goalX, goalY))
+                return null;
+
+            lock (_lock)
+            {
+                RebuildDirtyClusters();
+
+                var windows = new Dictionary<int, TileWindow>();
+                int startCluster = ClusterOf(startX, startY);
+                int goalCluster = ClusterOf(goalX, goalY);
+                TileWindow startWindow = GetWindow(windows, startCluster);
+                TileWindow goalWindow = GetWindow(windows, goalCluster);
+
+                if (!Snap(startWindow, ref startX, ref startY) || !Snap(goalWindow, ref goalX, ref goalY))
+                    return null;
+
+                Rectangle startBounds = ClusterBounds(startCluster);
+                int[] startDist = new int[startBounds.Width * startBounds.Height];
+                Bfs(startWindow, startBounds, startX, startY, startDist, null);
+
+                if (startCluster == goalCluster && startDist[LocalIndex(startBounds, goalX, goalY)] >= 0)
+                {
+                    var direct = new List<(int X, int Y, int Z)>();
+                    AppendClusterPath(direct, startWindow, startBounds, startX, startY, goalX, goalY);
+
+                    return direct;
+                }
+
+                Rectangle goalBounds = ClusterBounds(goalCluster);
+                int[] goalDist = new int[goalBounds.Width * goalBounds.Height];
+                Bfs(goalWindow, goalBounds, goalX, goalY, goalDist, null);
+
+                List<Node> portals = SearchPortals(startBounds, startDist, startCluster, goalBounds, goalDist, goalCluster, goalX, goalY);
+
+                if (portals == null)
+                    return null;
+
+                var route = new List<(int X, int Y, int Z)>();
+                int fromX = startX, fromY = startY;
+
+                foreach (Node portal in portals)
+                {
+                    AppendSegment(route, windows, fromX, fromY, portal.X, portal.Y);
+                    fromX = portal.X;
+                    fromY = portal.Y;
+                }
+
+                AppendSegment(route, windows, fromX, fromY, goalX, goalY);
+
+                return route;
+            }
+        }
+
+        /// <summary>
+        /// Load a graph saved by <see cref="Save"/>, fails if it was built from different map data.
+        /// </summary>
+        public bool TryLoad(string path)
+        {
+            if (!File.Exists(path))
+                return false;
+
+            try
+            {
+                using var reader = new BinaryReader(File.OpenRead(path));
+
+                if (reader.ReadInt32() != FILE_MAGIC || reader.ReadInt32() != FILE_VERSION || reader.ReadInt32() != MapIndex ||
+                    reader.ReadInt32() != Width || reader.ReadInt32() != Height || reader.ReadInt32() != CLUSTER_SIZE || reader.ReadUInt64() != Hash)
+                {
+                    return false;
+                }
+
+                var clusters = new Node[ClustersX * ClustersY][];
+
+                for (int c = 0; c < clusters.Length; c++)
+                {
+                    var nodes = new Node[reader.ReadInt32()];
+
+                    for (int i = 0; i < nodes.Length; i++)
+                    {
+                        ushort x = reader.ReadUInt16();
+                        ushort y = reader.ReadUInt16();
+                        var node = new Node(y * Width + x, x, y, reader.ReadSByte(), new Edge[reader.ReadUInt16()]);
+
+                        for (int e = 0; e < node.Edges.Length; e++)
+                            node.Edges[e] = new Edge(reader.ReadInt32(), reader.ReadUInt16());
+
+                        nodes[i] = node;
+                    }
+
+                    clusters[c] = nodes;
+                }
+
+                lock (_lock)
+                {
+                    _clusters = clusters;
+                    _nodes.Clear();
+
+                    foreach (Node[] nodes in clusters)
+                    {
+                        foreach (Node node in nodes)
+                            _nodes[node.Key] = node;
+                    }
+                }
+
+                return true;
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"[RegionGraph] Could not read {path}: {e.Message}");
+
+                return false;
+            }
+        }
+
+        public void Save(string path)
+        {
+            lock (_lock)
+            {
+                if (_clusters == null)
+                    return;
+
+                string tempPath = path + ".tmp";
+
+                using (var writer = new BinaryWriter(File.Create(tempPath)))
+                {
+                    writer.Write(FILE_MAGIC);
+                    writer.Write(FILE_VERSION);
+                    writer.Write(MapIndex);
+                    writer.Write(Width);
+                    writer.Write(Height);
+                    writer.Write(CLUSTER_SIZE);
+                    writer.Write(Hash);
+
+                    foreach (Node[] nodes in _clusters)
+                    {
+                        writer.Write(nodes.Length);
+
+                        foreach (Node node in nodes)
+                        {
+                            writer.Write(node.X);
+                            writer.Write(node.Y);
+                            writer.Write(node.Z);
+                            writer.Write((ushort)node.Edges.Length);
+
+                            foreach (Edge edge in node.Edges)
+                            {
+                                writer.Write(edge.To);
+                                writer.Write((ushort)edge.Cost);
+                            }
+                        }
+                    }
+                }
+
+                if (File.Exists(path))
+                    File.Delete(path);
+
+                File.Move(tempPath, path);
+                NeedsSave = false;
+            }
+        }
+
+        private bool Contains(int x, int y) => x >= 0 && y >= 0 && x < Width && y < Height;
+
+        private int ClusterOf(int x, int y) => y / CLUSTER_SIZE * ClustersX + x / CLUSTER_SIZE;
+
+        private Rectangle ClusterBounds(int cluster)
+        {
+            int x = cluster % ClustersX * CLUSTER_SIZE;
+            int y = cluster / ClustersX * CLUSTER_SIZE;
+
+            return new Rectangle(x, y, Math.Min(CLUSTER_SIZE, Width - x), Math.Min(CLUSTER_SIZE, Height - y));
+        }
+
+        private static int LocalIndex(Rectangle bounds, int x, int y) => (y - bounds.Y) * bounds.Width + (x - bounds.X);
+
+        private void RebuildDirtyClusters()
+        {
+            int[] blocks;
+
+            lock (_dirtyLock)
+            {
+                if (_dirtyBlocks.Count == 0)
+                    return;
+
+                blocks = new int[_dirtyBlocks.Count];
+                _dirtyBlocks.CopyTo(blocks);
+                _dirtyBlocks.Clear();
+            }
+
+            var clusters = new HashSet<int>();
+
+            foreach (int block in blocks)
+            {
+                ulong hash = HashBlock(block);
+                Hash -= MixBlockHash(block, _blockHashes[block]);
+                Hash += MixBlockHash(block, hash);
+                _blockHashes[block] = hash;
+
+                // Land heights are averaged with the tiles to the east and south and portals are shared with the next cluster
+                int clusterX = (block / _blocksHeight << 3) / CLUSTER_SIZE;
+                int clusterY = (block % _blocksHeight << 3) / CLUSTER_SIZE;
+
+                for (int y = Math.Max(0, clusterY - 1); y <= Math.Min(ClustersY - 1, clusterY + 1); y++)
+                {
+                    for (int x = Math.Max(0, clusterX - 1); x <= Math.Min(ClustersX - 1, clusterX + 1); x++)
+                        clusters.Add(y * ClustersX + x);
+                }
+            }
+
+            foreach (int cluster in clusters)
+            {
+                foreach (Node node in _clusters[cluster])
+                    _nodes.Remove(node.Key);
+
+                _clusters[cluster] = BuildCluster(cluster);
+
+                foreach (Node node in _clusters[cluster])
+                    _nodes[node.Key] = node;
+            }
+
+            NeedsSave = true;
+        }
+
+        private Node[] BuildCluster(int cluster)
+        {
+            Rectangle bounds = ClusterBounds(cluster);
+            TileWindow window = SampleCluster(bounds);
+            var nodes = new Dictionary<int, (Node Node, List<Edge> Edges)>();
+
+            AddPortals(window, nodes, bounds.X, bounds.Y, 0, 1, bounds.Height, -1, 0);
+            AddPortals(window, nodes, bounds.Right - 1, bounds.Y, 0, 1, bounds.Height, 1, 0);
+            AddPortals(window, nodes, bounds.X, bounds.Y, 1, 0, bounds.Width, 0, -1);
+            AddPortals(window, nodes, bounds.X, bounds.Bottom - 1, 1, 0, bounds.Width, 0, 1);
+
+            int[] dist = new int[bounds.Width * bounds.Height];
+            var result = new Node[nodes.Count];
+            int index = 0;
+
+            foreach ((Node node, List<Edge> edges) in nodes.Values)
+            {
+                Bfs(window, bounds, node.X, node.Y, dist, null);
+
+                foreach ((Node other, _) in nodes.Values)
+                {
+                    int d = dist[LocalIndex(bounds, other.X, other.Y)];
+
+                    if (other != node && d > 0)
+                        edges.Add(new Edge(other.Key, d));
+                }
+
+                result[index++] = new Node(node.Key, node.X, node.Y, node.Z, edges.ToArray());
+            }
+
+            return result;
+        }
+
+        /// <summary>
+        /// Walk one border of a cluster and add a portal for every run of tiles that can step across it.
+        /// Both clusters sharing the border find the same portals, each keeps the node on its own side.
+        /// </summary>
+        private void AddPortals
+        (
+            TileWindow window,
+            Dictionary<int, (Node Node, List<Edge> Edges)> nodes,
+            int startX,
+            int startY,
+            int stepX,
+            int stepY,
+            int length,
+            int outX,
+            int outY
+        )
+        {
+            int run = 0;
+
+            for (int i = 0; i <= length; i++)
+            {
+                int x = startX + i * stepX;
+                int y = startY + i * stepY;
+
+                if (i < length && CanStep(window, x, y, x + outX, y + outY))
+                {
+                    run++;
+
+                    continue;
+                }
+
+                if (run == 0)
+                    continue;
+
+                int first = i - run;
+
+                if (run >= PORTAL_SPLIT_LENGTH)
+                {
+                    AddPortal(window, nodes, startX + first * stepX, startY + first * stepY, outX, outY);
+                    AddPortal(window, nodes, startX + (i - 1) * stepX, startY + (i - 1) * stepY, outX, outY);
+                }
+                else
+                {
+                    int middle = first + (run - 1) / 2;
+                    AddPortal(window, nodes, startX + middle * stepX, startY + middle * stepY, outX, outY);
+                }
+
+                run = 0;
+            }
+        }
+
+        private void AddPortal(TileWindow window, Dictionary<int, (Node Node, List<Edge> Edges)> nodes, int x, int y, int outX, int outY)
+        {
+            int key = y * Width + x;
+
+            if (!nodes.TryGetValue(key, out var entry))
+            {
+                entry = (new Node(key, (ushort)x, (ushort)y, window.GetZ(x, y), null), new List<Edge>());
+                nodes[key] = entry;
+            }
+
+            entry.Edges.Add(new Edge((y + outY) * Width + x + outX, 1));
+        }
+
+        private List<Node> SearchPortals
+        (
+            Rectangle startBounds,
+            int[] startDist,
+            int startCluster,
+            Rectangle goalBounds,
+            int[] goalDist,
+            int goalCluster,
+            int goalX,
+            int goalY
+        )
+        {
+            const int GOAL = -1;
+
+            var costs = new Dictionary<int, int>();
+            var parents = new Dictionary<int, int>();
+            var open = new MinHeap();
+            var goalCosts = new Dictionary<int, int>();
+
+            foreach (Node node in _clusters[goalCluster])
+            {
+                int d = goalDist[LocalIndex(goalBounds, node.X, node.Y)];
+
+                if (d >= 0)
+                    goalCosts[node.Key] = d;
+            }
+
+            if (goalCosts.Count == 0)
+                return null;
+
+            foreach (Node node in _clusters[startCluster])
+            {
+                int d = startDist[LocalIndex(startBounds, node.X, node.Y)];
+
+                if (d < 0)
+                    continue;
+
+                costs[node.Key] = d;
+                parents[node.Key] = int.MinValue;
+                open.Push(d + Heuristic(node, goalX, goalY), node.Key);
+            }
+
+            while (open.TryPop(out int priority, out int key))
+            {
+                if (key == GOAL)
+                {
+                    var path = new List<Node>();
+
+                    for (int k = parents[GOAL]; k != int.MinValue; k = parents[k])
+                        path.Add(_nodes[k]);
+
+                    path.Reverse();
+
+                    return path;
+                }
+
+                Node node = _nodes[key];
+                int cost = costs[key];
+
+                if (priority > cost + Heuristic(node, goalX, goalY))
+                    continue;
+
+                if (goalCosts.TryGetValue(key, out int goalCost))
+                    Relax(GOAL, cost + goalCost, 0);
+
+                foreach (Edge edge in node.Edges)
+                {
+                    if (_nodes.TryGetValue(edge.To, out Node next))
+                        Relax(edge.To, cost + edge.Cost, Heuristic(next, goalX, goalY));
+                }
+
+                void Relax(int to, int newCost, int heuristic)
+                {
+                    if (costs.TryGetValue(to, out int oldCost) && oldCost <= newCost)
+                        return;
+
+                    costs[to] = newCost;
+                    parents[to] = key;
+                    open.Push(newCost + heuristic, to);
+                }
+            }
+
+            return null;
+        }
+
+        private static int Heuristic(Node node, int x, int y) => Math.Max(Math.Abs(node.X - x), Math.Abs(node.Y - y));
+
+        private void AppendSegment(List<(int X, int Y, int Z)> route, Dictionary<int, TileWindow> windows, int fromX, int fromY, int toX, int toY)
+        {
+            int cluster = ClusterOf(fromX, fromY);
+
+            if (cluster != ClusterOf(toX, toY))
+            {
+                // Portal crossing, the tiles are next to each other
+                route.Add((toX, toY, GetWindow(windows, ClusterOf(toX, toY)).GetZ(toX, toY)));
+
+                return;
+            }
+
+            AppendClusterPath(route, GetWindow(windows, cluster), ClusterBounds(cluster), fromX, fromY, toX, toY);
+        }
+
+        private static void AppendClusterPath(List<(int X, int Y, int Z)> route, TileWindow window, Rectangle bounds, int fromX, int fromY, int toX, int toY)
+        {
+            int size = bounds.Width * bounds.Height;
+            int[] dist = new int[size];
+            int[] parent = new int[size];
+            Bfs(window, bounds, toX, toY, dist, parent);
+
+            // Searched backwards so the parents lead to the goal
+            int index = LocalIndex(bounds, fromX, fromY);
+
+            if (route.Count == 0)
+                route.Add((fromX, fromY, window.GetZ(fromX, fromY)));
+
+            while (dist[index] > 0)
+            {
+                index = parent[index];
+                int x = bounds.X + index % bounds.Width;
+                int y = bounds.Y + index / bounds.Width;
+                route.Add((x, y, window.GetZ(x, y)));
+            }
+        }
+
+        private TileWindow GetWindow(Dictionary<int, TileWindow> windows, int cluster)
+        {
+            if (!windows.TryGetValue(cluster, out TileWindow window))
+                windows[cluster] = window = SampleCluster(ClusterBounds(cluster));
+
+            return window;
+        }
+
+        private static bool Snap(TileWindow window, ref int x, ref int y)
+        {
+            if (window.IsWalkable(x, y))
+                return true;
+
+            for (int range = 1; range <= SNAP_RANGE; range++)
+            {
+                for (int dy = -range; dy <= range; dy++)
+                {
+                    for (int dx = -range; dx <= range; dx++)
+                    {
+                        if (Math.Max(Math.Abs(dx), Math.Abs(dy)) == range && window.IsWalkable(x + dx, y + dy) &&
+                            window.Inner.Contains(x + dx, y + dy))
+                        {
+                            x += dx;
+                            y += dy;
+
+                            return true;
+                        }
+                    }
+                }
+            }
+
+            return false;
+        }
+
+        /// <summary>
+        /// Breadth first search inside of a cluster, diagonal steps need both straight steps to be open like in <see cref="Pathfinder"/>.
+        /// </summary>
+        private static void Bfs(TileWindow window, Rectangle bounds, int fromX, int fromY, int[] dist, int[] parent)
+        {
+            dist.AsSpan().Fill(-1);
+
+            if (!bounds.Contains(fromX, fromY) || !window.IsWalkable(fromX, fromY))
+                return;
+
+            int[] queue = new int[dist.Length];
+            int head = 0, tail = 0;
+            int start = LocalIndex(bounds, fromX, fromY);
+            dist[start] = 0;
+            queue[tail++] = start;
+
+            while (head < tail)
+            {
+                int current = queue[head++];
+                int x = bounds.X + current % bounds.Width;
+                int y = bounds.Y + current / bounds.Width;
+
+                for (int i = 0; i < 8; i++)
+                {
+                    int nx = x + _stepX[i];
+                    int ny = y + _stepY[i];
+
+                    if (!bounds.Contains(nx, ny))
+                        continue;
+
+                    int next = LocalIndex(bounds, nx, ny);
+
+                    if (dist[next] >= 0 || !CanStep(window, x, y, nx, ny))
+                        continue;
+
+                    if ((i & 1) != 0 && (!CanStep(window, x, y, nx, y) || !CanStep(window, x, y, x, ny)))
+                        continue;
+
+                    dist[next] = dist[current] + 1;
+
+                    if (parent != null)
+                        parent[next] = current;
+
+                    queue[tail++] = next;
+                }
+            }
+        }
+
+        private static bool CanStep(TileWindow window, int fromX, int fromY, int toX, int toY)
+        {
+            byte from = window.GetFlags(fromX, fromY);
+            byte to = window.GetFlags(toX, toY);
+
+            if ((from & to & TILE_WALKABLE) == 0)
+                return false;
+
+            int limit = (from & to & TILE_LAND) != 0 ? MAX_LAND_STEP_Z : MAX_STEP_Z;
+
+            return Math.Abs(window.GetZ(fromX, fromY) - window.GetZ(toX, toY)) <= limit;
+        }
+
+        /// <summary>
+        /// The cluster plus a one tile ring, so the borders can be checked against the neighbours.
+        /// </summary>
+        private TileWindow SampleCluster(Rectangle bounds)
+        {
+            var window = new TileWindow(bounds, new Rectangle(bounds.X - 1, bounds.Y - 1, bounds.Width + 2, bounds.Height + 2));
+            Rectangle area = window.Area;
+            int[] starts = new int[area.Width * area.Height + 1];
+            var objects = new List<WalkObject>();
+
+            // UltimaLive patches map memory on the game thread, a patch waits for the cluster to be read and marks its block changed afterwards
+            UltimaLive.MapDataLock.EnterReadLock();
+
+            try
+            {
+                WalkObject[] statics = CollectStatics(area, starts);
+
+                for (int y = area.Y; y < area.Bottom; y++)
+                {
+                    for (int x = area.X; x < area.Right; x++)
+                    {
+                        if (!Contains(x, y))
+                            continue;
+
+                        int index = (y - area.Y) * area.Width + x - area.X;
+
+                        objects.Clear();
+                        AddLand(x, y, objects);
+
+                        for (int i = starts[index]; i < starts[index + 1]; i++)
+                            objects.Add(statics[i]);
+
+                        if (FindWalkLevel(objects, out int z, out bool isLand))
+                            window.Set(x, y, (sbyte)Math.Max(sbyte.MinValue, Math.Min(sbyte.MaxValue, z)), (byte)(TILE_WALKABLE | (isLand ? TILE_LAND : 0)));
+                    }
+                }
+            }
+            finally
+            {
+                UltimaLive.MapDataLock.ExitReadLock();
+            }
+
+            return window;
+        }
+
+        /// <summary>
+        /// The lowest surface nothing blocks within a character's height.
+        /// </summary>
+        private static bool FindWalkLevel(List<WalkObject> objects, out int z, out bool isLand)
+        {
+            bool found = false;
+            z = 0;
+            isLand = false;
+
+            for (int i = 0; i < objects.Count; i++)
+            {
+                WalkObject candidate = objects[i];
+
+                if (!candidate.Standable || found && candidate.Top >= z)
+                    continue;
+
+                int top = candidate.Top;
+                bool blocked = false;
+
+                for (int j = 0; j < objects.Count && !blocked; j++)
+                {
+                    if (j == i)
+                        continue;
+
+                    WalkObject obj = objects[j];
+
+                    if (obj.Standable)
+                        blocked = obj.Base > top + 2 && obj.Base < top + Constants.DEFAULT_BLOCK_HEIGHT;
+                    else
+                        blocked = obj.Base < top + Constants.DEFAULT_BLOCK_HEIGHT && Math.Max(obj.Top, obj.Base + 1) > top;
+                }
+
+                if (!blocked)
+                {
+                    found = true;
+                    z = top;
+                    isLand = candidate.IsLand;
+                }
+            }
+
+            return found;
+        }
+
+        private void AddLand(int x, int y, List<WalkObject> objects)
+        {
+            if (!TryGetLand(x, y, out ushort graphic, out sbyte z) || !(graphic < 0x01AE && graphic != 2 || graphic > 0x01B5 && graphic != 0x01DB))
+                return;
+
+            // Same corners as Land.ApplyStretch
+            sbyte zRight = TryGetLand(x + 1, y, out _, out sbyte zr) ? zr : z;
+            sbyte zLeft = TryGetLand(x, y + 1, out _, out sbyte zl) ? zl : z;
+            sbyte zBottom = TryGetLand(x + 1, y + 1, out _, out sbyte zb) ? zb : z;
+
+            int averageZ = Math.Abs(z - zBottom) <= Math.Abs(zLeft - zRight) ? (z + zBottom) >> 1 : (zLeft + zRight) >> 1;
+            int minZ = Math.Min(z, Math.Min(zRight, Math.Min(zLeft, zBottom)));
+            bool impassable = TileDataLoader.Instance.LandData[graphic].IsImpassable;
+
+            objects.Add(new WalkObject(minZ, averageZ, !impassable, true));
+        }
+
+        /// <summary>
+        /// Statics that matter for walking in <paramref name="area"/>, grouped by tile. <paramref name="starts"/> gets the first index of every tile.
+        /// </summary>
+        private unsafe WalkObject[] CollectStatics(Rectangle area, int[] starts)
+        {
+            StaticTiles[] staticData = TileDataLoader.Instance.StaticData;
+            int minBlockX = Math.Max(0, area.X) >> 3, maxBlockX = (Math.Min(Width, area.Right) - 1) >> 3;
+            int minBlockY = Math.Max(0, area.Y) >> 3, maxBlockY = (Math.Min(Height, area.Bottom) - 1) >> 3;
+            var found = new List<(int Index, WalkObject Object)>();
+
+            for (int bx = minBlockX; bx <= maxBlockX; bx++)
+            {
+                for (int by = minBlockY; by <= maxBlockY; by++)
+                {
+                    ref IndexMap index = ref MapLoader.Instance.GetIndex(_dataMap, bx, by);
+                    StaticsBlock* sb = (StaticsBlock*)index.StaticAddress;
+
+                    if (sb == null)
+                        continue;
+
+                    for (int i = 0; i < (int)index.StaticCount; i++, sb++)
+                    {
+                        int x = (bx << 3) + sb->X;
+                        int y = (by << 3) + sb->Y;
+
+                        if (!area.Contains(x, y) || sb->Color >= staticData.Length)
+                            continue;
+
+                        ref StaticTiles data = ref staticData[sb->Color];
+                        bool standable = !data.IsImpassable && (data.IsSurface || data.IsBridge);
+
+                        if (!standable && !data.IsImpassable)
+                            continue;
+
+                        int top = sb->Z + (data.IsBridge ? data.Height / 2 : data.Height);
+                        int tile = (y - area.Y) * area.Width + x - area.X;
+                        found.Add((tile, new WalkObject(sb->Z, top, standable, false)));
+                        starts[tile + 1]++;
+                    }
+                }
+            }
+
+            for (int i = 1; i < starts.Length; i++)
+                starts[i] += starts[i - 1];
+
+            var result = new WalkObject[found.Count];
+            int[] next = new int[starts.Length - 1];
+            Array.Copy(starts, next, next.Length);
+
+            foreach ((int tile, WalkObject obj) in found)
+                result[next[tile]++] = obj;
+
+            return result;
+        }
+
+        private unsafe bool TryGetLand(int x, int y, out ushort graphic, out sbyte z)
+        {
+            graphic = 0;
+            z = 0;
+
+            if (!Contains(x, y))
+                return false;
+
+            ref IndexMap index = ref MapLoader.Instance.GetIndex(_dataMap, x >> 3, y >> 3);
+
+            if (index.MapAddress == 0)
+                return false;
+
+            MapBlock* mapBlock = (MapBlock*)index.MapAddress;
+            MapCells* cells = (MapCells*)&mapBlock->Cells;
+            ref MapCells cell = ref cells[((y & 7) << 3) + (x & 7)];
+
+            graphic = (ushort)(cell.TileID & 0x3FFF);
+            z = cell.Z;
+
+            return true;
+        }
+
+        private unsafe ulong HashBlock(int block)
+        {
+            ulong hash = 14695981039346656037UL;
+
+            UltimaLive.MapDataLock.EnterReadLock();
+
+            try
+            {
+                ref IndexMap index = ref MapLoader.Instance.GetIndex(_dataMap, block / _blocksHeight, block % _blocksHeight);
+
+                if (index.MapAddress != 0)
+                    hash = Fnv((byte*)&((MapBlock*)index.MapAddress)->Cells, 64 * sizeof(MapCells), hash);
+
+                if (index.StaticAddress != 0)
+                    hash = Fnv((byte*)index.StaticAddress, (int)index.StaticCount * sizeof(StaticsBlock), hash);
+            }
+            finally
+            {
+                UltimaLive.MapDataLock.ExitReadLock();
+            }
+
+            return hash;
+        }
+
+        private static unsafe ulong Fnv(byte* data, int length, ulong hash)
+        {
+            for (int i = 0; i < length; i++)
+            {
+                hash ^= data[i];
+                hash *= 1099511628211UL;
+            }
+
+            return hash;
+        }
+
+        /// <summary>
+        /// Blocks are summed after mixing so a single block can be swapped out of <see cref="Hash"/>.
+        /// </summary>
+        private static ulong MixBlockHash(int block, ulong hash)
+        {
+            ulong z = hash + (ulong)block * 0x9E3779B97F4A7C15UL;
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+
+            return z ^ (z >> 31);
+        }
+
+        private sealed class Node(int key, ushort x, ushort y, sbyte z, Edge[] edges)
+        {
+            public readonly int Key = key;
+            public readonly ushort X = x, Y = y;
+            public readonly sbyte Z = z;
+            public readonly Edge[] Edges = edges;
+        }
+
+        private readonly struct Edge(int to, int cost)
+        {
+            public readonly int To = to;
+            public readonly int Cost = cost;
+        }
+
+        private readonly struct WalkObject(int baseZ, int top, bool standable, bool isLand)
+        {
+            public readonly int Base = baseZ;
+            public readonly int Top = top;
+            public readonly bool Standable = standable;
+            public readonly bool IsLand = isLand;
+        }
+
+        private sealed class TileWindow(Rectangle inner, Rectangle area)
+        {
+            private readonly sbyte[] _z = new sbyte[area.Width * area.Height];
+            private readonly byte[] _flags = new byte[area.Width * area.Height];
+
+            public readonly Rectangle Inner = inner;
+            public readonly Rectangle Area = area;
+
+            public bool IsWalkable(int x, int y) => (GetFlags(x, y) & TILE_WALKABLE) != 0;
+
+            public byte GetFlags(int x, int y) => Area.Contains(x, y) ? _flags[(y - Area.Y) * Area.Width + x - Area.X] : (byte)0;
+
+            public sbyte GetZ(int x, int y) => Area.Contains(x, y) ? _z[(y - Area.Y) * Area.Width + x - Area.X] : (sbyte)0;
+
+            public void Set(int x, int y, sbyte z, byte flags)
+            {
+                int index = (y - Area.Y) * Area.Width + x - Area.X;
+                _z[index] = z;
+                _flags[index] = flags;
+            }
+        }
+
+        private sealed class MinHeap
+        {
+            private readonly List<(int Priority, int Value)> _items = new List<(int, int)>();
+
+            public void Push(int priority, int value)
+            {
+                _items.Add((priority, value));
+                int index = _items.Count - 1;
+
+                while (index > 0)
+                {
+                    int parent = (index - 1) / 2;
+
+                    if (_items[index].Priority >= _items[parent].Priority)
+                        break;
+
+                    (_items[index], _items[parent]) = (_items[parent], _items[index]);
+                    index = parent;
+                }
+            }
+
+            public bool TryPop(out int priority, out int value)
+            {
+                if (_items.Count == 0)
+                {
+                    priority = value = 0;
+
+                    return false;
+                }
+
+                (priority, value) = _items[0];
+                int last = _items.Count - 1;
+                _items[0] = _items[last];
+                _items.RemoveAt(last);
+
+                int index = 0;
+
+                while (true)
+                {
+                    int left = index * 2 + 1;
+                    int smallest = index;
+
+                    if (left < _items.Count && _items[left].Priority < _items[smallest].Priority)
+                        smallest = left;
+
+                    if (left + 1 < _items.Count && _items[left + 1].Priority < _items[smallest].Priority)
+                        smallest = left + 1;
+
+                    if (smallest == index)
+                        break;
+
+                    (_items[index], _items[smallest]) = (_items[smallest], _items[index]);
+                    index = smallest;
+                }
+
+                return true;
+            }
+        }
+    }
+}
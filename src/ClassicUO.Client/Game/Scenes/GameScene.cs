@@ -96,8 +96,9 @@ namespace ClassicUO.Game.Scenes
 
         private uint _timeToPlaceMultiInHouseCustomization;
         private readonly bool _use_render_target = false;
-        private UseItemQueue _useItemQueue = new UseItemQueue();
-        private MoveItemQueue _moveItemQueue = new MoveItemQueue();
+        private ActionScheduler _actionScheduler;
+        private UseItemQueue _useItemQueue;
+        private MoveItemQueue _moveItemQueue;
         private bool _useObjectHandles;
         private RenderTarget2D _world_render_target,
             _lightRenderTarget;
@@ -142,6 +143,10 @@ namespace ClassicUO.Game.Scenes
         {
             base.Load();
 
+            _actionScheduler = new ActionScheduler();
+            _useItemQueue = new UseItemQueue(_actionScheduler);
+            _moveItemQueue = new MoveItemQueue(_actionScheduler);
+
             UISettings.Preload();
 
             Client.Game.Window.AllowUserResizing = true;
@@ -371,7 +376,7 @@ namespace ClassicUO.Game.Scenes
             }
             
             SpellBarManager.Unload();
-            _moveItemQueue.Clear();
+            _actionScheduler?.Clear();
 
             GraphicsReplacement.Save();
             BuySellAgent.Unload();
@@ -855,9 +860,9 @@ namespace ClassicUO.Game.Scenes
             _animatedStaticsManager.Process();
             BoatMovingManager.Update();
             Pathfinder.ProcessAutoWalk();
-            DelayedObjectClickManager.Update();
+            HierarchicalPathfinder.Update();
+            PathfindingService.Update();
             AutoLootManager.Instance.Update();
-            _moveItemQueue.ProcessQueue();
             GridHighlightData.ProcessQueue();
 
             if (!MoveCharacterByMouseInput() && !currentProfile.DisableArrowBtn && !MoveCharByController())
@@ -913,7 +918,7 @@ namespace ClassicUO.Game.Scenes
                 _useItemQueue.ClearCorpses();
             }
 
-            _useItemQueue.Update();
+            _actionScheduler.Update();
 
             if (Time.Ticks > _nextProfileSave)
             {
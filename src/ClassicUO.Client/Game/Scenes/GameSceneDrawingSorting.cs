@@ -75,6 +75,9 @@ namespace ClassicUO.Game.Scenes
             _oldPlayerY,
             _oldPlayerZ;
         private int _foliageCount;
+        private int _prefetchMap = -1;
+        private Point _prefetchMinBlock,
+            _prefetchMaxBlock;
 
         // statics
         private GameObject _renderListStaticsHead,
@@ -1288,6 +1291,72 @@ namespace ClassicUO.Game.Scenes
             _last_scaled_offset.Y = winGameScaledOffsetY;
 
             UpdateMaxDrawZ();
+            PrefetchArt();
+        }
+
+        /// <summary>
+        /// Queue the art of the chunks around the view for background decoding, so walking or teleporting into a busy
+        /// area doesn't decode all of it in the frame it shows up. Runs when the view reaches another chunk.
+        /// </summary>
+        private unsafe void PrefetchArt()
+        {
+            const int PREFETCH_BLOCKS = 2;
+
+            int map = World.MapIndex;
+            var minBlock = new Point((_minTile.X >> 3) - PREFETCH_BLOCKS, (_minTile.Y >> 3) - PREFETCH_BLOCKS);
+            var maxBlock = new Point((_maxTile.X >> 3) + PREFETCH_BLOCKS, (_maxTile.Y >> 3) + PREFETCH_BLOCKS);
+
+            if (map == _prefetchMap && minBlock == _prefetchMinBlock && maxBlock == _prefetchMaxBlock)
+            {
+                return;
+            }
+
+            _prefetchMap = map;
+            _prefetchMinBlock = minBlock;
+            _prefetchMaxBlock = maxBlock;
+
+            if (map < 0 || map >= MapLoader.MAPS_COUNT)
+            {
+                return;
+            }
+
+            int dataMap = map;
+            MapLoader.Instance.SanitizeMapIndex(ref dataMap);
+
+            int blocksWidth = MapLoader.Instance.MapBlocksSize[map, 0];
+            int blocksHeight = MapLoader.Instance.MapBlocksSize[map, 1];
+            var arts = Client.Game.Arts;
+
+            for (int bx = Math.Max(0, minBlock.X), endX = Math.Min(blocksWidth - 1, maxBlock.X); bx <= endX; bx++)
+            {
+                for (int by = Math.Max(0, minBlock.Y), endY = Math.Min(blocksHeight - 1, maxBlock.Y); by <= endY; by++)
+                {
+                    ref IndexMap im = ref MapLoader.Instance.GetIndex(dataMap, bx, by);
+
+                    if (im.MapAddress != 0)
+                    {
+                        MapCells* cells = (MapCells*)&((MapBlock*)im.MapAddress)->Cells;
+
+                        for (int i = 0; i < 64; i++)
+                        {
+                            arts.PrefetchLand((uint)(cells[i].TileID & 0x3FFF));
+                        }
+                    }
+
+                    StaticsBlock* sb = (StaticsBlock*)im.StaticAddress;
+
+                    if (sb != null)
+                    {
+                        for (int i = 0, count = (int)im.StaticCount; i < count; ++i, ++sb)
+                        {
+                            if (sb->Color != 0 && sb->Color != 0xFFFF)
+                            {
+                                arts.PrefetchArt(sb->Color);
+                            }
+                        }
+                    }
+                }
+            }
         }
 
         private struct TreeUnion
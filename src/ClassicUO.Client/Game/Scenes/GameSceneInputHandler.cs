@@ -73,6 +73,8 @@ namespace ClassicUO.Game.Scenes
                     Pathfinder.StopAutoWalk();
                 }
 
+                HierarchicalPathfinder.StopRoute();
+
                 int x = Camera.Bounds.X + (Camera.Bounds.Width >> 1) + ((ProfileManager.CurrentProfile.PlayerOffset.X - ProfileManager.CurrentProfile.PlayerOffset.Y) * 22);
                 int y = Camera.Bounds.Y + (Camera.Bounds.Height >> 1) + ((ProfileManager.CurrentProfile.PlayerOffset.X + ProfileManager.CurrentProfile.PlayerOffset.Y) * 22);
 
@@ -1348,6 +1350,7 @@ namespace ClassicUO.Game.Scenes
                     if (Pathfinder.AutoWalking && Pathfinder.PathFindingCanBeCancelled)
                     {
                         Pathfinder.StopAutoWalk();
+                        HierarchicalPathfinder.StopRoute();
                     }
 
                     break;
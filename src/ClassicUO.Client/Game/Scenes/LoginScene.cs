@@ -249,6 +249,7 @@ namespace ClassicUO.Game.Scenes
             }
 
             World.Mobiles.Clear();
+            World.ItemIndex.Clear();
             World.Items.Clear();
 
             switch (CurrentLoginStep)
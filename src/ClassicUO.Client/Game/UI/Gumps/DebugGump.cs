@@ -145,6 +145,9 @@ namespace ClassicUO.Game.UI.Gumps
                         {
                             sb.Append($"\n[{pd.Context[pd.Context.Length - 1]}] [Last: {pd.LastTime:0.0}ms] [Total %: {100d * (pd.TimeInContext / timeTotal):0.00}]");
                         }
+
+                        var scriptQueue = LegionScripting.API.QueuedPythonActions;
+                        sb.Append($"\n[Script queue] [Depth: {scriptQueue.Count} Peak: {scriptQueue.PeakCount}] [Last: {scriptQueue.ExecutedLastFrame} in {scriptQueue.LastDrainMs:0.0}ms] [Overflows: {scriptQueue.Overflows}]");
                     }
                 }
                 else
@@ -1262,6 +1262,13 @@ namespace ClassicUO.Game.UI.Gumps
                     );
                 }
 
+                if (_item != null)
+                {
+                    ref readonly var text = ref Client.Game.Arts.GetArt((uint)_item.DisplayedGraphic);
+                    texture = text.Texture;
+                    bounds = text.UV;
+                }
+
                 if (_item != null && texture != null & rect != null)
                 {
                     hueVector = ShaderHueTranslator.GetHueVector(_item.Hue, _item.ItemData.IsPartialHue, 1f);
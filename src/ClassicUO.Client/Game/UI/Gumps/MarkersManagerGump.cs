@@ -290,6 +290,7 @@ namespace ClassicUO.Game.UI.Gumps
         private void MarkerEditEventHandler(object sender, EventArgs e)
         {
             _isMarkerListModified = true;
+            _markerFiles[_categoryId].InvalidateIndex();
         }
 
         public override void Dispose()
@@ -176,6 +176,11 @@ namespace ClassicUO.Game.UI.Gumps
             {
                 base.Draw(batcher, x, y);
 
+                // Art can be evicted from the atlas and come back somewhere else
+                ref readonly var staticArt = ref Client.Game.Arts.GetArt(0x0FAB);
+                texture = staticArt.Texture;
+                bounds = staticArt.UV;
+
                 if (texture != null)
                 {
                     if (isClickable)
@@ -108,7 +108,7 @@ namespace ClassicUO.Game.UI.Gumps
         private Vector3 hueVector;
         private Rectangle realArtRectBounds;
         private Point point = new Point();
-        private readonly SpriteInfo itemSpriteInfo;
+        private readonly uint graphic;
         private readonly AlphaBlendControl background;
 
 
@@ -120,7 +120,7 @@ namespace ClassicUO.Game.UI.Gumps
             originalSize = new Point(Width, Height);
             hueVector = ShaderHueTranslator.GetHueVector(item.Hue, item.ItemData.IsPartialHue, 1f);
             realArtRectBounds = Client.Game.Arts.GetRealArtBounds((uint)item.DisplayedGraphic);
-            itemSpriteInfo = Client.Game.Arts.GetArt((uint)(item.DisplayedGraphic));
+            graphic = item.DisplayedGraphic;
 
             HitBox loot = new HitBox(0, 0, Width, Height / 2);
             loot.Add(TextBox.GetOne("Loot", TrueTypeLoader.EMBEDDED_FONT, 16, Color.White, TextBox.RTLOptions.DefaultCentered(Width)));
@@ -186,6 +186,8 @@ namespace ClassicUO.Game.UI.Gumps
         {
             background.Draw(batcher, x, y);
 
+            ref readonly var itemSpriteInfo = ref Client.Game.Arts.GetArt(graphic);
+
             batcher.Draw
             (
                 itemSpriteInfo.Texture,
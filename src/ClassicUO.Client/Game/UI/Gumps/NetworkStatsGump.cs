@@ -123,6 +123,12 @@ namespace ClassicUO.Game.UI.Gumps
                 else
                 {
                     sb.Append($"Ping: {_ping} ms\n{"In:"} {NetStatistics.GetSizeAdaptive(_deltaBytesReceived),-6} {"Out:"} {NetStatistics.GetSizeAdaptive(_deltaBytesSent),-6}");
+
+                    // The packets that cost the most frame time in the last second
+                    foreach (var (id, name, ms) in PacketHandlers.Handler.Statistics.GetBusiestLastSecond(3))
+                    {
+                        sb.Append($"\n0x{id:X2} {name} {ms:0.0}ms");
+                    }
                 }
 
                 _cacheText = sb.ToString();
@@ -41,6 +41,7 @@ using ClassicUO.IO;
 using ClassicUO.Renderer;
 using ClassicUO.Resources;
 using ClassicUO.Utility;
+using ClassicUO.Utility.Collections;
 using ClassicUO.Utility.Logging;
 using Microsoft.Xna.Framework;
 using Microsoft.Xna.Framework.Graphics;
@@ -86,14 +87,12 @@ namespace ClassicUO.Game.UI.Gumps
 
         private List<string> _hiddenZoneFiles;
         private ZoneSets _zoneSets = new ZoneSets();
+        private readonly List<Zone> _visibleZones = new List<Zone>();
+        private readonly List<WMapMarker> _visibleMarkers = new List<WMapMarker>();
 
         private static Mobile following;
 
-        private static Texture2D _mapTexture;
-        private static uint[] _pixelBuffer;
-        private static sbyte[] _zBuffer;
-
-        public Texture2D MapTexture { get { return _mapTexture; } }
+        private WorldMapTiles _mapTiles;
 
         public static readonly List<WMapMarkerFile> _markerFiles = new List<WMapMarkerFile>();
 
@@ -667,6 +666,11 @@ namespace ClassicUO.Game.UI.Gumps
             {
                 Load();
             }
+            else if (_mapTiles != null && _mapTiles.IsDisposed)
+            {
+                // UltimaLive swapped the map files
+                _mapTiles = WorldMapTiles.Get(_mapIndex);
+            }
 
             World.WMapManager.RequestServerPartyGuildInfo();
         }
@@ -901,11 +905,83 @@ namespace ClassicUO.Game.UI.Gumps
 
         public class WMapMarkerFile
         {
+            private readonly Dictionary<int, SpatialGrid<WMapMarker>> _index = new Dictionary<int, SpatialGrid<WMapMarker>>();
+            private List<WMapMarker> _indexedMarkers;
+            private int _indexedCount;
+
             public string Name { get; set; }
             public string FullPath { get; set; }
             public List<WMapMarker> Markers { get; set; }
             public bool Hidden { get; set; }
             public bool IsEditable { get; set; }
+
+            /// <summary>
+            /// Add a marker and index it, instead of rebuilding the index of the whole file on the next draw.
+            /// </summary>
+            internal void AddMarker(WMapMarker marker)
+            {
+                Markers.Add(marker);
+
+                if (IsIndexed)
+                {
+                    GetGrid(marker.MapId).Add(marker, marker.X, marker.Y);
+                    _indexedCount++;
+                }
+            }
+
+            internal void RemoveMarker(WMapMarker marker)
+            {
+                if (Markers.Remove(marker) && IsIndexed)
+                {
+                    GetGrid(marker.MapId).Remove(marker, marker.X, marker.Y);
+                    _indexedCount--;
+                }
+            }
+
+            /// <summary>
+            /// Markers were replaced in the list, rebuild the index on the next draw.
+            /// Added or removed markers and a new list are noticed without this.
+            /// </summary>
+            internal void InvalidateIndex() => _indexedMarkers = null;
+
+            /// <summary>
+            /// Add the markers of a map inside of <paramref name="area"/> to <paramref name="result"/>.
+            /// </summary>
+            internal void QueryMarkers(int mapId, Rectangle area, List<WMapMarker> result)
+            {
+                if (!IsIndexed)
+                {
+                    foreach (SpatialGrid<WMapMarker> grid in _index.Values)
+                    {
+                        grid.Clear();
+                    }
+
+                    foreach (WMapMarker marker in Markers)
+                    {
+                        GetGrid(marker.MapId).Add(marker, marker.X, marker.Y);
+                    }
+
+                    _indexedMarkers = Markers;
+                    _indexedCount = Markers.Count;
+                }
+
+                if (_index.TryGetValue(mapId, out SpatialGrid<WMapMarker> mapGrid))
+                {
+                    mapGrid.Query(area, result);
+                }
+            }
+
+            private bool IsIndexed => _indexedMarkers != null && _indexedMarkers == Markers && _indexedCount == Markers.Count;
+
+            private SpatialGrid<WMapMarker> GetGrid(int mapId)
+            {
+                if (!_index.TryGetValue(mapId, out SpatialGrid<WMapMarker> grid))
+                {
+                    _index[mapId] = grid = new SpatialGrid<WMapMarker>();
+                }
+
+                return grid;
+            }
         }
 
         private class CurLoader
@@ -1473,208 +1549,19 @@ namespace ClassicUO.Game.UI.Gumps
         //    );
         //}
 
-        private unsafe Task Load()
+        private void Load()
         {
             _mapIndex = World.MapIndex;
 
-            if (_mapIndex < 0 || _mapIndex > MapLoader.MAPS_COUNT)
+            if (_mapIndex < 0 || _mapIndex > MapLoader.MAPS_COUNT || !World.InGame)
             {
-                return Task.CompletedTask;
+                return;
             }
 
-            return Task.Run
-            (
-                () =>
-                {
-                    if (World.InGame)
-                    {
-                        const int OFFSET_PIX = 2;
-                        const int OFFSET_PIX_HALF = OFFSET_PIX / 2;
-
-                        if (_mapTexture == null || _mapTexture.IsDisposed)
-                        {
-                            int maxX = -1, maxY = -1;
-
-                            for (int i = 0; i < MapLoader.Instance.MapsDefaultSize.GetLength(0); i++)
-                            {
-                                if (maxX < MapLoader.Instance.MapsDefaultSize[i, 0])
-                                {
-                                    maxX = MapLoader.Instance.MapsDefaultSize[i, 0];
-                                }
-
-                                if (maxY < MapLoader.Instance.MapsDefaultSize[i, 1])
-                                {
-                                    maxY = MapLoader.Instance.MapsDefaultSize[i, 1];
-                                }
-                            }
-
-                            if (OFFSET_PIX > 0)
-                            {
-                                maxX += OFFSET_PIX;
-                                maxY += OFFSET_PIX;
-                            }
-
-                            _mapTexture = new Texture2D(Client.Game.GraphicsDevice, maxX, maxY, false, SurfaceFormat.Color);
-                            _pixelBuffer = new uint[maxX * maxY];
-                            _zBuffer = new sbyte[maxX * maxY];
-                        }
-
-                        try
-                        {
-                            int realWidth = MapLoader.Instance.MapsDefaultSize[World.MapIndex, 0];
-                            int realHeight = MapLoader.Instance.MapsDefaultSize[World.MapIndex, 1];
-
-                            int fixedWidth = MapLoader.Instance.MapBlocksSize[World.MapIndex, 0];
-                            int fixedHeight = MapLoader.Instance.MapBlocksSize[World.MapIndex, 1];
-
-                            int size = (realWidth + OFFSET_PIX) * (realHeight + OFFSET_PIX);
-
-                            sbyte[] allZ = _zBuffer;
-                            uint[] buffer = _pixelBuffer;
-
-                            // horrible tweak to cleanup texture... but works!
-                            buffer.AsSpan().Fill(0);
-
-                            fixed (uint* pixels = &buffer[0])
-                            {
-                                _mapTexture.SetDataPointerEXT(0, null, (IntPtr)pixels, sizeof(uint) * _mapTexture.Width * _mapTexture.Height);
-                            }
-
-
-                            var huesLoader = HuesLoader.Instance;
-
-                            int bx, by, mapX = 0, mapY = 0, x, y;
-
-                            for (bx = 0; bx < fixedWidth; ++bx)
-                            {
-                                mapX = bx << 3;
-
-                                for (by = 0; by < fixedHeight; ++by)
-                                {
-                                    ref IndexMap indexMap = ref World.Map.GetIndex(bx, by);
-
-                                    if (indexMap.MapAddress == 0)
-                                    {
-                                        continue;
-                                    }
-
-                                    MapBlock* mapBlock = (MapBlock*)indexMap.MapAddress;
-                                    MapCells* cells = (MapCells*)&mapBlock->Cells;
-
-                                    mapY = by << 3;
-
-                                    for (y = 0; y < 8; ++y)
-                                    {
-                                        int block = (mapY + y + OFFSET_PIX_HALF) * (realWidth + OFFSET_PIX) + mapX + OFFSET_PIX_HALF;
-
-                                        int pos = y << 3;
-
-                                        for (x = 0; x < 8; ++x, ++pos, ++block)
-                                        {
-                                            ushort color = (ushort)(0x8000 | huesLoader.GetRadarColorData(cells[pos].TileID & 0x3FFF));
-
-                                            buffer[block] = HuesHelper.Color16To32(color) | 0xFF_00_00_00;
-                                            allZ[block] = cells[pos].Z;
-                                        }
-                                    }
-
-
-                                    StaticsBlock* sb = (StaticsBlock*)indexMap.StaticAddress;
-
-                                    if (sb != null)
-                                    {
-                                        int count = (int)indexMap.StaticCount;
-
-                                        for (int c = 0; c < count; ++c, ++sb)
-                                        {
-                                            if (sb->Color != 0 && sb->Color != 0xFFFF && GameObject.CanBeDrawn(sb->Color))
-                                            {
-                                                int block = (mapY + sb->Y + OFFSET_PIX_HALF) * (realWidth + OFFSET_PIX) + mapX + sb->X + OFFSET_PIX_HALF;
-
-                                                if (sb->Z >= allZ[block])
-                                                {
-                                                    ushort color = (ushort)(0x8000 | (sb->Hue != 0 ? huesLoader.GetHueColorRgba5551(16, sb->Hue) : huesLoader.GetRadarColorData(sb->Color + 0x4000)));
-
-                                                    buffer[block] = HuesHelper.Color16To32(color) | 0xFF_00_00_00;
-                                                    allZ[block] = sb->Z;
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-
-                            int real_width_less_one = realWidth - 1;
-                            int real_height_less_one = realHeight - 1;
-                            const float MAG_0 = 80f / 100f;
-                            const float MAG_1 = 100f / 80f;
-
-                            for (mapY = 1; mapY < real_height_less_one; ++mapY)
-                            {
-                                int blockCurrent = (mapY + OFFSET_PIX_HALF) * (realWidth + OFFSET_PIX) + OFFSET_PIX_HALF;
-                                int blockNext = (mapY + 1 + OFFSET_PIX_HALF) * (realWidth + OFFSET_PIX) + OFFSET_PIX_HALF;
-
-                                for (mapX = 1; mapX < real_width_less_one; ++mapX)
-                                {
-                                    sbyte z0 = allZ[++blockCurrent];
-                                    sbyte z1 = allZ[blockNext++];
-
-                                    if (z0 == z1)
-                                    {
-                                        continue;
-                                    }
-
-                                    ref uint cc = ref buffer[blockCurrent];
-
-                                    if (cc == 0)
-                                    {
-                                        continue;
-                                    }
-
-                                    byte r = (byte)(cc & 0xFF);
-                                    byte g = (byte)((cc >> 8) & 0xFF);
-                                    byte b = (byte)((cc >> 16) & 0xFF);
-                                    byte a = (byte)((cc >> 24) & 0xFF);
-
-                                    if (r != 0 || g != 0 || b != 0)
-                                    {
-                                        if (z0 < z1)
-                                        {
-                                            r = (byte)Math.Min(0xFF, r * MAG_0);
-                                            g = (byte)Math.Min(0xFF, g * MAG_0);
-                                            b = (byte)Math.Min(0xFF, b * MAG_0);
-                                        }
-                                        else
-                                        {
-                                            r = (byte)Math.Min(0xFF, r * MAG_1);
-                                            g = (byte)Math.Min(0xFF, g * MAG_1);
-                                            b = (byte)Math.Min(0xFF, b * MAG_1);
-                                        }
+            // Tiles are drawn in the background as they come into view, see WorldMapTiles
+            _mapTiles = WorldMapTiles.Get(_mapIndex);
 
-                                        cc = (uint)(r | (g << 8) | (b << 16) | (a << 24));
-                                    }
-                                }
-                            }
-                            if (OFFSET_PIX > 0)
-                            {
-                                realWidth += OFFSET_PIX;
-                                realHeight += OFFSET_PIX;
-                            }
-
-                            fixed (uint* pixels = &buffer[0])
-                            {
-                                _mapTexture.SetDataPointerEXT(0, new Rectangle(0, 0, realWidth, realHeight), (IntPtr)pixels, sizeof(uint) * realWidth * realHeight);
-                            }
-                        }
-                        catch (Exception ex)
-                        {
-                            Log.Error($"error loading worldmap: {ex}");
-                        }
-
-                        GameActions.Print(ResGumps.WorldMapLoaded, 0x48);
-                    }
-                }
-            );
+            GameActions.Print(ResGumps.WorldMapLoaded, 0x48);
         }
 
         internal class ZonesFileZoneData
@@ -1733,13 +1620,16 @@ namespace ClassicUO.Game.UI.Gumps
             public List<Zone> Zones = new List<Zone>();
             public bool Hidden = false;
             public string NiceFileName;
+            public SpatialGrid<Zone> Index = new SpatialGrid<Zone>();
 
             public ZoneSet(ZonesFile zf, string filename, bool hidden)
             {
                 MapIndex = zf.MapIndex;
                 foreach (ZonesFileZoneData data in zf.Zones)
                 {
-                    Zones.Add(new Zone(data));
+                    var zone = new Zone(data);
+                    Zones.Add(zone);
+                    Index.Add(zone, zone.BoundingRectangle);
                 }
 
                 Hidden = hidden;
@@ -1776,7 +1666,10 @@ namespace ClassicUO.Game.UI.Gumps
                 }
             }
 
-            public IEnumerable<Zone> GetZonesForMapIndex(int mapIndex)
+            /// <summary>
+            /// Add the zones of the shown sets of a map inside of <paramref name="area"/> to <paramref name="result"/>.
+            /// </summary>
+            public void QueryZones(int mapIndex, Rectangle area, List<Zone> result)
             {
                 foreach (KeyValuePair<string, ZoneSet> entry in ZoneSetDict)
                 {
@@ -1785,10 +1678,7 @@ namespace ClassicUO.Game.UI.Gumps
                     else if (entry.Value.Hidden)
                         continue;
 
-                    foreach (Zone zone in entry.Value.Zones)
-                    {
-                        yield return zone;
-                    }
+                    entry.Value.Index.Query(area, result);
                 }
             }
 
@@ -2142,7 +2032,7 @@ namespace ClassicUO.Game.UI.Gumps
 
             var mapMarkerFile = _markerFiles.FirstOrDefault(x => x.FullPath == UserMarkersFilePath);
 
-            mapMarkerFile?.Markers.Add(mapMarker);
+            mapMarkerFile?.AddMarker(mapMarker);
         }
 
         public void AddUserMarker(string markerName, int x, int y, int map, string color = "yellow")
@@ -2194,7 +2084,7 @@ namespace ClassicUO.Game.UI.Gumps
 
             var mapMarkerFile = _markerFiles.FirstOrDefault(x => x.FullPath == UserMarkersFilePath);
 
-            mapMarkerFile?.Markers.Add(mapMarker);
+            mapMarkerFile?.AddMarker(mapMarker);
         }
 
         public void RemoveUserMarker(string markerName)
@@ -2216,7 +2106,7 @@ namespace ClassicUO.Game.UI.Gumps
 
              foreach (var marker in markersToRemove)
              {
-                 mapMarkerFile.Markers.Remove(marker);
+                 mapMarkerFile.RemoveMarker(marker);
              }
 
              try
@@ -2343,18 +2233,10 @@ namespace ClassicUO.Game.UI.Gumps
                 hueVector
             );
 
-            if (_mapTexture != null)
+            if (_mapTiles != null)
             {
                 if (batcher.ClipBegin(gX, gY, gWidth, gHeight))
                 {
-                    var destRect = new Rectangle
-                    (
-                        gX + halfWidth,
-                        gY + halfHeight,
-                        size,
-                        size
-                    );
-
                     var srcRect = new Rectangle
                     (
                         centerX - size_zoom_half,
@@ -2363,22 +2245,16 @@ namespace ClassicUO.Game.UI.Gumps
                         size_zoom
                     );
 
-                    var origin = new Vector2
+                    // srcRect is in the old whole facet texture space, one pixel off the map
+                    _mapTiles.Draw
                     (
-                        srcRect.Width / 2f,
-                        srcRect.Height / 2f
-                    );
-
-                    batcher.Draw
-                    (
-                        _mapTexture,
-                        destRect,
-                        srcRect,
-                        hueVector,
+                        batcher,
+                        new Vector2(gX + halfWidth, gY + halfHeight),
+                        new Vector2(srcRect.X + srcRect.Width / 2f - 1, srcRect.Y + srcRect.Height / 2f - 1),
+                        new Rectangle(srcRect.X - 1, srcRect.Y - 1, srcRect.Width, srcRect.Height),
+                        size / (float)size_zoom,
                         _flipMap ? Microsoft.Xna.Framework.MathHelper.ToRadians(45) : 0,
-                        origin,
-                        SpriteEffects.None,
-                        0
+                        hueVector
                     );
 
                     DrawAll
@@ -2409,7 +2285,10 @@ namespace ClassicUO.Game.UI.Gumps
 
         private void DrawAll(UltimaBatcher2D batcher, Rectangle srcRect, int gX, int gY, int halfWidth, int halfHeight)
         {
-            foreach (Zone zone in _zoneSets.GetZonesForMapIndex(World.MapIndex))
+            _visibleZones.Clear();
+            _zoneSets.QueryZones(World.MapIndex, srcRect, _visibleZones);
+
+            foreach (Zone zone in _visibleZones)
             {
                 if (zone.BoundingRectangle.Intersects(srcRect))
                 {
@@ -2452,7 +2331,10 @@ namespace ClassicUO.Game.UI.Gumps
                         continue;
                     }
 
-                    foreach (WMapMarker marker in file.Markers)
+                    _visibleMarkers.Clear();
+                    file.QueryMarkers(World.MapIndex, srcRect, _visibleMarkers);
+
+                    foreach (WMapMarker marker in _visibleMarkers)
                     {
                         if (DrawMarker
                         (
@@ -2470,6 +2352,8 @@ namespace ClassicUO.Game.UI.Gumps
                     }
                 }
 
+                _visibleMarkers.Clear();
+
                 if (lastMarker != null)
                 {
                     DrawMarkerString(batcher, lastMarker, gX, gY, halfWidth, halfHeight);
@@ -56,6 +56,11 @@ namespace ClassicUO.Game
 
         private static UltimaLive _UL;
 
+        /// <summary>
+        /// Write locked while map or statics memory is patched. Code reading map blocks off the game thread holds the read lock per block it reads.
+        /// </summary>
+        public static readonly ReaderWriterLockSlim MapDataLock = new ReaderWriterLockSlim();
+
         private static readonly char[] _pathSeparatorChars = { Path.DirectorySeparatorChar, Path.AltDirectorySeparatorChar };
         private uint[] _EOF;
         private ULFileMul[] _filesIdxStatics;
@@ -342,6 +347,8 @@ namespace ClassicUO.Game
                         //instead of recalculating the CRC block 2 times, in case of terrain + statics update, we only set the actual block to ushort maxvalue, so it will be recalculated on next hash query
                         //also the server should always send FIRST the landdata packet, and only AFTER land the statics packet
                         _UL.MapCRCs[mapId][block] = ushort.MaxValue;
+                        HierarchicalPathfinder.OnBlockChanged(mapId, block);
+                        WorldMapTiles.OnBlockChanged(mapId, block);
                     }
 
                     break;
@@ -432,6 +439,8 @@ namespace ClassicUO.Game
                         }
 
                         _UL._writequeue = mapLoader._writer._toWrite;
+                        HierarchicalPathfinder.Clear();
+                        WorldMapTiles.Clear();
                     }
 
                     break;
@@ -507,6 +516,8 @@ namespace ClassicUO.Game
 
                 //instead of recalculating the CRC block 2 times, in case of terrain + statics update, we only set the actual block to ushort maxvalue, so it will be recalculated on next hash query
                 _UL.MapCRCs[mapId][block] = ushort.MaxValue;
+                HierarchicalPathfinder.OnBlockChanged(mapId, block);
+                WorldMapTiles.OnBlockChanged(mapId, block);
                 int blockX = block / mapHeightInBlocks, blockY = block % mapHeightInBlocks;
                 int minx = Math.Max(0, blockX - 1), miny = Math.Max(0, blockY - 1);
                 blockX = Math.Min(mapWidthInBlocks, blockX + 1);
@@ -756,7 +767,17 @@ namespace ClassicUO.Game
                     return;
                 }
 
-                _accessor.WriteArray(position, seg.Array, seg.Offset, seg.Count);
+                MapDataLock.EnterWriteLock();
+
+                try
+                {
+                    _accessor.WriteArray(position, seg.Array, seg.Offset, seg.Count);
+                }
+                finally
+                {
+                    MapDataLock.ExitWriteLock();
+                }
+
                 _accessor.Flush();
             }
 
@@ -767,7 +788,17 @@ namespace ClassicUO.Game
                     return;
                 }
 
-                _accessor.WriteArray(position, array, 0, array.Length);
+                MapDataLock.EnterWriteLock();
+
+                try
+                {
+                    _accessor.WriteArray(position, array, 0, array.Length);
+                }
+                finally
+                {
+                    MapDataLock.ExitWriteLock();
+                }
+
                 _accessor.Flush();
             }
         }
@@ -1137,13 +1168,22 @@ namespace ClassicUO.Game
                     }
                 }
 
-                ref IndexMap data = ref BlockData[map][block];
-                data.MapAddress = realMapAddress;
-                data.StaticAddress = realStaticAddress;
-                data.StaticCount = realStaticCount;
-                data.OriginalMapAddress = realMapAddress;
-                data.OriginalStaticAddress = realStaticAddress;
-                data.OriginalStaticCount = realStaticCount;
+                MapDataLock.EnterWriteLock();
+
+                try
+                {
+                    ref IndexMap data = ref BlockData[map][block];
+                    data.MapAddress = realMapAddress;
+                    data.StaticAddress = realStaticAddress;
+                    data.StaticCount = realStaticCount;
+                    data.OriginalMapAddress = realMapAddress;
+                    data.OriginalStaticAddress = realStaticAddress;
+                    data.OriginalStaticCount = realStaticCount;
+                }
+                finally
+                {
+                    MapDataLock.ExitWriteLock();
+                }
             }
 
             public class AsyncWriterTasked
@@ -0,0 +1,223 @@
+using System;
+using System.Diagnostics;
+using System.Threading;
+using System.Threading.Tasks;
+using ClassicUO.Game.GameObjects;
+using Microsoft.Xna.Framework;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// An immutable copy of what the pathfinder needs to know about an area of the map: for every tile the surfaces and blockers
+    /// with their flags and heights, computed the same way <see cref="Pathfinder"/> does it for the player's current step state.
+    /// Built a few rows per frame on the game thread from the loaded chunks by a <see cref="Builder"/>, searched from worker threads by <see cref="PathfindingService"/>.
+    /// Tiles in chunks that were not loaded have no entries and can't be walked on.
+    /// </summary>
+    public sealed class WalkabilityGrid
+    {
+        private static long _lastVersion;
+
+        private readonly int[] _starts;
+        private readonly Entry[] _entries;
+        private readonly sbyte[] _stretchedZ;
+
+        private WalkabilityGrid(long version, int mapIndex, int stepState, Rectangle area, int[] starts, Entry[] entries, sbyte[] stretchedZ)
+        {
+            Version = version;
+            MapIndex = mapIndex;
+            StepState = stepState;
+            Area = area;
+            CreatedAt = Environment.TickCount;
+            _starts = starts;
+            _entries = entries;
+            _stretchedZ = stretchedZ;
+        }
+
+        public long Version { get; }
+
+        public int MapIndex { get; }
+
+        internal int StepState { get; }
+
+        /// <summary>
+        /// Tiles covered by this grid, Right and Bottom are exclusive.
+        /// </summary>
+        public Rectangle Area { get; }
+
+        /// <summary>
+        /// Environment.TickCount when this grid was built.
+        /// </summary>
+        public int CreatedAt { get; }
+
+        public int EntryCount => _entries.Length;
+
+        public bool Contains(int x, int y) => Area.Contains(x, y);
+
+        /// <summary>
+        /// Entries of a tile in the order the pathfinder collects them, unsorted for <see cref="Pathfinder.ApplyMinMaxZ"/>.
+        /// Empty outside of the grid or for tiles that weren't loaded.
+        /// </summary>
+        internal ReadOnlySpan<Entry> GetEntries(int x, int y)
+        {
+            if (!Area.Contains(x, y))
+                return ReadOnlySpan<Entry>.Empty;
+
+            int index = (y - Area.Y) * Area.Width + (x - Area.X);
+            int start = _starts[index];
+
+            return new ReadOnlySpan<Entry>(_entries, start, _starts[index + 1] - start);
+        }
+
+        /// <summary>
+        /// Land.CalculateCurrentAverageZ of the stretched land entries, 8 directions each, see <see cref="Entry.StretchedIndex"/>.
+        /// </summary>
+        internal ReadOnlySpan<sbyte> StretchedZ => _stretchedZ;
+
+        /// <summary>
+        /// Copies the walk data of the loaded tiles in an area, a few rows per <see cref="Step"/> so a large area doesn't stall a frame.
+        /// Game thread only, the grid is handed to waiting searches through <see cref="Completion"/>.
+        /// </summary>
+        internal sealed class Builder
+        {
+            private readonly WalkData _data = new WalkData();
+            private readonly int[] _starts;
+            private readonly TaskCompletionSource<WalkabilityGrid> _done = new TaskCompletionSource<WalkabilityGrid>(TaskCreationOptions.RunContinuationsAsynchronously);
+            private int _row, _index;
+
+            public Builder(Rectangle area)
+            {
+                Area = area;
+                MapIndex = World.MapIndex;
+                StepState = Pathfinder.GetStepState();
+                _starts = new int[area.Width * area.Height + 1];
+            }
+
+            public Rectangle Area { get; }
+
+            public int MapIndex { get; }
+
+            public int StepState { get; }
+
+            /// <summary>
+            /// The grid once every row was copied, null if the build was cancelled.
+            /// </summary>
+            public Task<WalkabilityGrid> Completion => _done.Task;
+
+            /// <summary>
+            /// Copy rows until <paramref name="timer"/> passes <paramref name="budgetMs"/>, at least one row is always copied.
+            /// </summary>
+            /// <returns>True once the grid is complete</returns>
+            public bool Step(Stopwatch timer, double budgetMs)
+            {
+                while (_row < Area.Height)
+                {
+                    int y = Area.Y + _row++;
+
+                    for (int x = Area.X; x < Area.Right; x++)
+                    {
+                        _starts[_index++] = _data.EntryCount;
+
+                        Pathfinder.CollectWalkData(x, y, StepState, _data, false);
+                    }
+
+                    if (timer.Elapsed.TotalMilliseconds >= budgetMs)
+                        break;
+                }
+
+                if (_row < Area.Height)
+                    return false;
+
+                _starts[_index] = _data.EntryCount;
+
+                var grid = new WalkabilityGrid
+                (
+                    Interlocked.Increment(ref _lastVersion),
+                    MapIndex,
+                    StepState,
+                    Area,
+                    _starts,
+                    _data.Entries.ToArray(),
+                    _data.StretchedZ.ToArray()
+                );
+
+                _done.TrySetResult(grid);
+
+                return true;
+            }
+
+            public void Cancel()
+            {
+                _done.TrySetResult(null);
+            }
+        }
+
+        internal readonly struct Entry
+        {
+            public Entry(uint flags, int z, int averageZ, int height, int stretchedIndex)
+            {
+                Flags = flags;
+                Z = (short)z;
+                AverageZ = (short)averageZ;
+                Height = (short)height;
+                StretchedIndex = stretchedIndex;
+            }
+
+            public readonly uint Flags;
+            public readonly short Z;
+            public readonly short AverageZ;
+            public readonly short Height;
+
+            /// <summary>
+            /// Index of this land's 8 directional average Zs, -1 if this is not a stretched land tile.
+            /// </summary>
+            public readonly int StretchedIndex;
+
+            public bool IsStretchedLand => StretchedIndex >= 0;
+        }
+    }
+
+    /// <summary>
+    /// Walk data collected from tiles by <see cref="Pathfinder.CollectWalkData"/>, one tile at a time for the pathfinder's Z checks
+    /// or a whole area for a <see cref="WalkabilityGrid"/> being built.
+    /// </summary>
+    internal sealed class WalkData
+    {
+        private WalkabilityGrid.Entry[] _entries = new WalkabilityGrid.Entry[16];
+        private sbyte[] _stretchedZ = new sbyte[16];
+        private int _stretchedCount;
+
+        public int EntryCount { get; private set; }
+
+        public ReadOnlySpan<WalkabilityGrid.Entry> Entries => new ReadOnlySpan<WalkabilityGrid.Entry>(_entries, 0, EntryCount);
+
+        public ReadOnlySpan<sbyte> StretchedZ => new ReadOnlySpan<sbyte>(_stretchedZ, 0, _stretchedCount);
+
+        public void Clear()
+        {
+            EntryCount = 0;
+            _stretchedCount = 0;
+        }
+
+        /// <param name="land">The land tile of this entry, its directional Zs are kept when it is stretched</param>
+        public void Add(uint flags, int z, int averageZ, int height, Land land)
+        {
+            int stretchedIndex = -1;
+
+            if (land != null && land.IsStretched)
+            {
+                if (_stretchedCount + 8 > _stretchedZ.Length)
+                    Array.Resize(ref _stretchedZ, _stretchedZ.Length * 2);
+
+                stretchedIndex = _stretchedCount;
+
+                for (int dir = 0; dir < 8; dir++)
+                    _stretchedZ[_stretchedCount++] = (sbyte)land.CalculateCurrentAverageZ(dir);
+            }
+
+            if (EntryCount == _entries.Length)
+                Array.Resize(ref _entries, _entries.Length * 2);
+
+            _entries[EntryCount++] = new WalkabilityGrid.Entry(flags, z, averageZ, height, stretchedIndex);
+        }
+    }
+}
@@ -78,6 +78,8 @@ namespace ClassicUO.Game
 
         public static Dictionary<uint, Item> Items { get; } = new Dictionary<uint, Item>();
 
+        public static ItemIndexManager ItemIndex { get; } = new ItemIndexManager();
+
         public static Dictionary<uint, Mobile> Mobiles { get; } = new Dictionary<uint, Mobile>();
 
         public static Map.Map Map { get; private set; }
@@ -363,7 +365,7 @@ namespace ClassicUO.Game
                 {
                     for (int i = 0; i < _toRemove.Count; i++)
                     {
-                        Items.Remove(_toRemove[i]);
+                        RemoveFromItems(_toRemove[i]);
                     }
 
                     _toRemove.Clear();
@@ -455,7 +457,7 @@ namespace ClassicUO.Game
 
             if (item != null && item.IsDestroyed)
             {
-                Items.Remove(serial);
+                RemoveFromItems(serial);
                 item = null;
             }
 
@@ -463,11 +465,26 @@ namespace ClassicUO.Game
             {
                 item = Item.Create(serial);
                 Items.Add(item);
+                ItemIndex.Add(item);
             }
 
             return item;
         }
 
+        private static void RemoveFromItems(uint serial)
+        {
+            if (Items.TryGetValue(serial, out Item item))
+            {
+                // A destroyed item can already be reused under another serial
+                if (item.Serial == serial)
+                {
+                    ItemIndex.Remove(item);
+                }
+
+                Items.Remove(serial);
+            }
+        }
+
         public static Mobile GetOrCreateMobile(uint serial)
         {
             Mobile mob = Mobiles.Get(serial);
@@ -561,7 +578,7 @@ namespace ClassicUO.Game
 
             if (forceRemove)
             {
-                Items.Remove(serial);
+                RemoveFromItems(serial);
             }
 
             return true;
@@ -814,6 +831,7 @@ namespace ClassicUO.Game
 
             ObjectToRemove = 0;
             LastObject = 0;
+            ItemIndex.Clear();
             Items.Clear();
             Mobiles.Clear();
             Player?.Destroy();
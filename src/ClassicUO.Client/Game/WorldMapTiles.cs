@@ -0,0 +1,975 @@
+using System;
+using System.Buffers;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.Compression;
+using System.Threading;
+using System.Threading.Tasks;
+using ClassicUO.Assets;
+using ClassicUO.Game.GameObjects;
+using ClassicUO.Renderer;
+using ClassicUO.Utility;
+using ClassicUO.Utility.Logging;
+using Microsoft.Xna.Framework;
+using Microsoft.Xna.Framework.Graphics;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// The world map of a facet cut into <see cref="TILE_SIZE"/> pixel tiles, plus coarser levels where a tile covers 2x2 tiles of the level below.
+    /// Tiles are drawn in the background only once they are on screen and saved to Data/Client/WorldMap together with a hash of the map,
+    /// statics, radar and hue colors they were drawn from, so opening the map again just reads them back.
+    /// UltimaLive block updates redraw the tiles they touch. Textures are created on the game thread a few per frame
+    /// and the ones not drawn for the longest time are released once there are more than <see cref="MAX_TEXTURES"/>.
+    /// </summary>
+    internal sealed class WorldMapTiles : IDisposable
+    {
+        public const int TILE_SIZE = 256;
+
+        /// <summary>
+        /// A level <see cref="MAX_LEVEL"/> tile covers 2048x2048 map tiles, enough for the smallest zoom of the world map.
+        /// </summary>
+        public const int MAX_LEVEL = 3;
+
+        private const int TILE_BLOCKS = TILE_SIZE >> 3;
+        private const int MAX_TEXTURES = 192;
+        private const int UPLOADS_PER_FRAME = 4;
+        private const uint REQUEST_TIMEOUT = 2000;
+        private const int FILE_MAGIC = 0x3150414D; // MAP1
+        private const int FILE_VERSION = 1;
+        private const float MAG_0 = 80f / 100f;
+        private const float MAG_1 = 100f / 80f;
+
+        private static readonly int _maxWorkers = Math.Max(1, Math.Min(4, Environment.ProcessorCount - 1));
+        private static WorldMapTiles _current;
+
+        private readonly int _dataMap;
+        private readonly int _blocksWidth, _blocksHeight;
+        private readonly string _cachePath;
+        private readonly ulong _paletteHash;
+        private readonly Dictionary<long, Tile> _tiles = new Dictionary<long, Tile>();
+        private readonly ConcurrentDictionary<long, ulong> _hashes = new ConcurrentDictionary<long, ulong>();
+        private readonly ConcurrentStack<Tile> _requests = new ConcurrentStack<Tile>();
+        private readonly ConcurrentQueue<(Tile Tile, int Version, uint[] Pixels)> _ready = new ConcurrentQueue<(Tile, int, uint[])>();
+        private int _textureCount, _workers;
+        private volatile bool _disposed;
+
+        private WorldMapTiles(int mapIndex)
+        {
+            MapIndex = mapIndex;
+            _dataMap = mapIndex;
+            MapLoader.Instance.SanitizeMapIndex(ref _dataMap);
+            _blocksWidth = MapLoader.Instance.MapBlocksSize[mapIndex, 0];
+            _blocksHeight = MapLoader.Instance.MapBlocksSize[mapIndex, 1];
+            Width = MapLoader.Instance.MapsDefaultSize[mapIndex, 0];
+            Height = MapLoader.Instance.MapsDefaultSize[mapIndex, 1];
+            _cachePath = Path.Combine(CachePath, $"map{mapIndex}");
+            _paletteHash = HashPalette();
+        }
+
+        public static string CachePath => Path.Combine(CUOEnviroment.ExecutablePath, "Data", "Client", "WorldMap");
+
+        public int MapIndex { get; }
+
+        public int Width { get; }
+
+        public int Height { get; }
+
+        public bool IsDisposed => _disposed;
+
+        /// <summary>
+        /// The tiles of a facet, the ones of the facet shown before are released. Game thread only.
+        /// </summary>
+        public static WorldMapTiles Get(int mapIndex)
+        {
+            if (_current == null || _current.MapIndex != mapIndex)
+            {
+                _current?.Dispose();
+                _current = new WorldMapTiles(mapIndex);
+            }
+
+            return _current;
+        }
+
+        /// <summary>
+        /// A map block was patched by UltimaLive, redraw the tiles showing it.
+        /// </summary>
+        public static void OnBlockChanged(int mapIndex, int block)
+        {
+            if (_current != null && _current.MapIndex == mapIndex)
+            {
+                _current.Invalidate(block);
+            }
+        }
+
+        /// <summary>
+        /// The map files were replaced, drop everything.
+        /// </summary>
+        public static void Clear()
+        {
+            _current?.Dispose();
+            _current = null;
+        }
+
+        /// <summary>
+        /// Coarsest level that still has a pixel per map tile on screen at <paramref name="zoom"/>.
+        /// </summary>
+        public static int GetLevel(float zoom)
+        {
+            int level = 0;
+
+            while (level < MAX_LEVEL && zoom * (2 << level) <= 1f)
+            {
+                level++;
+            }
+
+            return level;
+        }
+
+        /// <summary>
+        /// Draw the tiles covering <paramref name="mapArea"/>. The map point <paramref name="mapCenter"/> lands on <paramref name="screenCenter"/>,
+        /// scaled by <paramref name="zoom"/> and rotated around it. Tiles not ready yet are drawn from a coarser level that is.
+        /// </summary>
+        public void Draw(UltimaBatcher2D batcher, Vector2 screenCenter, Vector2 mapCenter, Rectangle mapArea, float zoom, float rotation, Vector3 hue)
+        {
+            Upload();
+
+            int level = GetLevel(zoom);
+            int span = TILE_SIZE << level;
+            int minX = Math.Max(0, mapArea.Left / span);
+            int minY = Math.Max(0, mapArea.Top / span);
+            int maxX = Math.Min((Width - 1) / span, (mapArea.Right - 1) / span);
+            int maxY = Math.Min((Height - 1) / span, (mapArea.Bottom - 1) / span);
+
+            for (int ty = minY; ty <= maxY; ty++)
+            {
+                for (int tx = minX; tx <= maxX; tx++)
+                {
+                    DrawTile(batcher, level, tx, ty, screenCenter, mapCenter, zoom, rotation, hue);
+                }
+            }
+
+            Evict();
+        }
+
+        public void Dispose()
+        {
+            if (_disposed)
+            {
+                return;
+            }
+
+            _disposed = true;
+            _requests.Clear();
+
+            foreach (Tile tile in _tiles.Values)
+            {
+                tile.Texture?.Dispose();
+                tile.Texture = null;
+            }
+
+            _tiles.Clear();
+            _textureCount = 0;
+
+            ReturnReady();
+        }
+
+        private void ReturnReady()
+        {
+            while (_ready.TryDequeue(out var result))
+            {
+                ReturnPixels(result.Pixels);
+            }
+        }
+
+        private void DrawTile(UltimaBatcher2D batcher, int level, int tx, int ty, Vector2 screenCenter, Vector2 mapCenter, float zoom, float rotation, Vector3 hue)
+        {
+            Tile tile = GetTile(level, tx, ty);
+            tile.LastDrawn = Time.Ticks;
+
+            if ((tile.Texture == null || tile.Dirty) && !tile.Loading && !tile.Failed)
+            {
+                Request(tile);
+            }
+
+            int span = TILE_SIZE << level;
+            int mapX = tx * span;
+            int mapY = ty * span;
+
+            if (tile.Texture != null)
+            {
+                DrawTexture(batcher, tile.Texture, new Rectangle(0, 0, TILE_SIZE, TILE_SIZE), mapX, mapY, level, screenCenter, mapCenter, zoom, rotation, hue);
+
+                return;
+            }
+
+            for (int parentLevel = level + 1; parentLevel <= MAX_LEVEL; parentLevel++)
+            {
+                int parentSpan = TILE_SIZE << parentLevel;
+
+                if (!_tiles.TryGetValue(GetKey(parentLevel, mapX / parentSpan, mapY / parentSpan), out Tile parent) || parent.Texture == null)
+                {
+                    continue;
+                }
+
+                parent.LastDrawn = tile.LastDrawn;
+
+                var source = new Rectangle
+                (
+                    (mapX % parentSpan) >> parentLevel,
+                    (mapY % parentSpan) >> parentLevel,
+                    span >> parentLevel,
+                    span >> parentLevel
+                );
+
+                DrawTexture(batcher, parent.Texture, source, mapX, mapY, parentLevel, screenCenter, mapCenter, zoom, rotation, hue);
+
+                return;
+            }
+        }
+
+        private static void DrawTexture
+        (
+            UltimaBatcher2D batcher,
+            Texture2D texture,
+            Rectangle source,
+            int mapX,
+            int mapY,
+            int level,
+            Vector2 screenCenter,
+            Vector2 mapCenter,
+            float zoom,
+            float rotation,
+            Vector3 hue
+        )
+        {
+            float scale = zoom * (1 << level);
+
+            batcher.Draw
+            (
+                texture,
+                screenCenter,
+                source,
+                hue,
+                rotation,
+                new Vector2((mapCenter.X - mapX) / (1 << level), (mapCenter.Y - mapY) / (1 << level)),
+                new Vector2(scale, scale),
+                SpriteEffects.None,
+                0
+            );
+        }
+
+        private Tile GetTile(int level, int tx, int ty)
+        {
+            long key = GetKey(level, tx, ty);
+
+            if (!_tiles.TryGetValue(key, out Tile tile))
+            {
+                _tiles[key] = tile = new Tile(level, tx, ty);
+            }
+
+            return tile;
+        }
+
+        private void Request(Tile tile)
+        {
+            tile.Loading = true;
+            tile.Dirty = false;
+            _requests.Push(tile);
+
+            if (Interlocked.Increment(ref _workers) <= _maxWorkers)
+            {
+                Task.Run(Work);
+            }
+            else
+            {
+                Interlocked.Decrement(ref _workers);
+            }
+        }
+
+        /// <summary>
+        /// Newest requests first, the tiles asked for last are the ones on screen now.
+        /// </summary>
+        private void Work()
+        {
+            while (true)
+            {
+                while (!_disposed && _requests.TryPop(out Tile tile))
+                {
+                    int version = tile.Version;
+
+                    // Scrolled away before its turn, it is asked for again when it shows up
+                    if (unchecked(Time.Ticks - tile.LastDrawn) > REQUEST_TIMEOUT)
+                    {
+                        tile.Loading = false;
+
+                        continue;
+                    }
+
+                    uint[] pixels = null;
+
+                    try
+                    {
+                        pixels = GetPixels(tile.Level, tile.X, tile.Y);
+                    }
+                    catch (Exception e)
+                    {
+                        Log.Error($"[WorldMap] Could not draw tile {tile.Level}/{tile.X}/{tile.Y}: {e}");
+                    }
+
+                    // Dispose already emptied the queue, nothing would take the buffer back
+                    if (_disposed)
+                    {
+                        ReturnPixels(pixels);
+
+                        break;
+                    }
+
+                    _ready.Enqueue((tile, version, pixels));
+
+                    // Disposed between the check and the enqueue
+                    if (_disposed)
+                    {
+                        ReturnReady();
+                    }
+                }
+
+                Interlocked.Decrement(ref _workers);
+
+                // A request pushed after the last TryPop but before the decrement would otherwise wait for the next one
+                if (_disposed || _requests.IsEmpty)
+                {
+                    return;
+                }
+
+                if (Interlocked.Increment(ref _workers) > _maxWorkers)
+                {
+                    Interlocked.Decrement(ref _workers);
+
+                    return;
+                }
+            }
+        }
+
+        private void Upload()
+        {
+            for (int i = 0; i < UPLOADS_PER_FRAME && _ready.TryDequeue(out var result); i++)
+            {
+                Tile tile = result.Tile;
+                tile.Loading = false;
+
+                if (result.Pixels == null)
+                {
+                    tile.Failed = true;
+
+                    continue;
+                }
+
+                // Invalidated while it was drawn, Dirty asks for it again
+                if (result.Version == tile.Version)
+                {
+                    if (tile.Texture == null || tile.Texture.IsDisposed)
+                    {
+                        tile.Texture = new Texture2D(Client.Game.GraphicsDevice, TILE_SIZE, TILE_SIZE, false, SurfaceFormat.Color);
+                        _textureCount++;
+                    }
+
+                    tile.Texture.SetData(result.Pixels, 0, TILE_SIZE * TILE_SIZE);
+                }
+
+                ReturnPixels(result.Pixels);
+            }
+        }
+
+        private void Evict()
+        {
+            if (_textureCount <= MAX_TEXTURES)
+            {
+                return;
+            }
+
+            var loaded = new List<Tile>(_textureCount);
+
+            foreach (Tile tile in _tiles.Values)
+            {
+                if (tile.Texture != null)
+                {
+                    loaded.Add(tile);
+                }
+            }
+
+            loaded.Sort((a, b) => unchecked((int)(a.LastDrawn - b.LastDrawn)));
+
+            for (int i = 0; i < loaded.Count && _textureCount > MAX_TEXTURES * 3 / 4; i++)
+            {
+                Tile tile = loaded[i];
+
+                if (tile.LastDrawn == Time.Ticks)
+                {
+                    break;
+                }
+
+                tile.Texture.Dispose();
+                tile.Texture = null;
+                _textureCount--;
+            }
+        }
+
+        private void Invalidate(int block)
+        {
+            int bx = block / _blocksHeight;
+            int by = block % _blocksHeight;
+            int tx = bx / TILE_BLOCKS;
+            int ty = by / TILE_BLOCKS;
+
+            InvalidateTile(tx, ty);
+
+            // The tile to the right shades its first column with this block, the tile above its last row
+            bool right = bx % TILE_BLOCKS == TILE_BLOCKS - 1;
+            bool above = by % TILE_BLOCKS == 0 && ty > 0;
+
+            if (right)
+            {
+                InvalidateTile(tx + 1, ty);
+            }
+
+            if (above)
+            {
+                InvalidateTile(tx, ty - 1);
+            }
+
+            if (right && above)
+            {
+                InvalidateTile(tx + 1, ty - 1);
+            }
+        }
+
+        private void InvalidateTile(int tx, int ty)
+        {
+            for (int level = 0; level <= MAX_LEVEL; level++, tx >>= 1, ty >>= 1)
+            {
+                long key = GetKey(level, tx, ty);
+                _hashes.TryRemove(key, out _);
+
+                if (_tiles.TryGetValue(key, out Tile tile))
+                {
+                    Interlocked.Increment(ref tile.Version);
+                    tile.Dirty = true;
+                    tile.Failed = false;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Read the tile from the cache, or draw it and save it. Worker threads.
+        /// </summary>
+        private uint[] GetPixels(int level, int tx, int ty)
+        {
+            ulong hash = GetHash(level, tx, ty);
+            string path = Path.Combine(_cachePath, $"{level}_{tx}_{ty}.tile");
+            uint[] pixels = ArrayPool<uint>.Shared.Rent(TILE_SIZE * TILE_SIZE);
+
+            if (TryLoad(path, hash, pixels))
+            {
+                return pixels;
+            }
+
+            if (level == 0)
+            {
+                Rasterize(tx, ty, pixels);
+            }
+            else
+            {
+                Downsample(level, tx, ty, pixels);
+            }
+
+            Save(path, hash, pixels);
+
+            return pixels;
+        }
+
+        private unsafe void Rasterize(int tx, int ty, uint[] pixels)
+        {
+            // The tile's blocks plus a column on the left and a row below, heights are shaded against the tile down-left
+            const int STRIDE = (TILE_BLOCKS + 1) << 3;
+
+            int bx0 = tx * TILE_BLOCKS - 1;
+            int by0 = ty * TILE_BLOCKS;
+            uint[] colors = ArrayPool<uint>.Shared.Rent(STRIDE * STRIDE);
+            sbyte[] allZ = ArrayPool<sbyte>.Shared.Rent(STRIDE * STRIDE);
+
+            try
+            {
+                Array.Clear(colors, 0, STRIDE * STRIDE);
+                Array.Clear(allZ, 0, STRIDE * STRIDE);
+
+                HuesLoader huesLoader = HuesLoader.Instance;
+
+                // UltimaLive patches map memory on the game thread
+                UltimaLive.MapDataLock.EnterReadLock();
+
+                try
+                {
+                    for (int i = 0; i <= TILE_BLOCKS; i++)
+                    {
+                        int bx = bx0 + i;
+
+                        if (bx < 0 || bx >= _blocksWidth)
+                        {
+                            continue;
+                        }
+
+                        for (int j = 0; j <= TILE_BLOCKS; j++)
+                        {
+                            int by = by0 + j;
+
+                            if (by >= _blocksHeight)
+                            {
+                                break;
+                            }
+
+                            ref IndexMap indexMap = ref MapLoader.Instance.GetIndex(_dataMap, bx, by);
+
+                            if (indexMap.MapAddress == 0)
+                            {
+                                continue;
+                            }
+
+                            MapCells* cells = (MapCells*)&((MapBlock*)indexMap.MapAddress)->Cells;
+                            int origin = (j << 3) * STRIDE + (i << 3);
+
+                            for (int y = 0, pos = 0; y < 8; y++)
+                            {
+                                int index = origin + y * STRIDE;
+
+                                for (int x = 0; x < 8; x++, pos++, index++)
+                                {
+                                    ushort color = (ushort)(0x8000 | huesLoader.GetRadarColorData(cells[pos].TileID & 0x3FFF));
+
+                                    colors[index] = HuesHelper.Color16To32(color) | 0xFF_00_00_00;
+                                    allZ[index] = cells[pos].Z;
+                                }
+                            }
+
+                            StaticsBlock* sb = (StaticsBlock*)indexMap.StaticAddress;
+
+                            if (sb == null)
+                            {
+                                continue;
+                            }
+
+                            for (int c = 0, count = (int)indexMap.StaticCount; c < count; c++, sb++)
+                            {
+                                if (sb->Color != 0 && sb->Color != 0xFFFF && GameObject.CanBeDrawn(sb->Color))
+                                {
+                                    int index = origin + sb->Y * STRIDE + sb->X;
+
+                                    if (sb->Z >= allZ[index])
+                                    {
+                                        ushort color = (ushort)(0x8000 | (sb->Hue != 0 ? huesLoader.GetHueColorRgba5551(16, sb->Hue) : huesLoader.GetRadarColorData(sb->Color + 0x4000)));
+
+                                        colors[index] = HuesHelper.Color16To32(color) | 0xFF_00_00_00;
+                                        allZ[index] = sb->Z;
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+                finally
+                {
+                    UltimaLive.MapDataLock.ExitReadLock();
+                }
+
+                for (int y = 0; y < TILE_SIZE; y++)
+                {
+                    int mapY = ty * TILE_SIZE + y;
+                    int current = y * STRIDE + 8;
+                    int next = (y + 1) * STRIDE + 7;
+
+                    for (int x = 0; x < TILE_SIZE; x++, current++, next++)
+                    {
+                        uint cc = colors[current];
+                        int mapX = tx * TILE_SIZE + x;
+
+                        if (cc != 0 && mapX >= 1 && mapX < Width - 1 && mapY >= 1 && mapY < Height - 1)
+                        {
+                            sbyte z0 = allZ[current];
+                            sbyte z1 = allZ[next];
+
+                            if (z0 != z1)
+                            {
+                                cc = Shade(cc, z0 < z1 ? MAG_0 : MAG_1);
+                            }
+                        }
+
+                        pixels[y * TILE_SIZE + x] = cc;
+                    }
+                }
+            }
+            finally
+            {
+                ArrayPool<uint>.Shared.Return(colors);
+                ArrayPool<sbyte>.Shared.Return(allZ);
+            }
+        }
+
+        private static uint Shade(uint cc, float mag)
+        {
+            byte r = (byte)(cc & 0xFF);
+            byte g = (byte)((cc >> 8) & 0xFF);
+            byte b = (byte)((cc >> 16) & 0xFF);
+            byte a = (byte)((cc >> 24) & 0xFF);
+
+            if (r == 0 && g == 0 && b == 0)
+            {
+                return cc;
+            }
+
+            r = (byte)Math.Min(0xFF, r * mag);
+            g = (byte)Math.Min(0xFF, g * mag);
+            b = (byte)Math.Min(0xFF, b * mag);
+
+            return (uint)(r | (g << 8) | (b << 16) | (a << 24));
+        }
+
+        /// <summary>
+        /// Every pixel is the average of the 2x2 pixels below it, empty pixels past the map edge are left out.
+        /// </summary>
+        private void Downsample(int level, int tx, int ty, uint[] pixels)
+        {
+            const int HALF = TILE_SIZE / 2;
+
+            Array.Clear(pixels, 0, TILE_SIZE * TILE_SIZE);
+
+            int childSpan = TILE_SIZE << (level - 1);
+            var children = new uint[4][];
+
+            // A coarse tile seen for the first time draws up to 4^level tiles below it, spread them over the cores
+            Parallel.For
+            (
+                0,
+                4,
+                i =>
+                {
+                    int cx = tx * 2 + (i & 1);
+                    int cy = ty * 2 + (i >> 1);
+
+                    if (cx * childSpan < Width && cy * childSpan < Height)
+                    {
+                        children[i] = GetPixels(level - 1, cx, cy);
+                    }
+                }
+            );
+
+            for (int i = 0; i < 4; i++)
+            {
+                uint[] child = children[i];
+
+                if (child == null)
+                {
+                    continue;
+                }
+
+                try
+                {
+                    int offset = (i >> 1) * HALF * TILE_SIZE + (i & 1) * HALF;
+
+                    for (int y = 0; y < HALF; y++)
+                    {
+                        for (int x = 0; x < HALF; x++)
+                        {
+                            int src = (y << 1) * TILE_SIZE + (x << 1);
+
+                            pixels[offset + y * TILE_SIZE + x] = Average(child[src], child[src + 1], child[src + TILE_SIZE], child[src + TILE_SIZE + 1]);
+                        }
+                    }
+                }
+                finally
+                {
+                    ReturnPixels(child);
+                }
+            }
+        }
+
+        private static uint Average(uint c0, uint c1, uint c2, uint c3)
+        {
+            uint r = 0, g = 0, b = 0, a = 0, count = 0;
+
+            Accumulate(c0);
+            Accumulate(c1);
+            Accumulate(c2);
+            Accumulate(c3);
+
+            if (count == 0)
+            {
+                return 0;
+            }
+
+            return (r / count) | ((g / count) << 8) | ((b / count) << 16) | ((a / count) << 24);
+
+            void Accumulate(uint c)
+            {
+                if (c == 0)
+                {
+                    return;
+                }
+
+                r += c & 0xFF;
+                g += (c >> 8) & 0xFF;
+                b += (c >> 16) & 0xFF;
+                a += c >> 24;
+                count++;
+            }
+        }
+
+        /// <summary>
+        /// Level 0 tiles hash the blocks they are drawn from, coarser levels the hashes of their 4 tiles below.
+        /// </summary>
+        private ulong GetHash(int level, int tx, int ty)
+        {
+            long key = GetKey(level, tx, ty);
+
+            if (_hashes.TryGetValue(key, out ulong hash))
+            {
+                return hash;
+            }
+
+            if (level == 0)
+            {
+                hash = _paletteHash;
+
+                for (int bx = tx * TILE_BLOCKS - 1; bx < (tx + 1) * TILE_BLOCKS; bx++)
+                {
+                    for (int by = ty * TILE_BLOCKS; by <= (ty + 1) * TILE_BLOCKS; by++)
+                    {
+                        if (bx >= 0 && bx < _blocksWidth && by < _blocksHeight)
+                        {
+                            hash = HashBlock(bx, by, hash);
+                        }
+                    }
+                }
+            }
+            else
+            {
+                hash = 14695981039346656037UL;
+                int childSpan = TILE_SIZE << (level - 1);
+
+                for (int i = 0; i < 4; i++)
+                {
+                    int cx = tx * 2 + (i & 1);
+                    int cy = ty * 2 + (i >> 1);
+
+                    if (cx * childSpan < Width && cy * childSpan < Height)
+                    {
+                        hash = Mix(hash ^ GetHash(level - 1, cx, cy));
+                    }
+                }
+            }
+
+            _hashes[key] = hash;
+
+            return hash;
+        }
+
+        private unsafe ulong HashBlock(int bx, int by, ulong hash)
+        {
+            UltimaLive.MapDataLock.EnterReadLock();
+
+            try
+            {
+                ref IndexMap index = ref MapLoader.Instance.GetIndex(_dataMap, bx, by);
+
+                if (index.MapAddress != 0)
+                {
+                    hash = Fnv((byte*)&((MapBlock*)index.MapAddress)->Cells, 64 * sizeof(MapCells), hash);
+                }
+
+                if (index.StaticAddress != 0)
+                {
+                    hash = Fnv((byte*)index.StaticAddress, (int)index.StaticCount * sizeof(StaticsBlock), hash);
+                }
+            }
+            finally
+            {
+                UltimaLive.MapDataLock.ExitReadLock();
+            }
+
+            return hash;
+        }
+
+        /// <summary>
+        /// Radar colors plus the hue colors hued statics are drawn with, a changed hues.mul redraws the map too.
+        /// </summary>
+        private static unsafe ulong HashPalette()
+        {
+            ulong hash = 14695981039346656037UL;
+            ushort[] radarColors = HuesLoader.Instance.RadarCol;
+
+            if (radarColors != null && radarColors.Length != 0)
+            {
+                fixed (ushort* ptr = radarColors)
+                {
+                    hash = Fnv((byte*)ptr, radarColors.Length * sizeof(ushort), hash);
+                }
+            }
+
+            HuesGroup[] hues = HuesLoader.Instance.HuesRange;
+
+            if (hues != null)
+            {
+                for (int g = 0; g < hues.Length; g++)
+                {
+                    HuesBlock[] entries = hues[g].Entries;
+
+                    for (int e = 0; entries != null && e < entries.Length; e++)
+                    {
+                        // The only shade Rasterize uses
+                        ushort color = entries[e].ColorTable != null && entries[e].ColorTable.Length > 16 ? entries[e].ColorTable[16] : (ushort)0;
+                        hash = Fnv((byte*)&color, sizeof(ushort), hash);
+                    }
+                }
+            }
+
+            return hash;
+        }
+
+        private static unsafe ulong Fnv(byte* data, int length, ulong hash)
+        {
+            for (int i = 0; i < length; i++)
+            {
+                hash ^= data[i];
+                hash *= 1099511628211UL;
+            }
+
+            return hash;
+        }
+
+        private static ulong Mix(ulong z)
+        {
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+
+            return z ^ (z >> 31);
+        }
+
+        private static bool TryLoad(string path, ulong hash, uint[] pixels)
+        {
+            if (!File.Exists(path))
+            {
+                return false;
+            }
+
+            byte[] buffer = ArrayPool<byte>.Shared.Rent(TILE_SIZE * TILE_SIZE * sizeof(uint));
+
+            try
+            {
+                using var reader = new BinaryReader(File.OpenRead(path));
+
+                if (reader.ReadInt32() != FILE_MAGIC || reader.ReadInt32() != FILE_VERSION || reader.ReadInt32() != TILE_SIZE || reader.ReadUInt64() != hash)
+                {
+                    return false;
+                }
+
+                using var deflate = new DeflateStream(reader.BaseStream, CompressionMode.Decompress);
+                int length = TILE_SIZE * TILE_SIZE * sizeof(uint);
+                int read = 0;
+
+                while (read < length)
+                {
+                    int n = deflate.Read(buffer, read, length - read);
+
+                    if (n <= 0)
+                    {
+                        return false;
+                    }
+
+                    read += n;
+                }
+
+                Buffer.BlockCopy(buffer, 0, pixels, 0, length);
+
+                return true;
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"[WorldMap] Could not read {path}: {e.Message}");
+
+                return false;
+            }
+            finally
+            {
+                ArrayPool<byte>.Shared.Return(buffer);
+            }
+        }
+
+        private static void Save(string path, ulong hash, uint[] pixels)
+        {
+            // Two workers can save the same tile when a coarser level needs it at the same time
+            string tempPath = $"{path}.{Environment.CurrentManagedThreadId}.tmp";
+            byte[] buffer = ArrayPool<byte>.Shared.Rent(TILE_SIZE * TILE_SIZE * sizeof(uint));
+
+            try
+            {
+                Directory.CreateDirectory(Path.GetDirectoryName(path));
+                Buffer.BlockCopy(pixels, 0, buffer, 0, TILE_SIZE * TILE_SIZE * sizeof(uint));
+
+                using (var writer = new BinaryWriter(File.Create(tempPath)))
+                {
+                    writer.Write(FILE_MAGIC);
+                    writer.Write(FILE_VERSION);
+                    writer.Write(TILE_SIZE);
+                    writer.Write(hash);
+                    writer.Flush();
+
+                    using var deflate = new DeflateStream(writer.BaseStream, CompressionLevel.Fastest, true);
+                    deflate.Write(buffer, 0, TILE_SIZE * TILE_SIZE * sizeof(uint));
+                }
+
+                if (File.Exists(path))
+                {
+                    File.Delete(path);
+                }
+
+                File.Move(tempPath, path);
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"[WorldMap] Could not save {path}: {e.Message}");
+
+                try
+                {
+                    File.Delete(tempPath);
+                }
+                catch
+                {
+                }
+            }
+            finally
+            {
+                ArrayPool<byte>.Shared.Return(buffer);
+            }
+        }
+
+        private static void ReturnPixels(uint[] pixels)
+        {
+            if (pixels != null)
+            {
+                ArrayPool<uint>.Shared.Return(pixels);
+            }
+        }
+
+        private static long GetKey(int level, int tx, int ty) => ((long)level << 40) | ((long)tx << 20) | (uint)ty;
+
+        private sealed class Tile(int level, int x, int y)
+        {
+            public readonly int Level = level, X = x, Y = y;
+            public Texture2D Texture;
+            public uint LastDrawn;
+            public int Version;
+            public volatile bool Loading;
+            public bool Dirty, Failed;
+        }
+    }
+}
@@ -0,0 +1,259 @@
+using System;
+using System.Collections.Generic;
+using System.Threading;
+using ClassicUO.Game.Data;
+using ClassicUO.Game.GameObjects;
+
+namespace ClassicUO.Game
+{
+    /// <summary>
+    /// An immutable copy of the world entities. It is published by the game thread and can be read from any thread without locking.
+    /// A new snapshot is only built when a reader found the last one older than <see cref="REFRESH_AFTER_MS"/>,
+    /// so it costs nothing while no script is using it.
+    /// </summary>
+    public sealed class WorldSnapshot
+    {
+        /// <summary>
+        /// Reading a snapshot older than this (in ms) asks the game thread for a new one.
+        /// </summary>
+        private const int REFRESH_AFTER_MS = 50;
+
+        /// <summary>
+        /// Snapshots older than this (in ms) are considered stale, script threads wait for the next publish instead of using them.
+        /// </summary>
+        private const int STALE_AFTER_MS = 250;
+        private const int MAX_WAIT_MS = 100;
+
+        private static readonly object _sync = new object();
+        private static WorldSnapshot _current = new WorldSnapshot();
+        private static int _requested;
+        private static long _lastVersion;
+
+        private readonly Dictionary<uint, EntitySnapshot> _items;
+        private readonly Dictionary<uint, EntitySnapshot> _mobiles;
+
+        private WorldSnapshot()
+        {
+            _items = new Dictionary<uint, EntitySnapshot>();
+            _mobiles = new Dictionary<uint, EntitySnapshot>();
+            MapIndex = -1;
+        }
+
+        private WorldSnapshot(long version, int capacityItems, int capacityMobiles)
+        {
+            _items = new Dictionary<uint, EntitySnapshot>(capacityItems);
+            _mobiles = new Dictionary<uint, EntitySnapshot>(capacityMobiles);
+            Version = version;
+            CreatedAt = Environment.TickCount;
+        }
+
+        /// <summary>
+        /// The most recent snapshot. If the last published snapshot is stale this waits (briefly) for the game thread to publish a fresh one.
+        /// On the game thread it is built right away instead, that thread must never wait on itself.
+        /// </summary>
+        public static WorldSnapshot Current
+        {
+            get
+            {
+                WorldSnapshot snapshot = Volatile.Read(ref _current);
+
+                if (!snapshot.NeedsRefresh)
+                    return snapshot;
+
+                if (LegionScripting.LegionScripting.IsMainThread)
+                {
+                    Build();
+
+                    return Volatile.Read(ref _current);
+                }
+
+                Volatile.Write(ref _requested, 1);
+
+                if (!snapshot.IsStale)
+                    return snapshot;
+
+                lock (_sync)
+                {
+                    if (ReferenceEquals(snapshot, _current))
+                        Monitor.Wait(_sync, MAX_WAIT_MS);
+
+                    return _current;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Incremented every time a new snapshot is published.
+        /// </summary>
+        public long Version { get; }
+
+        /// <summary>
+        /// Environment.TickCount when this snapshot was built.
+        /// </summary>
+        public int CreatedAt { get; }
+
+        public int MapIndex { get; private set; }
+
+        public uint PlayerSerial { get; private set; }
+
+        public int PlayerX { get; private set; }
+
+        public int PlayerY { get; private set; }
+
+        public IReadOnlyDictionary<uint, EntitySnapshot> Items => _items;
+
+        public IReadOnlyDictionary<uint, EntitySnapshot> Mobiles => _mobiles;
+
+        public bool IsStale => Version == 0 || unchecked(Environment.TickCount - CreatedAt) > STALE_AFTER_MS;
+
+        private bool NeedsRefresh => Version == 0 || unchecked(Environment.TickCount - CreatedAt) > REFRESH_AFTER_MS;
+
+        public bool TryGetItem(uint serial, out EntitySnapshot item) => _items.TryGetValue(serial, out item);
+
+        public bool TryGetMobile(uint serial, out EntitySnapshot mobile) => _mobiles.TryGetValue(serial, out mobile);
+
+        public bool TryGet(uint serial, out EntitySnapshot entity)
+        {
+            if (SerialHelper.IsMobile(serial))
+                return _mobiles.TryGetValue(serial, out entity);
+
+            return _items.TryGetValue(serial, out entity);
+        }
+
+        /// <summary>
+        /// Build and publish a new snapshot if one was requested since the last publish. Must be called from the game thread.
+        /// </summary>
+        internal static void Publish()
+        {
+            if (Interlocked.Exchange(ref _requested, 0) == 0)
+                return;
+
+            Build();
+        }
+
+        private static void Build()
+        {
+            if (!World.InGame)
+                return;
+
+            WorldSnapshot snapshot = new WorldSnapshot(++_lastVersion, World.Items.Count, World.Mobiles.Count)
+            {
+                MapIndex = World.MapIndex,
+                PlayerSerial = World.Player.Serial,
+                PlayerX = World.Player.X,
+                PlayerY = World.Player.Y
+            };
+
+            foreach (Item item in World.Items.Values)
+            {
+                if (!item.IsDestroyed)
+                    snapshot._items[item.Serial] = new EntitySnapshot(item);
+            }
+
+            foreach (Mobile mobile in World.Mobiles.Values)
+            {
+                if (!mobile.IsDestroyed)
+                    snapshot._mobiles[mobile.Serial] = new EntitySnapshot(mobile);
+            }
+
+            lock (_sync)
+            {
+                Volatile.Write(ref _current, snapshot);
+                Monitor.PulseAll(_sync);
+            }
+        }
+
+        internal static void Clear()
+        {
+            lock (_sync)
+            {
+                Volatile.Write(ref _current, new WorldSnapshot());
+                Monitor.PulseAll(_sync);
+            }
+        }
+    }
+
+    /// <summary>
+    /// A copy of the commonly used values of an item or mobile at the time the snapshot was built.
+    /// </summary>
+    public readonly struct EntitySnapshot
+    {
+        public EntitySnapshot(Item item)
+        {
+            Entity = item;
+            Serial = item.Serial;
+            Graphic = item.Graphic;
+            Hue = item.Hue;
+            X = item.X;
+            Y = item.Y;
+            Z = item.Z;
+            Distance = item.Distance;
+            Container = item.Container;
+            Amount = item.Amount;
+            Notoriety = NotorietyFlag.Unknown;
+            Hits = item.Hits;
+            HitsMax = item.HitsMax;
+            IsDead = false;
+            Flags = item.Flags;
+        }
+
+        public EntitySnapshot(Mobile mobile)
+        {
+            Entity = mobile;
+            Serial = mobile.Serial;
+            Graphic = mobile.Graphic;
+            Hue = mobile.Hue;
+            X = mobile.X;
+            Y = mobile.Y;
+            Z = mobile.Z;
+            Distance = mobile.Distance;
+            Container = 0xFFFF_FFFF;
+            Amount = 1;
+            Notoriety = mobile.NotorietyFlag;
+            Hits = mobile.Hits;
+            HitsMax = mobile.HitsMax;
+            IsDead = mobile.IsDead;
+            Flags = mobile.Flags;
+        }
+
+        /// <summary>
+        /// The live entity this snapshot was taken from. Reading it from a script thread is not synchronized with the game.
+        /// </summary>
+        public Entity Entity { get; }
+
+        public uint Serial { get; }
+
+        public ushort Graphic { get; }
+
+        public ushort Hue { get; }
+
+        public ushort X { get; }
+
+        public ushort Y { get; }
+
+        public sbyte Z { get; }
+
+        /// <summary>
+        /// Distance from the player when the snapshot was built.
+        /// </summary>
+        public int Distance { get; }
+
+        public uint Container { get; }
+
+        public ushort Amount { get; }
+
+        public NotorietyFlag Notoriety { get; }
+
+        public ushort Hits { get; }
+
+        public ushort HitsMax { get; }
+
+        public bool IsDead { get; }
+
+        public Flags Flags { get; }
+
+        public bool IsMobile => SerialHelper.IsMobile(Serial);
+
+        public bool OnGround => !SerialHelper.IsValid(Container);
+    }
+}
@@ -130,9 +130,9 @@ namespace ClassicUO
             base.Initialize();
         }
 
-        private void SocketOnMessageReceived(object sender, byte[] e)
+        private void SocketOnMessageReceived(object sender, ArraySegment<byte> e)
         {
-            var c = PacketHandlers.Handler.ParsePackets(e);
+            var c = PacketHandlers.Handler.ParsePackets(e.AsSpan());
             AsyncNetClient.Socket.Statistics.TotalPacketsReceived += (uint)c;
         }
 
@@ -199,6 +199,7 @@ namespace ClassicUO
             PNGLoader.Instance.GraphicsDevice = GraphicsDevice;
             System.Threading.Tasks.Task loadResourceAssets = PNGLoader.Instance.LoadResourceAssets();
 
+            TextureAtlas.MemoryBudget = Math.Max(0, Settings.GlobalSettings.TextureMemoryBudgetMB) * 1024L * 1024L;
             Animations = new Renderer.Animations.Animations(GraphicsDevice);
             Arts = new Renderer.Arts.Art(GraphicsDevice);
             Gumps = new Renderer.Gumps.Gump(GraphicsDevice);
@@ -553,6 +554,12 @@ namespace ClassicUO
             _totalFrames++;
             GraphicsDevice.Clear(Color.Black);
 
+            TextureAtlas.BeginFrame();
+
+            Profiler.EnterContext("ArtUploads");
+            Arts.ProcessUploads();
+            Profiler.ExitContext("ArtUploads");
+
             _uoSpriteBatch.Begin();
             var rect = new Rectangle(0, 0, GraphicManager.PreferredBackBufferWidth, GraphicManager.PreferredBackBufferHeight);
             _uoSpriteBatch.Draw(SolidColorTextureCache.GetTexture(Color.Black), rect, Vector3.UnitZ);
@@ -1,7 +1,10 @@
 ﻿using System;
 using System.Collections.Concurrent;
 using System.Collections.Generic;
+using System.Diagnostics;
 using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Runtime.ExceptionServices;
 using System.Text.RegularExpressions;
 using System.Threading;
 using ClassicUO.Assets;
@@ -16,6 +19,7 @@ using ClassicUO.Game.UI.Gumps;
 using ClassicUO.Input;
 using ClassicUO.LegionScripting.PyClasses;
 using ClassicUO.Network;
+using ClassicUO.Utility;
 using FontStashSharp.RichText;
 using IronPython.Runtime;
 using Microsoft.Scripting.Hosting;
@@ -39,41 +43,182 @@ namespace ClassicUO.LegionScripting
 
         private ScriptEngine engine;
 
+        /// <summary>
+        /// Cooperative scripts rent their engine on a worker once they first run, after their API was created.
+        /// </summary>
+        internal ScriptEngine Engine
+        {
+            set => engine = value;
+        }
+
+        /// <summary>
+        /// Set when this API belongs to a cooperative script, waits then return something to yield instead of blocking.
+        /// </summary>
+        internal CooperativeTask CooperativeTask { get; set; }
+
         private ConcurrentBag<Gump> gumps = new();
+        private readonly List<PacketHook> packetHooks = new();
 
         #region Python C# Queue
 
-        public static readonly ConcurrentQueue<Action> QueuedPythonActions = new();
+        public static readonly ScriptActionQueue QueuedPythonActions = new();
 
-        private static T InvokeOnMainThread<T>(Func<T> func)
+        /// <summary>
+        /// Methods the player is usually waiting on, these run before other queued actions.
+        /// </summary>
+        private static readonly HashSet<string> interactiveMethods = new()
         {
-            var resultEvent = new ManualResetEvent(false);
-            T result = default;
+            nameof(Target), nameof(TargetSelf), nameof(TargetLandRel), nameof(TargetTileRel), nameof(CancelTarget), nameof(HasTarget),
+            nameof(RequestTarget), nameof(RequestAnyTarget), nameof(WaitForTarget), nameof(CastSpell), nameof(UseSkill), nameof(UseObject),
+            nameof(Stop)
+        };
 
-            void action()
+        /// <summary>
+        /// Methods whose work can wait a few frames without anyone noticing.
+        /// </summary>
+        private static readonly HashSet<string> bulkMethods = new()
+        {
+            nameof(AddGump), nameof(CloseGump), nameof(AddMapMarker), nameof(CreateCooldownBar)
+        };
+
+        private static ActionPriority PriorityOf(string method)
+        {
+            if (interactiveMethods.Contains(method))
+                return ActionPriority.Interactive;
+
+            if (bulkMethods.Contains(method))
+                return ActionPriority.Bulk;
+
+            return ActionPriority.Normal;
+        }
+
+        private const int MAX_POOLED_WAIT_HANDLES = 64;
+        private static readonly ConcurrentBag<ManualResetEventSlim> waitHandlePool = new();
+
+        private static ManualResetEventSlim RentWaitHandle()
+        {
+            if (waitHandlePool.TryTake(out var handle))
             {
-                result = func();
-                resultEvent.Set();
+                handle.Reset();
+                return handle;
             }
 
-            QueuedPythonActions.Enqueue(action);
-            resultEvent.WaitOne(); // Wait for the main thread to complete the operation
+            return new ManualResetEventSlim(false);
+        }
 
-            return result;
+        private static void ReturnWaitHandle(ManualResetEventSlim handle)
+        {
+            if (waitHandlePool.Count < MAX_POOLED_WAIT_HANDLES)
+                waitHandlePool.Add(handle);
+            else
+                handle.Dispose();
         }
 
-        private static void InvokeOnMainThread(Action action)
+        /// <summary>
+        /// Wait for work done on another thread, a cooperative worker gets a spare one to run the other scripts meanwhile.
+        /// </summary>
+        private static bool WaitBlocking(Func<bool> wait)
         {
-            var resultEvent = new ManualResetEvent(false);
+            CooperativeScheduler.BeginBlocking();
+
+            try
+            {
+                return wait();
+            }
+            finally
+            {
+                CooperativeScheduler.EndBlocking();
+            }
+        }
+
+        private static T InvokeOnMainThread<T>(Func<T> func, [CallerMemberName] string caller = "")
+        {
+            ScriptProfile profile = ScriptProfile.Current;
+
+            if (LegionScripting.IsMainThread) //Already on the main thread, for example inside of API.Batch
+            {
+                if (profile == null)
+                    return func();
+
+                long inlineStart = Stopwatch.GetTimestamp();
+
+                try
+                {
+                    return func();
+                }
+                finally
+                {
+                    profile.RecordCall(caller, Stopwatch.GetTimestamp() - inlineStart);
+                }
+            }
+
+            var resultEvent = RentWaitHandle();
+            T result = default;
+            Exception error = null;
+            long queuedAt = Stopwatch.GetTimestamp();
+            long execStart = 0, execEnd = 0;
+
+            void action()
+            {
+                execStart = Stopwatch.GetTimestamp();
+
+                if (profile != null)
+                    Profiler.EnterContext(profile.ContextName);
+
+                try
+                {
+                    result = func();
+                }
+                catch (Exception e)
+                {
+                    error = e;
+                }
+                finally
+                {
+                    if (profile != null)
+                        Profiler.ExitContext(profile.ContextName);
+
+                    execEnd = Stopwatch.GetTimestamp();
+                    resultEvent.Set();
+                }
+            }
+
+            QueuedPythonActions.Enqueue(action, profile, PriorityOf(caller));
+            CooperativeScheduler.BeginBlocking();
+
+            try
+            {
+                resultEvent.Wait(); // Wait for the main thread to complete the operation
+            }
+            finally
+            {
+                CooperativeScheduler.EndBlocking();
+            }
+
+            ReturnWaitHandle(resultEvent);
 
-            void wrappedAction()
+            if (profile != null)
             {
-                action();
-                resultEvent.Set();
+                long total = Stopwatch.GetTimestamp() - queuedAt;
+                profile.AddWait(total);
+                profile.RecordMainThreadCall(caller, execStart - queuedAt, execEnd - execStart, total);
             }
 
-            QueuedPythonActions.Enqueue(wrappedAction);
-            resultEvent.WaitOne();
+            if (error != null)
+                ExceptionDispatchInfo.Capture(error).Throw();
+
+            return result;
+        }
+
+        private static void InvokeOnMainThread(Action action, [CallerMemberName] string caller = "")
+        {
+            InvokeOnMainThread
+            (() =>
+                {
+                    action();
+                    return true;
+                }, caller
+            );
         }
 
         #endregion
@@ -88,6 +233,7 @@ namespace ClassicUO.LegionScripting
             lock (scheduledCallbacks)
             {
                 scheduledCallbacks.Enqueue(action);
+                ScriptEvents.Signal(Events.Callback);
 
                 while (scheduledCallbacks.Count > 100)
                 {
@@ -103,7 +249,7 @@ namespace ClassicUO.LegionScripting
         /// ```py
         /// while True:
         ///   API.ProcessCallbacks()
-        ///   API.Pause(0.1)
+        ///   API.WaitForEvent([API.Events.Callback], 1)
         /// ```
         /// </summary>
         public void ProcessCallbacks()
@@ -128,11 +274,11 @@ namespace ClassicUO.LegionScripting
         #endregion
 
         private ConcurrentBag<uint> ignoreList = new();
-        private ConcurrentQueue<JournalEntry> journalEntries = new();
+        private readonly ScriptJournal journalEntries = new();
         private Item backpack;
         private PlayerMobile player;
 
-        public ConcurrentQueue<JournalEntry> JournalEntries
+        public ScriptJournal JournalEntries
         {
             get { return journalEntries; }
         }
@@ -236,6 +382,15 @@ namespace ClassicUO.LegionScripting
             Invulnerable = 0x07
         }
 
+        public enum QuerySort
+        {
+            None,
+            Distance,
+            Hits,
+            HitsPercent,
+            Serial
+        }
+
         public enum PersistentVar
         {
             Char,
@@ -244,21 +399,220 @@ namespace ClassicUO.LegionScripting
             Global
         }
 
+        public enum Events
+        {
+            Journal,
+            Target,
+            Gump,
+            OPL,
+            ItemUpdate,
+            Pathfinding,
+            Callback,
+            Packet,
+            SharedVar
+        }
+
+        public enum SharedVar
+        {
+            Client,
+            Machine
+        }
+
         #endregion
 
         #region Methods
 
+        private static readonly Events[] targetEvents = { Events.Target };
+        private static readonly Events[] pathfindingEvents = { Events.Pathfinding };
+        private static readonly Events[] oplEvents = { Events.OPL };
+        private static readonly Events[] sharedVarEvents = { Events.SharedVar };
+
+        /// <summary>
+        /// Wait for something to happen in game instead of checking in a loop with API.Pause.
+        /// Returns as soon as one of the events happens, or None after the timeout.
+        /// Events: Journal, Target, Gump, OPL, ItemUpdate, Pathfinding, Callback, Packet (a hooked packet arrived, see API.HookPackets)
+        /// In cooperative scripts yield the result instead, the event is sent back by the yield.
+        /// Example:
+        /// ```py
+        /// while True:
+        ///   API.ProcessCallbacks()
+        ///   API.WaitForEvent([API.Events.Callback], 30)
+        /// ```
+        /// Cooperative example:
+        /// ```py
+        /// # mode: cooperative
+        /// def main():
+        ///   while True:
+        ///     ev = yield API.WaitForEvent([API.Events.Journal], 30)
+        /// ```
+        /// </summary>
+        /// <param name="events">List of events to wait for</param>
+        /// <param name="timeout">Max duration in seconds to wait</param>
+        /// <returns>The event that happened, or None if timed out</returns>
+        public object WaitForEvent(IList<Events> events, double timeout = 5)
+        {
+            if (events == null || events.Count == 0)
+                return null;
+
+            if (CooperativeTask != null)
+                return new CooperativeWait(timeout, events);
+
+            return ScriptEvents.Wait(events, ScriptEvents.Mark(), (int)(timeout * 1000));
+        }
+
+        /// <summary>
+        /// Run several API calls together in a single pass on the game thread, returning all of their results at once.
+        /// Normally every API call waits for the next frame, using this you only wait once for the whole batch.
+        /// Keep the functions short, avoid API.Pause or waiting methods inside a batch as they will freeze the game while they run.
+        /// Example:
+        /// ```py
+        /// hits, bandage, hasGump = API.Batch([
+        ///   lambda: API.Player.Hits,
+        ///   lambda: API.FindType(0x0E21, API.Backpack),
+        ///   lambda: API.HasGump()
+        /// ])
+        /// ```
+        /// </summary>
+        /// <param name="calls">A list of functions to call</param>
+        /// <returns>A list with the result of each function, in the same order</returns>
+        public PythonList Batch(IList<object> calls)
+        {
+            var results = new PythonList();
+
+            if (calls == null || calls.Count == 0)
+                return results;
+
+            ScriptProfile profile = ScriptProfile.Current;
+
+            object[] returned = InvokeOnMainThread
+            (() =>
+                {
+                    object[] r = new object[calls.Count];
+                    ScriptProfile.Current = profile; //Attribute the calls made inside of the batch to this script
+
+                    try
+                    {
+                        for (int i = 0; i < calls.Count; i++)
+                        {
+                            if (calls[i] != null && engine.Operations.IsCallable(calls[i]))
+                                r[i] = engine.Operations.Invoke(calls[i]);
+                        }
+                    }
+                    finally
+                    {
+                        ScriptProfile.Current = null;
+                    }
+
+                    return r;
+                }
+            );
+
+            foreach (object o in returned)
+                results.Add(o);
+
+            return results;
+        }
+
+        /// <summary>
+        /// Get timing info for a script: how many calls it made to the game thread, how long they waited and ran,
+        /// time spent per API method and how long the script was running vs waiting.
+        /// Example:
+        /// ```py
+        /// p = API.GetScriptProfile()
+        /// API.SysMsg(f"{p.MainThreadCalls} calls, {p.ExecutingMs:.1f}ms on the game thread")
+        /// for m in p.GetMethods():
+        ///   API.SysMsg(str(m))
+        /// ```
+        /// </summary>
+        /// <param name="name">Script file name, leave empty for the current script</param>
+        /// <returns>The profile, or None if the script wasn't found</returns>
+        public ScriptProfile GetScriptProfile(string name = "")
+        {
+            if (string.IsNullOrEmpty(name))
+                return CooperativeTask?.Profile ?? ScriptProfile.Current;
+
+            return InvokeOnMainThread(() => LegionScripting.LoadedScripts.FirstOrDefault(s => s.FileName == name)?.Profile);
+        }
+
+        /// <summary>
+        /// Get the profiles of all running python scripts, busiest on the game thread first.
+        /// Example:
+        /// ```py
+        /// for p in API.GetScriptProfiles():
+        ///   API.SysMsg(f"{p.Name}: {p.MainThreadCalls} calls, queued {p.QueuedMs:.0f}ms")
+        /// ```
+        /// </summary>
+        /// <returns>A list of profiles</returns>
+        public PythonList GetScriptProfiles()
+        {
+            var results = new PythonList();
+
+            ScriptProfile[] profiles = InvokeOnMainThread
+            (() => LegionScripting.LoadedScripts.Where(s => s.ScriptType == ScriptType.Python && s.IsPlaying)
+                .Select(s => s.Profile)
+                .OrderByDescending(p => p.ExecutingMs)
+                .ToArray()
+            );
+
+            foreach (ScriptProfile p in profiles)
+                results.Add(p);
+
+            return results;
+        }
+
+        /// <summary>
+        /// Get counts and handler times per received packet ID since login (or the last reset), most time first.
+        /// Each entry has ID, Name, Count, Bytes, HandlerMs, AverageHandlerMs, MaxHandlerMs, PluginMs and Histogram.
+        /// Example:
+        /// ```py
+        /// for p in API.GetPacketStats()[:5]:
+        ///   API.SysMsg(f"0x{p.ID:02X} {p.Name}: {p.Count}x, {p.HandlerMs:.1f}ms, max {p.MaxHandlerMs:.2f}ms")
+        /// ```
+        /// </summary>
+        /// <returns>A list of packet stats</returns>
+        public PythonList GetPacketStats()
+        {
+            var results = new PythonList();
+
+            foreach (PacketIdStats p in PacketHandlers.Handler.Statistics.GetAll())
+                results.Add(p);
+
+            return results;
+        }
+
+        /// <summary>
+        /// Clear the packet stats from API.GetPacketStats.
+        /// Example:
+        /// ```py
+        /// API.ResetPacketStats()
+        /// ```
+        /// </summary>
+        public void ResetPacketStats() => PacketHandlers.Handler.Statistics.Reset();
+
         /// <summary>
         /// Set a variable that is shared between scripts.
+        /// With API.SharedVar.Machine the variable is shared with the scripts of every client running on this computer,
+        /// those can only hold text, numbers, bools or None. The machine store holds a limited number of vars,
+        /// give vars you don't remove yourself a ttl.
         /// Example:
         /// ```py
         /// API.SetSharedVar("myVar", 10)
+        /// API.SetSharedVar("healer", API.Player.Name, API.SharedVar.Machine, 60)
         /// ```
         /// </summary>
         /// <param name="name">Name of the var</param>
         /// <param name="value">Value, can be a number, text, or *most* other objects too.</param>
-        public void SetSharedVar(string name, object value)
+        /// <param name="scope">Client (default) or Machine</param>
+        /// <param name="ttl">Machine vars only, seconds until the var is removed. 0 keeps it until you remove it</param>
+        public void SetSharedVar(string name, object value, SharedVar scope = SharedVar.Client, double ttl = 0)
         {
+            if (scope == SharedVar.Machine)
+            {
+                SharedVarStore.Machine.Set(name, value, ttl);
+                ScriptEvents.Signal(Events.SharedVar);
+                return;
+            }
+
             sharedVars[name] = value;
         }
 
@@ -272,9 +626,13 @@ namespace ClassicUO.LegionScripting
         /// ```
         /// </summary>
         /// <param name="name">Name of the var</param>
+        /// <param name="scope">Client (default) or Machine</param>
         /// <returns></returns>
-        public object GetSharedVar(string name)
+        public object GetSharedVar(string name, SharedVar scope = SharedVar.Client)
         {
+            if (scope == SharedVar.Machine)
+                return SharedVarStore.Machine.Get(name, out _);
+
             if (sharedVars.TryGetValue(name, out var v))
                 return v;
             return null;
@@ -288,8 +646,17 @@ namespace ClassicUO.LegionScripting
         /// ```
         /// </summary>
         /// <param name="name">Name of the var</param>
-        public void RemoveSharedVar(string name)
+        /// <param name="scope">Client (default) or Machine</param>
+        public void RemoveSharedVar(string name, SharedVar scope = SharedVar.Client)
         {
+            if (scope == SharedVar.Machine)
+            {
+                if (SharedVarStore.Machine.Remove(name))
+                    ScriptEvents.Signal(Events.SharedVar);
+
+                return;
+            }
+
             sharedVars.TryRemove(name, out _);
         }
 
@@ -300,11 +667,76 @@ namespace ClassicUO.LegionScripting
         /// API.ClearSharedVars()
         /// ```
         /// </summary>
-        public void ClearSharedVars()
+        /// <param name="scope">Client (default) or Machine</param>
+        public void ClearSharedVars(SharedVar scope = SharedVar.Client)
         {
+            if (scope == SharedVar.Machine)
+            {
+                SharedVarStore.Machine.Clear();
+                ScriptEvents.Signal(Events.SharedVar);
+                return;
+            }
+
             sharedVars.Clear();
         }
 
+        /// <summary>
+        /// Get the version of a machine shared variable. It changes every time the variable is set, use it with API.CompareAndSetSharedVar.
+        /// Example:
+        /// ```py
+        /// version = API.GetSharedVarVersion("lootTarget")
+        /// ```
+        /// </summary>
+        /// <param name="name">Name of the var</param>
+        /// <returns>The version, 0 if the var isn't set</returns>
+        public long GetSharedVarVersion(string name)
+        {
+            SharedVarStore.Machine.Get(name, out long version);
+
+            return version;
+        }
+
+        /// <summary>
+        /// Set a machine shared variable only if nobody changed it since you read its version, so two clients can't both claim the same thing.
+        /// Use version 0 to only set it if it isn't set yet.
+        /// Example:
+        /// ```py
+        /// # Only one client heals at a time, the claim runs out after 30 seconds unless the healer renews it
+        /// if API.CompareAndSetSharedVar("healer", 0, API.Player.Name, 30):
+        ///   API.SysMsg("I'm the healer")
+        /// ```
+        /// </summary>
+        /// <param name="name">Name of the var</param>
+        /// <param name="version">The version you read with API.GetSharedVarVersion</param>
+        /// <param name="value">The new value</param>
+        /// <param name="ttl">Seconds until the var is removed, 0 keeps it until you remove it</param>
+        /// <returns>True if the var was set</returns>
+        public bool CompareAndSetSharedVar(string name, long version, object value, double ttl = 0)
+        {
+            if (!SharedVarStore.Machine.CompareAndSet(name, version, value, ttl))
+                return false;
+
+            ScriptEvents.Signal(Events.SharedVar);
+
+            return true;
+        }
+
+        /// <summary>
+        /// Wait until a machine shared variable is set or removed by any client.
+        /// Example:
+        /// ```py
+        /// version = API.GetSharedVarVersion("healTarget")
+        /// if API.WaitForSharedVarChange("healTarget", version, 10):
+        ///   API.SysMsg(f"Heal {API.GetSharedVar('healTarget', API.SharedVar.Machine)}")
+        /// ```
+        /// </summary>
+        /// <param name="name">Name of the var</param>
+        /// <param name="version">The version you already know</param>
+        /// <param name="timeout">Seconds to wait</param>
+        /// <returns>True if the var changed, false if timed out</returns>
+        public bool WaitForSharedVarChange(string name, long version, double timeout = 5) =>
+            ScriptEvents.WaitUntil(sharedVarEvents, () => GetSharedVarVersion(name) != version, timeout);
+
         /// <summary>
         /// Close all gumps created by the API unless marked to remain open.
         /// </summary>
@@ -1086,31 +1518,28 @@ namespace ClassicUO.LegionScripting
         /// <returns>true/false if a path was generated</returns>
         public bool Pathfind(int x, int y, int z = int.MinValue, int distance = 1, bool wait = false, int timeout = 10)
         {
-            var pathFindStatus = InvokeOnMainThread
+            if(timeout > 30)
+                timeout = 30;
+
+            var request = InvokeOnMainThread
             (() =>
                 {
                     if (z == int.MinValue)
                         z = World.Map.GetTileZ(x, y);
 
-                    return Pathfinder.WalkTo(x, y, z, distance);
+                    return PathfindingService.Request(x, y, z, distance);
                 }
             );
 
-            if (!wait)
-                return pathFindStatus;
-
-            if(timeout > 30)
-                timeout = 30;
+            var pathFindStatus = WalkRequestedPath(request, timeout);
 
-            var expire = DateTime.Now.AddSeconds(timeout);
+            if (!wait || !pathFindStatus)
+                return pathFindStatus;
 
-            while (InvokeOnMainThread(()=>Pathfinder.AutoWalking))
+            if (!ScriptEvents.WaitUntil(pathfindingEvents, () => !InvokeOnMainThread(() => Pathfinder.AutoWalking), timeout))
             {
-                if (DateTime.Now >= expire)
-                {
-                    InvokeOnMainThread(Pathfinder.StopAutoWalk);
-                    return false;
-                }
+                InvokeOnMainThread(Pathfinder.StopAutoWalk);
+                return false;
             }
 
             InvokeOnMainThread(Pathfinder.StopAutoWalk);
@@ -1134,8 +1563,11 @@ namespace ClassicUO.LegionScripting
         /// <returns>true/false if a path was generated</returns>
         public bool PathfindEntity(uint entity, int distance = 1, bool wait = false, int timeout = 10)
         {
+            if(timeout > 30)
+                timeout = 30;
+
             int x = 0, y = 0, z = 0;
-            var pathFindStatus = InvokeOnMainThread
+            var request = InvokeOnMainThread
             (() =>
                 {
                     var mob = World.Get(entity);
@@ -1144,33 +1576,68 @@ namespace ClassicUO.LegionScripting
                         x = mob.X;
                         y = mob.Y;
                         z = mob.Z;
-                        return Pathfinder.WalkTo(x, y, z, distance);
+                        return PathfindingService.Request(x, y, z, distance);
                     }
 
-                    return false;
+                    return null;
                 }
             );
 
-            if(!wait || (x == 0 && y == 0))
+            var pathFindStatus = WalkRequestedPath(request, timeout);
+
+            if(!wait || !pathFindStatus || (x == 0 && y == 0))
                 return pathFindStatus;
 
-            if(timeout > 30)
-                timeout = 30;
+            if (!ScriptEvents.WaitUntil(pathfindingEvents, () => !InvokeOnMainThread(() => Pathfinder.AutoWalking), timeout))
+            {
+                InvokeOnMainThread(Pathfinder.StopAutoWalk);
+                return false;
+            }
 
-            var expire = DateTime.Now.AddSeconds(timeout);
+            InvokeOnMainThread(Pathfinder.StopAutoWalk);
+
+            return InvokeOnMainThread(()=>World.Player.DistanceFrom(new Vector2(x, y)) <= distance);
+        }
 
-            while (InvokeOnMainThread(()=>Pathfinder.AutoWalking))
+        /// <summary>
+        /// Wait for a background path search, then start walking it on the game thread.
+        /// If the player moved off the path meanwhile it is searched once more from where they are.
+        /// </summary>
+        private bool WalkRequestedPath(PathRequest request, int timeout)
+        {
+            for (int attempt = 0; attempt < 2 && request != null; attempt++)
             {
-                if (DateTime.Now >= expire)
+                if (!WaitBlocking(() => request.Wait(timeout)))
                 {
-                    InvokeOnMainThread(Pathfinder.StopAutoWalk);
+                    request.Cancel();
                     return false;
                 }
-            }
 
-            InvokeOnMainThread(Pathfinder.StopAutoWalk);
+                if (!request.Succeeded)
+                    return false;
 
-            return InvokeOnMainThread(()=>World.Player.DistanceFrom(new Vector2(x, y)) <= distance);
+                PathRequest done = request;
+                bool last = attempt == 1;
+
+                (bool walked, PathRequest retry) = InvokeOnMainThread
+                (() =>
+                    {
+                        if (Pathfinder.WalkPath(done))
+                            return (true, (PathRequest)null);
+
+                        bool moved = !last && World.Player != null && !World.Player.IsParalyzed;
+
+                        return (false, moved ? PathfindingService.Request(done.X, done.Y, done.Z, done.Distance) : null);
+                    }
+                );
+
+                if (walked)
+                    return true;
+
+                request = retry;
+            }
+
+            return false;
         }
 
         /// <summary>
@@ -1183,7 +1650,7 @@ namespace ClassicUO.LegionScripting
         /// ```
         /// </summary>
         /// <returns>true/false</returns>
-        public bool Pathfinding() => InvokeOnMainThread(() => Pathfinder.AutoWalking);
+        public bool Pathfinding() => InvokeOnMainThread(() => Pathfinder.AutoWalking || HierarchicalPathfinder.IsWalkingRoute);
 
         /// <summary>
         /// Cancel pathfinding.
@@ -1193,7 +1660,51 @@ namespace ClassicUO.LegionScripting
         ///   API.CancelPathfinding()
         /// ```
         /// </summary>
-        public void CancelPathfinding() => InvokeOnMainThread(Pathfinder.StopAutoWalk);
+        public void CancelPathfinding() => InvokeOnMainThread
+        (() =>
+            {
+                Pathfinder.StopAutoWalk();
+                HierarchicalPathfinder.StopRoute();
+            }
+        );
+
+        /// <summary>
+        /// Walk to a location far away, across the facet if needed.
+        /// The route is planned on a precomputed region graph and walked in short pieces with the regular pathfinder.
+        /// The first use on a facet builds the graph, which can take a few seconds, after that it is loaded from disk.
+        /// Example:
+        /// ```py
+        /// if API.PathfindLongRange(1414, 1515, wait=True):
+        ///   API.SysMsg("Arrived!")
+        /// ```
+        /// </summary>
+        /// <param name="x"></param>
+        /// <param name="y"></param>
+        /// <param name="distance">Distance away from goal to stop.</param>
+        /// <param name="wait">True/False if you want to wait until you arrive, get stuck or time out</param>
+        /// <param name="timeout">Seconds to wait, for the route search and for walking it when wait is True</param>
+        /// <returns>true/false if a route was found (and reached, when waiting)</returns>
+        public bool PathfindLongRange(int x, int y, int distance = 1, bool wait = false, int timeout = 300)
+        {
+            var routeTask = InvokeOnMainThread(() => HierarchicalPathfinder.FindRoute(x, y));
+
+            if (!WaitBlocking(() => routeTask.Wait(TimeSpan.FromSeconds(Math.Max(1, timeout)))) || routeTask.Result == null)
+                return false;
+
+            if (!InvokeOnMainThread(() => HierarchicalPathfinder.WalkRoute(routeTask.Result, distance)))
+                return false;
+
+            if (!wait)
+                return true;
+
+            if (!ScriptEvents.WaitUntil(pathfindingEvents, () => !InvokeOnMainThread(() => HierarchicalPathfinder.IsWalkingRoute), timeout))
+            {
+                CancelPathfinding();
+                return false;
+            }
+
+            return InvokeOnMainThread(() => World.Player.DistanceFrom(new Vector2(x, y)) <= distance);
+        }
 
         /// <summary>
         /// Attempt to build a path to a location.  This will fail with large distances.
@@ -1212,12 +1723,17 @@ namespace ClassicUO.LegionScripting
         /// <param name="z"></param>
         /// <param name="distance">Distance away from goal to stop.</param>
         /// <returns>Returns a list of positions to reach the goal. Returns null if cannot find path.</returns>
-        public PythonList GetPath(int x, int y, int z = int.MinValue, int distance = 1) => InvokeOnMainThread(() =>
+        public PythonList GetPath(int x, int y, int z = int.MinValue, int distance = 1)
         {
-            if (z == int.MinValue)
-                z = World.Map.GetTileZ(x, y);
+            var request = RequestPath(x, y, z, distance);
+
+            if (!WaitBlocking(() => request.Wait(30)))
+            {
+                request.Cancel();
+                return null;
+            }
 
-            var path = Pathfinder.GetPathTo(x, y, z, distance);
+            var path = request.Path;
             if (path is null)
             {
                 return null;
@@ -1231,6 +1747,30 @@ namespace ClassicUO.LegionScripting
             }
 
             return pythonList;
+        }
+
+        /// <summary>
+        /// Start searching for a path in the background without waiting for it.
+        /// Example:
+        /// ```py
+        /// req = API.RequestPath(1414, 1515)
+        /// while not req.IsCompleted:
+        ///   API.Pause(0.05)
+        /// if req.Succeeded:
+        ///   API.SysMsg(f"Path has {len(req.Path)} steps")
+        /// ```
+        /// </summary>
+        /// <param name="x"></param>
+        /// <param name="y"></param>
+        /// <param name="z"></param>
+        /// <param name="distance">Distance away from goal to stop.</param>
+        /// <returns>A PathRequest, check IsCompleted, Succeeded and Path. Call Cancel() to stop searching.</returns>
+        public PathRequest RequestPath(int x, int y, int z = int.MinValue, int distance = 1) => InvokeOnMainThread(() =>
+        {
+            if (z == int.MinValue)
+                z = World.Map.GetTileZ(x, y);
+
+            return PathfindingService.Request(x, y, z, distance);
         });
 
         /// <summary>
@@ -1370,10 +1910,6 @@ namespace ClassicUO.LegionScripting
         /// <returns>True if target was matching the type, or false if not/timed out</returns>
         public bool WaitForTarget(string targetType = "any", double timeout = 5)
         {
-            //Can't use Time.Ticks due to threading concerns
-            var expire = DateTime.UtcNow.AddSeconds(timeout);
-
-
             TargetType targetT = TargetType.Neutral;
 
             switch (targetType.ToLower())
@@ -1382,13 +1918,10 @@ namespace ClassicUO.LegionScripting
                 case "beneficial" or "ben": targetT = TargetType.Beneficial; break;
             }
 
-            while (!InvokeOnMainThread(() => { return TargetManager.IsTargeting && (TargetManager.TargetingType == targetT || targetType.ToLower() == "any"); }))
-            {
-                if (DateTime.UtcNow > expire)
-                    return false;
-            }
+            bool any = targetType.ToLower() == "any";
 
-            return true;
+            return ScriptEvents.WaitUntil
+                (targetEvents, () => InvokeOnMainThread(() => TargetManager.IsTargeting && (TargetManager.TargetingType == targetT || any)), timeout);
         }
 
         /// <summary>
@@ -1441,12 +1974,10 @@ namespace ClassicUO.LegionScripting
         /// <returns>The serial of the object targeted</returns>
         public uint RequestTarget(double timeout = 5)
         {
-            var expire = DateTime.Now.AddSeconds(timeout);
             InvokeOnMainThread(() => TargetManager.SetTargeting(CursorTarget.Internal, CursorType.Target, TargetType.Neutral));
 
-            while (DateTime.Now < expire)
-                if (!InvokeOnMainThread(() => TargetManager.IsTargeting))
-                    return TargetManager.LastTargetInfo.Serial;
+            if (ScriptEvents.WaitUntil(targetEvents, () => !InvokeOnMainThread(() => TargetManager.IsTargeting), timeout))
+                return TargetManager.LastTargetInfo.Serial;
 
             InvokeOnMainThread(() => TargetManager.Reset());
 
@@ -1484,16 +2015,10 @@ namespace ClassicUO.LegionScripting
         /// </example>
         public PyGameObject RequestAnyTarget(double timeout = 5)
         {
-            var expire = DateTime.Now.AddSeconds(timeout);
             InvokeOnMainThread(() => TargetManager.SetTargeting(CursorTarget.Internal, CursorType.Target, TargetType.Neutral));
 
-            while (DateTime.Now < expire)
+            if (ScriptEvents.WaitUntil(targetEvents, () => !InvokeOnMainThread(() => TargetManager.IsTargeting), timeout))
             {
-                if (InvokeOnMainThread(() => TargetManager.IsTargeting))
-                {
-                    continue;
-                }
-
                 return InvokeOnMainThread<PyGameObject>(static () =>
                 {
                     var info = TargetManager.LastTargetInfo;
@@ -1744,14 +2269,7 @@ namespace ClassicUO.LegionScripting
         public string ItemNameAndProps(uint serial, bool wait = false, int timeout = 10)
         {
             if (wait)
-            {
-                var expire = DateTime.UtcNow.AddSeconds(timeout);
-
-                while (!InvokeOnMainThread(() => World.OPL.Contains(serial)) && DateTime.UtcNow < expire)
-                {
-                    Thread.Sleep(100);
-                }
-            }
+                ScriptEvents.WaitUntil(oplEvents, () => InvokeOnMainThread(() => World.OPL.Contains(serial)), timeout);
 
             return InvokeOnMainThread
             (() =>
@@ -1965,22 +2483,14 @@ namespace ClassicUO.LegionScripting
         /// ```
         /// </summary>
         /// <param name="msg">The message to check for. Can be regex, prepend your msg with $</param>
+        /// <param name="cursor">Only check entries newer than this, see API.JournalCursor</param>
         /// <returns>True if message was found</returns>
-        public bool InJournal(string msg)
+        public bool InJournal(string msg, long cursor = 0)
         {
             if (string.IsNullOrEmpty(msg))
                 return false;
 
-            foreach (var je in JournalEntries.ToArray())
-            {
-                if (msg.StartsWith("$") && Regex.IsMatch(je.Text, msg.Substring(1)))
-                    return true;
-
-                if (je.Text.Contains(msg))
-                    return true;
-            }
-
-            return false;
+            return JournalEntries.Contains(new[] { msg }, cursor);
         }
 
         /// <summary>
@@ -1993,25 +2503,170 @@ namespace ClassicUO.LegionScripting
         /// ```
         /// </summary>
         /// <param name="msgs"></param>
+        /// <param name="cursor">Only check entries newer than this, see API.JournalCursor</param>
         /// <returns></returns>
-        public bool InJournalAny(IList<string> msgs)
+        public bool InJournalAny(IList<string> msgs, long cursor = 0)
         {
             if (msgs == null || msgs.Count == 0)
                 return false;
 
-            foreach (var je in JournalEntries.ToArray())
+            return JournalEntries.Contains(msgs, cursor);
+        }
+
+        /// <summary>
+        /// Get the current position of your journal. Pass it to other journal methods to only look at messages received after this point.
+        /// Example:
+        /// ```py
+        /// cursor = API.JournalCursor()
+        /// API.UseSkill("Hiding")
+        /// API.Pause(1)
+        /// if API.InJournal("You have hidden yourself well", cursor):
+        ///   API.SysMsg("Hidden!")
+        /// ```
+        /// </summary>
+        /// <returns>The sequence number of the newest journal entry</returns>
+        public long JournalCursor() => JournalEntries.LastSequence;
+
+        /// <summary>
+        /// Get journal entries received after a cursor.
+        /// Example:
+        /// ```py
+        /// cursor = API.JournalCursor()
+        /// while True:
+        ///   for entry in API.JournalEntriesSince(cursor):
+        ///     API.SysMsg(entry.Text)
+        ///   cursor = API.JournalCursor()
+        ///   API.Pause(1)
+        /// ```
+        /// </summary>
+        /// <param name="cursor">From API.JournalCursor</param>
+        /// <returns>A list of journal entries, oldest first</returns>
+        public JournalEntry[] JournalEntriesSince(long cursor) => JournalEntries.GetSince(cursor);
+
+        /// <summary>
+        /// Wait for a message to show up in your journal.
+        /// Example:
+        /// ```py
+        /// cursor = API.JournalCursor()
+        /// API.UseSkill("Hiding")
+        /// if API.WaitForJournal("You have hidden yourself well", 5, cursor):
+        ///   API.SysMsg("Hidden!")
+        /// ```
+        /// </summary>
+        /// <param name="msg">The message to wait for. Can be regex, prepend your msg with $</param>
+        /// <param name="timeout">Max duration in seconds to wait</param>
+        /// <param name="cursor">Only match entries newer than this, defaults to only new messages</param>
+        /// <returns>The matching journal entry, or None if timed out</returns>
+        public JournalEntry WaitForJournal(string msg, double timeout = 5, long cursor = -1)
+        {
+            if (string.IsNullOrEmpty(msg))
+                return null;
+
+            return WaitForJournalAny(new[] { msg }, timeout, cursor);
+        }
+
+        /// <summary>
+        /// Wait for *any* of the messages in this list to show up in your journal.
+        /// Example:
+        /// ```py
+        /// entry = API.WaitForJournalAny(["You put", "You fail"], 10)
+        /// if entry:
+        ///   API.SysMsg(entry.Text)
+        /// ```
+        /// </summary>
+        /// <param name="msgs">The messages to wait for. Can be regex, prepend your msgs with $</param>
+        /// <param name="timeout">Max duration in seconds to wait</param>
+        /// <param name="cursor">Only match entries newer than this, defaults to only new messages</param>
+        /// <returns>The matching journal entry, or None if timed out</returns>
+        public JournalEntry WaitForJournalAny(IList<string> msgs, double timeout = 5, long cursor = -1)
+        {
+            if (msgs == null || msgs.Count == 0)
+                return null;
+
+            if (cursor < 0)
+                cursor = JournalEntries.LastSequence;
+
+            return JournalEntries.WaitFor(msgs, cursor, (int)(timeout * 1000));
+        }
+
+        /// <summary>
+        /// Receive raw packets with these IDs as they are sent or received, instead of polling for what they change.
+        /// Packets wait in the hook until you read them, at most `capacity` of them. When full the oldest one is replaced,
+        /// or with dropOnOverflow the new one is dropped, hook.Dropped counts the lost packets.
+        /// Packet values are read with packet.ReadByte/ReadUInt16/ReadUInt32(offset), big endian like the protocol.
+        /// Example:
+        /// ```py
+        /// hook = API.HookPackets([0x0B]) # damage
+        /// while True:
+        ///   p = hook.Wait(30)
+        ///   if p:
+        ///     API.SysMsg(f"{p.ReadUInt32(1):X} took {p.ReadUInt16(5)} damage")
+        /// ```
+        /// Cooperative example:
+        /// ```py
+        /// # mode: cooperative
+        /// def main():
+        ///   hook = API.HookPackets([0xDD])
+        ///   while True:
+        ///     yield API.WaitForEvent([API.Events.Packet], 30)
+        ///     for p in hook.ReadAll():
+        ///       API.SysMsg(f"Gump {p.ReadUInt32(7)}")
+        /// ```
+        /// </summary>
+        /// <param name="ids">Packet IDs to receive</param>
+        /// <param name="incoming">Receive packets from the server</param>
+        /// <param name="outgoing">Receive packets the client sends</param>
+        /// <param name="capacity">Max packets kept until they are read</param>
+        /// <param name="dropOnOverflow">Drop new packets instead of the oldest ones when full</param>
+        /// <returns>The hook to read packets from</returns>
+        public PacketHook HookPackets(IList<int> ids, bool incoming = true, bool outgoing = false, int capacity = PacketHook.DEFAULT_CAPACITY, bool dropOnOverflow = false)
+        {
+            if (ids == null || ids.Count == 0)
+                return null;
+
+            var hook = new PacketHook(ids, incoming, outgoing, capacity, dropOnOverflow);
+
+            lock (packetHooks)
+                packetHooks.Add(hook);
+
+            PacketHooks.Add(hook);
+
+            return hook;
+        }
+
+        /// <summary>
+        /// Stop receiving packets on a hook, or on all of this script's hooks. Hooks are removed when the script stops.
+        /// Example:
+        /// ```py
+        /// API.UnhookPackets(hook)
+        /// ```
+        /// </summary>
+        /// <param name="hook">The hook from API.HookPackets, None for all of them</param>
+        public void UnhookPackets(PacketHook hook = null)
+        {
+            PacketHook[] hooks;
+
+            lock (packetHooks)
             {
-                foreach (var msg in msgs)
+                if (hook != null)
                 {
-                    if (msg.StartsWith("$") && Regex.IsMatch(je.Text, msg.Substring(1)))
-                        return true;
+                    if (!packetHooks.Remove(hook))
+                        return;
 
-                    if (je.Text.Contains(msg))
-                        return true;
+                    hooks = new[] { hook };
+                }
+                else
+                {
+                    hooks = packetHooks.ToArray();
+                    packetHooks.Clear();
                 }
             }
 
-            return false;
+            foreach (PacketHook h in hooks)
+            {
+                PacketHooks.Remove(h);
+                h.Close();
+            }
         }
 
         /// <summary>
@@ -2023,25 +2678,31 @@ namespace ClassicUO.LegionScripting
         /// </summary>
         public void ClearJournal()
         {
-            while (JournalEntries.TryDequeue(out _))
-            {
-            }
+            JournalEntries.Clear();
         }
 
         /// <summary>
         /// Pause the script.
+        /// In cooperative scripts this does not block, yield the result instead: `yield API.Pause(5)`
         /// Example:
         /// ```py
         /// API.Pause(5)
         /// ```
         /// </summary>
         /// <param name="seconds"></param>
-        public void Pause(double seconds)
+        public object Pause(double seconds)
         {
             if (seconds > 2000)
                 seconds = 2000;
 
+            if (CooperativeTask != null)
+                return new CooperativeWait(seconds);
+
+            long start = Stopwatch.GetTimestamp();
             Thread.Sleep((int)(seconds * 1000));
+            ScriptProfile.Current?.AddWait(Stopwatch.GetTimestamp() - start);
+
+            return null;
         }
 
         /// <summary>
@@ -2054,6 +2715,22 @@ namespace ClassicUO.LegionScripting
         public void Stop()
         {
             int t = Thread.CurrentThread.ManagedThreadId;
+            CooperativeTask task = CooperativeTask;
+
+            if (task != null)
+            {
+                // Don't wait on the game thread from a shared worker, the generator is closed once it yields
+                CooperativeScheduler.Stop(task);
+                QueuedPythonActions.Enqueue
+                (() =>
+                    {
+                        if (task.Script.CooperativeTask == task)
+                            LegionScripting.StopScript(task.Script);
+                    }
+                );
+
+                return;
+            }
 
             InvokeOnMainThread
             (() =>
@@ -2262,6 +2939,109 @@ namespace ClassicUO.LegionScripting
         /// <returns></returns>
         public Mobile[] GetAllMobiles() => InvokeOnMainThread(() => { return World.Mobiles.Values.ToArray(); });
 
+        /// <summary>
+        /// Create a filter for API.QueryEntities. Keep it and reuse it instead of creating a new one every time.
+        /// Example:
+        /// ```py
+        /// q = API.EntityQuery(notoriety=[API.Notoriety.Gray, API.Notoriety.Criminal], maxDistance=12, sortBy=API.QuerySort.HitsPercent, limit=5)
+        /// ```
+        /// </summary>
+        /// <param name="mobiles">Include mobiles</param>
+        /// <param name="items">Include items</param>
+        /// <param name="notoriety">List of notorieties to include, None for all</param>
+        /// <param name="graphics">List of graphics to include, None for all</param>
+        /// <param name="hue">Hue to match, -1 for any</param>
+        /// <param name="maxDistance">Max distance from the player, -1 for any</param>
+        /// <param name="container">Only items directly in this container, -1 for any</param>
+        /// <param name="requiredFlags">Flags the entity must have (Frozen 0x01, Poisoned 0x04, YellowBar 0x08, WarMode 0x40, Hidden 0x80)</param>
+        /// <param name="excludedFlags">Flags the entity must not have</param>
+        /// <param name="sortBy">API.QuerySort value</param>
+        /// <param name="descending">Sort from high to low</param>
+        /// <param name="limit">Max results, 0 for no limit</param>
+        /// <returns>A reusable query</returns>
+        public PyEntityQuery EntityQuery
+        (
+            bool mobiles = true, bool items = false, IList<Notoriety> notoriety = null, IList<int> graphics = null, int hue = -1, int maxDistance = -1,
+            long container = -1, int requiredFlags = 0, int excludedFlags = 0, QuerySort sortBy = QuerySort.Distance, bool descending = false, int limit = 0
+        ) => new()
+        {
+            Mobiles = mobiles,
+            Items = items,
+            Notoriety = notoriety != null ? new HashSet<Notoriety>(notoriety) : null,
+            Graphics = graphics != null ? new HashSet<ushort>(graphics.Select(g => (ushort)g)) : null,
+            Hue = hue,
+            MaxDistance = maxDistance,
+            Container = container,
+            RequiredFlags = requiredFlags,
+            ExcludedFlags = excludedFlags,
+            SortBy = sortBy,
+            Descending = descending,
+            Limit = limit
+        };
+
+        /// <summary>
+        /// Find entities matching a query, returning their values as parallel lists instead of objects.
+        /// This is much faster than reading attributes from many mobiles or items, and does not wait for the game thread.
+        /// Example:
+        /// ```py
+        /// q = API.EntityQuery(notoriety=[API.Notoriety.Enemy, API.Notoriety.Murderer], maxDistance=10, sortBy=API.QuerySort.HitsPercent)
+        /// while True:
+        ///   r = API.QueryEntities(q)
+        ///   if r.Count > 0:
+        ///     API.SysMsg(f"Weakest: {r.Serial[0]} at {r.Distance[0]} tiles with {r.Hits[0]}/{r.HitsMax[0]}")
+        ///   API.Pause(0.5)
+        /// ```
+        /// </summary>
+        /// <param name="query">Query from API.EntityQuery</param>
+        /// <returns>Results with Count, Serial, X, Y, Z, Distance, Hits, HitsMax, Graphic and Hue lists</returns>
+        public PyQueryResult QueryEntities(PyEntityQuery query)
+        {
+            query ??= new PyEntityQuery();
+
+            WorldSnapshot snapshot = WorldSnapshot.Current;
+            var matches = new List<EntitySnapshot>();
+
+            if (query.Mobiles)
+                Collect(snapshot.Mobiles.Values);
+
+            if (query.Items)
+                Collect(snapshot.Items.Values);
+
+            Comparison<EntitySnapshot> comparison = query.GetComparison();
+
+            if (comparison != null)
+                matches.Sort(comparison);
+
+            if (query.Limit > 0 && matches.Count > query.Limit)
+                matches.RemoveRange(query.Limit, matches.Count - query.Limit);
+
+            return new PyQueryResult(matches);
+
+            void Collect(IEnumerable<EntitySnapshot> entities)
+            {
+                foreach (EntitySnapshot e in entities)
+                {
+                    if (query.Matches(e, snapshot.PlayerSerial) && (!query.ExcludeIgnored || !OnIgnoreList(e.Serial)))
+                        matches.Add(e);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Get a read only copy of the items and mobiles the client knows about.
+        /// This does not wait for the game thread, the copy can be up to a few frames old.
+        /// Use it instead of many FindItem/FindMobile calls when slightly old values are fine.
+        /// Example:
+        /// ```py
+        /// snap = API.GetWorldSnapshot()
+        /// for mob in snap.Mobiles.Values:
+        ///   if mob.Distance < 5:
+        ///     API.SysMsg(f"{mob.Serial} hits: {mob.Hits}/{mob.HitsMax}")
+        /// ```
+        /// </summary>
+        /// <returns>The latest world snapshot</returns>
+        public WorldSnapshot GetWorldSnapshot() => WorldSnapshot.Current;
+
         /// <summary>
         /// Get the tile at a location.
         /// Example:
@@ -2931,6 +3711,41 @@ namespace ClassicUO.LegionScripting
         /// <returns></returns>
         public bool IsProcessingMoveQue() => InvokeOnMainThread(() => !MoveItemQueue.Instance.IsEmpty);
 
+        /// <summary>
+        /// Get how fast the move item queue is going. Moves are sent as fast as the server accepts them,
+        /// so this shows what the server allows right now.
+        /// Keys: queued, in_flight, sent, accepted, denied, timed_out, dropped, per_second, round_trip (ms), and delay (ms between moves).
+        /// Example:
+        /// ```py
+        /// stats = API.GetMoveQueueStats()
+        /// API.SysMsg(f"{stats['per_second']:.1f} moves/s, {stats['round_trip']:.0f} ms")
+        /// ```
+        /// </summary>
+        /// <returns>A dictionary of stats, empty when not in game</returns>
+        public PythonDictionary GetMoveQueueStats() => InvokeOnMainThread
+        (() =>
+            {
+                var stats = new PythonDictionary();
+                ActionScheduler scheduler = ActionScheduler.Instance;
+
+                if (scheduler == null)
+                    return stats;
+
+                stats["queued"] = scheduler.Count(ActionKind.Move);
+                stats["in_flight"] = scheduler.InFlight;
+                stats["sent"] = scheduler.Sent;
+                stats["accepted"] = scheduler.Accepted;
+                stats["denied"] = scheduler.Denied;
+                stats["timed_out"] = scheduler.TimedOut;
+                stats["dropped"] = scheduler.Dropped;
+                stats["per_second"] = scheduler.PerSecond;
+                stats["round_trip"] = scheduler.RoundTrip;
+                stats["delay"] = scheduler.Delay;
+
+                return stats;
+            }
+        );
+
         /// <summary>
         /// Save a variable that persists between sessions and scripts.
         /// Example:
@@ -2992,6 +3807,50 @@ namespace ClassicUO.LegionScripting
 
             return PersistentVars.GetVar(scope, name, defaultValue);
         }
+
+        /// <summary>
+        /// Save several persistent variables at once.
+        /// Example:
+        /// ```py
+        /// API.SavePersistentVars({"TotalKills": "5", "TotalDeaths": "1"}, API.PersistentVar.Char)
+        /// ```
+        /// </summary>
+        /// <param name="values">A dictionary of names and values</param>
+        /// <param name="scope"></param>
+        public void SavePersistentVars(IDictionary<object, object> values, PersistentVar scope)
+        {
+            if (values == null || values.Count == 0)
+                return;
+
+            var pairs = new List<KeyValuePair<string, string>>(values.Count);
+
+            foreach (var pair in values)
+                pairs.Add(new KeyValuePair<string, string>(pair.Key?.ToString(), pair.Value?.ToString()));
+
+            PersistentVars.SaveVars(scope, pairs);
+        }
+
+        /// <summary>
+        /// Get several persistent variables at once.
+        /// Example:
+        /// ```py
+        /// vars = API.GetPersistentVars(["TotalKills", "TotalDeaths"], "0", API.PersistentVar.Char)
+        /// API.SysMsg(vars["TotalKills"])
+        /// ```
+        /// </summary>
+        /// <param name="names">The names to get, or None for all variables of the scope</param>
+        /// <param name="defaultValue">The value used for names that were not saved</param>
+        /// <param name="scope"></param>
+        /// <returns>A dictionary of names and values</returns>
+        public PythonDictionary GetPersistentVars(IList<object> names, string defaultValue, PersistentVar scope)
+        {
+            var result = new PythonDictionary();
+
+            foreach (var pair in PersistentVars.GetVars(scope, names?.Select(n => n?.ToString()), defaultValue))
+                result[pair.Key] = pair.Value;
+
+            return result;
+        }
         #endregion
     }
 }
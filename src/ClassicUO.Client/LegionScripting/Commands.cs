@@ -955,6 +955,7 @@ namespace ClassicUO.LegionScripting
         public static bool CancelPathfind(string command, Argument[] args, bool quiet, bool force)
         {
             Pathfinder.StopAutoWalk();
+            HierarchicalPathfinder.StopRoute();
             return true;
         }
     }
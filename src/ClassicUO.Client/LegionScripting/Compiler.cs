@@ -0,0 +1,190 @@
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+
+namespace LScript
+{
+    /// <summary>
+    /// A statement of a compiled script. Control statements know where they go,
+    /// so taking a branch or leaving a loop doesn't walk the statements in between.
+    /// </summary>
+    internal sealed class Instruction
+    {
+        public readonly ASTNode Statement;
+
+        /// <summary>
+        /// The keyword, modifier or command starting the statement, null for an empty statement.
+        /// </summary>
+        public readonly ASTNode Node;
+
+        /// <summary>
+        /// if, elseif, else: the next elseif, else or endif of the same if.
+        /// while, for, foreach, break: the end of the loop.
+        /// endwhile, endfor, continue: the start of the loop.
+        /// -1 when there is none.
+        /// </summary>
+        public int Jump = -1;
+
+        /// <summary>
+        /// elseif, else: the endif closing the if. break: the start of the loop. -1 when there is none.
+        /// </summary>
+        public int Match = -1;
+
+        /// <summary>
+        /// for: the number of iterations, created the first time the loop runs.
+        /// </summary>
+        public Argument Limit;
+
+        public Instruction(ASTNode statement)
+        {
+            Statement = statement;
+            Node = statement.FirstChild();
+        }
+
+        public int LineNumber => Statement.LineNumber;
+    }
+
+    /// <summary>
+    /// Lowers the statements of a script into a flat list of <see cref="Instruction"/>s, with the jump targets of
+    /// if, while, for and break resolved ahead of time. The blocks are matched the same way the interpreter used to walk them
+    /// at run time, so malformed scripts fail at the same statements as before.
+    /// </summary>
+    internal static class Compiler
+    {
+        private static readonly ASTNodeType[] _if = { ASTNodeType.IF };
+        private static readonly ASTNodeType[] _endIf = { ASTNodeType.ENDIF };
+        private static readonly ASTNodeType[] _clauses = { ASTNodeType.ELSEIF, ASTNodeType.ELSE, ASTNodeType.ENDIF };
+        private static readonly ASTNodeType[] _while = { ASTNodeType.WHILE };
+        private static readonly ASTNodeType[] _endWhile = { ASTNodeType.ENDWHILE };
+        private static readonly ASTNodeType[] _for = { ASTNodeType.FOR, ASTNodeType.FOREACH };
+        private static readonly ASTNodeType[] _endFor = { ASTNodeType.ENDFOR };
+        private static readonly ASTNodeType[] _loops = { ASTNodeType.WHILE, ASTNodeType.FOR, ASTNodeType.FOREACH };
+        private static readonly ASTNodeType[] _loopEnds = { ASTNodeType.ENDWHILE, ASTNodeType.ENDFOR };
+
+        /// <param name="root">The script node returned by the <see cref="Lexer"/></param>
+        /// <param name="lines">Filled with the instruction each line starts at, for goto</param>
+        /// <param name="variables">Filled with the names scripts can declare, the foreach variables</param>
+        /// <param name="literals">Filled with the parsed value of the number literals</param>
+        public static Instruction[] Compile(ASTNode root, Dictionary<int, int> lines, HashSet<string> variables, Dictionary<ASTNode, IComparable> literals)
+        {
+            var code = new List<Instruction>();
+
+            for (ASTNode statement = root.FirstChild(); statement != null; statement = statement.Next())
+            {
+                lines[statement.LineNumber] = code.Count;
+                code.Add(new Instruction(statement));
+                ParseLiterals(statement, literals);
+            }
+
+            Instruction[] result = code.ToArray();
+
+            for (int i = 0; i < result.Length; i++)
+            {
+                Instruction ins = result[i];
+
+                if (ins.Node == null)
+                    continue;
+
+                switch (ins.Node.Type)
+                {
+                    case ASTNodeType.IF:
+                        ins.Jump = Find(result, i + 1, 1, _if, _clauses, _endIf);
+                        break;
+                    case ASTNodeType.ELSEIF:
+                    case ASTNodeType.ELSE:
+                        ins.Jump = Find(result, i + 1, 1, _if, _clauses, _endIf);
+                        ins.Match = Find(result, i + 1, 1, _if, _endIf, _endIf);
+                        break;
+                    case ASTNodeType.WHILE:
+                        ins.Jump = Find(result, i + 1, 1, _while, _endWhile, _endWhile);
+                        break;
+                    case ASTNodeType.ENDWHILE:
+                        ins.Jump = Find(result, i - 1, -1, _endWhile, _while, _while);
+                        break;
+                    case ASTNodeType.FOREACH:
+                        ASTNode name = ins.Node.FirstChild();
+
+                        if (name != null)
+                            variables.Add(name.Lexeme);
+
+                        goto case ASTNodeType.FOR;
+                    case ASTNodeType.FOR:
+                        ins.Jump = Find(result, i + 1, 1, _for, _endFor, _endFor);
+                        break;
+                    case ASTNodeType.ENDFOR:
+                        ins.Jump = Find(result, i - 1, -1, _endFor, _for, _for);
+                        break;
+                    case ASTNodeType.BREAK:
+                        ins.Jump = Find(result, i + 1, 1, _loops, _loopEnds, _loopEnds);
+                        ins.Match = Find(result, i - 1, -1, _loopEnds, _loops, _loops);
+                        break;
+                    case ASTNodeType.CONTINUE:
+                        ins.Jump = Find(result, i - 1, -1, _loopEnds, _loops, _loops);
+                        break;
+                }
+            }
+
+            return result;
+        }
+
+        /// <summary>
+        /// Walk from <paramref name="start"/> to the first of <paramref name="targets"/> that isn't inside a nested block.
+        /// </summary>
+        private static int Find(Instruction[] code, int start, int step, ASTNodeType[] opening, ASTNodeType[] targets, ASTNodeType[] closing)
+        {
+            int depth = 0;
+
+            for (int i = start; i >= 0 && i < code.Length; i += step)
+            {
+                ASTNode node = code[i].Node;
+
+                if (node == null)
+                    continue;
+
+                if (Array.IndexOf(opening, node.Type) >= 0)
+                {
+                    depth++;
+                }
+                else if (depth == 0 && Array.IndexOf(targets, node.Type) >= 0)
+                {
+                    return i;
+                }
+                else if (Array.IndexOf(closing, node.Type) >= 0)
+                {
+                    depth--;
+                }
+            }
+
+            return -1;
+        }
+
+        private static void ParseLiterals(ASTNode node, Dictionary<ASTNode, IComparable> literals)
+        {
+            for (ASTNode child = node.FirstChild(); child != null; child = child.Next())
+            {
+                switch (child.Type)
+                {
+                    case ASTNodeType.INTEGER:
+                        if (int.TryParse(child.Lexeme, out int i))
+                            literals[child] = i;
+
+                        break;
+                    case ASTNodeType.SERIAL:
+                        if (uint.TryParse(child.Lexeme.Substring(2), NumberStyles.HexNumber, Interpreter.Culture, out uint u))
+                            literals[child] = u;
+
+                        break;
+                    case ASTNodeType.DOUBLE:
+                        if (double.TryParse(child.Lexeme, out double d))
+                            literals[child] = d;
+
+                        break;
+                    default:
+                        ParseLiterals(child, literals);
+
+                        break;
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,529 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Threading;
+using ClassicUO.Game;
+using ClassicUO.Utility.Logging;
+using IronPython.Runtime;
+using Microsoft.Scripting.Hosting;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Runs cooperative python scripts as generators on a small set of worker threads instead of one thread per script.
+    /// A cooperative script is marked with a <c># mode: cooperative</c> line and defines a generator function named <c>main</c>.
+    /// Every <c>yield</c> hands the worker to the next ready script:
+    /// <c>yield</c> (None) reschedules right away, <c>yield 0.5</c> or <c>yield API.Pause(0.5)</c> sleeps,
+    /// <c>ev = yield API.WaitForEvent([...], timeout)</c> sleeps until one of the events happens.
+    /// Each script gets its own engine from <see cref="PythonEnginePool"/>, it is returned when the script ends.
+    /// Waits for something to happen in game (WaitForTarget, WaitForJournal, ...) are refused, they would hold a worker for as long as they wait.
+    /// API calls still wait for the game thread, while a worker does that a spare one runs the other scripts.
+    /// Stopping a script closes its generator at the next yield point, it is never aborted.
+    /// </summary>
+    internal static class CooperativeScheduler
+    {
+        public const string MODE_MARKER = "# mode: cooperative";
+
+        private const int WORKER_COUNT = 2;
+        private const int MAX_WORKERS = 8;
+        private const int IDLE_WAIT_MS = 250;
+
+        /// <summary>
+        /// Spare workers stop after being idle this long.
+        /// </summary>
+        private const int SPARE_IDLE_MS = 10_000;
+        private const int JOIN_TIMEOUT_MS = 1000;
+        private const string STEP_SOURCE =
+            "def _coop_step(gen, value):\n" +
+            "    try:\n" +
+            "        return (True, gen.send(value))\n" +
+            "    except StopIteration:\n" +
+            "        return (False, None)\n";
+
+        [ThreadStatic] private static bool _isWorker;
+
+        private static readonly object _lock = new object();
+        private static readonly LinkedList<CooperativeTask> _tasks = new();
+        private static readonly List<Thread> _workers = new();
+        private static readonly Stopwatch _clock = Stopwatch.StartNew();
+        private static int _blocked, _generation;
+        private static bool _subscribed;
+
+        public static long Now => _clock.ElapsedMilliseconds;
+
+        public static int Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _tasks.Count;
+            }
+        }
+
+        public static bool IsCooperative(ScriptFile script)
+        {
+            if (script.FileContents == null)
+                return false;
+
+            foreach (string line in script.FileContents)
+            {
+                string trimmed = line.Trim();
+
+                if (trimmed.Length == 0)
+                    continue;
+
+                if (!trimmed.StartsWith("#"))
+                    return false;
+
+                if (string.Equals(trimmed, MODE_MARKER, StringComparison.OrdinalIgnoreCase))
+                    return true;
+            }
+
+            return false;
+        }
+
+        public static CooperativeTask Start(ScriptFile script)
+        {
+            CooperativeTask task = new CooperativeTask(script);
+
+            lock (_lock)
+            {
+                EnsureStarted();
+                _tasks.AddLast(task);
+                Monitor.PulseAll(_lock);
+            }
+
+            return task;
+        }
+
+        /// <summary>
+        /// Ask the task to stop, its generator is closed the next time a worker picks it up.
+        /// </summary>
+        public static void Stop(CooperativeTask task)
+        {
+            if (task == null)
+                return;
+
+            lock (_lock)
+            {
+                task.Cancelled = true;
+                Monitor.PulseAll(_lock);
+            }
+        }
+
+        /// <summary>
+        /// Stop the workers, close the generators of the tasks left and return their engines.
+        /// </summary>
+        public static void Shutdown()
+        {
+            List<Thread> workers;
+            List<CooperativeTask> tasks;
+
+            lock (_lock)
+            {
+                // Workers of an older generation stop at their next pick, even the ones that don't stop in time
+                _generation++;
+                workers = new List<Thread>(_workers);
+                _workers.Clear();
+                Monitor.PulseAll(_lock);
+            }
+
+            long deadline = Now + JOIN_TIMEOUT_MS;
+
+            foreach (Thread worker in workers)
+            {
+                if (!worker.Join((int)Math.Max(0, deadline - Now)))
+                    Log.Warn($"{worker.Name} didn't stop, a script is still running on it");
+            }
+
+            lock (_lock)
+            {
+                tasks = new List<CooperativeTask>(_tasks);
+                _tasks.Clear();
+            }
+
+            foreach (CooperativeTask task in tasks)
+            {
+                Close(task);
+                task.ReleaseEngine();
+            }
+        }
+
+        /// <summary>
+        /// Call before a worker blocks on the game thread, like an API call waiting for the next frame.
+        /// A spare worker is started when fewer than <see cref="WORKER_COUNT"/> would be left to run the other scripts.
+        /// </summary>
+        public static void BeginBlocking()
+        {
+            if (!_isWorker)
+                return;
+
+            lock (_lock)
+            {
+                _blocked++;
+
+                if (_workers.Count > 0 && _workers.Count - _blocked < WORKER_COUNT && _workers.Count < MAX_WORKERS)
+                    StartWorker();
+            }
+        }
+
+        public static void EndBlocking()
+        {
+            if (!_isWorker)
+                return;
+
+            lock (_lock)
+                _blocked--;
+        }
+
+        /// <summary>
+        /// Throw when called from a cooperative script, for waits that last until something happens in game.
+        /// </summary>
+        public static void RefuseWait()
+        {
+            if (_isWorker)
+                throw new InvalidOperationException("Cooperative scripts can't wait here, yield API.WaitForEvent(...) or API.Pause(...) instead");
+        }
+
+        private static void EnsureStarted()
+        {
+            if (!_subscribed)
+            {
+                _subscribed = true;
+                ScriptEvents.Signaled += OnEventSignaled;
+            }
+
+            while (_workers.Count < WORKER_COUNT)
+                StartWorker();
+        }
+
+        private static void StartWorker()
+        {
+            int generation = _generation;
+
+            var worker = new Thread(() => WorkerLoop(generation))
+            {
+                IsBackground = true,
+                Name = $"Cooperative Python {_workers.Count + 1}"
+            };
+
+            _workers.Add(worker);
+            worker.Start();
+        }
+
+        private static void OnEventSignaled()
+        {
+            lock (_lock)
+                Monitor.PulseAll(_lock);
+        }
+
+        private static void WorkerLoop(int generation)
+        {
+            _isWorker = true;
+
+            while (true)
+            {
+                CooperativeTask task;
+
+                lock (_lock)
+                {
+                    long idleSince = Now;
+
+                    while (true)
+                    {
+                        if (generation != _generation || _workers.Count - _blocked > WORKER_COUNT && Now - idleSince > SPARE_IDLE_MS)
+                        {
+                            _workers.Remove(Thread.CurrentThread);
+
+                            return;
+                        }
+
+                        if ((task = TakeReady(out int waitMs)) != null)
+                            break;
+
+                        Monitor.Wait(_lock, waitMs);
+                    }
+                }
+
+                task.Profile.BeginRun();
+
+                try
+                {
+                    Run(task);
+                }
+                catch (Exception e)
+                {
+                    Log.Error($"Cooperative scheduler failed running {task.Script.FileName}: {e}");
+                    task.Finished = true;
+                }
+                finally
+                {
+                    task.Profile.EndRun();
+                }
+
+                if (task.Finished)
+                    task.ReleaseEngine();
+
+                lock (_lock)
+                {
+                    task.Running = false;
+
+                    if (!task.Finished)
+                        _tasks.AddLast(task);
+
+                    Monitor.PulseAll(_lock);
+                }
+
+                if (task.Finished)
+                {
+                    API.QueuedPythonActions.Enqueue
+                    (() =>
+                        {
+                            // The script may have been stopped and started again while this task was closing
+                            if (task.Script.CooperativeTask == task)
+                                LegionScripting.StopScript(task.Script);
+                        }
+                    );
+                }
+            }
+        }
+
+        /// <summary>
+        /// First task in round robin order that can run now, removed from the list while it runs.
+        /// </summary>
+        private static CooperativeTask TakeReady(out int waitMs)
+        {
+            waitMs = IDLE_WAIT_MS;
+            long now = Now;
+
+            for (LinkedListNode<CooperativeTask> node = _tasks.First; node != null; node = node.Next)
+            {
+                CooperativeTask task = node.Value;
+
+                if (task.IsReady(now))
+                {
+                    _tasks.Remove(node);
+                    task.Running = true;
+
+                    return task;
+                }
+
+                if (task.WakeAt > now)
+                    waitMs = (int)Math.Min(waitMs, task.WakeAt - now);
+            }
+
+            return null;
+        }
+
+        private static void Run(CooperativeTask task)
+        {
+            if (task.Cancelled)
+            {
+                Close(task);
+
+                return;
+            }
+
+            try
+            {
+                if (task.Generator == null)
+                {
+                    if (!Begin(task))
+                    {
+                        task.Finished = true;
+
+                        return;
+                    }
+                }
+
+                object sendValue = task.TakeWaitResult();
+                var result = (PythonTuple)task.Engine.Engine.Operations.Invoke(task.StepFunc, task.Generator, sendValue);
+
+                if (!(bool)result[0])
+                {
+                    task.Finished = true;
+
+                    return;
+                }
+
+                task.Schedule(result[1]);
+
+                if (task.Cancelled)
+                    Close(task);
+            }
+            catch (Exception e)
+            {
+                PrintError(task, e);
+                task.Finished = true;
+            }
+        }
+
+        /// <summary>
+        /// Rent the script's engine, run the module body and create the main generator.
+        /// </summary>
+        /// <returns>False if there is nothing left to schedule</returns>
+        private static bool Begin(CooperativeTask task)
+        {
+            ScriptFile script = task.Script;
+
+            // Renting can create an engine, which is slow, so it happens here instead of on the game thread
+            task.Engine = PythonEnginePool.Rent(Path.GetDirectoryName(script.FullPath));
+            ScriptEngine engine = task.Engine.Engine;
+            task.API.Engine = engine;
+
+            ScriptScope helpers = engine.CreateScope();
+            engine.Execute(STEP_SOURCE, helpers);
+            task.StepFunc = helpers.GetVariable("_coop_step");
+
+            ScriptScope scope = engine.CreateScope();
+            engine.GetBuiltinModule().SetVariable("API", task.API);
+            task.Engine.GetCompiled(script.FullPath, () => script.FileContentsJoined).Execute(scope);
+
+            if (!scope.TryGetVariable("main", out object main))
+                return false;
+
+            object gen = engine.Operations.Invoke(main);
+
+            if (gen is not PythonGenerator)
+                return false;
+
+            task.Generator = gen;
+
+            return true;
+        }
+
+        private static void Close(CooperativeTask task)
+        {
+            task.Finished = true;
+
+            if (task.Generator == null)
+                return;
+
+            try
+            {
+                task.Engine.Engine.Operations.InvokeMember(task.Generator, "close");
+            }
+            catch (Exception e)
+            {
+                PrintError(task, e);
+            }
+        }
+
+        private static void PrintError(CooperativeTask task, Exception e)
+        {
+            string error = task.Engine != null ? task.Engine.Engine.GetService<ExceptionOperations>().FormatException(e) : e.Message;
+
+            GameActions.Print("Python Script Error:");
+            GameActions.Print(error);
+        }
+    }
+
+    /// <summary>
+    /// Returned by API.Pause and API.WaitForEvent in cooperative scripts, yield it to give up the worker until it is done.
+    /// </summary>
+    internal sealed class CooperativeWait
+    {
+        public CooperativeWait(double seconds, IList<API.Events> events = null)
+        {
+            Seconds = seconds;
+            Events = events;
+            Mark = events != null ? ScriptEvents.Mark() : null;
+        }
+
+        public double Seconds { get; }
+        public IList<API.Events> Events { get; }
+        public long[] Mark { get; }
+    }
+
+    internal sealed class CooperativeTask
+    {
+        private CooperativeWait _wait;
+        private API.Events? _firedEvent;
+
+        public CooperativeTask(ScriptFile script)
+        {
+            Script = script;
+            API = new API(null)
+            {
+                CooperativeTask = this
+            };
+        }
+
+        public ScriptFile Script { get; }
+        public API API { get; }
+        public ScriptProfile Profile => Script.Profile;
+
+        /// <summary>
+        /// Rented when the task first runs, returned when it ends.
+        /// </summary>
+        public PooledPythonEngine Engine;
+        public object StepFunc;
+        public object Generator;
+        public long WakeAt;
+        public volatile bool Cancelled;
+        public bool Running, Finished;
+
+        public bool IsReady(long now)
+        {
+            if (Running)
+                return false;
+
+            if (Cancelled || Generator == null || now >= WakeAt)
+                return true;
+
+            if (_wait?.Events != null && (_firedEvent = ScriptEvents.Fired(_wait.Events, _wait.Mark)) != null)
+                return true;
+
+            return false;
+        }
+
+        /// <summary>
+        /// Decide when to run next from the value the generator yielded.
+        /// </summary>
+        public void Schedule(object yielded)
+        {
+            _wait = null;
+            _firedEvent = null;
+
+            switch (yielded)
+            {
+                case CooperativeWait wait:
+                    _wait = wait;
+                    WakeAt = CooperativeScheduler.Now + (long)(Math.Max(0, wait.Seconds) * 1000);
+
+                    break;
+
+                case IConvertible c when yielded is not string:
+                    WakeAt = CooperativeScheduler.Now + (long)(Math.Max(0, c.ToDouble(null)) * 1000);
+
+                    break;
+
+                default:
+                    WakeAt = 0;
+
+                    break;
+            }
+        }
+
+        public void ReleaseEngine()
+        {
+            PythonEnginePool.Return(Engine, true);
+            Engine = null;
+            StepFunc = null;
+            Generator = null;
+        }
+
+        /// <summary>
+        /// Value sent back into the generator, the event that ended a WaitForEvent or None.
+        /// </summary>
+        public object TakeWaitResult()
+        {
+            object result = _wait?.Events != null ? _firedEvent ?? ScriptEvents.Fired(_wait.Events, _wait.Mark) : null;
+            _wait = null;
+            _firedEvent = null;
+
+            return result;
+        }
+    }
+}
@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.Diagnostics;
 using System.Globalization;
 using ClassicUO;
 using ClassicUO.Game;
@@ -94,6 +95,9 @@ namespace LScript
         public readonly ASTNode StartNode;
         public readonly Scope Parent;
 
+        // The loop counter of a for or foreach scope
+        public int Iteration;
+
         public Scope(Scope parent, ASTNode start)
         {
             Parent = parent;
@@ -126,10 +130,20 @@ namespace LScript
         private ASTNode _node;
         private Script _script;
 
+        // Only the names a script can declare are looked up in its scopes
+        private readonly bool _variable;
+
+        // Literals are parsed the first time they are used
+        private bool _hasInt, _hasUInt, _hasUShort;
+        private int _int;
+        private uint _uint;
+        private ushort _ushort;
+
         public Argument(Script script, ASTNode node)
         {
             _node = node;
             _script = script;
+            _variable = script != null && node.Lexeme != null && script.IsVariable(node.Lexeme);
         }
 
         public string GetLexeme()
@@ -147,11 +161,17 @@ namespace LScript
                 throw new RunTimeError(_node, "Cannot convert argument to int");
 
             // Try to resolve it as a scoped variable first
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.AsInt();
 
-            return TypeConverter.ToInt(_node.Lexeme);
+            if (!_hasInt)
+            {
+                _int = TypeConverter.ToInt(_node.Lexeme);
+                _hasInt = true;
+            }
+
+            return _int;
         }
 
         // Treat the argument as an unsigned integer
@@ -161,11 +181,17 @@ namespace LScript
                 throw new RunTimeError(_node, "Cannot convert argument to uint");
 
             // Try to resolve it as a scoped variable first
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.AsUInt();
 
-            return TypeConverter.ToUInt(_node.Lexeme);
+            if (!_hasUInt)
+            {
+                _uint = TypeConverter.ToUInt(_node.Lexeme);
+                _hasUInt = true;
+            }
+
+            return _uint;
         }
 
         public ushort AsUShort()
@@ -174,11 +200,17 @@ namespace LScript
                 throw new RunTimeError(_node, "Cannot convert argument to ushort");
 
             // Try to resolve it as a scoped variable first
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.AsUShort();
 
-            return TypeConverter.ToUShort(_node.Lexeme);
+            if (!_hasUShort)
+            {
+                _ushort = TypeConverter.ToUShort(_node.Lexeme);
+                _hasUShort = true;
+            }
+
+            return _ushort;
         }
 
         public bool IsSerial()
@@ -186,7 +218,7 @@ namespace LScript
             if (_node.Lexeme == null)
                 return false;
 
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.IsSerial();
 
@@ -204,7 +236,7 @@ namespace LScript
                 throw new RunTimeError(_node, "Cannot convert argument to serial");
 
             // Try to resolve it as a scoped variable first
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.AsSerial();
 
@@ -223,13 +255,15 @@ namespace LScript
                 throw new RunTimeError(_node, "Cannot convert argument to string");
 
             // Try to resolve it as a scoped variable first
-            var arg = _script.Lookup(_node.Lexeme);
+            var arg = Resolve();
             if (arg != null)
                 return arg.AsString();
 
             return _node.Lexeme;
         }
 
+        private Argument Resolve() => _variable ? _script.Lookup(_node.Lexeme) : null;
+
         public bool AsBool()
         {
             if (_node.Lexeme == null)
@@ -264,12 +298,16 @@ namespace LScript
     {
         public bool IsPlaying = false;
 
-        private ASTNode _statement;
+        private Instruction[] _code;
+        private int _position;
 
         private Scope _scope;
 
-        private Dictionary<int, ASTNode> lineNodes = new Dictionary<int, ASTNode>();
-        private Deque<ASTNode> returnPoints = new Deque<ASTNode>();
+        private Dictionary<int, int> _lines = new Dictionary<int, int>();
+        private Deque<int> returnPoints = new Deque<int>();
+        private HashSet<string> _variables = new HashSet<string>();
+        private Dictionary<ASTNode, IComparable> _literals = new Dictionary<ASTNode, IComparable>();
+        private Dictionary<ASTNode, (Argument[] Args, ASTNode End)> _arguments = new Dictionary<ASTNode, (Argument[] Args, ASTNode End)>();
 
         public ExecutionState ExecutionState = ExecutionState.RUNNING;
 
@@ -298,10 +336,13 @@ namespace LScript
         {
             get
             {
-                return _statement == null ? 0 : _statement.LineNumber;
+                return _position < _code.Length ? _code[_position].LineNumber : 0;
             }
         }
 
+        // Index of the next instruction to run
+        internal int Position => _position;
+
         public Argument Lookup(string name)
         {
             var scope = _scope;
@@ -319,6 +360,9 @@ namespace LScript
             return result;
         }
 
+        // False for names no statement of the script declares, they can't be in any scope
+        internal bool IsVariable(string name) => _variables.Contains(name);
+
         public void JournalEntryAdded(JournalEntry e)
         {
             if (_journalEntries.Count >= 50)
@@ -354,75 +398,98 @@ namespace LScript
             _scope = _scope.Parent;
         }
 
+        // Go back to the scope of a loop, leaving the scopes of the ifs inside of it
+        private void PopScopes(ASTNode loop, bool inclusive)
+        {
+            var scope = _scope;
+
+            while (scope != null && scope.StartNode != loop)
+                scope = scope.Parent;
+
+            if (scope != null)
+                _scope = inclusive ? scope.Parent : scope;
+        }
+
+        // The arguments following a command or an expression are built once and reused
         private Argument[] ConstructArguments(ref ASTNode node)
         {
+            if (_arguments.TryGetValue(node, out var cached))
+            {
+                node = cached.End;
+
+                return cached.Args;
+            }
+
+            ASTNode start = node;
             List<Argument> args = new List<Argument>();
 
             node = node.Next();
 
-            while (node != null)
+            while (node != null && !IsOperator(node.Type))
             {
-                switch (node.Type)
-                {
-                    case ASTNodeType.AND:
-                    case ASTNodeType.OR:
-                    case ASTNodeType.EQUAL:
-                    case ASTNodeType.NOT_EQUAL:
-                    case ASTNodeType.LESS_THAN:
-                    case ASTNodeType.LESS_THAN_OR_EQUAL:
-                    case ASTNodeType.GREATER_THAN:
-                    case ASTNodeType.GREATER_THAN_OR_EQUAL:
-                        return args.ToArray();
-                }
-
                 args.Add(new Argument(this, node));
 
                 node = node.Next();
             }
 
-            return args.ToArray();
+            Argument[] result = args.ToArray();
+            _arguments[start] = (result, node);
+
+            return result;
+        }
+
+        private static bool IsOperator(ASTNodeType type)
+        {
+            switch (type)
+            {
+                case ASTNodeType.AND:
+                case ASTNodeType.OR:
+                case ASTNodeType.EQUAL:
+                case ASTNodeType.NOT_EQUAL:
+                case ASTNodeType.LESS_THAN:
+                case ASTNodeType.LESS_THAN_OR_EQUAL:
+                case ASTNodeType.GREATER_THAN:
+                case ASTNodeType.GREATER_THAN_OR_EQUAL:
+                    return true;
+            }
+
+            return false;
         }
 
-        // For now, the scripts execute directly from the
-        // abstract syntax tree. This is relatively simple.
-        // A more robust approach would be to "compile" the
-        // scripts to a bytecode. That would allow more errors
-        // to be caught with better error messages, as well as
-        // make the scripts execute more quickly.
+        // The statements are compiled to a flat list of instructions, see Compiler.
+        // Control statements jump straight to their targets instead of walking
+        // the statements in between.
         public Script(ASTNode root)
         {
-            // Set current to the first statement
-            _statement = root.FirstChild();
+            Compile(root);
 
             // Create a default scope
-            _scope = new Scope(null, _statement);
-            Root = root;
-
-            GenlineNodes();
+            _scope = new Scope(null, root.FirstChild());
         }
 
         public void UpdateScript(ASTNode root)
         {
-            _statement = root.FirstChild();
-            _scope = new Scope(null, _statement);
-            Root = root;
+            Compile(root);
+            _scope = new Scope(null, root.FirstChild());
             TargetRequested = false;
             returnPoints.Clear();
-            GenlineNodes();
         }
 
-        private void GenlineNodes()
+        private void Compile(ASTNode root)
         {
-            ASTNode n = _statement;
-            while (n != null)
-            {
-                lineNodes[n.LineNumber] = n;
-                n = n.Next();
-            }
+            _lines.Clear();
+            _variables.Clear();
+            _literals.Clear();
+            _arguments.Clear();
+
+            _code = Compiler.Compile(root, _lines, _variables, _literals);
+            _position = 0;
+            Root = root;
         }
+
         public void Reset()
         {
-            _statement = Root.FirstChild();
+            _position = 0;
             _journalEntries.Clear();
             TargetRequested = false;
             IgnoreList.Clear();
@@ -433,18 +500,14 @@ namespace LScript
 
         public bool ExecuteNext()
         {
-            if (_statement == null)
+            if (_position >= _code.Length)
                 return false;
 
-            if (_statement.Type != ASTNodeType.STATEMENT)
-                throw new RunTimeError(_statement, "Invalid script");
-
-            var node = _statement.FirstChild();
+            var ins = _code[_position];
+            var node = ins.Node;
 
             if (node == null)
-                throw new RunTimeError(_statement, "Invalid statement");
-
-            int depth = 0;
+                throw new RunTimeError(ins.Statement, "Invalid statement");
 
             if(CUOEnviroment.Debug)
                 ClassicUO.Game.GameActions.Print($"Executing: [{CurrentLine}]{node.Lexeme}");
@@ -465,118 +528,56 @@ namespace LScript
                         if (result)
                             break;
 
-                        // The expression evaluated false, so keep advancing until
-                        // we hit an elseif, else, or endif statement that matches
-                        // and try again.
-                        depth = 0;
+                        // The expression evaluated false, so try the elseif clauses
+                        // in turn until one matches, or an else or endif is hit.
+                        var target = ins.Jump;
 
-                        while (_statement != null)
+                        while (true)
                         {
-                            node = _statement.FirstChild();
+                            if (target == -1)
+                                throw new RunTimeError(node, "If with no matching endif");
 
-                            if (node.Type == ASTNodeType.IF)
-                            {
-                                depth++;
-                            }
-                            else if (node.Type == ASTNodeType.ELSEIF)
+                            var clause = _code[target];
+
+                            if (clause.Node.Type == ASTNodeType.ENDIF)
                             {
-                                if (depth == 0)
-                                {
-                                    expr = node.FirstChild();
-                                    result = EvaluateExpression(ref expr);
-
-                                    // Evaluated true. Jump right into execution
-                                    if (result)
-                                    {
-                                        Advance();
-                                        break;
-                                    }
-                                }
+                                _position = target;
+                                break;
                             }
-                            else if (node.Type == ASTNodeType.ELSE)
+
+                            if (clause.Node.Type == ASTNodeType.ELSE)
                             {
-                                if (depth == 0)
-                                {
-                                    // Jump into the else clause
-                                    Advance();
-                                    break;
-                                }
+                                // Jump into the else clause
+                                _position = target + 1;
+                                break;
                             }
-                            else if (node.Type == ASTNodeType.ENDIF)
-                            {
-                                if (depth == 0)
-                                    break;
 
-                                depth--;
+                            expr = clause.Node.FirstChild();
+
+                            // Evaluated true. Jump right into execution
+                            if (EvaluateExpression(ref expr))
+                            {
+                                _position = target + 1;
+                                break;
                             }
 
-                            Advance();
+                            target = clause.Jump;
                         }
 
-                        if (_statement == null)
-                            throw new RunTimeError(node, "If with no matching endif");
-
                         break;
                     }
                 case ASTNodeType.ELSEIF:
-                    // If we hit the elseif statement during normal advancing, skip over it. The only way
-                    // to execute an elseif clause is to jump directly in from an if statement.
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.IF)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.ENDIF)
-                        {
-                            if (depth == 0)
-                                break;
-
-                            depth--;
-                        }
-
-                        Advance();
-                    }
-
-                    if (_statement == null)
+                case ASTNodeType.ELSE:
+                    // If we hit an elseif or else statement during normal advancing, skip to the endif. The only way
+                    // to execute these clauses is to jump directly in from an if statement.
+                    if (ins.Match == -1)
                         throw new RunTimeError(node, "If with no matching endif");
 
+                    Jump(ins.Match);
                     break;
                 case ASTNodeType.ENDIF:
                     PopScope();
                     Advance();
-                    break;
-                case ASTNodeType.ELSE:
-                    // If we hit the else statement during normal advancing, skip over it. The only way
-                    // to execute an else clause is to jump directly in from an if statement.
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.IF)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.ENDIF)
-                        {
-                            if (depth == 0)
-                                break;
-
-                            depth--;
-                        }
-
-                        Advance();
-                    }
-
-                    if (_statement == null)
-                        throw new RunTimeError(node, "If with no matching endif");
-
                     break;
                 case ASTNodeType.WHILE:
                     {
@@ -589,330 +590,112 @@ namespace LScript
                         var expr = node.FirstChild();
                         var result = EvaluateExpression(ref expr);
 
-                        // Advance to next statement
-                        Advance();
-
-                        // The expression evaluated false, so keep advancing until
-                        // we hit an endwhile statement.
-                        if (!result)
-                        {
-                            depth = 0;
+                        if (result)
+                            Advance();
+                        else
+                            ExitLoop(ins);
 
-                            while (_statement != null)
-                            {
-                                node = _statement.FirstChild();
-
-                                if (node.Type == ASTNodeType.WHILE)
-                                {
-                                    depth++;
-                                }
-                                else if (node.Type == ASTNodeType.ENDWHILE)
-                                {
-                                    if (depth == 0)
-                                    {
-                                        PopScope();
-                                        // Go one past the endwhile so the loop doesn't repeat
-                                        Advance();
-                                        break;
-                                    }
-
-                                    depth--;
-                                }
-
-                                Advance();
-                            }
-                        }
                         break;
                     }
                 case ASTNodeType.ENDWHILE:
-                    // Walk backward to the while statement
-                    _statement = _statement.Prev();
-
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.ENDWHILE)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.WHILE)
-                        {
-                            if (depth == 0)
-                                break;
-
-                            depth--;
-                        }
-
-                        _statement = _statement.Prev();
-                    }
-
-                    if (_statement == null)
+                    // Jump back to the while statement
+                    if (ins.Jump == -1)
                         throw new RunTimeError(node, "Unexpected endwhile");
 
+                    _position = ins.Jump;
                     break;
                 case ASTNodeType.FOR:
                     {
-                        // The iterator variable's name is the hash code of the for loop's ASTNode.
-                        var iterName = node.GetHashCode().ToString();
-
                         // When we first enter the loop, push a new scope
                         if (_scope.StartNode != node)
                         {
                             PushScope(node);
-
-                            // Grab the arguments
-                            var max = node.FirstChild();
-
-                            if (max.Type != ASTNodeType.INTEGER)
-                                throw new RunTimeError(max, "Invalid for loop syntax");
-
-                            // Create a dummy argument that acts as our loop variable
-                            var iter = new ASTNode(ASTNodeType.INTEGER, "0", node, 0);
-
-                            _scope.SetVar(iterName, new Argument(this, iter));
                         }
                         else
                         {
-                            // Increment the iterator argument
-                            var arg = _scope.GetVar(iterName);
-
-                            var iter = new ASTNode(ASTNodeType.INTEGER, (arg.AsUInt() + 1).ToString(), node, 0);
-
-                            _scope.SetVar(iterName, new Argument(this, iter));
+                            _scope.Iteration++;
                         }
 
-                        // Check loop condition
-                        var i = _scope.GetVar(iterName);
-
                         // Grab the max value to iterate to
-                        node = node.FirstChild();
-                        var end = new Argument(this, node);
-
-                        if (i.AsUInt() < end.AsUInt())
+                        if (ins.Limit == null)
                         {
-                            // enter the loop
-                            Advance();
-                        }
-                        else
-                        {
-                            // Walk until the end of the loop
-                            Advance();
+                            var max = node.FirstChild();
 
-                            depth = 0;
+                            if (max.Type != ASTNodeType.INTEGER)
+                                throw new RunTimeError(max, "Invalid for loop syntax");
 
-                            while (_statement != null)
-                            {
-                                node = _statement.FirstChild();
-
-                                if (node.Type == ASTNodeType.FOR ||
-                                    node.Type == ASTNodeType.FOREACH)
-                                {
-                                    depth++;
-                                }
-                                else if (node.Type == ASTNodeType.ENDFOR)
-                                {
-                                    if (depth == 0)
-                                    {
-                                        PopScope();
-                                        // Go one past the end so the loop doesn't repeat
-                                        Advance();
-                                        break;
-                                    }
-
-                                    depth--;
-                                }
-
-                                Advance();
-                            }
+                            ins.Limit = new Argument(this, max);
                         }
+
+                        if ((uint)_scope.Iteration < ins.Limit.AsUInt())
+                            Advance();
+                        else
+                            ExitLoop(ins);
                     }
                     break;
                 case ASTNodeType.FOREACH:
                     {
                         // foreach VAR in LIST
-                        // The iterator's name is the hash code of the for loop's ASTNode.
                         var varName = node.FirstChild().Lexeme;
                         var listName = node.FirstChild().Next().Lexeme;
-                        var iterName = node.GetHashCode().ToString();
 
                         // When we first enter the loop, push a new scope
                         if (_scope.StartNode != node)
                         {
                             PushScope(node);
-
-                            // Create a dummy argument that acts as our iterator object
-                            var iter = new ASTNode(ASTNodeType.INTEGER, "0", node, 0);
-                            _scope.SetVar(iterName, new Argument(this, iter));
-
-                            // Make the user-chosen variable have the value for the front of the list
-                            var arg = Interpreter.GetListValue(listName, 0);
-
-                            if (arg != null)
-                                _scope.SetVar(varName, arg);
-                            else
-                                _scope.ClearVar(varName);
                         }
                         else
                         {
-                            // Increment the iterator argument
-                            var idx = _scope.GetVar(iterName).AsInt() + 1;
-                            var iter = new ASTNode(ASTNodeType.INTEGER, idx.ToString(), node, 0);
-                            _scope.SetVar(iterName, new Argument(this, iter));
-
-                            // Update the user-chosen variable
-                            var arg = Interpreter.GetListValue(listName, idx);
-
-                            if (arg != null)
-                                _scope.SetVar(varName, arg);
-                            else
-                                _scope.ClearVar(varName);
+                            _scope.Iteration++;
                         }
 
-                        // Check loop condition
-                        var i = _scope.GetVar(varName);
+                        // Make the user-chosen variable have the value at the iterator
+                        var arg = Interpreter.GetListValue(listName, _scope.Iteration);
 
-                        if (i != null)
+                        if (arg != null)
                         {
+                            _scope.SetVar(varName, arg);
+
                             // enter the loop
                             Advance();
                         }
                         else
                         {
-                            // Walk until the end of the loop
-                            Advance();
-
-                            depth = 0;
-
-                            while (_statement != null)
-                            {
-                                node = _statement.FirstChild();
-
-                                if (node.Type == ASTNodeType.FOR ||
-                                    node.Type == ASTNodeType.FOREACH)
-                                {
-                                    depth++;
-                                }
-                                else if (node.Type == ASTNodeType.ENDFOR)
-                                {
-                                    if (depth == 0)
-                                    {
-                                        PopScope();
-                                        // Go one past the end so the loop doesn't repeat
-                                        Advance();
-                                        break;
-                                    }
-
-                                    depth--;
-                                }
-
-                                Advance();
-                            }
+                            _scope.ClearVar(varName);
+                            ExitLoop(ins);
                         }
+
                         break;
                     }
                 case ASTNodeType.ENDFOR:
-                    // Walk backward to the for statement
-                    _statement = _statement.Prev();
-
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.ENDFOR)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.FOR ||
-                                 node.Type == ASTNodeType.FOREACH)
-                        {
-                            if (depth == 0)
-                                break;
-
-                            depth--;
-                        }
-
-                        _statement = _statement.Prev();
-                    }
-
-                    if (_statement == null)
+                    // Jump back to the for statement
+                    if (ins.Jump == -1)
                         throw new RunTimeError(node, "Unexpected endfor");
 
+                    _position = ins.Jump;
                     break;
                 case ASTNodeType.BREAK:
-                    // Walk until the end of the loop
-                    Advance();
+                    if (ins.Match != -1)
+                        PopScopes(_code[ins.Match].Node, true);
+                    else
+                        PopScope();
 
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.WHILE ||
-                            node.Type == ASTNodeType.FOR ||
-                            node.Type == ASTNodeType.FOREACH)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.ENDWHILE ||
-                            node.Type == ASTNodeType.ENDFOR)
-                        {
-                            if (depth == 0)
-                            {
-                                // Go one past the end so the loop doesn't repeat
-                                Advance();
-                                break;
-                            }
-
-                            depth--;
-                        }
-
-                        Advance();
-                    }
-
-                    PopScope();
+                    // Go one past the end so the loop doesn't repeat
+                    Jump(ins.Jump != -1 ? ins.Jump + 1 : _code.Length);
                     break;
                 case ASTNodeType.CONTINUE:
-                    // Walk backward to the loop statement
-                    _statement = _statement.Prev();
-
-                    depth = 0;
-
-                    while (_statement != null)
-                    {
-                        node = _statement.FirstChild();
-
-                        if (node.Type == ASTNodeType.ENDWHILE ||
-                            node.Type == ASTNodeType.ENDFOR)
-                        {
-                            depth++;
-                        }
-                        else if (node.Type == ASTNodeType.WHILE ||
-                                 node.Type == ASTNodeType.FOR ||
-                                 node.Type == ASTNodeType.FOREACH)
-                        {
-                            if (depth == 0)
-                                break;
-
-                            depth--;
-                        }
-
-                        _statement = _statement.Prev();
-                    }
-
-                    if (_statement == null)
+                    // Jump back to the loop statement
+                    if (ins.Jump == -1)
                         throw new RunTimeError(node, "Unexpected continue");
+
+                    PopScopes(_code[ins.Jump].Node, false);
+                    _position = ins.Jump;
                     break;
                 case ASTNodeType.STOP:
-                    _statement = null;
+                    _position = _code.Length;
                     break;
                 case ASTNodeType.REPLAY:
-                    _statement = _statement.Parent.FirstChild();
+                    _position = 0;
                     break;
                 case ASTNodeType.QUIET:
                 case ASTNodeType.FORCE:
@@ -923,21 +706,40 @@ namespace LScript
                     break;
             }
 
-            return (_statement != null) ? true : false;
+            return _position < _code.Length;
+        }
+
+        // Leave a loop whose condition failed, going one past its end so it doesn't repeat
+        private void ExitLoop(Instruction loop)
+        {
+            if (loop.Jump == -1)
+            {
+                Jump(_code.Length);
+
+                return;
+            }
+
+            PopScope();
+            Jump(loop.Jump + 1);
         }
 
         public void Advance()
+        {
+            Jump(_position + 1);
+        }
+
+        private void Jump(int position)
         {
             Interpreter.ClearTimeout();
-            _statement = _statement.Next();
+            _position = position;
         }
 
         public bool GotoLine(int line)
         {
-            if (lineNodes.ContainsKey(line))
+            if (_lines.TryGetValue(line, out int position))
             {
-                returnPoints.AddToBack(_statement);
-                _statement = lineNodes[line];
+                returnPoints.AddToBack(_position);
+                _position = position;
                 return true;
             }
             return false;
@@ -946,7 +748,7 @@ namespace LScript
         public void ReturnFromGoto()
         {
             if (returnPoints.Count > 0)
-                _statement = returnPoints.RemoveFromFront();
+                _position = returnPoints.RemoveFromFront();
         }
 
         private ASTNode EvaluateModifiers(ASTNode node, out bool quiet, out bool force, out bool not)
@@ -1150,16 +952,19 @@ namespace LScript
             switch (node.Type)
             {
                 case ASTNodeType.INTEGER:
-                    val = TypeConverter.ToInt(node.Lexeme);
+                    if (!_literals.TryGetValue(node, out val))
+                        val = TypeConverter.ToInt(node.Lexeme);
                     break;
                 case ASTNodeType.SERIAL:
-                    val = TypeConverter.ToUInt(node.Lexeme);
+                    if (!_literals.TryGetValue(node, out val))
+                        val = TypeConverter.ToUInt(node.Lexeme);
                     break;
                 case ASTNodeType.STRING:
                     val = node.Lexeme;
                     break;
                 case ASTNodeType.DOUBLE:
-                    val = TypeConverter.ToDouble(node.Lexeme);
+                    if (!_literals.TryGetValue(node, out val))
+                        val = TypeConverter.ToDouble(node.Lexeme);
                     break;
                 case ASTNodeType.OPERAND:
                     {
@@ -1225,6 +1030,9 @@ namespace LScript
 
         public static CultureInfo Culture;
 
+        // Milliseconds a script may run statements for each frame, 0 runs a single statement per frame
+        public static double FrameBudget = 2;
+
         static Interpreter()
         {
             Culture = new CultureInfo(CultureInfo.CurrentCulture.LCID, false);
@@ -1529,10 +1337,26 @@ namespace LScript
                 }
             }
 
-            if (!_activeScript.ExecuteNext())
+            var script = _activeScript;
+            long budget = (long)(FrameBudget * Stopwatch.Frequency / 1000);
+            long start = Stopwatch.GetTimestamp();
+
+            while (true)
             {
-                _activeScript = null;
-                return false;
+                int position = script.Position;
+
+                if (!script.ExecuteNext())
+                {
+                    _activeScript = null;
+                    return false;
+                }
+
+                // Paused, waiting on a command or stopped: pick it up again next frame
+                if (script.ExecutionState != ExecutionState.RUNNING || script.Position == position || !script.IsPlaying || _activeScript != script)
+                    break;
+
+                if (Stopwatch.GetTimestamp() - start >= budget)
+                    break;
             }
 
             return true;
@@ -7,5 +7,10 @@ namespace ClassicUO.LegionScripting
         public List<string> GlobalAutoStartScripts { get; set; } = new List<string>();
         public Dictionary<string, List<string>> CharAutoStartScripts { get; set; } = new Dictionary<string, List<string>>();
         public Dictionary<string, bool> GroupCollapsed { get; set; } = new Dictionary<string, bool>();
+
+        /// <summary>
+        /// Milliseconds each running lscript may run statements for every frame, 0 runs a single statement per frame.
+        /// </summary>
+        public double FrameBudget { get; set; } = 2;
     }
 }
@@ -11,7 +11,6 @@ using ClassicUO.Game;
 using ClassicUO.Game.Data;
 using ClassicUO.Game.Managers;
 using ClassicUO.Utility.Logging;
-using IronPython.Hosting;
 using LScript;
 using Microsoft.Scripting.Hosting;
 using static ClassicUO.LegionScripting.Commands;
@@ -36,9 +35,17 @@ namespace ClassicUO.LegionScripting
 
         public static Dictionary<int, ScriptFile> PyThreads = new Dictionary<int, ScriptFile>();
 
+        private static int _mainThreadId = -1;
+
+        /// <summary>
+        /// True when called from the game thread that drains <see cref="API.QueuedPythonActions"/>.
+        /// </summary>
+        public static bool IsMainThread => Thread.CurrentThread.ManagedThreadId == _mainThreadId;
+
         public static void Init()
         {
-            Task.Factory.StartNew(() => Python.CreateEngine());
+            _mainThreadId = Thread.CurrentThread.ManagedThreadId;
+            PythonEnginePool.WarmUp();
             ScriptPath = Path.GetFullPath(Path.Combine(CUOEnviroment.ExecutablePath, "LegionScripts"));
 
             if (!_loaded)
@@ -46,11 +53,13 @@ namespace ClassicUO.LegionScripting
                 RegisterCommands();
 
                 EventSink.JournalEntryAdded += EventSink_JournalEntryAdded;
+                ScriptEvents.Subscribe();
                 _loaded = true;
             }
 
             LoadScriptsFromFile();
             LoadLScriptSettings();
+            Interpreter.FrameBudget = lScriptSettings.FrameBudget;
             AutoPlayGlobal();
             AutoPlayChar();
             _enabled = true;
@@ -133,6 +142,22 @@ namespace ClassicUO.LegionScripting
                     }
                 }
             );
+
+            CommandManager.Register
+            (
+                "lscriptbudget", a =>
+                {
+                    if (a.Length < 2 || !double.TryParse(a[1], out double ms) || ms < 0)
+                    {
+                        GameActions.Print($"Usage: lscriptbudget <milliseconds per frame, 0 for one statement per frame>, currently {Interpreter.FrameBudget}");
+
+                        return;
+                    }
+
+                    Interpreter.FrameBudget = lScriptSettings.FrameBudget = ms;
+                    SaveScriptSettings();
+                }
+            );
         }
 
         private static void EventSink_JournalEntryAdded(object sender, JournalEntry e)
@@ -148,7 +173,7 @@ namespace ClassicUO.LegionScripting
                 if (script.ScriptType == ScriptType.LegionScript)
                     script.GetScript?.JournalEntryAdded(e);
                 else
-                    script.scopedAPI?.JournalEntries.Enqueue(e);
+                    script.scopedAPI?.JournalEntries.Add(e);
             }
         }
 
@@ -380,11 +405,17 @@ namespace ClassicUO.LegionScripting
 
             PyThreads.Clear();
 
+            WorldSnapshot.Clear();
+
+            CooperativeScheduler.Shutdown();
+
+            PythonEnginePool.Clear();
+
+            SharedVarStore.CloseMachine();
+
             SaveScriptSettings();
 
-            while (API.QueuedPythonActions.TryDequeue(out var action)) //Clear any queued actions
-            {
-            }
+            API.QueuedPythonActions.Clear();
 
             _enabled = false;
         }
@@ -394,6 +425,9 @@ namespace ClassicUO.LegionScripting
             if (!_enabled || !World.InGame)
                 return;
 
+            WorldSnapshot.Publish();
+            SharedVarStore.PollMachine();
+
             foreach (ScriptFile script in runningScripts)
             {
                 if (script.ScriptType == ScriptType.LegionScript)
@@ -419,8 +453,7 @@ namespace ClassicUO.LegionScripting
                 removeRunningScripts.Clear();
             }
 
-            while (API.QueuedPythonActions.TryDequeue(out var action))
-                action();
+            API.QueuedPythonActions.Drain();
         }
 
         public static void PlayScript(ScriptFile script)
@@ -447,7 +480,19 @@ namespace ClassicUO.LegionScripting
                 {
                     if (script.PythonThread == null || !script.PythonThread.IsAlive)
                     {
-                        script.ReadFromFile();
+                        script.FileContents = script.ReadFromFile();
+                        script.Profile.Reset();
+
+                        if (CooperativeScheduler.IsCooperative(script))
+                        {
+                            script.CooperativeTask = CooperativeScheduler.Start(script);
+                            script.scopedAPI = script.CooperativeTask.API;
+                            runningScripts.Add(script);
+                            ScriptStartedEvent?.Invoke(null, new ScriptInfoEvent(script));
+
+                            return;
+                        }
+
                         script.PythonThread = new Thread(() => ExecutePythonScript(script));
                         PyThreads.Add(script.PythonThread.ManagedThreadId, script);
                         script.PythonThread.Start();
@@ -462,23 +507,35 @@ namespace ClassicUO.LegionScripting
 
         private static void ExecutePythonScript(ScriptFile script)
         {
+            script.Profile.BeginRun();
             script.SetupPythonEngine();
             script.SetupPythonScope();
 
+            // StopScript can clear these from the game thread while the script is still unwinding
+            PooledPythonEngine pooled = script.pooledEngine;
+            ScriptEngine engine = script.pythonEngine;
+            ScriptScope scope = script.pythonScope;
+
             try
             {
-                script.pythonEngine.Execute(script.FileContentsJoined, script.pythonScope);
+                pooled.GetCompiled(script.FullPath, () => script.FileContentsJoined).Execute(scope);
+                script.EngineReusable = true;
             }
             catch (ThreadAbortException)
             {
             }
             catch (Exception e)
             {
-                var eo = script.pythonEngine.GetService<ExceptionOperations>();
+                var eo = engine.GetService<ExceptionOperations>();
                 string error = eo.FormatException(e);
 
                 GameActions.Print("Python Script Error:");
                 GameActions.Print(error);
+                script.EngineReusable = true;
+            }
+            finally
+            {
+                script.Profile.EndRun();
             }
 
             //script.PythonScriptStopped();
@@ -508,6 +565,9 @@ namespace ClassicUO.LegionScripting
                         script.PythonThread.Abort();
                     }
 
+                    CooperativeScheduler.Stop(script.CooperativeTask);
+                    script.CooperativeTask = null;
+
                     script.PythonScriptStopped();
                     script.PythonThread = null;
                 }
@@ -763,7 +823,11 @@ namespace ClassicUO.LegionScripting
         public string FileContentsJoined;
         public ScriptType ScriptType = ScriptType.LegionScript;
         public Thread PythonThread;
+        public CooperativeTask CooperativeTask;
+        public ScriptProfile Profile;
         public ScriptEngine pythonEngine;
+        public PooledPythonEngine pooledEngine;
+        public bool EngineReusable;
         public ScriptScope pythonScope;
         public API scopedAPI;
 
@@ -774,7 +838,7 @@ namespace ClassicUO.LegionScripting
                 if(ScriptType == ScriptType.LegionScript && GetScript != null)
                     return GetScript.IsPlaying;
 
-                return PythonThread != null;
+                return PythonThread != null || CooperativeTask != null;
             }
         }
 
@@ -797,6 +861,7 @@ namespace ClassicUO.LegionScripting
 
             FileName = fileName;
             FullPath = System.IO.Path.Combine(Path, FileName);
+            Profile = new ScriptProfile(FileName);
             FileContents = ReadFromFile();
 
             if (FileName.EndsWith(".py"))
@@ -811,6 +876,7 @@ namespace ClassicUO.LegionScripting
             Path = path;
             FileName = fileName;
             FullPath = System.IO.Path.Combine(Path, FileName);
+            Profile = new ScriptProfile(FileName);
             FileContents = source.Split(new[] { '\n' }, StringSplitOptions.None);
             GetScript = new Script(Lexer.Lex(FileContents));
         }
@@ -868,16 +934,9 @@ namespace ClassicUO.LegionScripting
             if (pythonEngine != null)
                 return;
 
-            pythonEngine = Python.CreateEngine();
-
-            string dir = System.IO.Path.GetDirectoryName(FullPath);
-            ICollection<string> paths = pythonEngine.GetSearchPaths();
-            paths.Add(System.IO.Path.Combine(CUOEnviroment.ExecutablePath, "iplib"));
-            paths.Add(System.IO.Path.Combine(CUOEnviroment.ExecutablePath, "LegionScripts"));
-
-            paths.Add(!string.IsNullOrWhiteSpace(dir) ? dir : Environment.CurrentDirectory);
-
-            pythonEngine.SetSearchPaths(paths);
+            EngineReusable = false;
+            pooledEngine = PythonEnginePool.Rent(System.IO.Path.GetDirectoryName(FullPath));
+            pythonEngine = pooledEngine.Engine;
         }
 
         public void SetupPythonScope()
@@ -891,8 +950,13 @@ namespace ClassicUO.LegionScripting
         public void PythonScriptStopped()
         {
             scopedAPI?.CloseGumps();
+            scopedAPI?.UnhookPackets();
             pythonScope = null;
             scopedAPI = null;
+
+            PythonEnginePool.Return(pooledEngine, EngineReusable);
+            pooledEngine = null;
+            pythonEngine = null;
         }
     }
 }
@@ -0,0 +1,275 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+using ClassicUO.LegionScripting.PyClasses;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Hands raw packets to the scripts that hooked their IDs. The network code asks <see cref="IsHooked"/> first,
+    /// a bit test in a 256 bit map per direction, so packets nobody hooked don't cost anything more.
+    /// Hooks are added and removed from script threads, packets are dispatched from the game thread.
+    /// </summary>
+    internal static class PacketHooks
+    {
+        private static readonly object _lock = new object();
+        private static PacketHook[] _hooks = Array.Empty<PacketHook>();
+        private static ulong[] _incoming = new ulong[4], _outgoing = new ulong[4];
+
+        public static bool IsHooked(byte id, bool outgoing)
+        {
+            ulong[] map = outgoing ? _outgoing : _incoming;
+
+            return (map[id >> 6] & (1UL << (id & 63))) != 0;
+        }
+
+        /// <summary>
+        /// Copy the packet once and queue it for every hook that wants it.
+        /// </summary>
+        public static void Dispatch(ReadOnlySpan<byte> data, bool outgoing)
+        {
+            if (data.IsEmpty)
+                return;
+
+            PyPacket packet = null;
+
+            foreach (PacketHook hook in _hooks)
+            {
+                if (!hook.Wants(data[0], outgoing))
+                    continue;
+
+                packet ??= new PyPacket(data.ToArray(), outgoing, Time.Ticks);
+                hook.Add(packet);
+            }
+
+            if (packet != null)
+                ScriptEvents.Signal(API.Events.Packet);
+        }
+
+        public static void Add(PacketHook hook)
+        {
+            lock (_lock)
+            {
+                var hooks = new PacketHook[_hooks.Length + 1];
+                _hooks.CopyTo(hooks, 0);
+                hooks[_hooks.Length] = hook;
+
+                Rebuild(hooks);
+            }
+        }
+
+        public static void Remove(PacketHook hook)
+        {
+            lock (_lock)
+            {
+                int index = Array.IndexOf(_hooks, hook);
+
+                if (index < 0)
+                    return;
+
+                var hooks = new PacketHook[_hooks.Length - 1];
+                Array.Copy(_hooks, 0, hooks, 0, index);
+                Array.Copy(_hooks, index + 1, hooks, index, hooks.Length - index);
+
+                Rebuild(hooks);
+            }
+        }
+
+        private static void Rebuild(PacketHook[] hooks)
+        {
+            var incoming = new ulong[4];
+            var outgoing = new ulong[4];
+
+            foreach (PacketHook hook in hooks)
+                hook.AddTo(incoming, outgoing);
+
+            // Readers on the game thread see either the old or the new maps, never a half built one
+            _hooks = hooks;
+            _incoming = incoming;
+            _outgoing = outgoing;
+        }
+    }
+
+    /// <summary>
+    /// A script's subscription to some packet IDs, created with API.HookPackets.
+    /// Packets are kept in a bounded ring buffer until the script reads them. When it is full the oldest packet is replaced,
+    /// or with DropOnOverflow the new packet is dropped. Either way <see cref="Dropped"/> counts the packets that were lost.
+    /// </summary>
+    public class PacketHook
+    {
+        public const int DEFAULT_CAPACITY = 256;
+
+        private readonly object _lock = new object();
+        private readonly ulong[] _incoming = new ulong[4], _outgoing = new ulong[4];
+        private readonly PyPacket[] _packets;
+        private int _head, _count;
+
+        internal PacketHook(IEnumerable<int> ids, bool incoming, bool outgoing, int capacity, bool dropOnOverflow)
+        {
+            foreach (int id in ids)
+            {
+                if (id < 0 || id > 0xFF)
+                    continue;
+
+                if (incoming)
+                    _incoming[id >> 6] |= 1UL << (id & 63);
+
+                if (outgoing)
+                    _outgoing[id >> 6] |= 1UL << (id & 63);
+            }
+
+            _packets = new PyPacket[Math.Max(1, capacity)];
+            DropOnOverflow = dropOnOverflow;
+        }
+
+        public bool DropOnOverflow { get; }
+
+        /// <summary>
+        /// False after the hook was removed, it gets no more packets.
+        /// </summary>
+        public bool Active { get; internal set; } = true;
+
+        /// <summary>
+        /// Packets waiting to be read.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _count;
+            }
+        }
+
+        public long Received { get; private set; }
+
+        public long Dropped { get; private set; }
+
+        /// <summary>
+        /// The oldest packet waiting, or None.
+        /// </summary>
+        public PyPacket Read()
+        {
+            lock (_lock)
+                return TakeLocked();
+        }
+
+        /// <summary>
+        /// All packets waiting, oldest first.
+        /// </summary>
+        public PyPacket[] ReadAll()
+        {
+            lock (_lock)
+            {
+                var result = new PyPacket[_count];
+
+                for (int i = 0; i < result.Length; i++)
+                    result[i] = TakeLocked();
+
+                return result;
+            }
+        }
+
+        /// <summary>
+        /// Block until a packet arrives. Cooperative scripts should yield API.WaitForEvent([API.Events.Packet]) and Read instead.
+        /// </summary>
+        /// <returns>The oldest packet waiting, or None if timed out</returns>
+        public PyPacket Wait(double timeout = 5)
+        {
+            CooperativeScheduler.RefuseWait();
+            int expire = Environment.TickCount + (int)(timeout * 1000);
+            long start = Stopwatch.GetTimestamp();
+
+            try
+            {
+                lock (_lock)
+                {
+                    while (_count == 0)
+                    {
+                        int remaining = unchecked(expire - Environment.TickCount);
+
+                        if (remaining <= 0 || !Active)
+                            return null;
+
+                        Monitor.Wait(_lock, remaining);
+                    }
+
+                    return TakeLocked();
+                }
+            }
+            finally
+            {
+                ScriptProfile.Current?.AddWait(Stopwatch.GetTimestamp() - start);
+            }
+        }
+
+        public void Clear()
+        {
+            lock (_lock)
+            {
+                Array.Clear(_packets, 0, _packets.Length);
+                _head = _count = 0;
+            }
+        }
+
+        internal bool Wants(byte id, bool outgoing) => ((outgoing ? _outgoing : _incoming)[id >> 6] & (1UL << (id & 63))) != 0;
+
+        internal void AddTo(ulong[] incoming, ulong[] outgoing)
+        {
+            for (int i = 0; i < 4; i++)
+            {
+                incoming[i] |= _incoming[i];
+                outgoing[i] |= _outgoing[i];
+            }
+        }
+
+        internal void Add(PyPacket packet)
+        {
+            lock (_lock)
+            {
+                Received++;
+
+                if (_count == _packets.Length)
+                {
+                    Dropped++;
+
+                    if (DropOnOverflow)
+                        return;
+
+                    _head = (_head + 1) % _packets.Length;
+                    _count--;
+                }
+
+                _packets[(_head + _count) % _packets.Length] = packet;
+                _count++;
+
+                Monitor.PulseAll(_lock);
+            }
+        }
+
+        internal void Close()
+        {
+            lock (_lock)
+            {
+                Active = false;
+                Monitor.PulseAll(_lock);
+            }
+        }
+
+        private PyPacket TakeLocked()
+        {
+            if (_count == 0)
+                return null;
+
+            PyPacket packet = _packets[_head];
+            _packets[_head] = null;
+            _head = (_head + 1) % _packets.Length;
+            _count--;
+
+            return packet;
+        }
+
+        public override string ToString() => $"<PacketHook Count={Count} Received={Received} Dropped={Dropped}>";
+    }
+}
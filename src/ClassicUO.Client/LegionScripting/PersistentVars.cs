@@ -1,5 +1,4 @@
 using System;
-using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.IO;
 using System.Threading;
@@ -13,18 +12,16 @@ namespace ClassicUO.LegionScripting
     {
         private const string DATA_FILE = "legionvars.dat";
         private const string GlobalScopeKey = "GLOBAL";
-        private const char SEPARATOR = '\t';
+        private const int FLUSH_DELAY_MS = 1000;
 
         private static string _charScopeKey = "";
         private static string _accountScopeKey = "";
         private static string _serverScopeKey = "";
 
-        private static readonly object _fileLock = new object();
-        private static readonly ConcurrentQueue<(API.PersistentVar scope, string scopeKey, string key, string value)> _saveQueue = new ConcurrentQueue<(API.PersistentVar scope, string scopeKey, string key, string value)>();
-        private static int _saveTaskRunning = 0;
+        private static int _flushScheduled = 0;
 
         private static string DataPath => Path.Combine(CUOEnviroment.ExecutablePath, "Data", DATA_FILE);
-        private static Dictionary<string, Dictionary<string, Dictionary<string, string>>> _data = new Dictionary<string, Dictionary<string, Dictionary<string, string>>>();
+        private static readonly PersistentVarStore _store = new PersistentVarStore(DataPath);
 
         public static void Load()
         {
@@ -32,255 +29,489 @@ namespace ClassicUO.LegionScripting
             _accountScopeKey = ProfileManager.CurrentProfile.ServerName + ProfileManager.CurrentProfile.Username;
             _serverScopeKey = ProfileManager.CurrentProfile.ServerName;
 
-            LoadFromFile();
+            _store.Flush();
+            _store.Load();
+        }
+
+        private static (API.PersistentVar scope, string scopeKey) GetScopeKeyPair(API.PersistentVar scope)
+        {
+            switch (scope)
+            {
+                case API.PersistentVar.Char:
+                    return (scope, _charScopeKey);
+                case API.PersistentVar.Account:
+                    return (scope, _accountScopeKey);
+                case API.PersistentVar.Server:
+                    return (scope, _serverScopeKey);
+                case API.PersistentVar.Global:
+                    return (scope, GlobalScopeKey);
+                default:
+                    throw new ArgumentOutOfRangeException(nameof(scope), scope, null);
+            }
+        }
+
+        public static string GetVar(API.PersistentVar scope, string key, string defaultValue = "")
+        {
+            var (s, scopeKey) = GetScopeKeyPair(scope);
+
+            return _store.Get(s.ToString(), scopeKey, key, defaultValue);
+        }
+
+        /// <summary>
+        /// Get several vars of a scope at once, or all of them when <paramref name="keys"/> is null.
+        /// </summary>
+        public static Dictionary<string, string> GetVars(API.PersistentVar scope, IEnumerable<string> keys = null, string defaultValue = "")
+        {
+            var (s, scopeKey) = GetScopeKeyPair(scope);
+
+            return _store.GetMany(s.ToString(), scopeKey, keys, defaultValue);
+        }
+
+        public static void SaveVar(API.PersistentVar scope, string key, string value)
+        {
+            var (s, scopeKey) = GetScopeKeyPair(scope);
+
+            _store.Set(s.ToString(), scopeKey, key, value ?? "");
+            ScheduleFlush();
+        }
+
+        public static void SaveVars(API.PersistentVar scope, IEnumerable<KeyValuePair<string, string>> values)
+        {
+            var (s, scopeKey) = GetScopeKeyPair(scope);
+
+            _store.SetMany(s.ToString(), scopeKey, values);
+            ScheduleFlush();
+        }
+
+        public static void DeleteVar(API.PersistentVar scope, string key)
+        {
+            var (s, scopeKey) = GetScopeKeyPair(scope);
+
+            _store.Set(s.ToString(), scopeKey, key, null);
+            ScheduleFlush();
+        }
+
+        /// <summary>
+        /// Changes are written together a moment after the first one, so a script saving vars in a loop appends them in one go.
+        /// </summary>
+        private static void ScheduleFlush()
+        {
+            if (Interlocked.CompareExchange(ref _flushScheduled, 1, 0) == 0)
+            {
+                Task.Run(FlushAfterDelay);
+            }
+        }
+
+        private static async Task FlushAfterDelay()
+        {
+            await Task.Delay(FLUSH_DELAY_MS);
+
+            // Changes made while flushing schedule the next flush
+            Interlocked.Exchange(ref _flushScheduled, 0);
+            _store.Flush();
+        }
+
+        public static void Unload()
+        {
+            _store.Flush();
+        }
+    }
+
+    /// <summary>
+    /// The persistent vars in memory, backed by an append only log. Every change adds a record line to the file:
+    /// scope, scope key, key and value separated by tabs, a record without a value deletes the key.
+    /// Changes are kept in memory until <see cref="Flush"/> appends them, once the log holds many more records than
+    /// there are vars it is rewritten with only the current values.
+    /// A record cut short by a crash is dropped on load, the records before it are kept.
+    /// </summary>
+    internal sealed class PersistentVarStore
+    {
+        public const int COMPACT_MIN_RECORDS = 4096;
+
+        private const char SEPARATOR = '\t';
+
+        private static readonly Encoding _encoding = new UTF8Encoding(false);
+
+        private readonly object _lock = new object();
+        private readonly object _fileLock = new object();
+        private readonly string _path;
+        private Dictionary<string, Dictionary<string, Dictionary<string, string>>> _data = new Dictionary<string, Dictionary<string, Dictionary<string, string>>>();
+        private List<Record> _pending = new List<Record>();
+        private int _count;
+
+        public PersistentVarStore(string path)
+        {
+            _path = path;
         }
 
-        private static void LoadFromFile()
+        /// <summary>
+        /// Vars currently set.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _count;
+            }
+        }
+
+        /// <summary>
+        /// Records in the log file.
+        /// </summary>
+        public int Records { get; private set; }
+
+        public void Load()
         {
             lock (_fileLock)
             {
+                var data = new Dictionary<string, Dictionary<string, Dictionary<string, string>>>();
+                int count = 0, records = 0;
+
                 try
                 {
-                    // Ensure the Data directory exists
-                    var dataDir = Path.GetDirectoryName(DataPath);
+                    var dataDir = Path.GetDirectoryName(_path);
                     if (!Directory.Exists(dataDir))
                     {
                         Directory.CreateDirectory(dataDir);
                     }
 
-                    _data = new Dictionary<string, Dictionary<string, Dictionary<string, string>>>();
-
-                    if (File.Exists(DataPath))
+                    if (File.Exists(_path))
                     {
-                        var lines = File.ReadAllLines(DataPath, Encoding.UTF8);
-                        
-                        foreach (var line in lines)
+                        byte[] bytes = File.ReadAllBytes(_path);
+                        int end = Array.LastIndexOf(bytes, (byte)'\n') + 1;
+
+                        if (end < bytes.Length)
+                        {
+                            // The last append didn't finish, drop it so the next one starts on a new line
+                            using (var stream = new FileStream(_path, FileMode.Open, FileAccess.Write))
+                                stream.SetLength(end);
+
+                            Console.WriteLine($"Warning: Dropped {bytes.Length - end} bytes of an incomplete record at the end of {_path}");
+                        }
+
+                        // Files written before the log have a BOM
+                        int start = bytes.Length >= 3 && bytes[0] == 0xEF && bytes[1] == 0xBB && bytes[2] == 0xBF ? 3 : 0;
+
+                        foreach (string line in _encoding.GetString(bytes, start, Math.Max(0, end - start)).Split('\n'))
                         {
-                            if (string.IsNullOrEmpty(line)) continue;
-                            
-                            var parts = line.Split(SEPARATOR);
-                            if (parts.Length >= 4)
+                            if (Parse(line.TrimEnd('\r'), out Record record))
                             {
-                                var scope = parts[0];
-                                var scopeKey = parts[1];
-                                var key = parts[2];
-                                var value = parts.Length > 4 ? string.Join(SEPARATOR.ToString(), parts, 3, parts.Length - 3) : parts[3];
-                                
-                                // Unescape special characters
-                                value = UnescapeValue(value);
-                                
-                                if (!_data.ContainsKey(scope))
-                                {
-                                    _data[scope] = new Dictionary<string, Dictionary<string, string>>();
-                                }
-                                
-                                if (!_data[scope].ContainsKey(scopeKey))
-                                {
-                                    _data[scope][scopeKey] = new Dictionary<string, string>();
-                                }
-                                
-                                _data[scope][scopeKey][key] = value;
+                                count += Apply(data, record);
+                                records++;
                             }
                         }
                     }
                 }
                 catch (Exception ex)
                 {
-                    // If file is corrupted, start fresh
-                    _data = new Dictionary<string, Dictionary<string, Dictionary<string, string>>>();
-                    
-                    // Optionally log the error
                     Console.WriteLine($"Warning: Failed to load persistent vars file: {ex.Message}");
                 }
+
+                lock (_lock)
+                {
+                    _data = data;
+                    _count = count;
+                    _pending.Clear();
+                }
+
+                Records = records;
+            }
+        }
+
+        public string Get(string scope, string scopeKey, string key, string defaultValue)
+        {
+            lock (_lock)
+            {
+                if (_data.TryGetValue(scope, out var scopeData) &&
+                    scopeData.TryGetValue(scopeKey, out var keyData) &&
+                    keyData.TryGetValue(key, out var value))
+                {
+                    return value;
+                }
+
+                return defaultValue;
             }
         }
 
-        private static void SaveToFile()
+        public Dictionary<string, string> GetMany(string scope, string scopeKey, IEnumerable<string> keys, string defaultValue)
         {
-            lock (_fileLock)
+            var result = new Dictionary<string, string>();
+
+            lock (_lock)
             {
-                try
+                Dictionary<string, string> keyData = null;
+
+                if (_data.TryGetValue(scope, out var scopeData))
+                    scopeData.TryGetValue(scopeKey, out keyData);
+
+                if (keys == null)
                 {
-                    var lines = new List<string>();
-                    
-                    foreach (var scope in _data)
-                    {
-                        foreach (var scopeKey in scope.Value)
-                        {
-                            foreach (var keyValue in scopeKey.Value)
-                            {
-                                var escapedValue = EscapeValue(keyValue.Value);
-                                lines.Add($"{scope.Key}{SEPARATOR}{scopeKey.Key}{SEPARATOR}{keyValue.Key}{SEPARATOR}{escapedValue}");
-                            }
-                        }
-                    }
-                    
-                    // Write to temp file first, then move (atomic operation)
-                    var tempPath = DataPath + ".tmp";
-                    File.WriteAllLines(tempPath, lines, Encoding.UTF8);
-                    
-                    if (File.Exists(DataPath))
+                    if (keyData != null)
                     {
-                        File.Delete(DataPath);
+                        foreach (var pair in keyData)
+                            result[pair.Key] = pair.Value;
                     }
-                    
-                    File.Move(tempPath, DataPath);
+
+                    return result;
                 }
-                catch (Exception ex)
+
+                foreach (string key in keys)
                 {
-                    throw new Exception($"Failed to save persistent vars: {ex.Message}", ex);
+                    if (key == null)
+                        continue;
+
+                    result[key] = keyData != null && keyData.TryGetValue(key, out var value) ? value : defaultValue;
                 }
             }
-        }
 
-        private static string EscapeValue(string value)
-        {
-            if (string.IsNullOrEmpty(value)) return value;
-            
-            return value.Replace("\\", "\\\\")
-                       .Replace("\t", "\\t")
-                       .Replace("\n", "\\n")
-                       .Replace("\r", "\\r");
+            return result;
         }
 
-        private static string UnescapeValue(string value)
+        /// <summary>
+        /// Set a var, or delete it when <paramref name="value"/> is null.
+        /// </summary>
+        public void Set(string scope, string scopeKey, string key, string value)
         {
-            if (string.IsNullOrEmpty(value)) return value;
-            
-            return value.Replace("\\r", "\r")
-                       .Replace("\\n", "\n")
-                       .Replace("\\t", "\t")
-                       .Replace("\\\\", "\\");
+            lock (_lock)
+            {
+                // Queued under the same lock as the change so the log has them in the same order
+                var record = new Record(scope, scopeKey, key, value);
+                _count += Apply(_data, record);
+                _pending.Add(record);
+            }
         }
 
-        private static (API.PersistentVar scope, string scopeKey) GetScopeKeyPair(API.PersistentVar scope)
+        public void SetMany(string scope, string scopeKey, IEnumerable<KeyValuePair<string, string>> values)
         {
-            switch (scope)
+            lock (_lock)
             {
-                case API.PersistentVar.Char:
-                    return (scope, _charScopeKey);
-                case API.PersistentVar.Account:
-                    return (scope, _accountScopeKey);
-                case API.PersistentVar.Server:
-                    return (scope, _serverScopeKey);
-                case API.PersistentVar.Global:
-                    return (scope, GlobalScopeKey);
-                default:
-                    throw new ArgumentOutOfRangeException(nameof(scope), scope, null);
+                foreach (var pair in values)
+                {
+                    if (string.IsNullOrEmpty(pair.Key))
+                        continue;
+
+                    var record = new Record(scope, scopeKey, pair.Key, pair.Value ?? "");
+                    _count += Apply(_data, record);
+                    _pending.Add(record);
+                }
             }
         }
 
-        public static string GetVar(API.PersistentVar scope, string key, string defaultValue = "")
+        /// <summary>
+        /// Append the changes made since the last flush, compacting the log when it got too large.
+        /// </summary>
+        public void Flush()
         {
-            var (s, scopeKey) = GetScopeKeyPair(scope);
-            var scopeStr = s.ToString();
-
             lock (_fileLock)
             {
-                if (_data.TryGetValue(scopeStr, out var scopeData) &&
-                    scopeData.TryGetValue(scopeKey, out var keyData) &&
-                    keyData.TryGetValue(key, out var value))
+                List<Record> batch;
+                int count;
+
+                lock (_lock)
                 {
-                    return value;
+                    batch = _pending;
+                    count = _count;
+
+                    if (batch.Count != 0)
+                        _pending = new List<Record>();
+                }
+
+                if (batch.Count != 0)
+                {
+                    try
+                    {
+                        var sb = new StringBuilder();
+
+                        foreach (Record record in batch)
+                            Write(sb, record);
+
+                        byte[] bytes = _encoding.GetBytes(sb.ToString());
+
+                        using (var stream = new FileStream(_path, FileMode.Append, FileAccess.Write, FileShare.Read))
+                        {
+                            stream.Write(bytes, 0, bytes.Length);
+                            stream.Flush(true);
+                        }
+
+                        Records += batch.Count;
+                    }
+                    catch (Exception ex)
+                    {
+                        Console.WriteLine($"Failed to save persistent vars: {ex.Message}");
+
+                        // Try again with the next flush
+                        lock (_lock)
+                            _pending.InsertRange(0, batch);
+
+                        return;
+                    }
+                }
+
+                if (Records >= COMPACT_MIN_RECORDS && Records > count * 2)
+                {
+                    Compact();
                 }
-                
-                return defaultValue;
             }
         }
 
-        public static void SaveVar(API.PersistentVar scope, string key, string value)
+        /// <summary>
+        /// Rewrite the log with a record per var. Changes made meanwhile are still pending and get appended to the new file.
+        /// </summary>
+        private void Compact()
         {
-            var (s, scopeKey) = GetScopeKeyPair(scope);
-            var scopeStr = s.ToString();
+            var sb = new StringBuilder();
+            int records = 0;
 
-            // Update in-memory data immediately
-            lock (_fileLock)
+            lock (_lock)
             {
-                // Ensure scope exists
-                if (!_data.ContainsKey(scopeStr))
-                {
-                    _data[scopeStr] = new Dictionary<string, Dictionary<string, string>>();
-                }
-                
-                // Ensure scope key exists
-                if (!_data[scopeStr].ContainsKey(scopeKey))
+                foreach (var scope in _data)
                 {
-                    _data[scopeStr][scopeKey] = new Dictionary<string, string>();
+                    foreach (var scopeKey in scope.Value)
+                    {
+                        foreach (var keyValue in scopeKey.Value)
+                        {
+                            Write(sb, new Record(scope.Key, scopeKey.Key, keyValue.Key, keyValue.Value));
+                            records++;
+                        }
+                    }
                 }
-                
-                // Set the value immediately
-                _data[scopeStr][scopeKey][key] = value;
             }
 
-            // Queue for async file save
-            _saveQueue.Enqueue((s, scopeKey, key, value));
+            try
+            {
+                // Write to temp file first, then swap it in
+                var tempPath = _path + ".tmp";
+                File.WriteAllText(tempPath, sb.ToString(), _encoding);
+
+                if (File.Exists(_path))
+                {
+                    File.Replace(tempPath, _path, null);
+                }
+                else
+                {
+                    File.Move(tempPath, _path);
+                }
 
-            // Only start the save task if not already running
-            if (Interlocked.CompareExchange(ref _saveTaskRunning, 1, 0) == 0)
+                Records = records;
+            }
+            catch (Exception ex)
             {
-                Task.Run(ProcessSaveQueue);
+                Console.WriteLine($"Failed to compact persistent vars: {ex.Message}");
             }
         }
 
-        public static void DeleteVar(API.PersistentVar scope, string key)
+        /// <summary>
+        /// Returns how the number of vars changed.
+        /// </summary>
+        private static int Apply(Dictionary<string, Dictionary<string, Dictionary<string, string>>> data, Record record)
         {
-            var (s, scopeKey) = GetScopeKeyPair(scope);
-            var scopeStr = s.ToString();
+            if (!data.TryGetValue(record.Scope, out var scopeData))
+            {
+                if (record.Value == null)
+                    return 0;
 
-            // Update in-memory data immediately
-            lock (_fileLock)
+                data[record.Scope] = scopeData = new Dictionary<string, Dictionary<string, string>>();
+            }
+
+            if (!scopeData.TryGetValue(record.ScopeKey, out var keyData))
             {
-                if (_data.TryGetValue(scopeStr, out var scopeData) &&
-                    scopeData.TryGetValue(scopeKey, out var keyData) &&
-                    keyData.ContainsKey(key))
-                {
-                    keyData.Remove(key);
-                }
+                if (record.Value == null)
+                    return 0;
+
+                scopeData[record.ScopeKey] = keyData = new Dictionary<string, string>();
             }
 
-            // Queue for async file save
-            _saveQueue.Enqueue((s, scopeKey, key, null)); // null value = delete
+            if (record.Value == null)
+                return keyData.Remove(record.Key) ? -1 : 0;
+
+            int added = keyData.ContainsKey(record.Key) ? 0 : 1;
+            keyData[record.Key] = record.Value;
+
+            return added;
+        }
+
+        private static void Write(StringBuilder sb, Record record)
+        {
+            sb.Append(Escape(record.Scope)).Append(SEPARATOR).Append(Escape(record.ScopeKey)).Append(SEPARATOR).Append(Escape(record.Key));
+
+            if (record.Value != null)
+                sb.Append(SEPARATOR).Append(Escape(record.Value));
+
+            sb.Append('\n');
+        }
+
+        private static bool Parse(string line, out Record record)
+        {
+            record = default;
+
+            if (string.IsNullOrEmpty(line))
+                return false;
+
+            var parts = line.Split(SEPARATOR);
+
+            if (parts.Length < 3)
+                return false;
+
+            string value = null;
 
-            if (Interlocked.CompareExchange(ref _saveTaskRunning, 1, 0) == 0)
+            if (parts.Length > 3)
             {
-                Task.Run(ProcessSaveQueue);
+                // Values were not always escaped, keep the tabs of old records
+                value = Unescape(parts.Length > 4 ? string.Join(SEPARATOR.ToString(), parts, 3, parts.Length - 3) : parts[3]);
             }
+
+            record = new Record(Unescape(parts[0]), Unescape(parts[1]), Unescape(parts[2]), value);
+
+            return true;
         }
 
-        private static async Task ProcessSaveQueue()
+        private static string Escape(string value)
         {
-            try
+            if (string.IsNullOrEmpty(value)) return value;
+
+            return value.Replace("\\", "\\\\")
+                       .Replace("\t", "\\t")
+                       .Replace("\n", "\\n")
+                       .Replace("\r", "\\r");
+        }
+
+        private static string Unescape(string value)
+        {
+            if (string.IsNullOrEmpty(value) || value.IndexOf('\\') < 0) return value;
+
+            var sb = new StringBuilder(value.Length);
+
+            for (int i = 0; i < value.Length; i++)
             {
-                bool hasChanges = false;
-                
-                // Process all queued items (but don't update in-memory data since it's already done)
-                while (_saveQueue.TryDequeue(out var item))
+                char c = value[i];
+
+                if (c != '\\' || i + 1 == value.Length)
                 {
-                    hasChanges = true;
+                    sb.Append(c);
+
+                    continue;
                 }
-                
-                // Only save to file if there were changes
-                if (hasChanges)
+
+                switch (value[++i])
                 {
-                    SaveToFile();
+                    case 't': sb.Append('\t'); break;
+                    case 'n': sb.Append('\n'); break;
+                    case 'r': sb.Append('\r'); break;
+                    case '\\': sb.Append('\\'); break;
+                    default: sb.Append(c).Append(value[i]); break;
                 }
             }
-            finally
-            {
-                Interlocked.Exchange(ref _saveTaskRunning, 0);
-            }
+
+            return sb.ToString();
         }
 
-        public static void Unload()
+        private readonly struct Record(string scope, string scopeKey, string key, string value)
         {
-            // Process any remaining items in the queue
-            if (_saveQueue.Count > 0)
-            {
-                if (Interlocked.CompareExchange(ref _saveTaskRunning, 1, 0) == 0)
-                {
-                    Task.Run(ProcessSaveQueue).Wait();
-                }
-            }
+            public readonly string Scope = scope;
+            public readonly string ScopeKey = scopeKey;
+            public readonly string Key = key;
+            public readonly string Value = value;
         }
     }
-}
\ No newline at end of file
+}
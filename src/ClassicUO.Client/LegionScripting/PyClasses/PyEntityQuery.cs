@@ -0,0 +1,177 @@
+using System;
+using System.Collections.Generic;
+using ClassicUO.Game;
+
+namespace ClassicUO.LegionScripting.PyClasses;
+
+/// <summary>
+/// A reusable filter for <see cref="API.QueryEntities"/>. Create one with API.EntityQuery and keep it between ticks.
+/// Unset filters (null, -1) match everything.
+/// </summary>
+public class PyEntityQuery
+{
+    /// <summary>
+    /// Include mobiles in the results.
+    /// </summary>
+    public bool Mobiles = true;
+
+    /// <summary>
+    /// Include items in the results.
+    /// </summary>
+    public bool Items;
+
+    /// <summary>
+    /// Only mobiles with one of these notorieties.
+    /// </summary>
+    public HashSet<API.Notoriety> Notoriety;
+
+    /// <summary>
+    /// Only entities with one of these graphics.
+    /// </summary>
+    public HashSet<ushort> Graphics;
+
+    /// <summary>
+    /// Only entities with this hue.
+    /// </summary>
+    public int Hue = -1;
+
+    /// <summary>
+    /// Max distance from the player.
+    /// </summary>
+    public int MaxDistance = -1;
+
+    /// <summary>
+    /// Only items directly inside of this container.
+    /// </summary>
+    public long Container = -1;
+
+    /// <summary>
+    /// Only entities that have all of these flags set (Frozen 0x01, Female 0x02, Poisoned 0x04, YellowBar 0x08, WarMode 0x40, Hidden 0x80).
+    /// </summary>
+    public int RequiredFlags;
+
+    /// <summary>
+    /// Skip entities that have any of these flags set.
+    /// </summary>
+    public int ExcludedFlags;
+
+    public bool IncludeDead;
+
+    public bool IncludePlayer;
+
+    /// <summary>
+    /// Skip entities on the script's ignore list.
+    /// </summary>
+    public bool ExcludeIgnored = true;
+
+    public API.QuerySort SortBy = API.QuerySort.Distance;
+
+    public bool Descending;
+
+    /// <summary>
+    /// Max number of results, 0 for no limit.
+    /// </summary>
+    public int Limit;
+
+    internal bool Matches(in EntitySnapshot e, uint playerSerial)
+    {
+        if (e.IsMobile)
+        {
+            if (!Mobiles || (!IncludePlayer && e.Serial == playerSerial) || (!IncludeDead && e.IsDead))
+                return false;
+
+            if (Notoriety != null && !Notoriety.Contains((API.Notoriety)(byte)e.Notoriety))
+                return false;
+        }
+        else
+        {
+            if (!Items || (Container >= 0 && e.Container != (uint)Container))
+                return false;
+        }
+
+        if (Graphics != null && !Graphics.Contains(e.Graphic))
+            return false;
+
+        if (Hue >= 0 && e.Hue != Hue)
+            return false;
+
+        if (MaxDistance >= 0 && e.Distance > MaxDistance)
+            return false;
+
+        int flags = (byte)e.Flags;
+
+        return (flags & RequiredFlags) == RequiredFlags && (flags & ExcludedFlags) == 0;
+    }
+
+    internal Comparison<EntitySnapshot> GetComparison()
+    {
+        Comparison<EntitySnapshot> comparison = SortBy switch
+        {
+            API.QuerySort.Distance => static (a, b) => a.Distance.CompareTo(b.Distance),
+            API.QuerySort.Hits => static (a, b) => a.Hits.CompareTo(b.Hits),
+            API.QuerySort.HitsPercent => static (a, b) => HitsPercent(a).CompareTo(HitsPercent(b)),
+            API.QuerySort.Serial => static (a, b) => a.Serial.CompareTo(b.Serial),
+            _ => null
+        };
+
+        if (comparison != null && Descending)
+        {
+            Comparison<EntitySnapshot> ascending = comparison;
+            comparison = (a, b) => ascending(b, a);
+        }
+
+        return comparison;
+    }
+
+    private static float HitsPercent(in EntitySnapshot e) => e.HitsMax > 0 ? (float)e.Hits / e.HitsMax : 0;
+}
+
+/// <summary>
+/// Results of <see cref="API.QueryEntities"/> as parallel arrays, index i of every array describes the same entity.
+/// Values were copied from the world snapshot, reading them does not touch the game.
+/// </summary>
+public class PyQueryResult
+{
+    internal PyQueryResult(List<EntitySnapshot> entities)
+    {
+        int count = entities.Count;
+
+        Count = count;
+        Serial = new uint[count];
+        X = new int[count];
+        Y = new int[count];
+        Z = new int[count];
+        Distance = new int[count];
+        Hits = new int[count];
+        HitsMax = new int[count];
+        Graphic = new int[count];
+        Hue = new int[count];
+
+        for (int i = 0; i < count; i++)
+        {
+            EntitySnapshot e = entities[i];
+            Serial[i] = e.Serial;
+            X[i] = e.X;
+            Y[i] = e.Y;
+            Z[i] = e.Z;
+            Distance[i] = e.Distance;
+            Hits[i] = e.Hits;
+            HitsMax[i] = e.HitsMax;
+            Graphic[i] = e.Graphic;
+            Hue[i] = e.Hue;
+        }
+    }
+
+    public readonly int Count;
+    public readonly uint[] Serial;
+    public readonly int[] X;
+    public readonly int[] Y;
+    public readonly int[] Z;
+    public readonly int[] Distance;
+    public readonly int[] Hits;
+    public readonly int[] HitsMax;
+    public readonly int[] Graphic;
+    public readonly int[] Hue;
+
+    public override string ToString() => $"<PyQueryResult Count={Count}>";
+}
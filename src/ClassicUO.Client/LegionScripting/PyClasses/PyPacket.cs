@@ -0,0 +1,69 @@
+using System;
+using System.Buffers.Binary;
+using System.Text;
+using IronPython.Runtime;
+
+namespace ClassicUO.LegionScripting.PyClasses;
+
+/// <summary>
+/// A read-only view of a raw packet delivered to a <see cref="PacketHook"/>.
+/// The bytes are shared by every script that hooked the packet, read them with the Read methods (big endian, like the protocol).
+/// </summary>
+public class PyPacket
+{
+    private readonly byte[] _data;
+
+    internal PyPacket(byte[] data, bool outgoing, uint time)
+    {
+        _data = data;
+        Outgoing = outgoing;
+        Time = time;
+    }
+
+    /// <summary>
+    /// Packet ID, the first byte.
+    /// </summary>
+    public int ID => _data[0];
+
+    /// <summary>
+    /// True for packets the client sent, false for packets from the server.
+    /// </summary>
+    public bool Outgoing { get; }
+
+    public int Length => _data.Length;
+
+    /// <summary>
+    /// Client time (ms) when the packet was seen.
+    /// </summary>
+    public uint Time { get; }
+
+    public int ReadByte(int offset) => _data[offset];
+
+    public int ReadSByte(int offset) => (sbyte)_data[offset];
+
+    public int ReadUInt16(int offset) => BinaryPrimitives.ReadUInt16BigEndian(_data.AsSpan(offset));
+
+    public int ReadInt16(int offset) => BinaryPrimitives.ReadInt16BigEndian(_data.AsSpan(offset));
+
+    public uint ReadUInt32(int offset) => BinaryPrimitives.ReadUInt32BigEndian(_data.AsSpan(offset));
+
+    public int ReadInt32(int offset) => BinaryPrimitives.ReadInt32BigEndian(_data.AsSpan(offset));
+
+    /// <summary>
+    /// Read an ascii string, stopping at the first 0.
+    /// </summary>
+    public string ReadAscii(int offset, int length)
+    {
+        ReadOnlySpan<byte> span = _data.AsSpan(offset, Math.Min(length, _data.Length - offset));
+        int end = span.IndexOf((byte)0);
+
+        return Encoding.ASCII.GetString(_data, offset, end < 0 ? span.Length : end);
+    }
+
+    /// <summary>
+    /// Copy of the packet as python bytes.
+    /// </summary>
+    public Bytes ToBytes() => new Bytes(_data);
+
+    public override string ToString() => $"<PyPacket 0x{ID:X2} {(Outgoing ? "out" : "in")} {Length} bytes>";
+}
@@ -0,0 +1,196 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading.Tasks;
+using ClassicUO.Utility.Logging;
+using IronPython.Hosting;
+using Microsoft.Scripting;
+using Microsoft.Scripting.Hosting;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Keeps a few initialised IronPython engines ready so starting a script doesn't pay for creating one.
+    /// Each pooled engine keeps its own compiled script cache and its imported iplib modules between uses.
+    /// </summary>
+    internal static class PythonEnginePool
+    {
+        private const int WARM_ENGINES = 2;
+        private const int MAX_IDLE_ENGINES = 4;
+
+        private static readonly ConcurrentBag<PooledPythonEngine> _idle = new();
+        private static int _warming;
+
+        public static string IpLibPath => Path.Combine(CUOEnviroment.ExecutablePath, "iplib");
+
+        public static string ScriptsPath => Path.Combine(CUOEnviroment.ExecutablePath, "LegionScripts");
+
+        public static int IdleCount => _idle.Count;
+
+        /// <summary>
+        /// Create engines in the background until <see cref="WARM_ENGINES"/> are idle.
+        /// </summary>
+        public static void WarmUp()
+        {
+            if (_idle.Count >= WARM_ENGINES || System.Threading.Interlocked.Exchange(ref _warming, 1) == 1)
+                return;
+
+            Task.Run
+            (() =>
+                {
+                    try
+                    {
+                        while (_idle.Count < WARM_ENGINES)
+                            _idle.Add(new PooledPythonEngine());
+                    }
+                    catch (Exception e)
+                    {
+                        Log.Error($"Failed to warm up python engines: {e}");
+                    }
+                    finally
+                    {
+                        _warming = 0;
+                    }
+                }
+            );
+        }
+
+        public static PooledPythonEngine Rent(string scriptDirectory)
+        {
+            if (!_idle.TryTake(out PooledPythonEngine engine))
+                engine = new PooledPythonEngine();
+
+            engine.SetScriptDirectory(scriptDirectory);
+            WarmUp();
+
+            return engine;
+        }
+
+        /// <summary>
+        /// Return an engine after a script finished. Engines from scripts that were aborted may be in a broken state, pass reusable false to throw them away.
+        /// </summary>
+        public static void Return(PooledPythonEngine engine, bool reusable)
+        {
+            if (engine == null)
+                return;
+
+            if (reusable && _idle.Count < MAX_IDLE_ENGINES && engine.ResetForReuse())
+            {
+                _idle.Add(engine);
+
+                return;
+            }
+
+            engine.Shutdown();
+        }
+
+        public static void Clear()
+        {
+            while (_idle.TryTake(out PooledPythonEngine engine))
+                engine.Shutdown();
+        }
+    }
+
+    internal class PooledPythonEngine
+    {
+        private readonly Dictionary<string, CachedCode> _compiled = new();
+        private readonly string _ipLibPath;
+
+        public PooledPythonEngine()
+        {
+            Engine = Python.CreateEngine();
+            _ipLibPath = PythonEnginePool.IpLibPath;
+
+            SetScriptDirectory(null);
+
+            // Importing anything pulls in the site setup, do it now instead of when a script starts
+            Engine.Execute("import sys", Engine.CreateScope());
+        }
+
+        public ScriptEngine Engine { get; }
+
+        public void SetScriptDirectory(string dir)
+        {
+            ICollection<string> paths = new List<string>
+            {
+                _ipLibPath,
+                PythonEnginePool.ScriptsPath,
+                !string.IsNullOrWhiteSpace(dir) ? dir : Environment.CurrentDirectory
+            };
+
+            Engine.SetSearchPaths(paths);
+        }
+
+        /// <summary>
+        /// Get the compiled script, compiling it only when the file changed since it was last compiled.
+        /// </summary>
+        public CompiledCode GetCompiled(string fullPath, Func<string> readSource)
+        {
+            DateTime modified = File.GetLastWriteTimeUtc(fullPath);
+
+            lock (_compiled)
+            {
+                if (_compiled.TryGetValue(fullPath, out CachedCode cached) && cached.Modified == modified)
+                    return cached.Code;
+            }
+
+            ScriptSource source = Engine.CreateScriptSourceFromString(readSource(), fullPath, SourceCodeKind.File);
+            CompiledCode code = source.Compile();
+
+            lock (_compiled)
+                _compiled[fullPath] = new CachedCode(modified, code);
+
+            return code;
+        }
+
+        /// <summary>
+        /// Drop modules imported from outside of iplib so edits to user modules are picked up next time, keep the rest loaded.
+        /// </summary>
+        /// <returns>False if the engine could not be reset and should not be reused</returns>
+        public bool ResetForReuse()
+        {
+            try
+            {
+                if (Engine.GetSysModule().GetVariable("modules") is not IDictionary<object, object> modules)
+                    return false;
+
+                foreach (object key in modules.Keys.ToList())
+                {
+                    if (Engine.Operations.TryGetMember(modules[key], "__file__", out object file) && file is string path &&
+                        !path.StartsWith(_ipLibPath, StringComparison.OrdinalIgnoreCase))
+                    {
+                        modules.Remove(key);
+                    }
+                }
+
+                return true;
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Unable to reset python engine for reuse: {e.Message}");
+
+                return false;
+            }
+        }
+
+        public void Shutdown()
+        {
+            try
+            {
+                Engine.Runtime.Shutdown();
+            }
+            catch (Exception e)
+            {
+                Log.Warn($"Error shutting down python engine: {e.Message}");
+            }
+        }
+
+        private readonly struct CachedCode(DateTime modified, CompiledCode code)
+        {
+            public DateTime Modified { get; } = modified;
+            public CompiledCode Code { get; } = code;
+        }
+    }
+}
@@ -0,0 +1,254 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using ClassicUO.Utility.Logging;
+
+namespace ClassicUO.LegionScripting
+{
+    public enum ActionPriority
+    {
+        /// <summary>
+        /// Things the player is waiting on, like targeting.
+        /// </summary>
+        Interactive,
+        Normal,
+        /// <summary>
+        /// Work that can be spread over a few frames, like adding gumps.
+        /// </summary>
+        Bulk
+    }
+
+    /// <summary>
+    /// Actions queued by scripts to run on the game thread.
+    /// Each script gets its own queue and they take turns, higher priorities go first,
+    /// but every <see cref="SHARE_EVERY"/>th action comes from a lower priority so they are never starved,
+    /// and <see cref="Drain"/> stops once the frame budget is used up so a busy script can't stall rendering.
+    /// Enqueue from any thread, drain from the game thread.
+    /// </summary>
+    public class ScriptActionQueue
+    {
+        public const double DEFAULT_FRAME_BUDGET_MS = 4;
+
+        /// <summary>
+        /// One action out of this many is taken from a lower priority, they take turns for it.
+        /// </summary>
+        public const int SHARE_EVERY = 4;
+
+        private static readonly object _systemOwner = new object();
+
+        private readonly object _lock = new object();
+        private readonly Dictionary<object, Queue<Action>>[] _queues;
+        private readonly LinkedList<object>[] _turns;
+        private readonly Stopwatch _timer = new Stopwatch();
+        private int _count, _takes, _sharedTurn;
+
+        public ScriptActionQueue()
+        {
+            int priorities = Enum.GetValues(typeof(ActionPriority)).Length;
+            _queues = new Dictionary<object, Queue<Action>>[priorities];
+            _turns = new LinkedList<object>[priorities];
+
+            for (int i = 0; i < priorities; i++)
+            {
+                _queues[i] = new Dictionary<object, Queue<Action>>();
+                _turns[i] = new LinkedList<object>();
+            }
+        }
+
+        /// <summary>
+        /// Max ms spent running actions per frame. At least one action always runs.
+        /// </summary>
+        public double FrameBudgetMs { get; set; } = DEFAULT_FRAME_BUDGET_MS;
+
+        /// <summary>
+        /// Actions waiting to run.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _count;
+            }
+        }
+
+        /// <summary>
+        /// Highest <see cref="Count"/> seen.
+        /// </summary>
+        public int PeakCount { get; private set; }
+
+        /// <summary>
+        /// Frames where the budget ran out before the queue was empty.
+        /// </summary>
+        public long Overflows { get; private set; }
+
+        public int ExecutedLastFrame { get; private set; }
+
+        public double LastDrainMs { get; private set; }
+
+        public void Enqueue(Action action) => Enqueue(action, null, ActionPriority.Normal);
+
+        /// <param name="owner">Who queued the action, actions from the same owner run in order. Null for client actions.</param>
+        public void Enqueue(Action action, object owner, ActionPriority priority)
+        {
+            if (action == null)
+                return;
+
+            owner ??= _systemOwner;
+
+            lock (_lock)
+            {
+                Dictionary<object, Queue<Action>> queues = _queues[(int)priority];
+
+                if (!queues.TryGetValue(owner, out Queue<Action> queue))
+                    queues[owner] = queue = new Queue<Action>();
+
+                if (queue.Count == 0)
+                    _turns[(int)priority].AddLast(owner);
+
+                queue.Enqueue(action);
+                _count++;
+
+                if (_count > PeakCount)
+                    PeakCount = _count;
+            }
+        }
+
+        /// <summary>
+        /// Actions waiting to run for this owner.
+        /// </summary>
+        public int CountFor(object owner)
+        {
+            int count = 0;
+
+            lock (_lock)
+            {
+                foreach (Dictionary<object, Queue<Action>> queues in _queues)
+                {
+                    if (queues.TryGetValue(owner ?? _systemOwner, out Queue<Action> queue))
+                        count += queue.Count;
+                }
+            }
+
+            return count;
+        }
+
+        /// <summary>
+        /// Run queued actions until the queue is empty or <see cref="FrameBudgetMs"/> is used up.
+        /// </summary>
+        public void Drain()
+        {
+            int executed = 0;
+            _timer.Restart();
+
+            while (TryTake(out Action action))
+            {
+                try
+                {
+                    action();
+                }
+                catch (Exception e)
+                {
+                    Log.Error($"Error running queued script action: {e}");
+                }
+
+                executed++;
+
+                if (_timer.Elapsed.TotalMilliseconds >= FrameBudgetMs)
+                {
+                    if (Count > 0)
+                        Overflows++;
+
+                    break;
+                }
+            }
+
+            ExecutedLastFrame = executed;
+            LastDrainMs = _timer.Elapsed.TotalMilliseconds;
+        }
+
+        public void Clear()
+        {
+            lock (_lock)
+            {
+                for (int i = 0; i < _queues.Length; i++)
+                {
+                    _queues[i].Clear();
+                    _turns[i].Clear();
+                }
+
+                _count = 0;
+            }
+        }
+
+        public void ResetStats()
+        {
+            PeakCount = 0;
+            Overflows = 0;
+        }
+
+        /// <summary>
+        /// Next action from the highest priority with work, owners take turns within a priority.
+        /// Every <see cref="SHARE_EVERY"/>th take the lower priorities go first instead, in turns.
+        /// </summary>
+        private bool TryTake(out Action action)
+        {
+            lock (_lock)
+            {
+                if (_count == 0)
+                {
+                    action = null;
+
+                    return false;
+                }
+
+                if (++_takes % SHARE_EVERY == 0)
+                {
+                    for (int n = 1; n < _turns.Length; n++)
+                    {
+                        _sharedTurn = _sharedTurn % (_turns.Length - 1) + 1;
+
+                        if (_turns[_sharedTurn].Count > 0)
+                        {
+                            action = TakeFrom(_sharedTurn);
+
+                            return true;
+                        }
+                    }
+                }
+
+                for (int i = 0; i < _turns.Length; i++)
+                {
+                    if (_turns[i].Count > 0)
+                    {
+                        action = TakeFrom(i);
+
+                        return true;
+                    }
+                }
+            }
+
+            action = null;
+
+            return false;
+        }
+
+        private Action TakeFrom(int priority)
+        {
+            LinkedList<object> turns = _turns[priority];
+            object owner = turns.First.Value;
+            turns.RemoveFirst();
+
+            Queue<Action> queue = _queues[priority][owner];
+            Action action = queue.Dequeue();
+            _count--;
+
+            if (queue.Count > 0)
+                turns.AddLast(owner);
+            else
+                _queues[priority].Remove(owner);
+
+            return action;
+        }
+    }
+}
@@ -0,0 +1,191 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+using ClassicUO.Game.Managers;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Lets script threads sleep until something they care about happens in game, instead of polling.
+    /// Each event type has a counter, waiting means blocking until one of the requested counters changes.
+    /// Every waiter has its own handle, registered for the events it waits on, so a signal only wakes the threads that care about it.
+    /// </summary>
+    internal static class ScriptEvents
+    {
+        /// <summary>
+        /// Conditions are re-checked at least this often (ms), in case a state change happened without an event.
+        /// </summary>
+        private const int RECHECK_MS = 1000;
+
+        private static readonly object _lock = new object();
+        private static readonly long[] _counters = new long[Enum.GetValues(typeof(API.Events)).Length];
+        private static readonly List<ManualResetEventSlim>[] _waiters = CreateWaiterLists(_counters.Length);
+        private static readonly Stack<ManualResetEventSlim> _handlePool = new();
+        private static bool _subscribed;
+
+        /// <summary>
+        /// Raised after any event is signaled, outside of the lock.
+        /// </summary>
+        public static event Action Signaled;
+
+        public static void Subscribe()
+        {
+            if (_subscribed)
+                return;
+
+            _subscribed = true;
+
+            EventSink.JournalEntryAdded += (_, _) => Signal(API.Events.Journal);
+            EventSink.OnTargetingChanged += (_, _) => Signal(API.Events.Target);
+            EventSink.OnServerGumpOpened += (_, _) => Signal(API.Events.Gump);
+            EventSink.OPLOnReceive += (_, _) => Signal(API.Events.OPL);
+            EventSink.OnItemCreated += (_, _) => Signal(API.Events.ItemUpdate);
+            EventSink.OnItemUpdated += (_, _) => Signal(API.Events.ItemUpdate);
+            EventSink.OnPathFindingStopped += (_, _) => Signal(API.Events.Pathfinding);
+        }
+
+        public static void Signal(API.Events e)
+        {
+            lock (_lock)
+            {
+                _counters[(int)e]++;
+
+                foreach (ManualResetEventSlim waiter in _waiters[(int)e])
+                    waiter.Set();
+            }
+
+            Signaled?.Invoke();
+        }
+
+        /// <summary>
+        /// Non blocking version of <see cref="Wait"/>.
+        /// </summary>
+        /// <returns>The event that fired since <paramref name="mark"/> was taken, or null</returns>
+        public static API.Events? Fired(IList<API.Events> events, long[] mark)
+        {
+            lock (_lock)
+                return FiredLocked(events, mark);
+        }
+
+        private static API.Events? FiredLocked(IList<API.Events> events, long[] mark)
+        {
+            foreach (API.Events e in events)
+            {
+                if (_counters[(int)e] != mark[(int)e])
+                    return e;
+            }
+
+            return null;
+        }
+
+        private static List<ManualResetEventSlim>[] CreateWaiterLists(int count)
+        {
+            var lists = new List<ManualResetEventSlim>[count];
+
+            for (int i = 0; i < count; i++)
+                lists[i] = new List<ManualResetEventSlim>();
+
+            return lists;
+        }
+
+        /// <summary>
+        /// Current counters, pass these to <see cref="Wait"/> so events fired after this call are not missed.
+        /// </summary>
+        public static long[] Mark()
+        {
+            lock (_lock)
+                return (long[])_counters.Clone();
+        }
+
+        /// <summary>
+        /// Block until one of the events fires after <paramref name="mark"/> was taken.
+        /// </summary>
+        /// <returns>The event that fired, or null if timed out</returns>
+        public static API.Events? Wait(IList<API.Events> events, long[] mark, int timeoutMs)
+        {
+            CooperativeScheduler.RefuseWait();
+            int expire = Environment.TickCount + timeoutMs;
+            long start = Stopwatch.GetTimestamp();
+            ManualResetEventSlim handle = null;
+
+            try
+            {
+                lock (_lock)
+                {
+                    API.Events? fired = FiredLocked(events, mark);
+
+                    if (fired != null)
+                        return fired;
+
+                    handle = _handlePool.Count > 0 ? _handlePool.Pop() : new ManualResetEventSlim();
+
+                    foreach (API.Events e in events)
+                        _waiters[(int)e].Add(handle);
+                }
+
+                while (true)
+                {
+                    int remaining = unchecked(expire - Environment.TickCount);
+
+                    if (remaining <= 0)
+                        return null;
+
+                    handle.Wait(remaining);
+
+                    lock (_lock)
+                    {
+                        API.Events? fired = FiredLocked(events, mark);
+
+                        if (fired != null)
+                            return fired;
+
+                        // Signals set the handle under the lock, so none can be missed between the check and the reset
+                        handle.Reset();
+                    }
+                }
+            }
+            finally
+            {
+                if (handle != null)
+                {
+                    lock (_lock)
+                    {
+                        foreach (API.Events e in events)
+                            _waiters[(int)e].Remove(handle);
+
+                        handle.Reset();
+                        _handlePool.Push(handle);
+                    }
+                }
+
+                ScriptProfile.Current?.AddWait(Stopwatch.GetTimestamp() - start);
+            }
+        }
+
+        /// <summary>
+        /// Wait until <paramref name="condition"/> is true, checking it again each time one of the events fires.
+        /// </summary>
+        /// <returns>True if the condition was met before the timeout</returns>
+        public static bool WaitUntil(IList<API.Events> events, Func<bool> condition, double timeoutSeconds)
+        {
+            CooperativeScheduler.RefuseWait();
+            int expire = Environment.TickCount + (int)(timeoutSeconds * 1000);
+
+            while (true)
+            {
+                long[] mark = Mark();
+
+                if (condition())
+                    return true;
+
+                int remaining = unchecked(expire - Environment.TickCount);
+
+                if (remaining <= 0)
+                    return false;
+
+                Wait(events, mark, Math.Min(remaining, RECHECK_MS));
+            }
+        }
+    }
+}
@@ -0,0 +1,313 @@
+using System;
+using System.Collections;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Text.RegularExpressions;
+using System.Threading;
+using ClassicUO.Game.Managers;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// A bounded, per script copy of the journal. Every entry gets an increasing sequence number so scripts can keep a cursor
+    /// and only look at entries newer than it, instead of rescanning everything.
+    /// Written from the game thread, read from the script thread. Matching runs on a copy, outside of the lock the game thread needs.
+    /// Also has the members of the ConcurrentQueue API.JournalEntries used to be, so older scripts keep working.
+    /// </summary>
+    public class ScriptJournal : IEnumerable<JournalEntry>
+    {
+        public const int MAX_ENTRIES = 1000;
+
+        /// <summary>
+        /// Regex patterns kept compiled, the least recently used one is dropped past this.
+        /// </summary>
+        public const int MAX_CACHED_REGEXES = 64;
+
+        private static readonly Dictionary<string, LinkedListNode<(string Pattern, Regex Regex)>> _regexes = new();
+        private static readonly LinkedList<(string Pattern, Regex Regex)> _regexOrder = new();
+
+        private readonly object _lock = new object();
+        private readonly JournalEntry[] _entries;
+        private readonly long[] _sequences;
+        private int _head, _count;
+        private long _lastSequence;
+
+        public ScriptJournal(int capacity = MAX_ENTRIES)
+        {
+            _entries = new JournalEntry[capacity];
+            _sequences = new long[capacity];
+        }
+
+        /// <summary>
+        /// Sequence number of the newest entry, 0 if nothing was added yet.
+        /// </summary>
+        public long LastSequence
+        {
+            get
+            {
+                lock (_lock)
+                    return _lastSequence;
+            }
+        }
+
+        public int Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _count;
+            }
+        }
+
+        public bool IsEmpty => Count == 0;
+
+        /// <summary>
+        /// Copies the entry, the journal manager reuses its entry objects.
+        /// </summary>
+        public void Add(JournalEntry e)
+        {
+            JournalEntry copy = new JournalEntry
+            {
+                Font = e.Font,
+                Hue = e.Hue,
+                IsUnicode = e.IsUnicode,
+                Name = e.Name,
+                Text = e.Text ?? string.Empty,
+                TextType = e.TextType,
+                Time = e.Time,
+                MessageType = e.MessageType
+            };
+
+            lock (_lock)
+            {
+                int index = (_head + _count) % _entries.Length;
+
+                if (_count == _entries.Length)
+                    _head = (_head + 1) % _entries.Length;
+                else
+                    _count++;
+
+                _entries[index] = copy;
+                _sequences[index] = ++_lastSequence;
+
+                Monitor.PulseAll(_lock);
+            }
+        }
+
+        public void Clear()
+        {
+            lock (_lock)
+            {
+                Array.Clear(_entries, 0, _entries.Length);
+                _head = 0;
+                _count = 0;
+            }
+        }
+
+        /// <summary>
+        /// Entries with a sequence number greater than <paramref name="cursor"/>, oldest first.
+        /// </summary>
+        public JournalEntry[] GetSince(long cursor)
+        {
+            lock (_lock)
+            {
+                int start = FirstIndexAfter(cursor);
+                JournalEntry[] result = new JournalEntry[_count - start];
+
+                for (int i = start; i < _count; i++)
+                    result[i - start] = _entries[(_head + i) % _entries.Length];
+
+                return result;
+            }
+        }
+
+        /// <summary>
+        /// Check entries newer than <paramref name="cursor"/> for any of the messages. Messages starting with $ are regex.
+        /// </summary>
+        public bool Contains(IList<string> msgs, long cursor = 0)
+        {
+            if (msgs == null || msgs.Count == 0)
+                return false;
+
+            return Find(GetSince(cursor), msgs) != null;
+        }
+
+        public void Enqueue(JournalEntry e) => Add(e);
+
+        /// <summary>
+        /// Remove the oldest entry.
+        /// </summary>
+        public bool TryDequeue(out JournalEntry result)
+        {
+            lock (_lock)
+            {
+                if (_count == 0)
+                {
+                    result = null;
+
+                    return false;
+                }
+
+                result = _entries[_head];
+                _entries[_head] = null;
+                _head = (_head + 1) % _entries.Length;
+                _count--;
+
+                return true;
+            }
+        }
+
+        public bool TryPeek(out JournalEntry result)
+        {
+            lock (_lock)
+            {
+                result = _count > 0 ? _entries[_head] : null;
+
+                return _count > 0;
+            }
+        }
+
+        public JournalEntry[] ToArray() => GetSince(0);
+
+        public void CopyTo(JournalEntry[] array, int index) => GetSince(0).CopyTo(array, index);
+
+        /// <summary>
+        /// Wait until an entry newer than <paramref name="cursor"/> matches one of the messages.
+        /// </summary>
+        /// <returns>The matching entry, or null if timed out</returns>
+        public JournalEntry WaitFor(IList<string> msgs, long cursor, int timeoutMs)
+        {
+            CooperativeScheduler.RefuseWait();
+            int expire = Environment.TickCount + timeoutMs;
+            long start = Stopwatch.GetTimestamp();
+
+            try
+            {
+                if (msgs == null || msgs.Count == 0)
+                    return null;
+
+                while (true)
+                {
+                    JournalEntry[] entries;
+                    long scanned;
+
+                    lock (_lock)
+                    {
+                        entries = GetSince(cursor);
+                        scanned = _lastSequence;
+                    }
+
+                    JournalEntry match = Find(entries, msgs);
+
+                    if (match != null)
+                        return match;
+
+                    cursor = scanned;
+
+                    int remaining = unchecked(expire - Environment.TickCount);
+
+                    if (remaining <= 0)
+                        return null;
+
+                    lock (_lock)
+                    {
+                        // Entries added while matching are picked up right away
+                        if (_lastSequence == scanned)
+                            Monitor.Wait(_lock, remaining);
+                    }
+                }
+            }
+            finally
+            {
+                ScriptProfile.Current?.AddWait(Stopwatch.GetTimestamp() - start);
+            }
+        }
+
+        private static JournalEntry Find(JournalEntry[] entries, IList<string> msgs)
+        {
+            foreach (JournalEntry je in entries)
+            {
+                foreach (string msg in msgs)
+                {
+                    if (IsMatch(je.Text, msg))
+                        return je;
+                }
+            }
+
+            return null;
+        }
+
+        private int FirstIndexAfter(long cursor)
+        {
+            if (_count == 0)
+                return 0;
+
+            long oldest = _sequences[_head];
+
+            if (cursor < oldest)
+                return 0;
+
+            return (int)Math.Min(_count, cursor - oldest + 1);
+        }
+
+        public static bool IsMatch(string text, string msg)
+        {
+            if (string.IsNullOrEmpty(msg))
+                return false;
+
+            if (msg[0] == '$')
+                return GetRegex(msg.Substring(1)).IsMatch(text);
+
+            return text.Contains(msg);
+        }
+
+        /// <summary>
+        /// Scripts can build patterns at runtime, so only the most recently used ones are kept.
+        /// </summary>
+        private static Regex GetRegex(string pattern)
+        {
+            lock (_regexes)
+            {
+                if (_regexes.TryGetValue(pattern, out LinkedListNode<(string Pattern, Regex Regex)> node))
+                {
+                    _regexOrder.Remove(node);
+                    _regexOrder.AddFirst(node);
+
+                    return node.Value.Regex;
+                }
+            }
+
+            // Built outside of the lock, an invalid pattern throws to the script
+            var regex = new Regex(pattern);
+
+            lock (_regexes)
+            {
+                if (!_regexes.ContainsKey(pattern))
+                {
+                    _regexes[pattern] = _regexOrder.AddFirst((pattern, regex));
+
+                    if (_regexes.Count > MAX_CACHED_REGEXES)
+                    {
+                        _regexes.Remove(_regexOrder.Last.Value.Pattern);
+                        _regexOrder.RemoveLast();
+                    }
+                }
+            }
+
+            return regex;
+        }
+
+        internal static int CachedRegexCount
+        {
+            get
+            {
+                lock (_regexes)
+                    return _regexes.Count;
+            }
+        }
+
+        public IEnumerator<JournalEntry> GetEnumerator() => ((IEnumerable<JournalEntry>)GetSince(0)).GetEnumerator();
+
+        IEnumerator IEnumerable.GetEnumerator() => GetEnumerator();
+    }
+}
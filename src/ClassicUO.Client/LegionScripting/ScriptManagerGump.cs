@@ -505,6 +505,7 @@ while True:
                 ContextMenu.Add(new ContextMenuItemEntry("Edit", () => { UIManager.Add(new ScriptEditor(Script)); }));
                 ContextMenu.Add(new ContextMenuItemEntry("Edit Externally", () => { OpenFileWithDefaultApp(Script.FullPath); }));
                 ContextMenu.Add(new ContextMenuItemEntry("Autostart", () => { GenAutostartContext().Show(); }));
+                ContextMenu.Add(new ContextMenuItemEntry("Print profile", () => { GameActions.Print(Script.Profile.ToString()); }));
                 ContextMenu.Add(new ContextMenuItemEntry("Create macro button", () =>
                 {
                     var mm = MacroManager.TryGetMacroManager();
@@ -553,6 +554,14 @@ while True:
                 SetBGColors();
             }
 
+            public override void SlowUpdate()
+            {
+                base.SlowUpdate();
+
+                if (Script.ScriptType == ScriptType.Python && Script.IsPlaying)
+                    SetTooltip($"{Script.FileName}\n{Script.Profile.Summary()}");
+            }
+
             private void ScriptStarted(object sender, ScriptInfoEvent e)
             {
                 SetBGColors();
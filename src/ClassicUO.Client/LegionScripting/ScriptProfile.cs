@@ -0,0 +1,241 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text;
+using System.Threading;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Timing for one running python script: how often it asks the game thread to do something, how long those requests
+    /// sit in <see cref="API.QueuedPythonActions"/> and run in OnUpdate, which API methods it calls and how long it spends running vs waiting.
+    /// Updated from the script thread and the game thread, read from anywhere.
+    /// </summary>
+    public class ScriptProfile
+    {
+        /// <summary>
+        /// Profile of the script running on the current thread, null on threads that are not running a script.
+        /// </summary>
+        [ThreadStatic]
+        internal static ScriptProfile Current;
+
+        private readonly object _lock = new object();
+        private readonly Dictionary<string, ApiCallStats> _methods = new();
+        private long _startTicks, _runTicks, _runStartTicks, _waitTicks;
+        private long _queuedTicks, _execTicks, _maxQueuedTicks, _maxExecTicks;
+        private int _runDepth;
+        private long _mainThreadCalls;
+
+        public ScriptProfile(string name)
+        {
+            Name = name;
+            ContextName = "Python " + name;
+            _startTicks = Stopwatch.GetTimestamp();
+        }
+
+        public string Name { get; }
+
+        /// <summary>
+        /// Name used for this script's context in <see cref="ClassicUO.Utility.Profiler"/>.
+        /// </summary>
+        internal string ContextName { get; }
+
+        /// <summary>
+        /// Number of actions this script queued to run on the game thread.
+        /// </summary>
+        public long MainThreadCalls => Interlocked.Read(ref _mainThreadCalls);
+
+        /// <summary>
+        /// Actions from this script currently waiting for the game thread.
+        /// </summary>
+        public int QueuedActions => API.QueuedPythonActions.CountFor(this);
+
+        /// <summary>
+        /// Total ms the script's actions waited in the queue before the game thread got to them.
+        /// </summary>
+        public double QueuedMs => ToMs(Interlocked.Read(ref _queuedTicks));
+
+        /// <summary>
+        /// Total ms the game thread spent running this script's actions.
+        /// </summary>
+        public double ExecutingMs => ToMs(Interlocked.Read(ref _execTicks));
+
+        public double MaxQueuedMs => ToMs(Interlocked.Read(ref _maxQueuedTicks));
+
+        public double MaxExecutingMs => ToMs(Interlocked.Read(ref _maxExecTicks));
+
+        /// <summary>
+        /// Ms since the script was started.
+        /// </summary>
+        public double WallMs => ToMs(Stopwatch.GetTimestamp() - _startTicks);
+
+        /// <summary>
+        /// Ms the script spent blocked, waiting on the game thread, pauses or events.
+        /// </summary>
+        public double WaitingMs => ToMs(Interlocked.Read(ref _waitTicks));
+
+        /// <summary>
+        /// Ms the script spent running its own code, an estimate of its cpu time.
+        /// </summary>
+        public double ActiveMs
+        {
+            get
+            {
+                long run;
+
+                lock (_lock)
+                {
+                    run = _runTicks;
+
+                    if (_runDepth > 0)
+                        run += Stopwatch.GetTimestamp() - _runStartTicks;
+                }
+
+                return ToMs(Math.Max(0, run - Interlocked.Read(ref _waitTicks)));
+            }
+        }
+
+        /// <summary>
+        /// Call stats per API method, sorted by total time.
+        /// </summary>
+        public List<ApiCallStats> GetMethods()
+        {
+            lock (_lock)
+                return _methods.Values.Select(m => m.Clone()).OrderByDescending(m => m.TotalMs).ToList();
+        }
+
+        public void Reset()
+        {
+            lock (_lock)
+            {
+                _methods.Clear();
+                _startTicks = Stopwatch.GetTimestamp();
+                _runTicks = 0;
+                _runStartTicks = _startTicks;
+            }
+
+            Interlocked.Exchange(ref _waitTicks, 0);
+            Interlocked.Exchange(ref _queuedTicks, 0);
+            Interlocked.Exchange(ref _execTicks, 0);
+            Interlocked.Exchange(ref _maxQueuedTicks, 0);
+            Interlocked.Exchange(ref _maxExecTicks, 0);
+            Interlocked.Exchange(ref _mainThreadCalls, 0);
+        }
+
+        /// <summary>
+        /// Mark the start of a stretch where the script's own code runs on the current thread.
+        /// </summary>
+        internal void BeginRun()
+        {
+            lock (_lock)
+            {
+                if (_runDepth++ == 0)
+                    _runStartTicks = Stopwatch.GetTimestamp();
+            }
+
+            Current = this;
+        }
+
+        internal void EndRun()
+        {
+            lock (_lock)
+            {
+                if (_runDepth > 0 && --_runDepth == 0)
+                    _runTicks += Stopwatch.GetTimestamp() - _runStartTicks;
+            }
+
+            Current = null;
+        }
+
+        internal void AddWait(long ticks)
+        {
+            Interlocked.Add(ref _waitTicks, ticks);
+        }
+
+        /// <summary>
+        /// Record an action the script queued for the game thread.
+        /// </summary>
+        internal void RecordMainThreadCall(string method, long queuedTicks, long execTicks, long totalTicks)
+        {
+            Interlocked.Increment(ref _mainThreadCalls);
+            Interlocked.Add(ref _queuedTicks, queuedTicks);
+            Interlocked.Add(ref _execTicks, execTicks);
+            InterlockedMax(ref _maxQueuedTicks, queuedTicks);
+            InterlockedMax(ref _maxExecTicks, execTicks);
+
+            RecordCall(method, totalTicks);
+        }
+
+        internal void RecordCall(string method, long ticks)
+        {
+            if (string.IsNullOrEmpty(method))
+                return;
+
+            lock (_lock)
+            {
+                if (!_methods.TryGetValue(method, out ApiCallStats stats))
+                    _methods[method] = stats = new ApiCallStats(method);
+
+                stats.Add(ToMs(ticks));
+            }
+        }
+
+        /// <summary>
+        /// Short multi-line summary, used for the script manager tooltip.
+        /// </summary>
+        public string Summary(int topMethods = 3)
+        {
+            var sb = new StringBuilder();
+            sb.AppendLine($"Running: {WallMs / 1000d:0.0}s, active {ActiveMs:0}ms, waiting {WaitingMs:0}ms");
+            sb.Append($"Game thread: {MainThreadCalls} calls ({QueuedActions} waiting), queued {QueuedMs:0.0}ms (max {MaxQueuedMs:0.0}), executing {ExecutingMs:0.0}ms (max {MaxExecutingMs:0.0})");
+
+            foreach (ApiCallStats m in GetMethods().Take(topMethods))
+                sb.Append($"\n  {m}");
+
+            return sb.ToString();
+        }
+
+        public override string ToString() => $"{Name}\n{Summary(int.MaxValue)}";
+
+        internal static double ToMs(long ticks) => ticks * 1000d / Stopwatch.Frequency;
+
+        private static void InterlockedMax(ref long location, long value)
+        {
+            long current;
+
+            while (value > (current = Interlocked.Read(ref location)))
+            {
+                if (Interlocked.CompareExchange(ref location, value, current) == current)
+                    break;
+            }
+        }
+    }
+
+    public class ApiCallStats
+    {
+        public ApiCallStats(string method)
+        {
+            Method = method;
+        }
+
+        public string Method { get; }
+        public long Count { get; private set; }
+        public double TotalMs { get; private set; }
+        public double MaxMs { get; private set; }
+        public double AverageMs => Count > 0 ? TotalMs / Count : 0;
+
+        internal void Add(double ms)
+        {
+            Count++;
+            TotalMs += ms;
+
+            if (ms > MaxMs)
+                MaxMs = ms;
+        }
+
+        internal ApiCallStats Clone() => (ApiCallStats)MemberwiseClone();
+
+        public override string ToString() => $"{Method}: {Count}x, avg {AverageMs:0.00}ms, max {MaxMs:0.00}ms";
+    }
+}
@@ -0,0 +1,514 @@
+using System;
+using System.Diagnostics;
+using System.IO;
+using System.IO.MemoryMappedFiles;
+using System.Numerics;
+using System.Text;
+using System.Threading;
+
+namespace ClassicUO.LegionScripting
+{
+    /// <summary>
+    /// Shared vars every client on the machine can see, for API.SharedVar.Machine.
+    /// The vars live in a fixed size hash table inside of a memory mapped file, so all processes mapping it read and write the same memory.
+    /// A spin lock in the file header guards the table. The lock word holds the process id of the holder, the lock is only taken over
+    /// when that process is gone.
+    /// Every write takes the next value of a counter in the header as the var's version, versions never repeat so
+    /// <see cref="CompareAndSet"/> can't be fooled by a var that was removed and set again. Other clients notice writes by polling that counter.
+    /// Values can be text, numbers, bools or None. Vars can expire, an expired var is gone and its slot is used again.
+    /// </summary>
+    internal sealed unsafe class SharedVarStore : IDisposable
+    {
+        public const int MAX_NAME_BYTES = 64;
+        public const int MAX_VALUE_BYTES = SLOT_SIZE - S_VALUE;
+        public const int SLOT_COUNT = 2048;
+
+        private const int MAGIC = 0x32524156; // VAR2
+        private const int HEADER_SIZE = 64;
+        private const int SLOT_SIZE = 512;
+        private const long FILE_SIZE = HEADER_SIZE + (long)SLOT_SIZE * SLOT_COUNT;
+        private const int LOCK_TIMEOUT_MS = 1000;
+
+        // Header
+        private const int H_MAGIC = 0;
+        private const int H_LOCK = 8;
+        private const int H_CHANGES = 16;
+
+        // Slot
+        private const int S_STATE = 0;
+        private const int S_NAME_LENGTH = 4;
+        private const int S_TYPE = 6;
+        private const int S_VERSION = 8;
+        private const int S_VALUE_LENGTH = 16;
+        private const int S_EXPIRES = 24;
+        private const int S_NAME = 32;
+        private const int S_VALUE = S_NAME + MAX_NAME_BYTES;
+
+        private const int STATE_EMPTY = 0;
+        private const int STATE_USED = 1;
+        private const int STATE_REMOVED = 2;
+
+        private const byte TYPE_NONE = 0;
+        private const byte TYPE_STRING = 1;
+        private const byte TYPE_INTEGER = 2;
+        private const byte TYPE_DOUBLE = 3;
+        private const byte TYPE_BOOL = 4;
+
+        private static readonly object _machineLock = new object();
+        private static SharedVarStore _machine;
+        private static int _tickets;
+
+        private readonly MemoryMappedFile _file;
+        private readonly MemoryMappedViewAccessor _view;
+        private readonly byte* _ptr;
+        private readonly long _owner;
+        private long _seenChanges;
+        private long _ownChanges;
+
+        public SharedVarStore(string path)
+        {
+            Directory.CreateDirectory(Path.GetDirectoryName(path));
+
+            var stream = new FileStream(path, FileMode.OpenOrCreate, FileAccess.ReadWrite, FileShare.ReadWrite | FileShare.Delete);
+
+            try
+            {
+                // A new file is zero filled, which is an empty table
+                if (stream.Length < FILE_SIZE)
+                    stream.SetLength(FILE_SIZE);
+
+                _file = MemoryMappedFile.CreateFromFile(stream, null, FILE_SIZE, MemoryMappedFileAccess.ReadWrite, HandleInheritability.None, false);
+            }
+            catch
+            {
+                stream.Dispose();
+
+                throw;
+            }
+
+            _view = _file.CreateViewAccessor(0, FILE_SIZE);
+
+            byte* ptr = null;
+            _view.SafeMemoryMappedViewHandle.AcquirePointer(ref ptr);
+            _ptr = ptr;
+
+            int magic = Interlocked.CompareExchange(ref *(int*)(_ptr + H_MAGIC), MAGIC, 0);
+
+            if (magic != 0 && magic != MAGIC)
+            {
+                Dispose();
+
+                throw new InvalidDataException($"{path} is not a shared var file");
+            }
+
+            _owner = (long)Process.GetCurrentProcess().Id << 32;
+            _seenChanges = Changes;
+        }
+
+        /// <summary>
+        /// The store shared by the clients of this machine, opened the first time a script uses it.
+        /// </summary>
+        public static SharedVarStore Machine
+        {
+            get
+            {
+                lock (_machineLock)
+                    return _machine ??= new SharedVarStore(Path.Combine(Path.GetTempPath(), "TazUO", "sharedvars2.bin"));
+            }
+        }
+
+        /// <summary>
+        /// Number of writes made to the store, by any client.
+        /// </summary>
+        public long Changes => Interlocked.Read(ref *(long*)(_ptr + H_CHANGES));
+
+        /// <summary>
+        /// Signal <see cref="API.Events.SharedVar"/> when another client wrote since the last call. Does nothing until a script used the store.
+        /// </summary>
+        public static void PollMachine()
+        {
+            SharedVarStore store = Volatile.Read(ref _machine);
+
+            if (store != null && store.Poll())
+                ScriptEvents.Signal(API.Events.SharedVar);
+        }
+
+        public static void CloseMachine()
+        {
+            lock (_machineLock)
+            {
+                _machine?.Dispose();
+                _machine = null;
+            }
+        }
+
+        /// <summary>
+        /// True when another store wrote since the last call, writes made through this one don't count.
+        /// </summary>
+        public bool Poll()
+        {
+            if (Changes == _seenChanges)
+                return false;
+
+            long lockValue = Lock();
+
+            try
+            {
+                long others = Changes - _seenChanges - _ownChanges;
+                _seenChanges = Changes;
+                _ownChanges = 0;
+
+                return others > 0;
+            }
+            finally
+            {
+                Unlock(lockValue);
+            }
+        }
+
+        /// <param name="version">The version of the var, 0 if it isn't set</param>
+        /// <returns>The value, or null if the var isn't set</returns>
+        public object Get(string name, out long version)
+        {
+            byte[] key = EncodeName(name);
+
+            long lockValue = Lock();
+
+            try
+            {
+                byte* slot = Find(key, false);
+
+                if (slot == null)
+                {
+                    version = 0;
+
+                    return null;
+                }
+
+                version = *(long*)(slot + S_VERSION);
+
+                return DecodeValue(slot);
+            }
+            finally
+            {
+                Unlock(lockValue);
+            }
+        }
+
+        /// <param name="ttl">Seconds until the var expires, 0 to keep it until it is removed</param>
+        /// <returns>The new version of the var</returns>
+        public long Set(string name, object value, double ttl = 0)
+        {
+            CompareAndSet(name, -1, value, ttl, out long version);
+
+            return version;
+        }
+
+        /// <summary>
+        /// Set the var only if its version is still <paramref name="expectedVersion"/>, use 0 to only set it when it isn't set yet.
+        /// </summary>
+        /// <param name="ttl">Seconds until the var expires, 0 to keep it until it is removed</param>
+        public bool CompareAndSet(string name, long expectedVersion, object value, double ttl = 0) => CompareAndSet(name, expectedVersion, value, ttl, out _);
+
+        public bool Remove(string name)
+        {
+            byte[] key = EncodeName(name);
+
+            long lockValue = Lock();
+
+            try
+            {
+                byte* slot = Find(key, false);
+
+                if (slot == null)
+                    return false;
+
+                *(int*)(slot + S_STATE) = STATE_REMOVED;
+                NextVersion();
+
+                return true;
+            }
+            finally
+            {
+                Unlock(lockValue);
+            }
+        }
+
+        public void Clear()
+        {
+            long lockValue = Lock();
+
+            try
+            {
+                for (int i = 0; i < SLOT_COUNT; i++)
+                    *(int*)GetSlot(i) = STATE_EMPTY;
+
+                NextVersion();
+            }
+            finally
+            {
+                Unlock(lockValue);
+            }
+        }
+
+        private bool CompareAndSet(string name, long expectedVersion, object value, double ttl, out long version)
+        {
+            byte[] key = EncodeName(name);
+            byte type = EncodeValue(value, out byte[] data);
+            long expires = ttl > 0 ? Now() + (long)(ttl * 1000) : 0;
+
+            long lockValue = Lock();
+
+            try
+            {
+                byte* slot = Find(key, true);
+                bool used = slot != null && *(int*)(slot + S_STATE) == STATE_USED;
+
+                if (expectedVersion != -1 && expectedVersion != (used ? *(long*)(slot + S_VERSION) : 0))
+                {
+                    version = used ? *(long*)(slot + S_VERSION) : 0;
+
+                    return false;
+                }
+
+                if (slot == null)
+                    throw new InvalidOperationException($"The shared var store is full, it holds up to {SLOT_COUNT} vars. Remove vars you don't need anymore or give them a ttl");
+
+                if (!used)
+                {
+                    *(ushort*)(slot + S_NAME_LENGTH) = (ushort)key.Length;
+
+                    fixed (byte* src = key)
+                        Buffer.MemoryCopy(src, slot + S_NAME, MAX_NAME_BYTES, key.Length);
+                }
+
+                slot[S_TYPE] = type;
+                *(int*)(slot + S_VALUE_LENGTH) = data.Length;
+
+                if (data.Length != 0)
+                {
+                    fixed (byte* src = data)
+                        Buffer.MemoryCopy(src, slot + S_VALUE, MAX_VALUE_BYTES, data.Length);
+                }
+
+                *(long*)(slot + S_EXPIRES) = expires;
+                version = *(long*)(slot + S_VERSION) = NextVersion();
+                *(int*)(slot + S_STATE) = STATE_USED;
+
+                return true;
+            }
+            finally
+            {
+                Unlock(lockValue);
+            }
+        }
+
+        /// <summary>
+        /// Only called while holding the lock.
+        /// </summary>
+        private long NextVersion()
+        {
+            _ownChanges++;
+
+            return Interlocked.Increment(ref *(long*)(_ptr + H_CHANGES));
+        }
+
+        // Wall clock in ms, every process on the machine agrees on it
+        private static long Now() => DateTime.UtcNow.Ticks / TimeSpan.TicksPerMillisecond;
+
+        /// <summary>
+        /// The slot holding <paramref name="key"/>. With <paramref name="create"/> a free slot for it when it isn't there, null if the table is full.
+        /// Expired vars passed on the way are removed.
+        /// </summary>
+        private byte* Find(byte[] key, bool create)
+        {
+            uint hash = 2166136261;
+
+            foreach (byte b in key)
+                hash = (hash ^ b) * 16777619;
+
+            byte* free = null;
+            long now = Now();
+
+            for (int i = 0; i < SLOT_COUNT; i++)
+            {
+                byte* slot = GetSlot((int)((hash + (uint)i) % SLOT_COUNT));
+                int state = *(int*)(slot + S_STATE);
+
+                if (state == STATE_USED)
+                {
+                    long expires = *(long*)(slot + S_EXPIRES);
+
+                    if (expires != 0 && expires <= now)
+                    {
+                        *(int*)(slot + S_STATE) = state = STATE_REMOVED;
+                    }
+                }
+
+                if (state == STATE_EMPTY)
+                    return create ? (free != null ? free : slot) : null;
+
+                if (state == STATE_REMOVED)
+                {
+                    if (free == null)
+                        free = slot;
+
+                    continue;
+                }
+
+                if (*(ushort*)(slot + S_NAME_LENGTH) == key.Length && new ReadOnlySpan<byte>(slot + S_NAME, key.Length).SequenceEqual(key))
+                    return slot;
+            }
+
+            return create ? free : null;
+        }
+
+        private byte* GetSlot(int index) => _ptr + HEADER_SIZE + (long)index * SLOT_SIZE;
+
+        /// <returns>The value written to the lock word, pass it to <see cref="Unlock"/></returns>
+        private long Lock()
+        {
+            long* word = (long*)(_ptr + H_LOCK);
+
+            // The holder's process id and a ticket, so a lock left behind by a client that died can be told apart
+            long value = _owner | (uint)Interlocked.Increment(ref _tickets);
+            var spin = new SpinWait();
+            long seen = 0;
+            int seenAt = 0;
+
+            while (true)
+            {
+                long held = Interlocked.CompareExchange(ref *word, value, 0);
+
+                if (held == 0)
+                    return value;
+
+                if (held != seen)
+                {
+                    seen = held;
+                    seenAt = Environment.TickCount;
+                }
+                else if (Environment.TickCount - seenAt > LOCK_TIMEOUT_MS)
+                {
+                    // A holder that is only slow keeps the lock, check again after another timeout
+                    if (!IsRunning((int)(held >> 32)) && Interlocked.CompareExchange(ref *word, value, held) == held)
+                        return value;
+
+                    seenAt = Environment.TickCount;
+                }
+
+                spin.SpinOnce();
+            }
+        }
+
+        /// <summary>
+        /// Release the lock, unless somebody took it over.
+        /// </summary>
+        private void Unlock(long value)
+        {
+            Interlocked.CompareExchange(ref *(long*)(_ptr + H_LOCK), 0, value);
+        }
+
+        private static bool IsRunning(int processId)
+        {
+            try
+            {
+                using (Process process = Process.GetProcessById(processId))
+                    return !process.HasExited;
+            }
+            catch (ArgumentException)
+            {
+                return false;
+            }
+            catch (Exception)
+            {
+                // Not allowed to look at it, so it is there
+                return true;
+            }
+        }
+
+        private static byte[] EncodeName(string name)
+        {
+            if (string.IsNullOrEmpty(name))
+                throw new ArgumentException("Shared vars must have a name");
+
+            byte[] key = Encoding.UTF8.GetBytes(name);
+
+            if (key.Length > MAX_NAME_BYTES)
+                throw new ArgumentException($"Shared var names can be up to {MAX_NAME_BYTES} bytes long");
+
+            return key;
+        }
+
+        private static byte EncodeValue(object value, out byte[] data)
+        {
+            switch (value)
+            {
+                case null:
+                    data = Array.Empty<byte>();
+
+                    return TYPE_NONE;
+                case string s:
+                    data = Encoding.UTF8.GetBytes(s);
+
+                    if (data.Length > MAX_VALUE_BYTES)
+                        throw new ArgumentException($"Shared var values can be up to {MAX_VALUE_BYTES} bytes long");
+
+                    return TYPE_STRING;
+                case bool b:
+                    data = new[] { b ? (byte)1 : (byte)0 };
+
+                    return TYPE_BOOL;
+                case int _:
+                case long _:
+                case uint _:
+                case short _:
+                case ushort _:
+                case byte _:
+                case sbyte _:
+                    data = BitConverter.GetBytes(Convert.ToInt64(value));
+
+                    return TYPE_INTEGER;
+                case BigInteger big when big >= long.MinValue && big <= long.MaxValue:
+                    data = BitConverter.GetBytes((long)big);
+
+                    return TYPE_INTEGER;
+                case double _:
+                case float _:
+                    data = BitConverter.GetBytes(Convert.ToDouble(value));
+
+                    return TYPE_DOUBLE;
+                default:
+                    throw new ArgumentException("Machine shared vars can only hold text, numbers, bools or None");
+            }
+        }
+
+        private static object DecodeValue(byte* slot)
+        {
+            byte* data = slot + S_VALUE;
+
+            switch (slot[S_TYPE])
+            {
+                case TYPE_STRING:
+                    return Encoding.UTF8.GetString(data, *(int*)(slot + S_VALUE_LENGTH));
+                case TYPE_BOOL:
+                    return *data != 0;
+                case TYPE_INTEGER:
+                    long l = *(long*)data;
+
+                    return l >= int.MinValue && l <= int.MaxValue ? (object)(int)l : l;
+                case TYPE_DOUBLE:
+                    return *(double*)data;
+                default:
+                    return null;
+            }
+        }
+
+        public void Dispose()
+        {
+            _view.SafeMemoryMappedViewHandle.ReleasePointer();
+            _view.Dispose();
+            _file.Dispose();
+        }
+    }
+}
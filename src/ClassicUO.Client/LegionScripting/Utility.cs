@@ -34,7 +34,7 @@ namespace ClassicUO.LegionScripting
         {
             List<Item> list = new List<Item>();
 
-            foreach (Item item in World.Items.Values)
+            foreach (Item item in FindCandidates(gfx, parentContainer, rootContainer, parOrRootContainer))
             {
                 if (gfx != uint.MaxValue && item.Graphic != gfx)
                     continue;
@@ -51,10 +51,13 @@ namespace ClassicUO.LegionScripting
                 if (hue != ushort.MaxValue && item.Hue != hue)
                     continue;
 
-                var root = World.Items.Get(item.BackpackOrRootContainer);
+                if (groundRange != int.MaxValue)
+                {
+                    var root = World.Items.Get(item.BackpackOrRootContainer);
 
-                if (groundRange != int.MaxValue && ((item.Distance > groundRange && root == null) || (root != null && root.Distance > groundRange)))
-                    continue;
+                    if ((item.Distance > groundRange && root == null) || (root != null && root.Distance > groundRange))
+                        continue;
+                }
 
                 if (!skipIgnoreCheck && Interpreter.InIgnoreList(item))
                     continue;
@@ -65,6 +68,50 @@ namespace ClassicUO.LegionScripting
             return list;
         }
 
+        private static readonly List<uint> _candidateSerials = new List<uint>();
+
+        /// <summary>
+        /// Narrow down the items worth checking using <see cref="World.ItemIndex"/>, container filters first as they are usually the smallest set.
+        /// Every item that could match is returned, the caller still applies all filters.
+        /// </summary>
+        private static IEnumerable<Item> FindCandidates(uint gfx, uint parentContainer, uint rootContainer, uint parOrRootContainer)
+        {
+            _candidateSerials.Clear();
+
+            if (parentContainer != uint.MaxValue)
+            {
+                _candidateSerials.AddRange(World.ItemIndex.InContainer(parentContainer));
+            }
+            else if (rootContainer != uint.MaxValue || parOrRootContainer != uint.MaxValue)
+            {
+                uint container = rootContainer != uint.MaxValue ? rootContainer : parOrRootContainer;
+
+                _candidateSerials.Add(container); //A top level container is its own root
+                World.ItemIndex.CollectNested(container, _candidateSerials);
+            }
+            else if (gfx != uint.MaxValue)
+            {
+                if (gfx > ushort.MaxValue)
+                    return Enumerable.Empty<Item>();
+
+                _candidateSerials.AddRange(World.ItemIndex.WithGraphic((ushort)gfx));
+            }
+            else
+            {
+                return World.Items.Values;
+            }
+
+            List<Item> items = new List<Item>(_candidateSerials.Count);
+
+            foreach (uint serial in _candidateSerials)
+            {
+                if (World.Items.TryGetValue(serial, out Item item))
+                    items.Add(item);
+            }
+
+            return items;
+        }
+
         public static uint ContentsCount(Item container)
         {
             if (container == null) return 0;
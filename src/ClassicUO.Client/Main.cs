@@ -265,8 +265,14 @@ namespace ClassicUO
                         break;
                 }
 
-                Client.Run();
-
+                if (!string.IsNullOrEmpty(CUOEnviroment.ReplayFile))
+                {
+                    Client.Replay(CUOEnviroment.ReplayFile, CUOEnviroment.ReplaySpeed);
+                }
+                else
+                {
+                    Client.Run();
+                }
             }
 
             Log.Trace("Closing...");
@@ -534,6 +540,24 @@ namespace ClassicUO
 
                         break;
 
+                    case "packetcapture":
+                        CUOEnviroment.PacketCaptureFile = value;
+
+                        break;
+
+                    case "replay":
+                        CUOEnviroment.ReplayFile = value;
+
+                        break;
+
+                    case "replay_speed":
+                        if (double.TryParse(value, NumberStyles.Float, CultureInfo.InvariantCulture, out double replaySpeed))
+                        {
+                            CUOEnviroment.ReplaySpeed = replaySpeed;
+                        }
+
+                        break;
+
                     case "language":
 
                         switch (value?.ToUpperInvariant())
@@ -1,6 +1,9 @@
 using ClassicUO.Network.Encryption;
 using ClassicUO.Utility.Logging;
+using ClassicUO.Configuration;
 using System;
+using System.Buffers;
+using System.Diagnostics;
 using System.Net;
 using System.Net.Sockets;
 using System.Threading;
@@ -14,6 +17,8 @@ namespace ClassicUO.Network
 {
     sealed class AsyncSocketWrapper : IDisposable
     {
+        private const int RECEIVE_BUFFER_SIZE = 4096;
+
         private TcpClient _socket;
         private NetworkStream _stream;
         private CancellationTokenSource _cancellationTokenSource;
@@ -23,7 +28,11 @@ namespace ClassicUO.Network
 
         public event EventHandler OnConnected, OnDisconnected;
         public event EventHandler<SocketError> OnError;
-        public event EventHandler<byte[]> OnDataReceived;
+
+        /// <summary>
+        /// Raised from the receive thread with a segment rented from <see cref="ArrayPool{T}.Shared"/>, the handler owns it and must return it.
+        /// </summary>
+        public event EventHandler<ArraySegment<byte>> OnDataReceived;
 
         public async Task<bool> ConnectAsync(string ip, int port, CancellationToken cancellationToken = default)
         {
@@ -89,38 +98,33 @@ namespace ClassicUO.Network
 
         private async Task ReceiveLoopAsync(CancellationToken cancellationToken)
         {
-            var buffer = new byte[4096];
-
             try
             {
                 while (!cancellationToken.IsCancellationRequested && IsConnected)
                 {
-                    int toRead = Math.Min(buffer.Length, _socket.Client.Available);
-                    int bytesRead = -1;
-                    if(toRead > 0)
-                        bytesRead = await _stream.ReadAsync(buffer, 0, toRead, cancellationToken);
+                    // Waits for data instead of polling, Disconnect closes the socket to end a pending read
+                    byte[] buffer = ArrayPool<byte>.Shared.Rent(RECEIVE_BUFFER_SIZE);
+                    int bytesRead = await _stream.ReadAsync(buffer, 0, RECEIVE_BUFFER_SIZE, cancellationToken);
 
-                    if (bytesRead == 0)
+                    if (bytesRead == 0 || cancellationToken.IsCancellationRequested)
                     {
-                        OnDisconnected?.Invoke(this, EventArgs.Empty);
-                        Disconnect();
+                        ArrayPool<byte>.Shared.Return(buffer);
 
-                        break;
-                    }
+                        if (bytesRead == 0)
+                        {
+                            OnDisconnected?.Invoke(this, EventArgs.Empty);
+                            Disconnect(false);
+                        }
 
-                    if (bytesRead > 0 && !cancellationToken.IsCancellationRequested)
-                    {
-                        var data = new byte[bytesRead];
-                        Array.Copy(buffer, data, bytesRead);
-                        OnDataReceived?.Invoke(this, data);
+                        break;
                     }
 
-                    await Task.Delay(1, cancellationToken);
+                    OnDataReceived?.Invoke(this, new ArraySegment<byte>(buffer, 0, bytesRead));
                 }
             }
             catch (IOException ioEx) when (ioEx.InnerException is SocketException socketEx)
             {
-                Disconnect();
+                Disconnect(false);
 
                 switch (socketEx.SocketErrorCode)
                 {
@@ -133,24 +137,38 @@ namespace ClassicUO.Network
             }
             catch (OperationAbortedException)
             {
-                Disconnect();
+                Disconnect(false);
                 OnError?.Invoke(this, SocketError.Success);
             }
             catch (OperationCanceledException)
             {
-                Disconnect();
+                Disconnect(false);
+                OnError?.Invoke(this, SocketError.Success);
+            }
+            catch (ObjectDisposedException)
+            {
+                Disconnect(false);
                 OnError?.Invoke(this, SocketError.Success);
             }
             catch (Exception ex)
             {
+                if (_isDisconnecting)
+                {
+                    OnError?.Invoke(this, SocketError.Success);
+
+                    return;
+                }
+
                 Log.Error($"Error in receive loop {ex}");
-                Disconnect();
+                Disconnect(false);
                 OnError?.Invoke(this, SocketError.SocketError);
             }
         }
 
         private bool _isDisconnecting;
-        public void Disconnect()
+        public void Disconnect() => Disconnect(true);
+
+        private void Disconnect(bool waitForReceive)
         {
             if (_isDisconnecting)
                 return;
@@ -158,17 +176,32 @@ namespace ClassicUO.Network
             _isDisconnecting = true;
             
             _cancellationTokenSource?.Cancel();
-            _receiveTask?.Wait(5000);
+            // Closing the socket is what ends a pending read
             _stream?.Close();
             _socket?.Close();
+
+            if (waitForReceive)
+            {
+                try
+                {
+                    _receiveTask?.Wait(5000);
+                }
+                catch (AggregateException) { }
+            }
         }
 
         public void Dispose()
         {
             _cancellationTokenSource?.Cancel();
-            _receiveTask?.Wait(5000);
             _stream?.Dispose();
             _socket?.Dispose();
+
+            try
+            {
+                _receiveTask?.Wait(5000);
+            }
+            catch (AggregateException) { }
+
             _cancellationTokenSource?.Dispose();
         }
     }
@@ -176,15 +209,17 @@ namespace ClassicUO.Network
     internal sealed class AsyncNetClient : IDisposable
     {
         private const int BUFF_SIZE = 0x10000;
+        private const int SEND_BUFFER_SIZE = 0x4000;
 
-        private readonly byte[] _compressedBuffer = new byte[4096];
-        private readonly byte[] _uncompressedBuffer = new byte[BUFF_SIZE];
         private readonly Huffman _huffman = new Huffman();
         private bool _isCompressionEnabled;
         private readonly AsyncSocketWrapper _socket;
         private uint? _localIP;
         private readonly CircularBuffer _sendStream;
-        private readonly ConcurrentQueue<byte[]> _incomingMessages = new();
+        private readonly ConcurrentQueue<ArraySegment<byte>> _incomingMessages = new();
+        private readonly SemaphoreSlim _sendSignal = new SemaphoreSlim(0);
+        private int _sendSignaled;
+        private long _oldestQueuedTimestamp;
         private Task _networkTask;
         private CancellationTokenSource _cancellationTokenSource = new();
 
@@ -242,15 +277,24 @@ namespace ClassicUO.Network
             }
         }
 
+        /// <summary>
+        /// How long the sender waits after being woken up so packets sent close together go out in one write.
+        /// </summary>
+        public int SendCoalesceMs { get; set; }
+
         public event EventHandler Connected;
         public event EventHandler<SocketError> Disconnected;
-        public static event EventHandler<byte[]> MessageReceived;
+        /// <summary>
+        /// Raised on the game thread for received data, the segment goes back to the pool once the handlers return.
+        /// </summary>
+        public static event EventHandler<ArraySegment<byte>> MessageReceived;
 
         public async Task<bool> Connect(string ip, ushort port, CancellationToken cancellationToken = new ())
         {
             _sendStream.Clear();
             _huffman.Reset();
             Statistics.Reset();
+            SendCoalesceMs = Math.Max(0, Settings.GlobalSettings.SendCoalesceMs);
 
             var success = await _socket.ConnectAsync(ip, port, cancellationToken);
 
@@ -298,52 +342,108 @@ namespace ClassicUO.Network
             _sendStream.Clear();
         }
 
+        /// <summary>
+        /// Sleeps until <see cref="Send"/> queues data, then writes everything queued with one write in flight at a time.
+        /// </summary>
         private async Task NetworkLoopAsync(CancellationToken cancellationToken)
         {
-            while (!cancellationToken.IsCancellationRequested && IsConnected)
+            var buffer = ArrayPool<byte>.Shared.Rent(SEND_BUFFER_SIZE);
+
+            try
             {
-                try
+                while (!cancellationToken.IsCancellationRequested && IsConnected)
                 {
-                    // Process outgoing data
-                    ProcessSendAsync(cancellationToken);
+                    await _sendSignal.WaitAsync(cancellationToken);
 
-                    // Update statistics
-                    Statistics.Update();
+                    if (SendCoalesceMs > 0)
+                    {
+                        await Task.Delay(SendCoalesceMs, cancellationToken);
+                    }
+
+                    Interlocked.Exchange(ref _sendSignaled, 0);
 
-                    // Small delay to prevent excessive CPU usage
-                    await Task.Delay(1, cancellationToken);
+                    await FlushSendQueueAsync(buffer, cancellationToken);
                 }
-                catch (OperationCanceledException)
+            }
+            catch (OperationCanceledException)
+            {
+                await Disconnect();
+                Disconnected?.Invoke(this, SocketError.Success);
+            }
+            catch (Exception ex)
+            {
+                await Disconnect();
+                Log.Error($"Network loop error: {ex}");
+                Disconnected?.Invoke(this, SocketError.SocketError);
+            }
+            finally
+            {
+                ArrayPool<byte>.Shared.Return(buffer);
+            }
+        }
+
+        private async Task FlushSendQueueAsync(byte[] buffer, CancellationToken cancellationToken)
+        {
+            long queuedAt = 0;
+
+            while (IsConnected)
+            {
+                int read;
+
+                lock (_sendStream)
                 {
-                    await Disconnect();
-                    Disconnected?.Invoke(this, SocketError.Success);
-                    break;
+                    read = _sendStream.Dequeue(buffer, 0, Math.Min(buffer.Length, _sendStream.Length));
+
+                    if (_sendStream.Length == 0 && read > 0)
+                    {
+                        queuedAt = _oldestQueuedTimestamp;
+                    }
+
+                    Statistics.SendQueueLength = _sendStream.Length;
                 }
-                catch (Exception ex)
+
+                if (read <= 0)
                 {
-                    await Disconnect();
-                    Log.Error($"Network loop error: {ex}");
-                    Disconnected?.Invoke(this, SocketError.SocketError);
                     break;
                 }
+
+                await _socket.SendAsync(buffer, 0, read, cancellationToken);
+                Statistics.TotalSendWrites++;
+            }
+
+            if (queuedAt != 0)
+            {
+                Statistics.AddFlushLatency((Stopwatch.GetTimestamp() - queuedAt) * 1000.0 / Stopwatch.Frequency);
             }
         }
 
-        private void OnDataReceived(object sender, byte[] data)
+        private void OnDataReceived(object sender, ArraySegment<byte> data)
         {
             try
             {
-                Statistics.TotalBytesReceived += (uint)data.Length;
+                Statistics.TotalBytesReceived += (uint)data.Count;
 
                 var span = data.AsSpan();
                 ProcessEncryption(span);
+
+                if (!_isCompressionEnabled)
+                {
+                    PacketCapture.Default?.Record(span, false);
+                    _incomingMessages.Enqueue(data);
+
+                    return;
+                }
+
                 var decompressed = DecompressBuffer(span);
+                ArrayPool<byte>.Shared.Return(data.Array);
 
-                if (!decompressed.IsEmpty)
+                if (decompressed.Count > 0)
                 {
-                    var message = decompressed.ToArray();
-                    _incomingMessages.Enqueue(message);
+                    PacketCapture.Default?.Record(decompressed.AsSpan(), false);
+                    _incomingMessages.Enqueue(decompressed);
                 }
+                else if (decompressed.Array != null)
+                    ArrayPool<byte>.Shared.Return(decompressed.Array);
             }
             catch (Exception ex)
             {
@@ -355,8 +455,9 @@ namespace ClassicUO.Network
         {
             if (_cancellationTokenSource.IsCancellationRequested)
             {
-                while (_incomingMessages.TryDequeue(out _))
+                while (_incomingMessages.TryDequeue(out var message))
                 {
+                    ArrayPool<byte>.Shared.Return(message.Array);
                 }
 
                 return;
@@ -364,8 +465,18 @@ namespace ClassicUO.Network
             
             while (_incomingMessages.TryDequeue(out var message))
             {
-                MessageReceived?.Invoke(this, message);
+                try
+                {
+                    MessageReceived?.Invoke(this, message);
+                }
+                finally
+                {
+                    ArrayPool<byte>.Shared.Return(message.Array);
+                }
             }
+
+            Statistics.Update();
+            PacketHandlers.Handler.Statistics.Update();
         }
         
         public void Send(Span<byte> message, bool ignorePlugin = false, bool skipEncryption = false)
@@ -384,6 +495,12 @@ namespace ClassicUO.Network
                 return;
 
             PacketLogger.Default?.Log(message, true);
+            PacketCapture.Default?.Record(message, true);
+
+            if (LegionScripting.PacketHooks.IsHooked(message[0], true))
+            {
+                LegionScripting.PacketHooks.Dispatch(message, true);
+            }
 
             if (!skipEncryption)
             {
@@ -392,7 +509,18 @@ namespace ClassicUO.Network
 
             lock (_sendStream)
             {
+                if (_sendStream.Length == 0)
+                {
+                    _oldestQueuedTimestamp = Stopwatch.GetTimestamp();
+                }
+
                 _sendStream.Enqueue(message);
+                Statistics.SendQueueLength = _sendStream.Length;
+            }
+
+            if (Interlocked.Exchange(ref _sendSignaled, 1) == 0)
+            {
+                _sendSignal.Release();
             }
 
             Statistics.TotalBytesSent += (uint)message.Length;
@@ -407,54 +535,24 @@ namespace ClassicUO.Network
             EncryptionHelper.Decrypt(buffer, buffer, buffer.Length);
         }
 
-        //Not really async, but sends data async inside
-        private void ProcessSendAsync(CancellationToken cancellationToken)
-        {
-            if (!IsConnected)
-                return;
-
-            try
-            {
-                lock (_sendStream)
-                {
-                    if (_sendStream.Length > 0)
-                    {
-                        var sendingBuffer = new byte[4096];
-                        
-                        int size = Math.Max(sendingBuffer.Length, _sendStream.Length);
-                        
-                        var read = _sendStream.Dequeue(sendingBuffer, 0, size);
-
-                        if (read > 0)
-                        {
-                            _socket.SendAsync(sendingBuffer, 0, read, cancellationToken);
-                        }
-                    }
-                }
-            }
-            catch (Exception ex)
-            {
-                Log.Error($"Error in ProcessSendAsync: {ex}");
-                Disconnected?.Invoke(this, SocketError.SocketError);
-            }
-        }
-
-        private Span<byte> DecompressBuffer(Span<byte> buffer)
+        /// <summary>
+        /// Decompress into a segment rented from the pool, or an empty segment without an array if the data was bad.
+        /// </summary>
+        private ArraySegment<byte> DecompressBuffer(Span<byte> buffer)
         {
-            if (!_isCompressionEnabled)
-                return buffer;
-
-            var size = 65536;
+            var output = ArrayPool<byte>.Shared.Rent(BUFF_SIZE);
+            var size = BUFF_SIZE;
 
-            if (!_huffman.Decompress(buffer, _uncompressedBuffer, ref size))
+            if (!_huffman.Decompress(buffer, output, ref size))
             {
+                ArrayPool<byte>.Shared.Return(output);
                 _ = Disconnect();
                 Disconnected?.Invoke(this, SocketError.SocketError);
 
-                return Span<byte>.Empty;
+                return default;
             }
 
-            return _uncompressedBuffer.AsSpan(0, size);
+            return new ArraySegment<byte>(output, 0, size);
         }
 
         public void Dispose()
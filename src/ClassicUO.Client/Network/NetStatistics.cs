@@ -76,6 +76,43 @@ namespace ClassicUO.Network
 
         public uint LastPingReceived { get; private set; } = Time.Ticks;
 
+        /// <summary>
+        /// Bytes waiting to be written to the socket.
+        /// </summary>
+        public int SendQueueLength
+        {
+            get => _sendQueueLength;
+            set
+            {
+                _sendQueueLength = value;
+
+                if (value > PeakSendQueueLength)
+                {
+                    PeakSendQueueLength = value;
+                }
+            }
+        }
+
+        public int PeakSendQueueLength { get; private set; }
+
+        /// <summary>
+        /// Socket writes, lower than <see cref="TotalPacketsSent"/> when packets were sent together.
+        /// </summary>
+        public uint TotalSendWrites { get; set; }
+
+        /// <summary>
+        /// Time from the first packet being queued until the queue was written out.
+        /// </summary>
+        public double LastFlushLatencyMs { get; private set; }
+
+        public double MaxFlushLatencyMs { get; private set; }
+
+        public double AverageFlushLatencyMs => _flushCount == 0 ? 0 : _flushLatencySum / _flushCount;
+
+        private int _sendQueueLength;
+        private double _flushLatencySum;
+        private long _flushCount;
+
         public uint Ping
         {
             get
@@ -107,6 +144,19 @@ namespace ClassicUO.Network
             LastPingReceived = Time.Ticks;
         }
 
+        public void AddFlushLatency(double ms)
+        {
+            LastFlushLatencyMs = ms;
+
+            if (ms > MaxFlushLatencyMs)
+            {
+                MaxFlushLatencyMs = ms;
+            }
+
+            _flushLatencySum += ms;
+            _flushCount++;
+        }
+
         public void SendPing()
         {
             if(_socket != null)
@@ -141,6 +191,10 @@ namespace ClassicUO.Network
             _lastTotalBytesReceived = _lastTotalBytesSent = _lastTotalPacketsReceived = _lastTotalPacketsSent = 0;
             TotalBytesReceived = TotalBytesSent = TotalPacketsReceived = TotalPacketsSent = 0;
             DeltaBytesReceived = DeltaBytesSent = DeltaPacketsReceived = DeltaPacketsSent = 0;
+            _sendQueueLength = PeakSendQueueLength = 0;
+            TotalSendWrites = 0;
+            LastFlushLatencyMs = MaxFlushLatencyMs = _flushLatencySum = 0;
+            _flushCount = 0;
         }
 
         public void Update()
@@ -161,7 +215,7 @@ namespace ClassicUO.Network
 
         public override string ToString()
         {
-            return $"Packets:\n >> {DeltaPacketsReceived}\n << {DeltaPacketsSent}\nBytes:\n >> {GetSizeAdaptive(DeltaBytesReceived)}\n << {GetSizeAdaptive(DeltaBytesSent)}";
+            return $"Packets:\n >> {DeltaPacketsReceived}\n << {DeltaPacketsSent}\nBytes:\n >> {GetSizeAdaptive(DeltaBytesReceived)}\n << {GetSizeAdaptive(DeltaBytesSent)}\nSend queue: {GetSizeAdaptive(SendQueueLength)} (peak {GetSizeAdaptive(PeakSendQueueLength)})\nFlush: {LastFlushLatencyMs:0.00}ms (avg {AverageFlushLatencyMs:0.00}ms, max {MaxFlushLatencyMs:0.00}ms)";
         }
 
         public static string GetSizeAdaptive(long bytes)
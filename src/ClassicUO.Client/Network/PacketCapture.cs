@@ -0,0 +1,264 @@
+using ClassicUO.Utility;
+using ClassicUO.Utility.Logging;
+using System;
+using System.Diagnostics;
+using System.IO;
+
+namespace ClassicUO.Network
+{
+    /// <summary>
+    /// Records the plain (decrypted, decompressed) network traffic to a binary file that <see cref="PacketReplay"/> can play back.
+    /// File: header (magic, format version, client version, start time) followed by records of
+    /// [int64 microseconds since start][uint8 direction][uint8 packet id][int32 length][bytes].
+    /// Received records are the data as it came off the socket, so they can start or end in the middle of a packet and their id is the first byte.
+    /// </summary>
+    sealed class PacketCapture : IDisposable
+    {
+        public const uint MAGIC = 0x50414355; // "UCAP"
+        public const ushort FORMAT_VERSION = 1;
+        public const string EXTENSION = ".uocap";
+
+        private const int FLUSH_INTERVAL_MS = 1000;
+
+        private readonly BinaryWriter _writer;
+        private readonly long _startTimestamp;
+        private long _lastFlush;
+        private byte[] _scratch = new byte[0x1000];
+
+        private PacketCapture(string path)
+        {
+            FilePath = path;
+            _writer = new BinaryWriter(new FileStream(path, FileMode.Create, FileAccess.Write, FileShare.Read, 0x10000));
+            _startTimestamp = _lastFlush = Stopwatch.GetTimestamp();
+
+            _writer.Write(MAGIC);
+            _writer.Write(FORMAT_VERSION);
+            _writer.Write((uint)Client.Version);
+            _writer.Write(DateTime.UtcNow.Ticks);
+            _writer.Flush();
+        }
+
+        /// <summary>
+        /// The capture being recorded, null when capturing is off.
+        /// </summary>
+        public static PacketCapture Default { get; private set; }
+
+        public string FilePath { get; }
+
+        public long RecordsWritten { get; private set; }
+
+        public long BytesWritten { get; private set; }
+
+        /// <summary>
+        /// Start recording to <paramref name="path"/>, or to a new file in Logs/Network if none is given.
+        /// </summary>
+        public static PacketCapture Start(string path = null)
+        {
+            Stop();
+
+            if (string.IsNullOrWhiteSpace(path))
+            {
+                path = Path.Combine
+                (
+                    FileSystemHelper.CreateFolderIfNotExists(CUOEnviroment.ExecutablePath, "Logs", "Network"),
+                    $"capture_{DateTime.Now:yyyyMMdd_HHmmss}{EXTENSION}"
+                );
+            }
+
+            try
+            {
+                Default = new PacketCapture(path);
+                Log.Trace($"Capturing packets to {path}");
+            }
+            catch (Exception e)
+            {
+                Log.Error($"Could not start packet capture: {e.Message}");
+                Default = null;
+            }
+
+            return Default;
+        }
+
+        public static void Stop()
+        {
+            Default?.Dispose();
+            Default = null;
+        }
+
+        /// <summary>
+        /// Append a record, called from both the game thread (sent) and the receive thread (received).
+        /// </summary>
+        public void Record(ReadOnlySpan<byte> data, bool toServer)
+        {
+            if (data.IsEmpty)
+                return;
+
+            long now = Stopwatch.GetTimestamp();
+            byte id = data[0];
+
+            try
+            {
+                lock (_writer)
+                {
+                    if (data.Length > _scratch.Length)
+                        _scratch = new byte[Math.Max(data.Length, _scratch.Length * 2)];
+
+                    data.CopyTo(_scratch);
+
+                    // Never write account credentials to disk
+                    if (toServer && (id == 0x80 || id == 0x91))
+                    {
+                        int start = Math.Min(id == 0x80 ? 1 : 5, data.Length);
+                        Array.Clear(_scratch, start, Math.Min(start + 60, data.Length) - start);
+                    }
+
+                    _writer.Write((now - _startTimestamp) * 1_000_000 / Stopwatch.Frequency);
+                    _writer.Write((byte)(toServer ? PacketDirection.ToServer : PacketDirection.ToClient));
+                    _writer.Write(id);
+                    _writer.Write(data.Length);
+                    _writer.Write(_scratch, 0, data.Length);
+
+                    RecordsWritten++;
+                    BytesWritten += data.Length;
+
+                    // Don't lose more than a second of traffic if the client goes down
+                    if ((now - _lastFlush) * 1000 / Stopwatch.Frequency >= FLUSH_INTERVAL_MS)
+                    {
+                        _writer.Flush();
+                        _lastFlush = now;
+                    }
+                }
+            }
+            catch (Exception e)
+            {
+                Log.Error($"Packet capture stopped: {e.Message}");
+
+                // Close the half written file so the handle isn't held until exit
+                try
+                {
+                    Dispose();
+                }
+                catch (Exception)
+                {
+                }
+
+                if (Default == this)
+                    Default = null;
+            }
+        }
+
+        public void Dispose()
+        {
+            lock (_writer)
+            {
+                _writer.Dispose();
+            }
+        }
+    }
+
+    enum PacketDirection : byte
+    {
+        ToClient,
+        ToServer
+    }
+
+    /// <summary>
+    /// A record read back from a capture file. <see cref="Data"/> belongs to the reader and is only valid until the next read.
+    /// </summary>
+    readonly ref struct CapturedPacket
+    {
+        public CapturedPacket(long time, PacketDirection direction, byte id, Span<byte> data)
+        {
+            Time = time;
+            Direction = direction;
+            ID = id;
+            Data = data;
+        }
+
+        /// <summary>
+        /// Microseconds since the capture started.
+        /// </summary>
+        public readonly long Time;
+        public readonly PacketDirection Direction;
+        public readonly byte ID;
+        public readonly Span<byte> Data;
+    }
+
+    sealed class PacketCaptureReader : IDisposable
+    {
+        private readonly BinaryReader _reader;
+        private byte[] _buffer = new byte[0x10000];
+
+        public PacketCaptureReader(string path)
+        {
+            _reader = new BinaryReader(new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.ReadWrite, 0x10000));
+
+            if (_reader.BaseStream.Length < 18 || _reader.ReadUInt32() != PacketCapture.MAGIC)
+            {
+                _reader.Dispose();
+
+                throw new InvalidDataException($"'{path}' is not a packet capture");
+            }
+
+            ushort version = _reader.ReadUInt16();
+
+            if (version != PacketCapture.FORMAT_VERSION)
+            {
+                _reader.Dispose();
+
+                throw new InvalidDataException($"Unsupported packet capture version {version}");
+            }
+
+            ClientVersion = (ClientVersion)_reader.ReadUInt32();
+            StartTime = new DateTime(_reader.ReadInt64(), DateTimeKind.Utc);
+        }
+
+        /// <summary>
+        /// Version of the client that made the capture, packet sizes depend on it.
+        /// </summary>
+        public ClientVersion ClientVersion { get; }
+
+        public DateTime StartTime { get; }
+
+        /// <summary>
+        /// Read the next record, false at the end of the file. A record cut short by a crash ends the capture.
+        /// </summary>
+        public bool TryRead(out CapturedPacket packet)
+        {
+            packet = default;
+
+            try
+            {
+                if (_reader.BaseStream.Length - _reader.BaseStream.Position < 14)
+                    return false;
+
+                long time = _reader.ReadInt64();
+                var direction = (PacketDirection)_reader.ReadByte();
+                byte id = _reader.ReadByte();
+                int length = _reader.ReadInt32();
+
+                if (length < 0 || length > _reader.BaseStream.Length - _reader.BaseStream.Position)
+                    return false;
+
+                if (length > _buffer.Length)
+                    _buffer = new byte[Math.Max(length, _buffer.Length * 2)];
+
+                for (int read = 0, n; read < length; read += n)
+                {
+                    if ((n = _reader.Read(_buffer, read, length - read)) <= 0)
+                        return false;
+                }
+
+                packet = new CapturedPacket(time, direction, id, _buffer.AsSpan(0, length));
+
+                return true;
+            }
+            catch (EndOfStreamException)
+            {
+                return false;
+            }
+        }
+
+        public void Dispose() => _reader.Dispose();
+    }
+}
@@ -49,6 +49,7 @@ using ClassicUO.Utility.Platforms;
 using Microsoft.Xna.Framework;
 using System;
 using System.Collections.Generic;
+using System.Diagnostics;
 using System.Text;
 using System.Text.RegularExpressions;
 
@@ -79,6 +80,16 @@ namespace ClassicUO.Network
 
         public static PacketHandlers Handler { get; } = new PacketHandlers();
 
+        public PacketHandlers()
+        {
+            Statistics = new PacketStatistics(id => _handlers[id]?.Method.Name);
+        }
+
+        /// <summary>
+        /// Counts and handler times per packet ID.
+        /// </summary>
+        public PacketStatistics Statistics { get; }
+
         public void Add(byte id, OnPacketBufferReader handler) => _handlers[id] = handler;
 
         private byte[] _readingBuffer = new byte[4096];
@@ -88,9 +99,66 @@ namespace ClassicUO.Network
 
         public int ParsePackets(Span<byte> data)
         {
-            Append(data, false);
+            var packetsCount = 0;
+
+            lock (_buffer)
+            {
+                // Whole packets are handled straight from the received data, only a partial one at the end gets buffered
+                if (_buffer.Length == 0)
+                {
+                    packetsCount += ParsePacketsInPlace(ref data);
+                }
+
+                Append(data, false);
+                packetsCount += ParsePackets(_buffer, true);
+            }
 
-            return ParsePackets(_buffer, true) + ParsePackets(_pluginsBuffer, false);
+            return packetsCount + ParsePackets(_pluginsBuffer, false);
+        }
+
+        private int ParsePacketsInPlace(ref Span<byte> data)
+        {
+            var packetsCount = 0;
+
+            while (GetPacketInfo(data, out var packetID, out int offset, out int packetlength) && packetlength > 0 && data.Length >= packetlength)
+            {
+                var packet = data.Slice(0, packetlength);
+                data = data.Slice(packetlength);
+
+                PacketLogger.Default?.Log(packet, false);
+
+                long pluginTicks = 0;
+
+                if (Plugin.Plugins.Count != 0)
+                {
+                    // Plugins work on arrays and may change the packet
+                    while (packetlength > _readingBuffer.Length)
+                    {
+                        Array.Resize(ref _readingBuffer, _readingBuffer.Length * 2);
+                    }
+
+                    packet.CopyTo(_readingBuffer);
+
+                    long pluginStart = Stopwatch.GetTimestamp();
+                    bool handle = Plugin.ProcessRecvPacket(_readingBuffer, ref packetlength);
+                    pluginTicks = Stopwatch.GetTimestamp() - pluginStart;
+
+                    if (!handle)
+                    {
+                        Statistics.Record(packetID, packet.Length, 0, pluginTicks);
+
+                        continue;
+                    }
+
+                    packet = _readingBuffer.AsSpan(0, packetlength);
+                }
+
+                AnalyzePacket(packet, offset, pluginTicks);
+
+                ++packetsCount;
+            }
+
+            return packetsCount;
         }
 
         private int ParsePackets(CircularBuffer stream, bool allowPlugins)
@@ -142,9 +210,25 @@ namespace ClassicUO.Network
                     // TODO: the pluging function should allow Span<byte> or unsafe type only.
                     // The current one is a bad style decision.
                     // It will be fixed once the new plugin system is done.
-                    if (!allowPlugins || Plugin.ProcessRecvPacket(packetBuffer, ref packetlength))
+                    long pluginTicks = 0;
+                    bool handle = true;
+
+                    if (allowPlugins)
                     {
-                        AnalyzePacket(packetBuffer.AsSpan(0, packetlength), offset);
+                        int receivedLength = packetlength;
+                        long pluginStart = Stopwatch.GetTimestamp();
+                        handle = Plugin.ProcessRecvPacket(packetBuffer, ref packetlength);
+                        pluginTicks = Stopwatch.GetTimestamp() - pluginStart;
+
+                        if (!handle)
+                        {
+                            Statistics.Record(packetID, receivedLength, 0, pluginTicks);
+                        }
+                    }
+
+                    if (handle)
+                    {
+                        AnalyzePacket(packetBuffer.AsSpan(0, packetlength), offset, pluginTicks);
 
                         ++packetsCount;
                     }
@@ -162,20 +246,61 @@ namespace ClassicUO.Network
             (fromPlugins ? _pluginsBuffer : _buffer).Enqueue(data);
         }
 
-        private void AnalyzePacket(ReadOnlySpan<byte> data, int offset)
+        private void AnalyzePacket(ReadOnlySpan<byte> data, int offset, long pluginTicks)
         {
             if (data.IsEmpty)
                 return;
 
+            if (LegionScripting.PacketHooks.IsHooked(data[0], false))
+                LegionScripting.PacketHooks.Dispatch(data, false);
+
             var bufferReader = _handlers[data[0]];
+            long handlerTicks = 0;
 
             if (bufferReader != null)
             {
                 var buffer = new StackDataReader(data);
                 buffer.Seek(offset);
 
+                long start = Stopwatch.GetTimestamp();
                 bufferReader(ref buffer);
+                handlerTicks = Stopwatch.GetTimestamp() - start;
+            }
+
+            Statistics.Record(data[0], data.Length, handlerTicks, pluginTicks);
+        }
+
+        private static bool GetPacketInfo(
+            ReadOnlySpan<byte> buffer,
+            out byte packetID,
+            out int packetOffset,
+            out int packetLen
+        )
+        {
+            if (buffer.IsEmpty)
+            {
+                packetID = 0xFF;
+                packetLen = 0;
+                packetOffset = 0;
+
+                return false;
             }
+
+            packetLen = PacketsTable.GetPacketLength(packetID = buffer[0]);
+            packetOffset = 1;
+
+            if (packetLen == -1)
+            {
+                if (buffer.Length < 3)
+                {
+                    return false;
+                }
+
+                packetLen = (buffer[1] << 8) | buffer[2];
+                packetOffset = 3;
+            }
+
+            return true;
         }
 
         private static bool GetPacketInfo(
@@ -1658,6 +1783,8 @@ namespace ClassicUO.Network
             ushort hue = p.ReadUInt16BE();
 
             AddItemToContainer(serial, graphic, amount, x, y, hue, containerSerial);
+
+            ActionScheduler.Instance?.OnItemMoved(serial);
         }
 
         private static void DenyMoveItem(ref StackDataReader p)
@@ -1667,6 +1794,7 @@ namespace ClassicUO.Network
                 return;
             }
 
+            uint heldSerial = Client.Game.GameCursor.ItemHold.Serial;
             Item firstItem = World.Items.Get(Client.Game.GameCursor.ItemHold.Serial);
 
             if (
@@ -1781,6 +1909,8 @@ namespace ClassicUO.Network
 
             byte code = p.ReadUInt8();
 
+            ActionScheduler.Instance?.OnMoveDenied(heldSerial, code);
+
             if (code < 5)
             {
                 MessageManager.HandleMessage(
@@ -1813,9 +1943,13 @@ namespace ClassicUO.Network
                 return;
             }
 
+            uint heldSerial = Client.Game.GameCursor.ItemHold.Serial;
+
             Client.Game.GameCursor.ItemHold.Enabled = false;
             Client.Game.GameCursor.ItemHold.Dropped = false;
 
+            ActionScheduler.Instance?.OnDropAccepted(heldSerial);
+
             Console.WriteLine("PACKET - ITEM DROP OK!");
         }
 
@@ -2229,6 +2363,9 @@ namespace ClassicUO.Network
                 }
 
                 AddItemToContainer(serial, graphic, amount, x, y, hue, containerSerial);
+
+                // Decode the icons in the background while the container or shop gump is being opened
+                Client.Game?.Arts?.PrefetchArt(graphic);
             }
         }
 
@@ -7410,6 +7547,8 @@ namespace ClassicUO.Network
                 World.Player.LastGumpID = gumpID;
             }
 
+            EventSink.InvokeOnServerGumpOpened(gump, gumpID);
+
             if (gump.X == 0 && gump.Y == 0)
             {
                 gump.CenterXInViewPort();
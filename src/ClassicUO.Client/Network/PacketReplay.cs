@@ -0,0 +1,132 @@
+using ClassicUO.Utility.Logging;
+using System;
+using System.Diagnostics;
+using System.Threading;
+
+namespace ClassicUO.Network
+{
+    /// <summary>
+    /// Plays the received side of a <see cref="PacketCapture"/> file through <see cref="PacketHandlers.ParsePackets"/>,
+    /// so packet handling can be measured and compared without a server. Sent records are skipped, nothing goes out while replaying.
+    /// </summary>
+    sealed class PacketReplay
+    {
+        private const int MAX_LOGGED_ERRORS = 10;
+
+        /// <summary>
+        /// Replay a capture on the calling thread.
+        /// </summary>
+        /// <param name="speed">1 plays at the recorded speed, 2 twice as fast, 0 or less as fast as possible</param>
+        public static PacketReplayResult Run(string path, double speed = 0, CancellationToken cancellationToken = default)
+        {
+            var result = new PacketReplayResult();
+
+            using (var reader = new PacketCaptureReader(path))
+            {
+                if (reader.ClientVersion != Client.Version)
+                {
+                    Log.Warn($"Capture was made with client {reader.ClientVersion}, replaying with {Client.Version}. Packet sizes may not match.");
+                }
+
+                long start = Stopwatch.GetTimestamp();
+
+                while (!cancellationToken.IsCancellationRequested && reader.TryRead(out CapturedPacket record))
+                {
+                    result.CaptureDurationMs = record.Time / 1000.0;
+
+                    if (record.Direction != PacketDirection.ToClient)
+                    {
+                        continue;
+                    }
+
+                    if (speed > 0)
+                    {
+                        WaitUntil(start, record.Time / speed);
+                    }
+
+                    long before = Stopwatch.GetTimestamp();
+
+                    try
+                    {
+                        result.Packets += PacketHandlers.Handler.ParsePackets(record.Data);
+                    }
+                    catch (Exception e)
+                    {
+                        if (result.Errors++ < MAX_LOGGED_ERRORS)
+                        {
+                            Log.Warn($"[Replay] Handling data starting with 0x{record.ID:X2} at {record.Time / 1000.0:F1}ms failed: {e.Message}");
+                        }
+                    }
+
+                    double ms = (Stopwatch.GetTimestamp() - before) * 1000.0 / Stopwatch.Frequency;
+
+                    result.Records++;
+                    result.Bytes += record.Data.Length;
+                    result.HandlingMs += ms;
+
+                    if (ms > result.SlowestRecordMs)
+                    {
+                        result.SlowestRecordMs = ms;
+                        result.SlowestRecordTime = record.Time / 1000.0;
+                    }
+                }
+
+                result.ElapsedMs = (Stopwatch.GetTimestamp() - start) * 1000.0 / Stopwatch.Frequency;
+            }
+
+            return result;
+        }
+
+        private static void WaitUntil(long start, double microseconds)
+        {
+            while (true)
+            {
+                double left = microseconds - (Stopwatch.GetTimestamp() - start) * 1_000_000.0 / Stopwatch.Frequency;
+
+                if (left <= 0)
+                {
+                    return;
+                }
+
+                // Sleep for the bulk of it, the last millisecond is too short for the scheduler
+                if (left > 2000)
+                {
+                    Thread.Sleep((int)(left / 1000) - 1);
+                }
+                else
+                {
+                    Thread.SpinWait(100);
+                }
+            }
+        }
+    }
+
+    sealed class PacketReplayResult
+    {
+        public int Records;
+        public int Packets;
+        public long Bytes;
+        public int Errors;
+
+        /// <summary>
+        /// Wall time of the replay, including the waits of a real time replay.
+        /// </summary>
+        public double ElapsedMs;
+
+        /// <summary>
+        /// Time spent inside of the packet handlers.
+        /// </summary>
+        public double HandlingMs;
+
+        public double SlowestRecordMs;
+        public double SlowestRecordTime;
+        public double CaptureDurationMs;
+
+        public override string ToString()
+        {
+            return $"Replayed {Records} records, {Packets} packets, {Bytes} bytes ({CaptureDurationMs:F0}ms of capture) in {ElapsedMs:F1}ms\n" +
+                   $"Handling: {HandlingMs:F1}ms total, {(Packets > 0 ? HandlingMs * 1000.0 / Packets : 0):F2}us per packet, slowest record {SlowestRecordMs:F2}ms at {SlowestRecordTime:F0}ms\n" +
+                   $"Errors: {Errors}";
+        }
+    }
+}
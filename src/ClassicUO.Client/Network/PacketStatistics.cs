@@ -0,0 +1,355 @@
+using ClassicUO.Configuration;
+using ClassicUO.Utility;
+using ClassicUO.Utility.Logging;
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace ClassicUO.Network
+{
+    /// <summary>
+    /// Counters per received packet ID: how many, how many bytes, time spent in the handler (with a histogram)
+    /// and time plugins spent on them in Plugin.ProcessRecvPacket.
+    /// Recorded by <see cref="PacketHandlers"/> on the game thread, read from anywhere.
+    /// </summary>
+    public sealed class PacketStatistics
+    {
+        /// <summary>
+        /// Upper bounds of the handler time histogram buckets in microseconds, the last bucket holds everything slower.
+        /// </summary>
+        public static readonly double[] HistogramBoundsUs = { 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000 };
+
+        private readonly object _lock = new object();
+        private readonly Func<byte, string> _nameResolver;
+        private readonly PacketIdStats[] _stats = new PacketIdStats[0x100];
+        private readonly long[] _windowTicks = new long[0x100];
+        private readonly long[] _lastWindowTicks = new long[0x100];
+        private readonly long _windowLength = Stopwatch.Frequency;
+        private long _windowEnd;
+        private long _nextDump;
+        private bool _dumping;
+
+        public PacketStatistics(Func<byte, string> nameResolver = null)
+        {
+            _nameResolver = nameResolver;
+        }
+
+        /// <summary>
+        /// Record a received packet. <paramref name="handlerTicks"/> and <paramref name="pluginTicks"/> are Stopwatch ticks.
+        /// </summary>
+        public void Record(byte id, int length, long handlerTicks, long pluginTicks)
+        {
+            long now = Stopwatch.GetTimestamp();
+
+            lock (_lock)
+            {
+                PacketIdStats stats = _stats[id] ??= new PacketIdStats(id, _nameResolver?.Invoke(id));
+                stats.Add(length, handlerTicks, pluginTicks);
+
+                RollWindow(now);
+                _windowTicks[id] += handlerTicks + pluginTicks;
+            }
+        }
+
+        /// <summary>
+        /// Stats of every packet ID that was received, most handler time first.
+        /// </summary>
+        public List<PacketIdStats> GetAll()
+        {
+            lock (_lock)
+            {
+                return _stats.Where(s => s != null).Select(s => s.Clone()).OrderByDescending(s => s.HandlerMs + s.PluginMs).ToList();
+            }
+        }
+
+        public PacketIdStats Get(byte id)
+        {
+            lock (_lock)
+            {
+                return _stats[id]?.Clone();
+            }
+        }
+
+        /// <summary>
+        /// Packet IDs that took the most handler and plugin time during the last second.
+        /// </summary>
+        public List<(byte ID, string Name, double Ms)> GetBusiestLastSecond(int count)
+        {
+            var result = new List<(byte ID, string Name, double Ms)>();
+
+            lock (_lock)
+            {
+                RollWindow(Stopwatch.GetTimestamp());
+
+                for (int i = 0; i < _lastWindowTicks.Length; i++)
+                {
+                    if (_lastWindowTicks[i] > 0)
+                    {
+                        result.Add(((byte)i, _stats[i]?.Name, ToMs(_lastWindowTicks[i])));
+                    }
+                }
+            }
+
+            result.Sort((a, b) => b.Ms.CompareTo(a.Ms));
+
+            if (result.Count > count)
+            {
+                result.RemoveRange(count, result.Count - count);
+            }
+
+            return result;
+        }
+
+        public void Reset()
+        {
+            lock (_lock)
+            {
+                Array.Clear(_stats, 0, _stats.Length);
+                Array.Clear(_windowTicks, 0, _windowTicks.Length);
+                Array.Clear(_lastWindowTicks, 0, _lastWindowTicks.Length);
+                _windowEnd = 0;
+            }
+        }
+
+        /// <summary>
+        /// Write the stats to Logs/Network/packet_stats.csv and .json every <see cref="Settings.PacketStatsDumpInterval"/> seconds.
+        /// </summary>
+        public void Update()
+        {
+            int interval = Settings.GlobalSettings.PacketStatsDumpInterval;
+
+            if (interval <= 0 || _dumping)
+            {
+                return;
+            }
+
+            long now = Stopwatch.GetTimestamp();
+
+            if (_nextDump == 0)
+            {
+                _nextDump = now + interval * Stopwatch.Frequency;
+
+                return;
+            }
+
+            if (now < _nextDump)
+            {
+                return;
+            }
+
+            _nextDump = now + interval * Stopwatch.Frequency;
+            _dumping = true;
+
+            List<PacketIdStats> stats = GetAll();
+
+            Task.Run
+            (() =>
+                {
+                    try
+                    {
+                        Dump(stats, FileSystemHelper.CreateFolderIfNotExists(CUOEnviroment.ExecutablePath, "Logs", "Network"));
+                    }
+                    catch (Exception e)
+                    {
+                        Log.Warn($"Could not write packet stats: {e.Message}");
+                    }
+                    finally
+                    {
+                        _dumping = false;
+                    }
+                }
+            );
+        }
+
+        /// <summary>
+        /// Write packet_stats.csv and packet_stats.json to <paramref name="folder"/>.
+        /// </summary>
+        public static void Dump(List<PacketIdStats> stats, string folder)
+        {
+            using (var writer = new StreamWriter(Path.Combine(folder, "packet_stats.csv")))
+            {
+                WriteCsv(stats, writer);
+            }
+
+            using (var writer = new StreamWriter(Path.Combine(folder, "packet_stats.json")))
+            {
+                WriteJson(stats, writer);
+            }
+        }
+
+        public static void WriteCsv(List<PacketIdStats> stats, TextWriter writer)
+        {
+            writer.Write("id,name,count,bytes,handler_ms,avg_handler_ms,max_handler_ms,plugin_ms");
+
+            foreach (double bound in HistogramBoundsUs)
+            {
+                writer.Write(string.Format(CultureInfo.InvariantCulture, ",le_{0}us", bound));
+            }
+
+            writer.WriteLine(",gt_{0}us", HistogramBoundsUs[HistogramBoundsUs.Length - 1].ToString(CultureInfo.InvariantCulture));
+
+            foreach (PacketIdStats s in stats)
+            {
+                writer.Write
+                (
+                    string.Format
+                    (
+                        CultureInfo.InvariantCulture,
+                        "0x{0:X2},{1},{2},{3},{4:0.###},{5:0.####},{6:0.###},{7:0.###}",
+                        s.ID,
+                        s.Name,
+                        s.Count,
+                        s.Bytes,
+                        s.HandlerMs,
+                        s.AverageHandlerMs,
+                        s.MaxHandlerMs,
+                        s.PluginMs
+                    )
+                );
+
+                foreach (long bucket in s.Histogram)
+                {
+                    writer.Write(',');
+                    writer.Write(bucket);
+                }
+
+                writer.WriteLine();
+            }
+        }
+
+        public static void WriteJson(List<PacketIdStats> stats, TextWriter writer)
+        {
+            var sb = new StringBuilder();
+            sb.Append("{\n  \"time\": \"").Append(DateTime.Now.ToString("o", CultureInfo.InvariantCulture)).Append("\",\n");
+            sb.Append("  \"histogram_bounds_us\": [").Append(string.Join(", ", HistogramBoundsUs.Select(b => b.ToString(CultureInfo.InvariantCulture)))).Append("],\n");
+            sb.Append("  \"packets\": [");
+
+            for (int i = 0; i < stats.Count; i++)
+            {
+                PacketIdStats s = stats[i];
+
+                sb.Append(i == 0 ? "\n" : ",\n");
+                sb.Append
+                (
+                    string.Format
+                    (
+                        CultureInfo.InvariantCulture,
+                        "    {{ \"id\": {0}, \"name\": \"{1}\", \"count\": {2}, \"bytes\": {3}, \"handler_ms\": {4:0.###}, \"avg_handler_ms\": {5:0.####}, \"max_handler_ms\": {6:0.###}, \"plugin_ms\": {7:0.###}, \"histogram\": [{8}] }}",
+                        s.ID,
+                        s.Name,
+                        s.Count,
+                        s.Bytes,
+                        s.HandlerMs,
+                        s.AverageHandlerMs,
+                        s.MaxHandlerMs,
+                        s.PluginMs,
+                        string.Join(", ", s.Histogram)
+                    )
+                );
+            }
+
+            sb.Append("\n  ]\n}\n");
+            writer.Write(sb.ToString());
+        }
+
+        private void RollWindow(long now)
+        {
+            if (now < _windowEnd)
+            {
+                return;
+            }
+
+            // A window that ended more than a window ago had no packets since, the last second was empty
+            if (now - _windowEnd < _windowLength)
+            {
+                Array.Copy(_windowTicks, _lastWindowTicks, _windowTicks.Length);
+            }
+            else
+            {
+                Array.Clear(_lastWindowTicks, 0, _lastWindowTicks.Length);
+            }
+
+            Array.Clear(_windowTicks, 0, _windowTicks.Length);
+            _windowEnd = now + _windowLength;
+        }
+
+        internal static double ToMs(long ticks) => ticks * 1000d / Stopwatch.Frequency;
+    }
+
+    public sealed class PacketIdStats
+    {
+        private long _handlerTicks, _maxHandlerTicks, _pluginTicks;
+
+        internal PacketIdStats(byte id, string name)
+        {
+            ID = id;
+            Name = name ?? string.Empty;
+            Histogram = new long[PacketStatistics.HistogramBoundsUs.Length + 1];
+        }
+
+        public byte ID { get; }
+
+        /// <summary>
+        /// Name of the handler method, empty for packets without one.
+        /// </summary>
+        public string Name { get; }
+
+        public long Count { get; private set; }
+
+        public long Bytes { get; private set; }
+
+        public double HandlerMs => PacketStatistics.ToMs(_handlerTicks);
+
+        public double MaxHandlerMs => PacketStatistics.ToMs(_maxHandlerTicks);
+
+        public double AverageHandlerMs => Count > 0 ? HandlerMs / Count : 0;
+
+        /// <summary>
+        /// Time plugins spent on these packets before they reached the handler.
+        /// </summary>
+        public double PluginMs => PacketStatistics.ToMs(_pluginTicks);
+
+        /// <summary>
+        /// Packets per handler time bucket, see <see cref="PacketStatistics.HistogramBoundsUs"/>.
+        /// </summary>
+        public long[] Histogram { get; private set; }
+
+        internal void Add(int bytes, long handlerTicks, long pluginTicks)
+        {
+            Count++;
+            Bytes += bytes;
+            _handlerTicks += handlerTicks;
+            _pluginTicks += pluginTicks;
+
+            if (handlerTicks > _maxHandlerTicks)
+            {
+                _maxHandlerTicks = handlerTicks;
+            }
+
+            double us = handlerTicks * 1_000_000d / Stopwatch.Frequency;
+            int bucket = 0;
+
+            while (bucket < PacketStatistics.HistogramBoundsUs.Length && us > PacketStatistics.HistogramBoundsUs[bucket])
+            {
+                bucket++;
+            }
+
+            Histogram[bucket]++;
+        }
+
+        internal PacketIdStats Clone()
+        {
+            var clone = (PacketIdStats)MemberwiseClone();
+            clone.Histogram = (long[])Histogram.Clone();
+
+            return clone;
+        }
+
+        public override string ToString() => $"0x{ID:X2} {Name}: {Count}x, {NetStatistics.GetSizeAdaptive(Bytes)}, {HandlerMs:0.0}ms (avg {AverageHandlerMs:0.000}ms, max {MaxHandlerMs:0.00}ms), plugins {PluginMs:0.0}ms";
+    }
+}
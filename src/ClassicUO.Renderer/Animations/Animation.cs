@@ -1,6 +1,7 @@
 using ClassicUO.Assets;
 using Microsoft.Xna.Framework.Graphics;
 using System;
+using System.Collections.Generic;
 using System.Runtime.CompilerServices;
 
 namespace ClassicUO.Renderer.Animations
@@ -15,9 +16,20 @@ namespace ClassicUO.Renderer.Animations
 
         private AnimationDirection[][][] _cache;
 
+        // Directions by atlas key - 1, dropping any frame of a direction drops all of them
+        private readonly List<(AnimationGroup Group, byte Direction)> _atlasKeys = new List<(AnimationGroup, byte)>();
+
         public Animations(GraphicsDevice device)
         {
-            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color);
+            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color, Evict);
+        }
+
+        private void Evict(int key)
+        {
+            var (group, dir) = _atlasKeys[key - 1];
+
+            // Loaded again the next time it is drawn
+            group.Direction[dir].SpriteInfos = null;
         }
 
 
@@ -288,6 +300,12 @@ namespace ClassicUO.Renderer.Animations
                 animDir.FrameCount = (byte)frames.Length;
                 animDir.SpriteInfos = new SpriteInfo[frames.Length];
 
+                if (animDir.AtlasKey == 0)
+                {
+                    _atlasKeys.Add((groupObj, dir));
+                    animDir.AtlasKey = _atlasKeys.Count;
+                }
+
                 for (int i = 0; i < frames.Length; i++)
                 {
                     ref var frame = ref frames[i];
@@ -313,11 +331,14 @@ namespace ClassicUO.Renderer.Animations
                         frame.Pixels.AsSpan(),
                         frame.Width,
                         frame.Height,
-                        out spriteInfo.UV
+                        out spriteInfo.UV,
+                        animDir.AtlasKey
                     );
                 }
             }
 
+            _atlas.Touch(animDir.AtlasKey);
+
             return animDir.SpriteInfos.AsSpan(0, animDir.FrameCount);
         }
 
@@ -7,5 +7,10 @@ namespace ClassicUO.Renderer.Animations
         public byte FrameCount;
         public SpriteInfo[] SpriteInfos;
         public bool IsVerdata;
+
+        /// <summary>
+        /// Key of the frames in the animation atlas, 0 until they were loaded once.
+        /// </summary>
+        public int AtlasKey;
     }
 }
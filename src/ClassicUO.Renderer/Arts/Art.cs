@@ -1,4 +1,9 @@
 using System;
+using System.Buffers;
+using System.Collections.Concurrent;
+using System.Diagnostics;
+using System.Threading;
+using System.Threading.Tasks;
 using ClassicUO.Assets;
 using ClassicUO.Utility;
 using ClassicUO.Utility.Logging;
@@ -8,20 +13,48 @@ using SDL2;
 
 namespace ClassicUO.Renderer.Arts
 {
+    /// <summary>
+    /// Land and static art packed in texture atlases. Art is loaded the first time it is drawn, or ahead of time with
+    /// <see cref="PrefetchArt"/> and <see cref="PrefetchLand"/>: those are decoded and trimmed on worker threads and
+    /// <see cref="ProcessUploads"/> moves them into the atlas on the game thread, a few milliseconds worth per frame.
+    /// The atlas can drop art that wasn't drawn for a while, when it is drawn again it goes back through the decode workers.
+    /// </summary>
     public sealed class Art
     {
+        private const double UPLOAD_BUDGET_MS = 2;
+        private const int MAX_DECODE_WORKERS = 2;
+
+        private const int STATE_IDLE = 0;
+        private const int STATE_QUEUED = 1;
+        private const int STATE_DECODING = 2;
+        private const int STATE_DECODED = 3;
+
         private readonly SpriteInfo[] _spriteInfos;
         private readonly TextureAtlas _atlas;
         private readonly PixelPicker _picker = new PixelPicker();
         private readonly Rectangle[] _realArtBounds;
+        private readonly int[] _states;
+        private readonly DecodedArt[] _decoded;
+        private readonly bool[] _evicted;
+        private readonly ConcurrentQueue<uint> _decodeQueue = new ConcurrentQueue<uint>();
+        private readonly ConcurrentQueue<uint> _uploadQueue = new ConcurrentQueue<uint>();
+        private int _workers;
 
         public Art(GraphicsDevice device)
         {
-            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color);
+            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color, Evict);
             _spriteInfos = new SpriteInfo[ArtLoader.Instance.Entries.Length];
             _realArtBounds = new Rectangle[_spriteInfos.Length];
+            _states = new int[_spriteInfos.Length];
+            _decoded = new DecodedArt[_spriteInfos.Length];
+            _evicted = new bool[_spriteInfos.Length];
         }
 
+        /// <summary>
+        /// Art waiting to be decoded or uploaded.
+        /// </summary>
+        public int PendingCount => _decodeQueue.Count + _uploadQueue.Count;
+
         public ref readonly SpriteInfo GetLand(uint idx)
             => ref Get((uint)(idx & ~0x4000));
 
@@ -37,6 +70,25 @@ namespace ClassicUO.Renderer.Arts
 
             if (spriteInfo.Texture == null)
             {
+                if (_evicted[idx] && ReloadEvicted(idx))
+                {
+                    return ref SpriteInfo.Empty;
+                }
+
+                switch (Interlocked.CompareExchange(ref _states[idx], STATE_IDLE, STATE_QUEUED))
+                {
+                    case STATE_DECODING:
+                        // A worker is on it, draw nothing for a frame instead of decoding it twice
+                        return ref SpriteInfo.Empty;
+
+                    case STATE_DECODED:
+                        // Needed now, don't wait for the upload budget
+                        Upload(idx);
+
+                        return ref spriteInfo;
+                }
+
+                // Idle, or taken back from the decode queue
                 ArtInfo artInfo = PNGLoader.Instance.LoadArtTexture(idx);
 
                 if (artInfo.Pixels == null || artInfo.Pixels.IsEmpty)
@@ -56,44 +108,237 @@ namespace ClassicUO.Renderer.Arts
                 
                 if (!artInfo.Pixels.IsEmpty)
                 {
-                    spriteInfo.Texture = _atlas.AddSprite(
+                    SetSprite(
+                        idx,
+                        ref spriteInfo,
                         artInfo.Pixels,
                         artInfo.Width,
                         artInfo.Height,
-                        out spriteInfo.UV
+                        idx > 0x4000 ? GetBounds(artInfo.Pixels, artInfo.Width, artInfo.Height) : Rectangle.Empty
                     );
+                }
+            }
+
+            _atlas.Touch((int)idx);
+
+            return ref spriteInfo;
+        }
+
+        /// <summary>
+        /// Decode a static in the background so it is in the atlas before it is drawn.
+        /// </summary>
+        public void PrefetchArt(uint graphic) => Prefetch(graphic + 0x4000);
+
+        public void PrefetchLand(uint graphic) => Prefetch(graphic & ~0x4000u);
+
+        /// <summary>
+        /// Move decoded art into the atlas until the frame's budget is used. Game thread only.
+        /// </summary>
+        public void ProcessUploads()
+        {
+            if (_uploadQueue.IsEmpty)
+            {
+                return;
+            }
+
+            long start = Stopwatch.GetTimestamp();
+            long budget = (long)(UPLOAD_BUDGET_MS * Stopwatch.Frequency / 1000);
+
+            while (_uploadQueue.TryDequeue(out uint idx))
+            {
+                // Get may have uploaded it already
+                if (Volatile.Read(ref _states[idx]) == STATE_DECODED)
+                {
+                    Upload(idx);
+                }
+
+                if (Stopwatch.GetTimestamp() - start > budget)
+                {
+                    break;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Art the atlas dropped wasn't drawn for a while, decoding it again on a worker costs at most a frame without it.
+        /// </summary>
+        /// <returns>True while it is being decoded</returns>
+        private bool ReloadEvicted(uint idx)
+        {
+            if (Volatile.Read(ref _states[idx]) == STATE_IDLE)
+            {
+                Prefetch(idx);
+            }
+
+            int state = Volatile.Read(ref _states[idx]);
+
+            return state == STATE_QUEUED || state == STATE_DECODING;
+        }
+
+        private void Prefetch(uint idx)
+        {
+            if (idx >= _spriteInfos.Length || _spriteInfos[idx].Texture != null || Volatile.Read(ref _states[idx]) != STATE_IDLE)
+            {
+                return;
+            }
+
+            // Png replacements need the graphics device, Get loads them
+            if (PNGLoader.Instance.HasArtTexture(idx))
+            {
+                return;
+            }
+
+            if (Interlocked.CompareExchange(ref _states[idx], STATE_QUEUED, STATE_IDLE) != STATE_IDLE)
+            {
+                return;
+            }
+
+            _decodeQueue.Enqueue(idx);
+
+            if (Interlocked.Increment(ref _workers) <= MAX_DECODE_WORKERS)
+            {
+                Task.Run(Decode);
+            }
+            else
+            {
+                Interlocked.Decrement(ref _workers);
+            }
+        }
 
-                    if (idx > 0x4000)
+        private void Decode()
+        {
+            while (true)
+            {
+                while (_decodeQueue.TryDequeue(out uint idx))
+                {
+                    // Get took it back to load it right away
+                    if (Interlocked.CompareExchange(ref _states[idx], STATE_DECODING, STATE_QUEUED) != STATE_QUEUED)
                     {
-                        idx -= 0x4000;
-                        _picker.Set(idx, artInfo.Width, artInfo.Height, artInfo.Pixels);
+                        continue;
+                    }
 
-                        var pos1 = 0;
-                        int minX = artInfo.Width,
-                            minY = artInfo.Height,
-                            maxX = 0,
-                            maxY = 0;
+                    DecodedArt decoded = null;
 
-                        for (int y = 0; y < artInfo.Height; ++y)
+                    try
+                    {
+                        ArtInfo artInfo = ArtLoader.Instance.GetArt(idx);
+
+                        if (!artInfo.Pixels.IsEmpty)
                         {
-                            for (int x = 0; x < artInfo.Width; ++x)
-                            {
-                                if (artInfo.Pixels[pos1++] != 0)
-                                {
-                                    minX = Math.Min(minX, x);
-                                    maxX = Math.Max(maxX, x);
-                                    minY = Math.Min(minY, y);
-                                    maxY = Math.Max(maxY, y);
-                                }
-                            }
+                            uint[] pixels = ArrayPool<uint>.Shared.Rent(artInfo.Width * artInfo.Height);
+                            artInfo.Pixels.CopyTo(pixels);
+
+                            decoded = new DecodedArt(
+                                pixels,
+                                artInfo.Width,
+                                artInfo.Height,
+                                idx > 0x4000 ? GetBounds(artInfo.Pixels, artInfo.Width, artInfo.Height) : Rectangle.Empty
+                            );
                         }
+                    }
+                    catch (Exception e)
+                    {
+                        Log.Error($"Could not decode art {idx}: {e}");
+                    }
 
-                        _realArtBounds[idx] = new Rectangle(minX, minY, maxX - minX, maxY - minY);
+                    if (decoded == null)
+                    {
+                        // Missing art is left to Get, which falls back to the placeholder item
+                        Volatile.Write(ref _states[idx], STATE_IDLE);
+
+                        continue;
                     }
+
+                    _decoded[idx] = decoded;
+                    Volatile.Write(ref _states[idx], STATE_DECODED);
+                    _uploadQueue.Enqueue(idx);
+                }
+
+                Interlocked.Decrement(ref _workers);
+
+                // Something queued between the last TryDequeue and the decrement would wait for the next Prefetch
+                if (_decodeQueue.IsEmpty)
+                {
+                    return;
+                }
+
+                if (Interlocked.Increment(ref _workers) > MAX_DECODE_WORKERS)
+                {
+                    Interlocked.Decrement(ref _workers);
+
+                    return;
                 }
             }
+        }
 
-            return ref spriteInfo;
+        private void Upload(uint idx)
+        {
+            DecodedArt decoded = _decoded[idx];
+            _decoded[idx] = null;
+            Volatile.Write(ref _states[idx], STATE_IDLE);
+
+            if (decoded == null)
+            {
+                return;
+            }
+
+            SetSprite(
+                idx,
+                ref _spriteInfos[idx],
+                decoded.Pixels.AsSpan(0, decoded.Width * decoded.Height),
+                decoded.Width,
+                decoded.Height,
+                decoded.Bounds
+            );
+
+            ArrayPool<uint>.Shared.Return(decoded.Pixels);
+        }
+
+        private void SetSprite(uint idx, ref SpriteInfo spriteInfo, ReadOnlySpan<uint> pixels, int width, int height, Rectangle bounds)
+        {
+            spriteInfo.Texture = _atlas.AddSprite(pixels, width, height, out spriteInfo.UV, (int)idx);
+            _evicted[idx] = false;
+
+            if (idx > 0x4000)
+            {
+                idx -= 0x4000;
+                _picker.Set(idx, width, height, pixels);
+                _realArtBounds[idx] = bounds;
+            }
+        }
+
+        /// <summary>
+        /// The atlas dropped the sprite, the next <see cref="Get"/> or prefetch queues it for the decode workers. Bounds and pixel data stay.
+        /// </summary>
+        private void Evict(int idx)
+        {
+            _spriteInfos[idx] = default;
+            _evicted[idx] = true;
+        }
+
+        private static Rectangle GetBounds(ReadOnlySpan<uint> pixels, int width, int height)
+        {
+            var pos1 = 0;
+            int minX = width,
+                minY = height,
+                maxX = 0,
+                maxY = 0;
+
+            for (int y = 0; y < height; ++y)
+            {
+                for (int x = 0; x < width; ++x)
+                {
+                    if (pixels[pos1++] != 0)
+                    {
+                        minX = Math.Min(minX, x);
+                        maxX = Math.Max(maxX, x);
+                        minY = Math.Min(minY, y);
+                        maxY = Math.Max(maxY, y);
+                    }
+                }
+            }
+
+            return new Rectangle(minX, minY, maxX - minX, maxY - minY);
         }
 
         public unsafe IntPtr CreateCursorSurfacePtr(
@@ -191,5 +436,12 @@ namespace ClassicUO.Renderer.Arts
                 : _realArtBounds[idx];
 
         public bool PixelCheck(uint idx, int x, int y) => _picker.Get(idx, x, y);
+
+        private sealed class DecodedArt(uint[] pixels, int width, int height, Rectangle bounds)
+        {
+            public readonly uint[] Pixels = pixels;
+            public readonly int Width = width, Height = height;
+            public readonly Rectangle Bounds = bounds;
+        }
     }
 }
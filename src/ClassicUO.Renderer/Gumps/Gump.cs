@@ -11,7 +11,7 @@ namespace ClassicUO.Renderer.Gumps
 
         public Gump(GraphicsDevice device)
         {
-            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color);
+            _atlas = new TextureAtlas(device, 4096, 4096, SurfaceFormat.Color, Evict);
             _spriteInfos = new SpriteInfo[GumpsLoader.Instance.Entries.Length];
         }
 
@@ -36,16 +36,24 @@ namespace ClassicUO.Renderer.Gumps
                         gumpInfo.Pixels,
                         gumpInfo.Width,
                         gumpInfo.Height,
-                        out spriteInfo.UV
+                        out spriteInfo.UV,
+                        (int)idx
                     );
 
                     _picker.Set(idx, gumpInfo.Width, gumpInfo.Height, gumpInfo.Pixels);
                 }
             }
 
+            _atlas.Touch((int)idx);
+
             return ref spriteInfo;
         }
 
+        private void Evict(int idx)
+        {
+            _spriteInfos[idx] = default;
+        }
+
         public bool PixelCheck(uint idx, int x, int y, double scale = 1f) => _picker.Get(idx, x, y, scale: scale);
     }
 }
@@ -3,76 +3,319 @@ using Microsoft.Xna.Framework.Graphics;
 using StbRectPackSharp;
 using System;
 using System.Collections.Generic;
+using System.Runtime.CompilerServices;
 
 namespace ClassicUO.Renderer
 {
+    /// <summary>
+    /// Sprites packed into textures (pages) of a fixed size.
+    /// An atlas created with an eviction callback tracks when each of its sprites was last used, see <see cref="Touch"/>.
+    /// Once all atlases together hold <see cref="MemoryBudget"/> bytes of pages, a full page is followed by a cold one instead of a new one:
+    /// a page none of whose sprites were drawn for <see cref="COLD_MS"/> is emptied and packed again, if there is none the atlas grows.
+    /// The dropped sprites are handed to the callback so their owner loads them again if they are ever drawn.
+    /// Pages are reused instead of disposed because some controls hold on to an atlas texture.
+    /// </summary>
     public class TextureAtlas : IDisposable
     {
+        /// <summary>
+        /// Only pages with no sprite used for this long are emptied.
+        /// </summary>
+        public const int COLD_MS = 30_000;
+
+        private static readonly List<TextureAtlas> _atlases = new List<TextureAtlas>();
+        private static uint _now = (uint)Environment.TickCount;
+
         private readonly int _width,
             _height;
         private readonly SurfaceFormat _format;
         private readonly GraphicsDevice _device;
-        private readonly List<Texture2D> _textureList;
+        private readonly List<Page> _pages = new List<Page>();
+        private readonly Action<int> _evicted;
+        private readonly Dictionary<int, Sprite> _sprites = new Dictionary<int, Sprite>();
+        private uint[] _lastUsed = Array.Empty<uint>();
         private Packer _packer;
+        private Page _current;
+
+        public TextureAtlas(GraphicsDevice device, int width, int height, SurfaceFormat format) : this(device, width, height, format, null)
+        {
+        }
 
-        public TextureAtlas(GraphicsDevice device, int width, int height, SurfaceFormat format)
+        /// <param name="evicted">Called with the key of each sprite dropped from the atlas. Null for an atlas that keeps every sprite.</param>
+        public TextureAtlas(GraphicsDevice device, int width, int height, SurfaceFormat format, Action<int> evicted)
         {
             _device = device;
             _width = width;
             _height = height;
             _format = format;
+            _evicted = evicted;
 
-            _textureList = new List<Texture2D>();
+            _atlases.Add(this);
         }
 
-        public int TexturesCount => _textureList.Count;
+        /// <summary>
+        /// Bytes of pages all atlases may hold before they reuse their coldest pages, 0 for no limit.
+        /// </summary>
+        public static long MemoryBudget { get; set; }
 
-        public unsafe Texture2D AddSprite(
+        /// <summary>
+        /// Pages emptied to make room.
+        /// </summary>
+        public static long Evictions { get; private set; }
+
+        public static long EvictedSprites { get; private set; }
+
+        public static int PageCount
+        {
+            get
+            {
+                int count = 0;
+
+                foreach (TextureAtlas atlas in _atlases)
+                    count += atlas._pages.Count;
+
+                return count;
+            }
+        }
+
+        public static long TotalBytes
+        {
+            get
+            {
+                long bytes = 0;
+
+                foreach (TextureAtlas atlas in _atlases)
+                    bytes += atlas._pages.Count * atlas.PageBytes;
+
+                return bytes;
+            }
+        }
+
+        /// <summary>
+        /// Part of all pages covered by sprites that weren't dropped.
+        /// </summary>
+        public static double FillRatio
+        {
+            get
+            {
+                long used = 0,
+                    total = 0;
+
+                foreach (TextureAtlas atlas in _atlases)
+                {
+                    foreach (Page page in atlas._pages)
+                    {
+                        used += page.UsedArea;
+                        total += atlas.PageArea;
+                    }
+                }
+
+                return total == 0 ? 0 : (double)used / total;
+            }
+        }
+
+        public int TexturesCount => _pages.Count;
+
+        private int PageArea => _width * _height;
+
+        // AddSprite only takes 32 bit pixels
+        private long PageBytes => (long)PageArea * sizeof(uint);
+
+        /// <summary>
+        /// Call once per frame before anything is drawn. Pages with sprites used after this aren't emptied until the next frame.
+        /// </summary>
+        public static void BeginFrame()
+        {
+            uint now = (uint)Environment.TickCount;
+
+            // Every frame gets its own time, so "used this frame" is an equality check
+            _now = (int)(now - _now) > 0 ? now : _now + 1;
+        }
+
+        /// <summary>
+        /// Mark the sprite added with <paramref name="key"/> as used.
+        /// </summary>
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public void Touch(int key)
+        {
+            uint[] lastUsed = _lastUsed;
+
+            if ((uint)key < (uint)lastUsed.Length)
+            {
+                lastUsed[key] = _now;
+            }
+        }
+
+        public Texture2D AddSprite(
             ReadOnlySpan<uint> pixels,
             int width,
             int height,
             out Rectangle pr
+        ) => AddSprite(pixels, width, height, out pr, -1);
+
+        /// <param name="key">
+        /// Passed to the eviction callback when the sprite is dropped, several sprites can share a key and are dropped together.
+        /// Negative for a sprite that must never be dropped, its page is kept.
+        /// </param>
+        public unsafe Texture2D AddSprite(
+            ReadOnlySpan<uint> pixels,
+            int width,
+            int height,
+            out Rectangle pr,
+            int key
         )
         {
-            var index = _textureList.Count - 1;
-
-            if (index < 0)
+            if (_current == null)
             {
-                index = 0;
-                CreateNewTexture2D();
+                NextPage();
             }
 
             while (!_packer.PackRect(width, height, out pr))
             {
-                CreateNewTexture2D();
-                index = _textureList.Count - 1;
+                NextPage();
             }
 
-            Texture2D texture = _textureList[index];
+            Page page = _current;
 
             fixed (uint* src = pixels)
             {
-                texture.SetDataPointerEXT(0, pr, (IntPtr)src, sizeof(uint) * width * height);
+                page.Texture.SetDataPointerEXT(0, pr, (IntPtr)src, sizeof(uint) * width * height);
+            }
+
+            page.UsedArea += width * height;
+            Register(page, key, width * height);
+
+            return page.Texture;
+        }
+
+        private void Register(Page page, int key, int area)
+        {
+            if (key < 0 || _evicted == null)
+            {
+                page.Pinned = true;
+
+                return;
+            }
+
+            if (key >= _lastUsed.Length)
+            {
+                uint[] lastUsed = new uint[Math.Max(key + 1, _lastUsed.Length * 2)];
+                _lastUsed.CopyTo(lastUsed, 0);
+                _lastUsed = lastUsed;
             }
 
-            return texture;
+            _sprites.TryGetValue(key, out Sprite next);
+
+            var sprite = new Sprite(key, page, area, next);
+            _sprites[key] = sprite;
+            page.Sprites.Add(sprite);
+            _lastUsed[key] = _now;
         }
 
-        private void CreateNewTexture2D()
+        private void NextPage()
         {
-            Utility.Logging.Log.Trace($"creating texture: {_width}x{_height} {_format}");
-            Texture2D texture = new Texture2D(_device, _width, _height, false, _format);
-            _textureList.Add(texture);
+            Page page = null;
+
+            if (_evicted != null && MemoryBudget > 0 && TotalBytes + PageBytes > MemoryBudget)
+            {
+                page = FindColdPage();
+            }
+
+            if (page != null)
+            {
+                Empty(page);
+            }
+            else
+            {
+                Utility.Logging.Log.Trace($"creating texture: {_width}x{_height} {_format}");
+                page = new Page(new Texture2D(_device, _width, _height, false, _format));
+                _pages.Add(page);
+            }
+
+            _current = page;
 
             _packer?.Dispose();
             _packer = new Packer(_width, _height);
         }
 
+        /// <summary>
+        /// The page that was drawn from least recently, null if every page had a sprite used in the last <see cref="COLD_MS"/>.
+        /// </summary>
+        private Page FindColdPage()
+        {
+            Page best = null;
+            uint bestIdle = COLD_MS;
+
+            foreach (Page page in _pages)
+            {
+                if (page == _current || page.Pinned)
+                {
+                    continue;
+                }
+
+                uint idle = uint.MaxValue;
+
+                foreach (Sprite sprite in page.Sprites)
+                {
+                    idle = Math.Min(idle, _now - _lastUsed[sprite.Key]);
+
+                    if (idle <= bestIdle)
+                    {
+                        break;
+                    }
+                }
+
+                if (idle > bestIdle)
+                {
+                    best = page;
+                    bestIdle = idle;
+                }
+            }
+
+            return best;
+        }
+
+        private void Empty(Page page)
+        {
+            foreach (Sprite sprite in page.Sprites)
+            {
+                Evict(sprite.Key, page);
+            }
+
+            page.Sprites.Clear();
+            page.UsedArea = 0;
+            Evictions++;
+        }
+
+        /// <param name="emptying">Page being emptied, its list is cleared by the caller</param>
+        private void Evict(int key, Page emptying)
+        {
+            if (!_sprites.TryGetValue(key, out Sprite sprite))
+            {
+                return;
+            }
+
+            _sprites.Remove(key);
+
+            // Older sprites of the key can be on other pages, none of them is drawn anymore
+            for (; sprite != null; sprite = sprite.Next)
+            {
+                if (sprite.Page != emptying)
+                {
+                    sprite.Page.Sprites.Remove(sprite);
+                }
+
+                sprite.Page.UsedArea -= sprite.Area;
+                EvictedSprites++;
+            }
+
+            _evicted(key);
+        }
+
         public void SaveImages(string name)
         {
             for (int i = 0, count = TexturesCount; i < count; ++i)
             {
-                var texture = _textureList[i];
+                var texture = _pages[i].Texture;
 
                 using (var stream = System.IO.File.Create($"atlas/{name}_atlas_{i}.png"))
                 {
@@ -83,16 +326,43 @@ namespace ClassicUO.Renderer
 
         public void Dispose()
         {
-            foreach (Texture2D texture in _textureList)
+            foreach (Page page in _pages)
             {
-                if (!texture.IsDisposed)
+                if (!page.Texture.IsDisposed)
                 {
-                    texture.Dispose();
+                    page.Texture.Dispose();
                 }
             }
 
-            _packer.Dispose();
-            _textureList.Clear();
+            _packer?.Dispose();
+            _pages.Clear();
+            _sprites.Clear();
+            _current = null;
+            _atlases.Remove(this);
+        }
+
+        private sealed class Page(Texture2D texture)
+        {
+            public readonly Texture2D Texture = texture;
+            public readonly List<Sprite> Sprites = new List<Sprite>();
+            public int UsedArea;
+
+            /// <summary>
+            /// Holds a sprite that can't be dropped.
+            /// </summary>
+            public bool Pinned;
+        }
+
+        private sealed class Sprite(int key, Page page, int area, Sprite next)
+        {
+            public readonly int Key = key;
+            public readonly Page Page = page;
+            public readonly int Area = area;
+
+            /// <summary>
+            /// Older sprite with the same key.
+            /// </summary>
+            public readonly Sprite Next = next;
         }
     }
 }
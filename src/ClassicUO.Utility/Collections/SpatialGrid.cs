@@ -0,0 +1,171 @@
+using System.Collections.Generic;
+using Microsoft.Xna.Framework;
+
+namespace ClassicUO.Utility.Collections
+{
+    /// <summary>
+    /// Uniform grid over map coordinates to find the items inside of a rectangle without looking at all of them.
+    /// An item spanning several cells is kept in each of them and still returned once by <see cref="Query"/>.
+    /// Bounds are inclusive, a point is a rectangle with no width and height.
+    /// </summary>
+    public sealed class SpatialGrid<T>
+    {
+        private readonly int _cellSize;
+        private readonly Dictionary<long, List<Entry>> _cells = new Dictionary<long, List<Entry>>();
+        private int _minCellX = int.MaxValue, _minCellY = int.MaxValue, _maxCellX = int.MinValue, _maxCellY = int.MinValue;
+
+        public SpatialGrid(int cellSize = 128)
+        {
+            _cellSize = cellSize;
+        }
+
+        public int Count { get; private set; }
+
+        public void Add(T item, int x, int y) => Add(item, new Rectangle(x, y, 0, 0));
+
+        public void Add(T item, Rectangle bounds)
+        {
+            GetCells(bounds, out int minX, out int minY, out int maxX, out int maxY);
+
+            for (int cy = minY; cy <= maxY; cy++)
+            {
+                for (int cx = minX; cx <= maxX; cx++)
+                {
+                    long key = GetKey(cx, cy);
+
+                    if (!_cells.TryGetValue(key, out List<Entry> cell))
+                    {
+                        _cells[key] = cell = new List<Entry>();
+                    }
+
+                    cell.Add(new Entry(item, bounds));
+                }
+            }
+
+            if (minX < _minCellX) _minCellX = minX;
+            if (minY < _minCellY) _minCellY = minY;
+            if (maxX > _maxCellX) _maxCellX = maxX;
+            if (maxY > _maxCellY) _maxCellY = maxY;
+
+            Count++;
+        }
+
+        public bool Remove(T item, int x, int y) => Remove(item, new Rectangle(x, y, 0, 0));
+
+        /// <summary>
+        /// Remove an item, <paramref name="bounds"/> must be the ones it was added with.
+        /// </summary>
+        public bool Remove(T item, Rectangle bounds)
+        {
+            GetCells(bounds, out int minX, out int minY, out int maxX, out int maxY);
+            EqualityComparer<T> comparer = EqualityComparer<T>.Default;
+            bool removed = false;
+
+            for (int cy = minY; cy <= maxY; cy++)
+            {
+                for (int cx = minX; cx <= maxX; cx++)
+                {
+                    if (!_cells.TryGetValue(GetKey(cx, cy), out List<Entry> cell))
+                    {
+                        continue;
+                    }
+
+                    for (int i = 0; i < cell.Count; i++)
+                    {
+                        if (cell[i].Bounds == bounds && comparer.Equals(cell[i].Item, item))
+                        {
+                            cell.RemoveAt(i);
+                            removed = true;
+
+                            break;
+                        }
+                    }
+                }
+            }
+
+            if (removed)
+            {
+                Count--;
+            }
+
+            return removed;
+        }
+
+        public void Clear()
+        {
+            _cells.Clear();
+            _minCellX = _minCellY = int.MaxValue;
+            _maxCellX = _maxCellY = int.MinValue;
+            Count = 0;
+        }
+
+        /// <summary>
+        /// Add the items touching <paramref name="area"/> to <paramref name="result"/>.
+        /// </summary>
+        public void Query(Rectangle area, List<T> result)
+        {
+            if (Count == 0)
+            {
+                return;
+            }
+
+            GetCells(area, out int minX, out int minY, out int maxX, out int maxY);
+
+            // Zoomed out the area can be much larger than what was added
+            if (minX < _minCellX) minX = _minCellX;
+            if (minY < _minCellY) minY = _minCellY;
+            if (maxX > _maxCellX) maxX = _maxCellX;
+            if (maxY > _maxCellY) maxY = _maxCellY;
+
+            int areaRight = area.X + area.Width;
+            int areaBottom = area.Y + area.Height;
+
+            for (int cy = minY; cy <= maxY; cy++)
+            {
+                for (int cx = minX; cx <= maxX; cx++)
+                {
+                    if (!_cells.TryGetValue(GetKey(cx, cy), out List<Entry> cell))
+                    {
+                        continue;
+                    }
+
+                    foreach (Entry entry in cell)
+                    {
+                        Rectangle b = entry.Bounds;
+
+                        if (b.X > areaRight || b.X + b.Width < area.X || b.Y > areaBottom || b.Y + b.Height < area.Y)
+                        {
+                            continue;
+                        }
+
+                        // Only the cell holding the top left corner of the overlap reports an item spanning several cells
+                        if (GetCell(b.X > area.X ? b.X : area.X) != cx || GetCell(b.Y > area.Y ? b.Y : area.Y) != cy)
+                        {
+                            continue;
+                        }
+
+                        result.Add(entry.Item);
+                    }
+                }
+            }
+        }
+
+        private void GetCells(Rectangle bounds, out int minX, out int minY, out int maxX, out int maxY)
+        {
+            minX = GetCell(bounds.X);
+            minY = GetCell(bounds.Y);
+            maxX = GetCell(bounds.X + bounds.Width);
+            maxY = GetCell(bounds.Y + bounds.Height);
+        }
+
+        private int GetCell(int value) => value >= 0 ? value / _cellSize : (value + 1) / _cellSize - 1;
+
+        private static long GetKey(int cx, int cy) => ((long)cx << 32) | (uint)cy;
+
+        private readonly struct Entry(T item, Rectangle bounds)
+        {
+            public readonly T Item = item;
+            public readonly Rectangle Bounds = bounds;
+        }
+    }
+}
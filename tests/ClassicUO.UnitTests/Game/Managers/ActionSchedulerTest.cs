@@ -0,0 +1,230 @@
+using System.Collections.Generic;
+using ClassicUO.Game.Managers;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.Game.Managers
+{
+    public class ActionSchedulerTest
+    {
+        private readonly List<ScheduledAction> _sent = new List<ScheduledAction>();
+        private long _now = 1000;
+        private long _delay;
+
+        private ActionScheduler CreateScheduler(long delay = 1000, bool dropAcks = true)
+        {
+            _delay = delay;
+
+            return new ActionScheduler
+            (
+                a =>
+                {
+                    _sent.Add(a);
+
+                    return SendResult.Sent;
+                },
+                () => _now,
+                () => _delay,
+                dropAcks
+            );
+        }
+
+        private static ScheduledAction Move(uint serial, SchedulePriority priority = SchedulePriority.Normal) => new ScheduledAction(ActionKind.Move, serial, priority);
+
+        [Fact]
+        public void Moves_Wait_For_The_Server_To_Answer()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+            scheduler.Enqueue(Move(1));
+            scheduler.Enqueue(Move(2));
+
+            scheduler.Update();
+            _now += 2000;
+            scheduler.Update();
+
+            // The second move waits on the first one, not on the delay
+            _sent.Should().HaveCount(1);
+            scheduler.InFlight.Should().Be(1);
+
+            scheduler.OnDropAccepted(1);
+            scheduler.Update();
+
+            _sent.Should().HaveCount(2);
+            scheduler.Accepted.Should().Be(1);
+        }
+
+        [Fact]
+        public void Accepted_Moves_Speed_Up_And_Denials_Slow_Down()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+
+            for (uint i = 1; i <= 20; i++)
+            {
+                scheduler.Enqueue(Move(i));
+                scheduler.Update();
+                _now += 20;
+                scheduler.OnDropAccepted(i);
+                _now += 1000;
+            }
+
+            scheduler.Accepted.Should().Be(20);
+            scheduler.RoundTrip.Should().Be(20);
+            scheduler.Delay.Should().Be(ActionScheduler.MIN_DELAY);
+
+            scheduler.Enqueue(Move(21));
+            scheduler.Update();
+            scheduler.OnMoveDenied(21, 5);
+
+            scheduler.Delay.Should().Be(ActionScheduler.MIN_DELAY * 2);
+
+            // Denied for going too fast, so it's tried again
+            scheduler.IsQueued(ActionKind.Move, 21).Should().BeTrue();
+        }
+
+        [Fact]
+        public void Moves_Denied_For_Good_Are_Dropped()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+            scheduler.Enqueue(Move(1));
+            scheduler.Update();
+
+            scheduler.OnMoveDenied(1, 1);
+
+            scheduler.Denied.Should().Be(1);
+            scheduler.Queued.Should().Be(0);
+            scheduler.Delay.Should().Be(1000);
+        }
+
+        [Fact]
+        public void Higher_Priorities_Go_First_And_Duplicates_Are_Ignored()
+        {
+            ActionScheduler scheduler = CreateScheduler(delay: 0);
+            scheduler.Enqueue(Move(1, SchedulePriority.Low)).Should().BeTrue();
+            scheduler.Enqueue(Move(1)).Should().BeFalse();
+            scheduler.Enqueue(Move(2, SchedulePriority.High)).Should().BeTrue();
+            scheduler.Enqueue(new ScheduledAction(ActionKind.Use, 1)).Should().BeTrue();
+
+            scheduler.Update();
+            scheduler.OnDropAccepted(2);
+            _now += ActionScheduler.MIN_DELAY;
+            scheduler.Update();
+
+            _sent.Should().HaveCount(3);
+            _sent[0].Serial.Should().Be(2);
+            _sent[1].Kind.Should().Be(ActionKind.Use);
+            _sent[2].Serial.Should().Be(1);
+        }
+
+        [Fact]
+        public void Cancelled_And_Failing_Actions_Are_Not_Sent()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+            scheduler.Enqueue(Move(1));
+            scheduler.Enqueue(new ScheduledAction(ActionKind.Move, 2) { Condition = () => false });
+            scheduler.Enqueue(new ScheduledAction(ActionKind.Click, 3) { NotBefore = _now + 500 });
+
+            scheduler.Cancel(ActionKind.Move, 1).Should().Be(1);
+            scheduler.Update();
+
+            _sent.Should().BeEmpty();
+            scheduler.Dropped.Should().Be(1);
+
+            // Clicks don't wait on the delay between moves
+            _now += 500;
+            scheduler.Update();
+
+            _sent.Should().ContainSingle().Which.Kind.Should().Be(ActionKind.Click);
+        }
+
+        [Fact]
+        public void Answers_For_Other_Items_Are_Ignored()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+            scheduler.Enqueue(Move(1));
+            scheduler.Enqueue(Move(2));
+            scheduler.Update();
+
+            // The player dragged something else by hand
+            scheduler.OnDropAccepted(3);
+            scheduler.OnMoveDenied(3, 5);
+
+            scheduler.InFlight.Should().Be(1);
+            scheduler.Accepted.Should().Be(0);
+            scheduler.Denied.Should().Be(0);
+            scheduler.Delay.Should().Be(1000);
+        }
+
+        [Fact]
+        public void Uses_Keep_The_Configured_Delay()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+
+            for (uint i = 1; i <= 10; i++)
+            {
+                scheduler.Enqueue(Move(i));
+                scheduler.Update();
+                scheduler.OnDropAccepted(i);
+                _now += 1000;
+            }
+
+            scheduler.Enqueue(new ScheduledAction(ActionKind.Use, 1));
+            scheduler.Enqueue(new ScheduledAction(ActionKind.Use, 2));
+            _sent.Clear();
+
+            scheduler.Update();
+            _now += 500;
+            scheduler.Update();
+
+            // Moves sped up, uses aren't acknowledged so they don't
+            scheduler.Delay.Should().BeLessThan(500);
+            _sent.Should().ContainSingle();
+
+            _now += 500;
+            scheduler.Update();
+
+            _sent.Should().HaveCount(2);
+        }
+
+        [Fact]
+        public void Configured_Delay_Changes_Are_Picked_Up()
+        {
+            ActionScheduler scheduler = CreateScheduler();
+
+            _delay = 300;
+            scheduler.Update();
+
+            scheduler.Delay.Should().Be(300);
+        }
+
+        [Fact]
+        public void Container_Update_Completes_Move_Without_Drop_Acks()
+        {
+            ActionScheduler scheduler = CreateScheduler(dropAcks: false);
+            scheduler.Enqueue(Move(1));
+            scheduler.Update();
+
+            _now += 100;
+            scheduler.OnItemMoved(2);
+            scheduler.InFlight.Should().Be(1);
+
+            scheduler.OnItemMoved(1);
+            scheduler.InFlight.Should().Be(0);
+            scheduler.RoundTrip.Should().Be(100);
+        }
+
+        [Fact]
+        public void Unanswered_Moves_Time_Out()
+        {
+            ActionScheduler scheduler = CreateScheduler(delay: 100);
+            scheduler.Enqueue(Move(1));
+            scheduler.Update();
+
+            _now += 10_000;
+            scheduler.Update();
+
+            scheduler.InFlight.Should().Be(0);
+            scheduler.TimedOut.Should().Be(1);
+            scheduler.Delay.Should().Be(200);
+        }
+    }
+}
@@ -0,0 +1,88 @@
+using System.Collections.Generic;
+using ClassicUO.Game;
+using ClassicUO.Game.GameObjects;
+using ClassicUO.Game.Managers;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.Game.Managers
+{
+    public class ItemIndexManagerTest
+    {
+        private static Item CreateItem(uint serial, ushort graphic, uint container)
+        {
+            Item item = Item.Create(serial);
+            item.Graphic = graphic;
+            item.Container = container;
+
+            return item;
+        }
+
+        [Fact]
+        public void WithGraphic_Returns_Only_Matching_Serials()
+        {
+            var index = new ItemIndexManager();
+            index.Add(CreateItem(0x4000_0001, 0x0EED, 0xFFFF_FFFF));
+            index.Add(CreateItem(0x4000_0002, 0x0EED, 0x4000_0010));
+            index.Add(CreateItem(0x4000_0003, 0x0F0E, 0x4000_0010));
+
+            index.WithGraphic(0x0EED).Should().BeEquivalentTo(new uint[] { 0x4000_0001, 0x4000_0002 });
+            index.WithGraphic(0x1234).Should().BeEmpty();
+        }
+
+        [Fact]
+        public void Remove_Drops_Item_From_All_Indexes()
+        {
+            var index = new ItemIndexManager();
+            Item item = CreateItem(0x4000_0001, 0x0EED, 0x4000_0010);
+            index.Add(item);
+
+            index.Remove(item);
+
+            index.WithGraphic(0x0EED).Should().BeEmpty();
+            index.InContainer(0x4000_0010).Should().BeEmpty();
+        }
+
+        [Fact]
+        public void CollectNested_Returns_Items_At_Any_Depth()
+        {
+            var index = new ItemIndexManager();
+            index.Add(CreateItem(0x4000_0010, 0x0E75, 0x0000_0001));
+            index.Add(CreateItem(0x4000_0011, 0x0E76, 0x4000_0010));
+            index.Add(CreateItem(0x4000_0012, 0x0EED, 0x4000_0011));
+            index.Add(CreateItem(0x4000_0013, 0x0EED, 0x4000_0020));
+
+            var results = new List<uint>();
+            index.CollectNested(0x4000_0010, results);
+
+            results.Should().BeEquivalentTo(new uint[] { 0x4000_0011, 0x4000_0012 });
+        }
+
+        [Fact]
+        public void Reused_Item_Is_Indexed_Under_New_Serial()
+        {
+            Item item = World.GetOrCreateItem(0x4000_0100);
+            item.Graphic = 0x0EED;
+            item.Container = 0x4000_0200;
+
+            item.Destroy();
+            Item reused = World.GetOrCreateItem(0x4000_0101);
+            reused.Graphic = 0x0EEE;
+
+            try
+            {
+                // The pool hands the destroyed item straight back
+                reused.Should().BeSameAs(item);
+                World.ItemIndex.WithGraphic(0x0EED).Should().NotContain(0x4000_0100);
+                World.ItemIndex.InContainer(0x4000_0200).Should().NotContain(0x4000_0100);
+                World.ItemIndex.WithGraphic(0x0EEE).Should().Contain(0x4000_0101);
+            }
+            finally
+            {
+                World.ItemIndex.Remove(reused);
+                World.Items.Remove(0x4000_0100);
+                World.Items.Remove(0x4000_0101);
+            }
+        }
+    }
+}
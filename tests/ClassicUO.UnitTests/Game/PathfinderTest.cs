@@ -0,0 +1,66 @@
+using System;
+using ClassicUO.Game;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.Game
+{
+    public class PathfinderTest
+    {
+        private const uint SURFACE = (uint)(Pathfinder.PATH_OBJECT_FLAGS.POF_IMPASSABLE_OR_SURFACE | Pathfinder.PATH_OBJECT_FLAGS.POF_SURFACE);
+        private const uint BRIDGE = (uint)(Pathfinder.PATH_OBJECT_FLAGS.POF_SURFACE | Pathfinder.PATH_OBJECT_FLAGS.POF_BRIDGE);
+
+        // Land at 3 under a ramp from 0 to 10, in the order CreateItemList adds them
+        private static readonly WalkabilityGrid.Entry[] _rampTile =
+        {
+            new WalkabilityGrid.Entry(SURFACE, 3, 3, 0, -1),
+            new WalkabilityGrid.Entry(BRIDGE, 0, 5, 10, -1)
+        };
+
+        [Fact]
+        public void ApplyMinMaxZ_Lets_A_Bridge_Lower_MinZ_After_The_Surface_Below_It()
+        {
+            int minZ = -128;
+            int maxZ = 5;
+
+            Pathfinder.ApplyMinMaxZ(_rampTile, ReadOnlySpan<sbyte>.Empty, 5, 2, ref minZ, ref maxZ);
+
+            minZ.Should().Be(0);
+            maxZ.Should().Be(12);
+        }
+
+        [Fact]
+        public void ApplyMinMaxZ_Depends_On_Item_Order()
+        {
+            var sorted = (WalkabilityGrid.Entry[])_rampTile.Clone();
+            Pathfinder.SortEntries(sorted);
+
+            int minZ = -128;
+            int maxZ = 5;
+
+            Pathfinder.ApplyMinMaxZ(sorted, ReadOnlySpan<sbyte>.Empty, 5, 2, ref minZ, ref maxZ);
+
+            minZ.Should().Be(3);
+        }
+
+        [Fact]
+        public void SortEntries_Orders_By_Z_Then_Height_And_Keeps_Ties()
+        {
+            var entries = new[]
+            {
+                new WalkabilityGrid.Entry(SURFACE, 10, 10, 0, -1),
+                new WalkabilityGrid.Entry(BRIDGE, 0, 2, 5, -1),
+                new WalkabilityGrid.Entry(SURFACE, 0, 0, 0, -1),
+                new WalkabilityGrid.Entry(BRIDGE, 0, 0, 0, -1)
+            };
+
+            Pathfinder.SortEntries(entries);
+
+            entries[0].Flags.Should().Be(SURFACE);
+            entries[1].Flags.Should().Be(BRIDGE);
+            entries[1].Height.Should().Be(0);
+            entries[2].Height.Should().Be(5);
+            entries[3].Z.Should().Be(10);
+        }
+    }
+}
@@ -0,0 +1,94 @@
+using System;
+using System.Collections.Generic;
+using FluentAssertions;
+using LScript;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class InterpreterTest
+    {
+        private static int _count;
+
+        static InterpreterTest()
+        {
+            Interpreter.RegisterCommandHandler("testcount", (command, args, quiet, force) =>
+            {
+                _count += args.Length > 0 ? args[0].AsInt() : 1;
+
+                return true;
+            });
+        }
+
+        [Fact]
+        public void Compile_Resolves_If_And_Loop_Targets()
+        {
+            var code = Compiler.Compile
+            (
+                Lexer.Lex(new[]
+                {
+                    "if 1 == 2",        // 0
+                    "  testcount",      // 1
+                    "elseif 2 == 2",    // 2
+                    "  while 1 == 1",   // 3
+                    "    break",        // 4
+                    "  endwhile",       // 5
+                    "else",             // 6
+                    "  testcount",      // 7
+                    "endif"             // 8
+                }),
+                new Dictionary<int, int>(),
+                new HashSet<string>(),
+                new Dictionary<ASTNode, IComparable>()
+            );
+
+            code.Should().HaveCount(9);
+            code[0].Jump.Should().Be(2);
+            code[2].Jump.Should().Be(6);
+            code[2].Match.Should().Be(8);
+            code[3].Jump.Should().Be(5);
+            code[4].Jump.Should().Be(5);
+            code[4].Match.Should().Be(3);
+            code[5].Jump.Should().Be(3);
+            code[6].Match.Should().Be(8);
+        }
+
+        [Fact]
+        public void ExecuteScript_Runs_Statements_Within_Budget()
+        {
+            var script = new Script
+            (
+                Lexer.Lex(new[]
+                {
+                    "for 3",
+                    "  if 1 == 1",
+                    "    testcount",
+                    "    continue",
+                    "  endif",
+                    "  testcount 100",
+                    "endfor",
+                    "testcount 10"
+                })
+            ) { IsPlaying = true };
+
+            double budget = Interpreter.FrameBudget;
+            _count = 0;
+
+            try
+            {
+                Interpreter.FrameBudget = 0;
+                Interpreter.ExecuteScript(script).Should().BeTrue();
+                script.CurrentLine.Should().Be(1);
+
+                Interpreter.FrameBudget = 1000;
+                Interpreter.ExecuteScript(script).Should().BeFalse();
+                _count.Should().Be(13);
+            }
+            finally
+            {
+                Interpreter.FrameBudget = budget;
+                Interpreter.StopScript();
+            }
+        }
+    }
+}
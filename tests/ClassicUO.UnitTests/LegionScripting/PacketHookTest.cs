@@ -0,0 +1,85 @@
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class PacketHookTest
+    {
+        private static readonly byte[] Damage = { 0x0B, 0x00, 0x00, 0x12, 0x34, 0x00, 0x05 };
+
+        [Fact]
+        public void Dispatch_Delivers_Only_Hooked_IDs()
+        {
+            var hook = new PacketHook(new[] { 0x0B }, true, false, 4, false);
+            PacketHooks.Add(hook);
+
+            try
+            {
+                PacketHooks.IsHooked(0x0B, false).Should().BeTrue();
+                PacketHooks.IsHooked(0x0B, true).Should().BeFalse();
+                PacketHooks.IsHooked(0x0C, false).Should().BeFalse();
+
+                PacketHooks.Dispatch(Damage, false);
+                PacketHooks.Dispatch(new byte[] { 0x0C, 0x00 }, false);
+
+                var packet = hook.Read();
+                packet.ID.Should().Be(0x0B);
+                packet.Outgoing.Should().BeFalse();
+                packet.ReadUInt32(1).Should().Be(0x1234);
+                packet.ReadUInt16(5).Should().Be(5);
+                hook.Read().Should().BeNull();
+            }
+            finally
+            {
+                PacketHooks.Remove(hook);
+            }
+
+            PacketHooks.IsHooked(0x0B, false).Should().BeFalse();
+        }
+
+        [Fact]
+        public void Full_Hook_Replaces_Oldest_Packet()
+        {
+            var hook = new PacketHook(new[] { 0x0B }, true, false, 2, false);
+            PacketHooks.Add(hook);
+
+            try
+            {
+                for (byte i = 1; i <= 3; i++)
+                    PacketHooks.Dispatch(new byte[] { 0x0B, i }, false);
+
+                var packets = hook.ReadAll();
+                packets.Should().HaveCount(2);
+                packets[0].ReadByte(1).Should().Be(2);
+                packets[1].ReadByte(1).Should().Be(3);
+                hook.Dropped.Should().Be(1);
+            }
+            finally
+            {
+                PacketHooks.Remove(hook);
+            }
+        }
+
+        [Fact]
+        public void DropOnOverflow_Keeps_Oldest_Packets()
+        {
+            var hook = new PacketHook(new[] { 0x0B }, true, false, 2, true);
+            PacketHooks.Add(hook);
+
+            try
+            {
+                for (byte i = 1; i <= 3; i++)
+                    PacketHooks.Dispatch(new byte[] { 0x0B, i }, false);
+
+                hook.Read().ReadByte(1).Should().Be(1);
+                hook.Read().ReadByte(1).Should().Be(2);
+                hook.Dropped.Should().Be(1);
+            }
+            finally
+            {
+                PacketHooks.Remove(hook);
+            }
+        }
+    }
+}
@@ -0,0 +1,74 @@
+using System;
+using System.IO;
+using System.Text;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class PersistentVarStoreTest : IDisposable
+    {
+        private readonly string _path = Path.Combine(Path.GetTempPath(), $"legionvars_{Guid.NewGuid():N}.dat");
+
+        public void Dispose()
+        {
+            if (File.Exists(_path))
+                File.Delete(_path);
+        }
+
+        [Fact]
+        public void Flushed_Changes_Are_Replayed_On_Load()
+        {
+            var store = new PersistentVarStore(_path);
+            store.Load();
+            store.Set("Char", "me", "kills", "5");
+            store.Set("Char", "me", "note", "a\tb\nc\\");
+            store.Set("Char", "me", "deaths", "1");
+            store.Set("Char", "me", "deaths", null);
+            store.Flush();
+
+            var loaded = new PersistentVarStore(_path);
+            loaded.Load();
+
+            loaded.Get("Char", "me", "kills", "").Should().Be("5");
+            loaded.Get("Char", "me", "note", "").Should().Be("a\tb\nc\\");
+            loaded.Get("Char", "me", "deaths", "none").Should().Be("none");
+            loaded.Count.Should().Be(2);
+            loaded.Records.Should().Be(4);
+        }
+
+        [Fact]
+        public void Load_Drops_Incomplete_Last_Record()
+        {
+            File.WriteAllText(_path, "Global\tGLOBAL\tcount\t7\nGlobal\tGLOBAL\tcount\t8", new UTF8Encoding(false));
+
+            var store = new PersistentVarStore(_path);
+            store.Load();
+            store.Get("Global", "GLOBAL", "count", "").Should().Be("7");
+
+            store.Set("Global", "GLOBAL", "other", "1");
+            store.Flush();
+
+            File.ReadAllText(_path).Should().Be("Global\tGLOBAL\tcount\t7\nGlobal\tGLOBAL\tother\t1\n");
+        }
+
+        [Fact]
+        public void Flush_Compacts_Large_Log()
+        {
+            var store = new PersistentVarStore(_path);
+            store.Load();
+
+            for (int i = 0; i <= PersistentVarStore.COMPACT_MIN_RECORDS; i++)
+                store.Set("Char", "me", "counter", i.ToString());
+
+            store.Flush();
+
+            store.Records.Should().Be(1);
+
+            var loaded = new PersistentVarStore(_path);
+            loaded.Load();
+            loaded.Get("Char", "me", "counter", "").Should().Be(PersistentVarStore.COMPACT_MIN_RECORDS.ToString());
+        }
+    }
+}
@@ -0,0 +1,91 @@
+using System.Collections.Generic;
+using System.Threading;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class ScriptActionQueueTest
+    {
+        [Fact]
+        public void Drain_Runs_Higher_Priority_First()
+        {
+            var queue = new ScriptActionQueue();
+            var order = new List<string>();
+
+            queue.Enqueue(() => order.Add("bulk"), null, ActionPriority.Bulk);
+            queue.Enqueue(() => order.Add("normal"), null, ActionPriority.Normal);
+            queue.Enqueue(() => order.Add("interactive"), null, ActionPriority.Interactive);
+
+            queue.Drain();
+
+            order.Should().Equal("interactive", "normal", "bulk");
+            queue.Count.Should().Be(0);
+        }
+
+        [Fact]
+        public void Drain_Alternates_Between_Owners()
+        {
+            var queue = new ScriptActionQueue();
+            var order = new List<string>();
+            object a = new object(), b = new object();
+
+            for (int i = 0; i < 3; i++)
+                queue.Enqueue(() => order.Add("a"), a, ActionPriority.Normal);
+
+            queue.Enqueue(() => order.Add("b"), b, ActionPriority.Normal);
+
+            queue.Drain();
+
+            order.Should().Equal("a", "b", "a", "a");
+        }
+
+        [Fact]
+        public void Drain_Stops_When_Budget_Is_Used()
+        {
+            var queue = new ScriptActionQueue { FrameBudgetMs = 1 };
+
+            for (int i = 0; i < 5; i++)
+                queue.Enqueue(() => Thread.Sleep(5));
+
+            queue.Drain();
+
+            queue.ExecutedLastFrame.Should().Be(1);
+            queue.Count.Should().Be(4);
+            queue.Overflows.Should().Be(1);
+            queue.PeakCount.Should().Be(5);
+        }
+
+        [Fact]
+        public void Lower_Priorities_Get_A_Share_While_Higher_Ones_Have_Work()
+        {
+            var queue = new ScriptActionQueue();
+            var order = new List<string>();
+
+            for (int i = 0; i < 10; i++)
+                queue.Enqueue(() => order.Add("interactive"), null, ActionPriority.Interactive);
+
+            queue.Enqueue(() => order.Add("normal"), null, ActionPriority.Normal);
+            queue.Enqueue(() => order.Add("bulk"), null, ActionPriority.Bulk);
+
+            queue.Drain();
+
+            order.IndexOf("normal").Should().Be(ScriptActionQueue.SHARE_EVERY - 1);
+            order.IndexOf("bulk").Should().Be(ScriptActionQueue.SHARE_EVERY * 2 - 1);
+        }
+
+        [Fact]
+        public void CountFor_Counts_Only_That_Owner()
+        {
+            var queue = new ScriptActionQueue();
+            object a = new object();
+
+            queue.Enqueue(() => { }, a, ActionPriority.Normal);
+            queue.Enqueue(() => { }, a, ActionPriority.Bulk);
+            queue.Enqueue(() => { });
+
+            queue.CountFor(a).Should().Be(2);
+        }
+    }
+}
@@ -0,0 +1,42 @@
+using System.Threading.Tasks;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class ScriptEventsTest
+    {
+        [Fact]
+        public void Wait_Returns_Event_Signaled_Before_It_Started()
+        {
+            long[] mark = ScriptEvents.Mark();
+            ScriptEvents.Signal(API.Events.Gump);
+
+            ScriptEvents.Wait(new[] { API.Events.Gump }, mark, 0).Should().Be(API.Events.Gump);
+        }
+
+        [Fact]
+        public void Wait_Ignores_Other_Events_And_Wakes_On_Its_Own()
+        {
+            long[] mark = ScriptEvents.Mark();
+            Task<API.Events?> waiter = Task.Run(() => ScriptEvents.Wait(new[] { API.Events.Callback }, mark, 5000));
+
+            ScriptEvents.Signal(API.Events.OPL);
+            waiter.Wait(100).Should().BeFalse();
+
+            ScriptEvents.Signal(API.Events.Callback);
+            waiter.Wait(5000).Should().BeTrue();
+            waiter.Result.Should().Be(API.Events.Callback);
+        }
+
+        [Fact]
+        public void Wait_Times_Out_Without_Matching_Event()
+        {
+            long[] mark = ScriptEvents.Mark();
+
+            ScriptEvents.Wait(new[] { API.Events.Target }, ScriptEvents.Mark(), 20).Should().BeNull();
+            ScriptEvents.Fired(new[] { API.Events.Target }, mark).Should().BeNull();
+        }
+    }
+}
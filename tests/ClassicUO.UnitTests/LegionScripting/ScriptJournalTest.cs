@@ -0,0 +1,86 @@
+using ClassicUO.Game.Managers;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class ScriptJournalTest
+    {
+        private static JournalEntry Entry(string text) => new JournalEntry { Text = text };
+
+        [Fact]
+        public void Add_Past_Capacity_Keeps_Newest_Entries()
+        {
+            var journal = new ScriptJournal(3);
+
+            for (int i = 1; i <= 5; i++)
+                journal.Add(Entry("msg " + i));
+
+            journal.Count.Should().Be(3);
+            journal.LastSequence.Should().Be(5);
+            journal.GetSince(0).Should().OnlyContain(e => e.Text != "msg 1" && e.Text != "msg 2");
+        }
+
+        [Fact]
+        public void GetSince_Returns_Only_Newer_Entries()
+        {
+            var journal = new ScriptJournal();
+            journal.Add(Entry("old"));
+            long cursor = journal.LastSequence;
+            journal.Add(Entry("new"));
+
+            var entries = journal.GetSince(cursor);
+
+            entries.Should().HaveCount(1);
+            entries[0].Text.Should().Be("new");
+        }
+
+        [Fact]
+        public void Contains_Supports_Regex_And_Cursor()
+        {
+            var journal = new ScriptJournal();
+            journal.Add(Entry("You have hidden yourself well."));
+            long cursor = journal.LastSequence;
+
+            journal.Contains(new[] { "$hidden\\s+yourself" }).Should().BeTrue();
+            journal.Contains(new[] { "hidden" }, cursor).Should().BeFalse();
+        }
+
+        [Fact]
+        public void WaitFor_Times_Out_Without_Match()
+        {
+            var journal = new ScriptJournal();
+            journal.Add(Entry("something"));
+
+            journal.WaitFor(new[] { "something" }, journal.LastSequence, 10).Should().BeNull();
+            journal.WaitFor(new[] { "something" }, 0, 10).Should().NotBeNull();
+        }
+
+        [Fact]
+        public void Queue_Members_Still_Work_For_Old_Scripts()
+        {
+            var journal = new ScriptJournal();
+            journal.Enqueue(Entry("first"));
+            journal.Enqueue(Entry("second"));
+
+            journal.ToArray().Should().HaveCount(2);
+            journal.TryDequeue(out JournalEntry oldest).Should().BeTrue();
+            oldest.Text.Should().Be("first");
+            journal.TryPeek(out JournalEntry next).Should().BeTrue();
+            next.Text.Should().Be("second");
+            journal.TryDequeue(out _).Should().BeTrue();
+            journal.IsEmpty.Should().BeTrue();
+            journal.TryDequeue(out _).Should().BeFalse();
+        }
+
+        [Fact]
+        public void Regex_Cache_Is_Bounded()
+        {
+            for (int i = 0; i < ScriptJournal.MAX_CACHED_REGEXES * 2; i++)
+                ScriptJournal.IsMatch("text " + i, "$text " + i + "$");
+
+            ScriptJournal.CachedRegexCount.Should().BeLessOrEqualTo(ScriptJournal.MAX_CACHED_REGEXES);
+        }
+    }
+}
@@ -0,0 +1,57 @@
+using System.Diagnostics;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class ScriptProfileTest
+    {
+        [Fact]
+        public void RecordMainThreadCall_Accumulates_Per_Method()
+        {
+            var profile = new ScriptProfile("test.py");
+            long ms = Stopwatch.Frequency / 1000;
+
+            profile.RecordMainThreadCall("FindType", 2 * ms, 1 * ms, 3 * ms);
+            profile.RecordMainThreadCall("FindType", 4 * ms, 1 * ms, 5 * ms);
+            profile.RecordMainThreadCall("SysMsg", 1 * ms, 1 * ms, 2 * ms);
+
+            profile.MainThreadCalls.Should().Be(3);
+            profile.QueuedMs.Should().BeApproximately(7, 0.01);
+            profile.MaxQueuedMs.Should().BeApproximately(4, 0.01);
+
+            var methods = profile.GetMethods();
+            methods.Should().HaveCount(2);
+            methods[0].Method.Should().Be("FindType");
+            methods[0].Count.Should().Be(2);
+            methods[0].MaxMs.Should().BeApproximately(5, 0.01);
+        }
+
+        [Fact]
+        public void Reset_Clears_Stats()
+        {
+            var profile = new ScriptProfile("test.py");
+            profile.RecordMainThreadCall("SysMsg", 10, 10, 20);
+            profile.AddWait(100);
+
+            profile.Reset();
+
+            profile.MainThreadCalls.Should().Be(0);
+            profile.WaitingMs.Should().Be(0);
+            profile.GetMethods().Should().BeEmpty();
+        }
+
+        [Fact]
+        public void BeginRun_Sets_Current_For_Thread()
+        {
+            var profile = new ScriptProfile("test.py");
+
+            profile.BeginRun();
+            ScriptProfile.Current.Should().BeSameAs(profile);
+
+            profile.EndRun();
+            ScriptProfile.Current.Should().BeNull();
+        }
+    }
+}
@@ -0,0 +1,105 @@
+using System;
+using System.IO;
+using System.Threading;
+using ClassicUO.LegionScripting;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.LegionScripting
+{
+    public class SharedVarStoreTest : IDisposable
+    {
+        private readonly string _path = Path.Combine(Path.GetTempPath(), $"sharedvars_{Guid.NewGuid():N}.bin");
+        private readonly SharedVarStore _a, _b;
+
+        public SharedVarStoreTest()
+        {
+            // Two stores mapping the same file behave like two clients
+            _a = new SharedVarStore(_path);
+            _b = new SharedVarStore(_path);
+        }
+
+        public void Dispose()
+        {
+            _a.Dispose();
+            _b.Dispose();
+            File.Delete(_path);
+        }
+
+        [Fact]
+        public void Values_Are_Seen_By_Other_Store()
+        {
+            _a.Set("text", "hello");
+            _a.Set("number", 42);
+            _a.Set("big", 1L << 40);
+            _a.Set("double", 1.5);
+            _a.Set("flag", true);
+
+            _b.Get("text", out long version).Should().Be("hello");
+            version.Should().BeGreaterThan(0);
+            _b.Get("number", out _).Should().Be(42);
+            _b.Get("big", out _).Should().Be(1L << 40);
+            _b.Get("double", out _).Should().Be(1.5);
+            _b.Get("flag", out _).Should().Be(true);
+
+            _b.Remove("text").Should().BeTrue();
+            _a.Get("text", out version).Should().BeNull();
+            version.Should().Be(0);
+        }
+
+        [Fact]
+        public void CompareAndSet_Fails_On_Stale_Version()
+        {
+            _a.CompareAndSet("claim", 0, "a").Should().BeTrue();
+            _b.CompareAndSet("claim", 0, "b").Should().BeFalse();
+
+            _b.Get("claim", out long version).Should().Be("a");
+            _b.CompareAndSet("claim", version, "b").Should().BeTrue();
+            _a.CompareAndSet("claim", version, "c").Should().BeFalse();
+
+            // A var set again after a remove gets a new version
+            _a.Remove("claim");
+            _a.Set("claim", "d");
+            _b.CompareAndSet("claim", version, "e").Should().BeFalse();
+            _a.Get("claim", out _).Should().Be("d");
+        }
+
+        [Fact]
+        public void Poll_Reports_Writes_From_Other_Store()
+        {
+            _b.Poll().Should().BeFalse();
+
+            _a.Set("x", 1);
+
+            _b.Poll().Should().BeTrue();
+            _b.Poll().Should().BeFalse();
+
+            // Its own writes aren't news to a store
+            _a.Poll().Should().BeFalse();
+        }
+
+        [Fact]
+        public void Expired_Vars_Are_Gone_And_Free_Their_Slot()
+        {
+            for (int i = 0; i < SharedVarStore.SLOT_COUNT; i++)
+                _a.Set($"claim{i}", i, 0.05);
+
+            Thread.Sleep(100);
+
+            _b.Get("claim0", out long version).Should().BeNull();
+            version.Should().Be(0);
+            _b.CompareAndSet("claim0", 0, "b").Should().BeTrue();
+            _b.Set("other", 1);
+        }
+
+        [Fact]
+        public void Rejects_Unsupported_Values()
+        {
+            Action set = () => _a.Set("list", new object());
+            set.Should().Throw<ArgumentException>();
+
+            Action tooLong = () => _a.Set("text", new string('x', SharedVarStore.MAX_VALUE_BYTES + 1));
+            tooLong.Should().Throw<ArgumentException>();
+        }
+    }
+}
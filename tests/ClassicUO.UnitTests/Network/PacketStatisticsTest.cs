@@ -0,0 +1,86 @@
+using System.Diagnostics;
+using System.IO;
+using ClassicUO.Network;
+using FluentAssertions;
+using Xunit;
+
+namespace ClassicUO.UnitTests.Network
+{
+    public class PacketStatisticsTest
+    {
+        private static readonly long Ms = Stopwatch.Frequency / 1000;
+
+        [Fact]
+        public void Record_Accumulates_Per_Packet_ID()
+        {
+            var stats = new PacketStatistics(id => id == 0x3C ? "UpdateContainedItems" : null);
+
+            stats.Record(0x3C, 100, 2 * Ms, 0);
+            stats.Record(0x3C, 50, 4 * Ms, 1 * Ms);
+            stats.Record(0x11, 10, 1 * Ms, 0);
+
+            var all = stats.GetAll();
+            all.Should().HaveCount(2);
+            all[0].ID.Should().Be(0x3C);
+            all[0].Name.Should().Be("UpdateContainedItems");
+            all[0].Count.Should().Be(2);
+            all[0].Bytes.Should().Be(150);
+            all[0].HandlerMs.Should().BeApproximately(6, 0.01);
+            all[0].MaxHandlerMs.Should().BeApproximately(4, 0.01);
+            all[0].PluginMs.Should().BeApproximately(1, 0.01);
+            all[1].Name.Should().BeEmpty();
+        }
+
+        [Fact]
+        public void Record_Fills_Histogram_Buckets()
+        {
+            var stats = new PacketStatistics();
+
+            stats.Record(0x20, 1, 0, 0);
+            stats.Record(0x20, 1, 3 * Ms, 0);
+            stats.Record(0x20, 1, 100 * Ms, 0);
+
+            long[] histogram = stats.Get(0x20).Histogram;
+            histogram[0].Should().Be(1);
+            histogram[7].Should().Be(1);
+            histogram[histogram.Length - 1].Should().Be(1);
+        }
+
+        [Fact]
+        public void GetBusiestLastSecond_Is_Empty_Until_A_Second_Passed()
+        {
+            var stats = new PacketStatistics();
+
+            stats.Record(0x3C, 1, 5 * Ms, 0);
+
+            stats.GetBusiestLastSecond(3).Should().BeEmpty();
+        }
+
+        [Fact]
+        public void Reset_Clears_Stats()
+        {
+            var stats = new PacketStatistics();
+            stats.Record(0x3C, 1, Ms, 0);
+
+            stats.Reset();
+
+            stats.GetAll().Should().BeEmpty();
+            stats.Get(0x3C).Should().BeNull();
+        }
+
+        [Fact]
+        public void WriteCsv_Writes_A_Row_Per_Packet_ID()
+        {
+            var stats = new PacketStatistics();
+            stats.Record(0x3C, 1, Ms, 0);
+            stats.Record(0xD6, 1, Ms, 0);
+
+            var writer = new StringWriter();
+            PacketStatistics.WriteCsv(stats.GetAll(), writer);
+
+            string[] lines = writer.ToString().Trim().Split('\n');
+            lines.Should().HaveCount(3);
+            lines[0].Should().StartWith("id,name,count,bytes");
+        }
+    }
+}
@@ -0,0 +1,55 @@
+using System.Collections.Generic;
+using ClassicUO.Utility.Collections;
+using FluentAssertions;
+using Microsoft.Xna.Framework;
+using Xunit;
+
+namespace ClassicUO.UnitTests.Utility
+{
+    public class SpatialGridTest
+    {
+        [Fact]
+        public void Query_Returns_Only_Points_Inside_Area()
+        {
+            var grid = new SpatialGrid<string>(16);
+            grid.Add("a", 5, 5);
+            grid.Add("b", 40, 40);
+            grid.Add("c", -3, 2);
+
+            var result = new List<string>();
+            grid.Query(new Rectangle(-10, 0, 30, 30), result);
+
+            result.Should().BeEquivalentTo("a", "c");
+        }
+
+        [Fact]
+        public void Item_Spanning_Cells_Is_Returned_Once()
+        {
+            var grid = new SpatialGrid<string>(16);
+            grid.Add("zone", new Rectangle(0, 0, 100, 100));
+
+            var result = new List<string>();
+            grid.Query(new Rectangle(10, 10, 60, 60), result);
+
+            result.Should().Equal("zone");
+        }
+
+        [Fact]
+        public void Remove_Takes_Item_Out_Of_Every_Cell()
+        {
+            var grid = new SpatialGrid<string>(16);
+            var bounds = new Rectangle(0, 0, 40, 40);
+            grid.Add("zone", bounds);
+            grid.Add("point", 8, 8);
+
+            grid.Remove("zone", bounds).Should().BeTrue();
+            grid.Remove("zone", bounds).Should().BeFalse();
+
+            var result = new List<string>();
+            grid.Query(new Rectangle(0, 0, 64, 64), result);
+
+            result.Should().Equal("point");
+            grid.Count.Should().Be(1);
+        }
+    }
+}